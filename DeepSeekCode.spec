@@ -3,7 +3,9 @@
 # All modules: cli (22), deepseek_code (68), external deps
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('src', 'src'), ('skills', 'skills')]
+datas = [('src', 'src'), ('skills', 'skills'),
+         # BPE vocabulary next to the module that loads it (tokenization/counter.py)
+         ('src/deepseek_code/tokenization/bpe_vocab.json', 'deepseek_code/tokenization')]
 binaries = []
 hiddenimports = [
     # --- cli ---
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark: ArchiveTool, zipfile secuencial vs compresion por bloques en paralelo.
+
+Crea (una vez) un arbol sintetico de N archivos (texto repetitivo y
+binario poco compresible, como un build real) y mide:
+
+    legacy   zipfile.ZipFile.write archivo por archivo (algoritmo anterior)
+    zip      write_zip con --workers hilos
+    tar.gz   write_tar(tar.gz)
+    tar.xz   write_tar(tar.xz)       (solo con --xz: es lento)
+    unzip    extract_zip del zip anterior
+
+En una maquina de un solo nucleo el paralelo no puede ganar; lo que
+importa ahi es que no empeore y que el event loop quede libre.
+
+Uso:
+    python benchmarks/bench_archive.py
+    python benchmarks/bench_archive.py --files 2000 --workers 8 --xz
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from deepseek_code.tools.archive_engine import (  # noqa: E402
+    collect_entries, extract_zip, write_tar, write_zip,
+)
+
+_WORDS = ["user", "config", "load", "save", "parse", "render", "token", "cache",
+          "session", "request", "handler", "index", "query", "result", "error"]
+
+
+def build_tree(root: Path, files: int, seed: int = 5):
+    marker = root.parent / ".bench_files"
+    if marker.exists() and marker.read_text() == f"v1:{files}":
+        return
+    if root.exists():
+        shutil.rmtree(root)
+    rng = random.Random(seed)
+    for i in range(files):
+        d = root / f"dir{i // 100}"
+        if i % 100 == 0:
+            d.mkdir(parents=True, exist_ok=True)
+        if i % 10 == 0:
+            data = rng.randbytes(rng.randint(50_000, 400_000))
+        else:
+            words = [rng.choice(_WORDS) for _ in range(rng.randint(2_000, 20_000))]
+            data = " ".join(words).encode()
+        (d / f"f{i}.dat").write_bytes(data)
+    marker.write_text(f"v1:{files}")
+
+
+def legacy_zip(dst: Path, entries):
+    with zipfile.ZipFile(str(dst), "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for path, arcname, _size in entries:
+            zf.write(str(path), arcname)
+
+
+def timed(label: str, total: int, func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<8} {elapsed:7.2f}s  {total / 1024 / 1024 / elapsed:7.1f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=600)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--xz", action="store_true", help="incluir tar.xz")
+    parser.add_argument("--root", default=os.path.join(tempfile.gettempdir(), "deepseek-bench-archive"))
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    tree = root / "tree"
+    build_tree(tree, args.files)
+    entries = collect_entries(tree, 10 ** 6, 10 ** 12)
+    total = sum(size for _path, _name, size in entries)
+    out = root / "out"
+    shutil.rmtree(out, ignore_errors=True)
+    out.mkdir()
+    print(f"{len(entries)} archivos, {total / 1024 / 1024:.1f} MB, {args.workers} hilo(s)")
+
+    timed("legacy", total, legacy_zip, out / "legacy.zip", entries)
+    timed("zip", total, write_zip, out / "a.zip", entries, workers=args.workers)
+    timed("tar.gz", total, write_tar, out / "a.tar.gz", entries, "tar.gz", workers=args.workers)
+    if args.xz:
+        timed("tar.xz", total, write_tar, out / "a.tar.xz", entries, "tar.xz", workers=args.workers)
+    timed("unzip", total, extract_zip, out / "a.zip", out / "x", 10 ** 6, 10 ** 12,
+          workers=args.workers)
+    for name in sorted(os.listdir(out)):
+        if os.path.isfile(out / name):
+            print(f"  {name:<12} {os.path.getsize(out / name) / 1024 / 1024:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Benchmark: list_directory / find_files recursivos, rglob vs walker en streaming.
+
+Crea (una vez) un arbol sintetico tipo monorepo: unos pocos miles de
+archivos de codigo y el resto dentro de node_modules y build, que es
+donde se va el tiempo del recorrido completo. Luego compara:
+
+    legacy  lo que hacian las tools: sorted(rglob("*"))[:max_results] y
+            base.glob("**/*.py") sin poda
+    walker  ListDirectoryTool / FindFilesTool actuales (os.scandir,
+            poda de IGNORE_DIRS y .gitignore, corte en max_results)
+
+Uso:
+    python benchmarks/bench_dir_walker.py
+    python benchmarks/bench_dir_walker.py --files 200000 --max-results 500
+    python benchmarks/bench_dir_walker.py --root /tmp/arbol --keep
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from deepseek_code.tools.file_utils import FindFilesTool  # noqa: E402
+from deepseek_code.tools.filesystem import ListDirectoryTool  # noqa: E402
+
+# Fraccion del arbol que es codigo propio (el resto: dependencias y artefactos)
+SOURCE_FRACTION = 0.02
+FILES_PER_DIR = 50
+
+
+def build_tree(root: Path, files: int):
+    """Arbol de `files` archivos; reutiliza uno ya creado con la misma cantidad."""
+    marker = root / ".bench_files"
+    if marker.exists() and marker.read_text() == str(files):
+        return
+    if root.exists():
+        shutil.rmtree(root)
+    source = max(1, int(files * SOURCE_FRACTION))
+    layout = [("src", source), ("node_modules", (files - source) * 3 // 4),
+              ("build", files - source - (files - source) * 3 // 4)]
+    for top, count in layout:
+        for i in range(count):
+            d = root / top / f"pkg{i // (FILES_PER_DIR * 20)}" / f"mod{i // FILES_PER_DIR}"
+            if i % FILES_PER_DIR == 0:
+                d.mkdir(parents=True, exist_ok=True)
+            ext = ".py" if top == "src" else ".js"
+            (d / f"f{i}{ext}").write_bytes(b"x")
+    (root / ".gitignore").write_text("*.tmp\n", encoding="utf-8")
+    marker.write_text(str(files))
+
+
+def legacy_list(base: Path, max_results: int) -> int:
+    files = list(base.rglob("*"))
+    files = sorted(files)[:max_results]
+    for f in files:
+        f.stat()
+    return len(files)
+
+
+def legacy_find(base: Path, pattern: str, max_results: int) -> int:
+    count = 0
+    for match in base.glob(pattern):
+        count += 1
+        if count > max_results:
+            break
+    return min(count, max_results)
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200_000, help="Archivos del arbol sintetico")
+    parser.add_argument("--max-results", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--root", help="Directorio del arbol (default: temporal)")
+    parser.add_argument("--keep", action="store_true", help="No borrar el arbol al terminar")
+    args = parser.parse_args()
+
+    root = Path(args.root or os.path.join(tempfile.gettempdir(), "deepseek_bench_tree"))
+    t0 = time.perf_counter()
+    build_tree(root, args.files)
+    print(f"Arbol: {args.files} archivos en {root} ({time.perf_counter() - t0:.1f}s)")
+
+    list_tool = ListDirectoryTool([str(root)])
+    find_tool = FindFilesTool([str(root)])
+    n = args.max_results
+
+    cases = [
+        ("list recursive", lambda: legacy_list(root, n),
+         lambda: asyncio.run(list_tool.execute(str(root), recursive=True, max_results=n))),
+        ("find **/*.py", lambda: legacy_find(root, "**/*.py", n),
+         lambda: asyncio.run(find_tool.execute(str(root), "**/*.py", max_results=n))),
+        ("find **/*.md (0 hits)", lambda: legacy_find(root, "**/*.md", n),
+         lambda: asyncio.run(find_tool.execute(str(root), "**/*.md", max_results=n))),
+    ]
+    print(f"\n{'caso':<24}{'legacy':>10}{'walker':>10}{'speedup':>10}")
+    for name, legacy, walker in cases:
+        t_legacy, _ = timed(legacy, args.repeat)
+        t_walker, _ = timed(walker, args.repeat)
+        print(f"{name:<24}{t_legacy:>9.3f}s{t_walker:>9.3f}s{t_legacy / t_walker:>9.1f}x")
+
+    if not args.keep and not args.root:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
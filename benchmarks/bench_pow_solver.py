@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Benchmark: wasm_solve (1 hilo) vs solver paralelo por lotes de nonces.
+
+Para cada dificultad genera un challenge sintetico con respuesta conocida
+(DeepSeekHashV1 calculado con la propia exportacion WASM), lo resuelve
+con ambos solvers, verifica que las respuestas sean identicas y reporta
+los tiempos.
+
+Uso:
+    python benchmarks/bench_pow_solver.py --wasm %APPDATA%/DeepSeek-Code/sha3_wasm_bg.wasm
+    python benchmarks/bench_pow_solver.py --wasm sha3_wasm_bg.wasm --difficulties 144000 1000000 --workers 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from deepseek_code.client.pow_solver import ParallelPowSolver, deepseek_hash_v1  # noqa: E402
+from deepseek_code.client.web_session import DeepSeekWebSession  # noqa: E402
+
+DEFAULT_DIFFICULTIES = (50_000, 144_000, 500_000, 1_000_000, 4_000_000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wasm", required=True, help="Ruta a sha3_wasm_bg.wasm")
+    parser.add_argument("--difficulties", type=int, nargs="+", default=list(DEFAULT_DIFFICULTIES))
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (default: cpu_count)")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    session = DeepSeekWebSession("bench-token", {"bench": "1"}, args.wasm)
+    solver = ParallelPowSolver(args.wasm, args.workers)
+    # Calentar el pool (spawn + deserializar el modulo en cada worker)
+    warm = {"salt": "w", "expire_at": 1, "difficulty": 10,
+            "challenge": deepseek_hash_v1("w_1_5", args.wasm)}
+    solver.solve(warm)
+
+    print(f"workers={solver.workers}")
+    print(f"{'difficulty':>11} {'answer':>9} {'wasm_solve':>11} {'parallel':>10} {'speedup':>8} match")
+    try:
+        for difficulty in args.difficulties:
+            answer = rng.randrange(difficulty // 2, difficulty)
+            salt, expire_at = f"s{rng.getrandbits(32):08x}", 1700000000000
+            challenge = {
+                "algorithm": "DeepSeekHashV1",
+                "challenge": deepseek_hash_v1(f"{salt}_{expire_at}_{answer}", args.wasm),
+                "salt": salt,
+                "expire_at": expire_at,
+                "difficulty": difficulty,
+            }
+
+            t0 = time.perf_counter()
+            single = session._solve_challenge_wasm(challenge)
+            t1 = time.perf_counter()
+            parallel = solver.solve(challenge)
+            t2 = time.perf_counter()
+
+            match = single == parallel == answer
+            print(
+                f"{difficulty:>11} {answer:>9} {(t1 - t0) * 1000:>9.1f}ms "
+                f"{(t2 - t1) * 1000:>8.1f}ms {(t1 - t0) / (t2 - t1):>7.2f}x {'OK' if match else 'MISMATCH'}"
+            )
+    finally:
+        solver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Benchmark: serena_search_for_pattern, recorrido completo vs indice de trigramas.
+
+Crea (una vez) un repo sintetico de N archivos de codigo con
+identificadores variados y mide:
+
+    legacy   el algoritmo anterior: iter_project_files + read_file_lines
+             en cada archivo + numero de linea con text[:pos].count("\\n")
+    build    construccion inicial del indice (una sola vez por proyecto)
+    walk     recorrido completo sin cambios (stat de todos los archivos): al
+             primer uso del proceso, tras run_command o un proceso en
+             background, y cada FULL_REFRESH_SECONDS
+    idle     refresh() + consulta tras --idle segundos sin consultas, con
+             una tool que escribio un archivo entre medio (lo normal entre
+             tool calls del agente)
+
+Uso:
+    python benchmarks/bench_search_index.py
+    python benchmarks/bench_search_index.py --files 50000 --repeat 5 --idle 30
+"""
+
+import argparse
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from deepseek_code.server.tool import bump_mutation_epoch  # noqa: E402
+from deepseek_code.serena.code_patterns import iter_project_files, read_file_lines  # noqa: E402
+from deepseek_code.serena.trigram_index import TrigramIndex, line_of  # noqa: E402
+from deepseek_code.serena.project_files import read_text  # noqa: E402
+
+_WORDS = ["user", "config", "load", "save", "parse", "render", "token", "cache",
+          "session", "request", "handler", "index", "query", "result", "error"]
+_SYLLABLES = ["ka", "lo", "mi", "tur", "pex", "vor", "zan", "qui", "bel", "dro", "fen", "gul"]
+
+QUERIES = [
+    ("identificador raro", r"def\s+needle_handler_20007\b"),
+    ("literal comun", r"def load_"),
+    ("alternativa", r"(?:parse|save)_vorzan\w*\("),
+    ("sin literales", r"\d{2}\(\w{2}\)"),
+]
+
+
+def build_repo(root: Path, files: int, seed: int = 3):
+    marker = root / ".bench_files"
+    if marker.exists() and marker.read_text() == f"v3:{files}":
+        return
+    if root.exists():
+        shutil.rmtree(root)
+    rng = random.Random(seed)
+    # Vocabulario de proyecto: palabras comunes + miles de nombres propios
+    vocab = _WORDS + ["".join(rng.sample(_SYLLABLES, 3)) for _ in range(3000)]
+    for i in range(files):
+        d = root / f"pkg{i // 1000}" / f"mod{i // 50}"
+        if i % 50 == 0:
+            d.mkdir(parents=True, exist_ok=True)
+        lines = ["import os", ""]
+        for _ in range(rng.randint(8, 30)):
+            name = "_".join([rng.choice(_WORDS), rng.choice(vocab)]) + f"_{rng.randint(0, 99)}"
+            lines += [f"def {name}(arg):", f"    return {rng.choice(vocab)}(arg)", ""]
+        if i % 10000 == 7:
+            lines += ["def needle_handler_%d(arg):" % i, "    return arg", ""]
+        (d / f"file{i}.py").write_text("\n".join(lines), encoding="utf-8")
+    marker.write_text(f"v3:{files}")
+
+
+def legacy_search(root: Path, pattern: str, max_results: int = 30) -> int:
+    regex = re.compile(pattern, re.MULTILINE | re.DOTALL)
+    total = 0
+    for fpath in iter_project_files(str(root)):
+        if total >= max_results:
+            break
+        lines = read_file_lines(fpath)
+        full_text = "".join(lines)
+        for match in regex.finditer(full_text):
+            if total >= max_results:
+                break
+            full_text[:match.start()].count("\n")
+            total += 1
+    return total
+
+
+def indexed_search(index: TrigramIndex, pattern: str, max_results: int = 30) -> int:
+    regex = re.compile(pattern, re.MULTILINE | re.DOTALL)
+    total = 0
+    for rel in index.candidates(pattern):
+        if total >= max_results:
+            break
+        text = read_text(os.path.join(index.root, rel)) or ""
+        starts = None
+        for match in regex.finditer(text):
+            if total >= max_results:
+                break
+            if starts is None:
+                starts = index.line_table(rel)[0]
+            line_of(starts, match.start())
+            total += 1
+    return total
+
+
+def query_after_idle(index: TrigramIndex, pattern: str, idle: float, written: Path) -> int:
+    """Como en uso real: la ultima revision fue hace `idle` s y una tool escribio un archivo."""
+    index._last_refresh = time.monotonic() - idle
+    written.write_text(f"def written_{time.perf_counter_ns()}():\n    pass\n", encoding="utf-8")
+    bump_mutation_epoch([str(written)])
+    index.refresh()
+    return indexed_search(index, pattern)
+
+
+def best_of(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--root", help="Directorio del repo sintetico (default: temporal)")
+    parser.add_argument("--idle", type=float, default=10.0,
+                        help="Segundos desde la consulta anterior (default: 10)")
+    args = parser.parse_args()
+
+    root = Path(args.root or os.path.join(tempfile.gettempdir(), "deepseek_bench_repo"))
+    t0 = time.perf_counter()
+    build_repo(root, args.files)
+    print(f"Repo: {args.files} archivos en {root} ({time.perf_counter() - t0:.1f}s)")
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="deepseek_idx_"), "search.db")
+    index = TrigramIndex(str(root), db_path=db_path)
+    t0 = time.perf_counter()
+    stats = index.refresh(force=True)
+    print(f"build    {time.perf_counter() - t0:8.2f}s  ({stats['indexed']} archivos, "
+          f"{os.path.getsize(db_path) / 1024 / 1024:.1f} MB)")
+    t_refresh, _ = best_of(lambda: index.refresh(force=True), args.repeat)
+    print(f"walk     {t_refresh:8.3f}s  (sin cambios)\n")
+
+    written = root / "pkg0" / "written_by_tool.py"
+    print(f"{'consulta':<22}{'legacy':>10}{'idle':>11}{'speedup':>9}{'hits':>6}")
+    for name, pattern in QUERIES:
+        t_legacy, hits_legacy = best_of(lambda: legacy_search(root, pattern), 1)
+        t_index, hits_index = best_of(
+            lambda: query_after_idle(index, pattern, args.idle, written), args.repeat)
+        assert hits_legacy == hits_index or hits_index == 30, (hits_legacy, hits_index)
+        print(f"{name:<22}{t_legacy:>9.3f}s{t_index * 1000:>9.1f}ms"
+              f"{t_legacy / t_index:>8.0f}x{hits_index:>6}")
+
+    index.close()
+    written.unlink()
+    shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark: carga de skills sin indice vs con indice persistente y cache.
+
+Simula lo que hace cada delegacion (un proceso nuevo): armar el catalogo
+de negociacion (nombre + descripcion de todas las skills) y cargar el
+contenido de varias skills relevantes. Mide:
+
+    sin-indice   SkillLoader(index=False): abre y descomprime cada ZIP
+    frio         indice vacio (primera delegacion: extrae y guarda)
+    tibio-disco  SkillLoader nuevo con el indice ya en disco (delegaciones
+                 siguientes, cada una en su propio proceso)
+    tibio-mem    el mismo loader otra vez (varias cargas en un proceso)
+
+Uso:
+    python benchmarks/bench_skill_loader.py
+    python benchmarks/bench_skill_loader.py --skills 8 --repeat 20
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from deepseek_code.skills import skill_catalog  # noqa: E402
+from deepseek_code.skills.loader import SkillLoader, reset_skill_loaders  # noqa: E402
+from deepseek_code.skills.skill_index import SkillIndex  # noqa: E402
+
+
+def _delegation(loader: SkillLoader, names):
+    metas = loader.load_metadata()
+    contents = [loader.load_one(n) for n in names]
+    return len(metas), sum(len(s.content) for s in contents if s)
+
+
+def _measure(make_loader, names, repeat: int, before=None) -> float:
+    times = []
+    for _ in range(repeat):
+        if before:
+            before()
+        loader = make_loader()
+        t0 = time.perf_counter()
+        _delegation(loader, names)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=os.path.join(ROOT, "skills"), help="directorio de skills")
+    parser.add_argument("--skills", type=int, default=5, help="skills cuyo contenido se carga")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    packages = sorted(f[:-len(".skill")] for f in os.listdir(args.dir) if f.endswith(".skill"))
+    names = packages[:args.skills]
+    tmp = tempfile.mkdtemp(prefix="bench_skill_index_")
+    index_dir = os.path.join(tmp, "index")
+    try:
+        def wipe():
+            shutil.rmtree(index_dir, ignore_errors=True)
+
+        results = [
+            ("sin-indice", _measure(lambda: SkillLoader(args.dir, index=False), names, args.repeat)),
+            ("frio", _measure(lambda: SkillLoader(args.dir, index=SkillIndex(args.dir, index_dir)),
+                              names, args.repeat, before=wipe)),
+            ("tibio-disco", _measure(lambda: SkillLoader(args.dir, index=SkillIndex(args.dir, index_dir)),
+                                     names, args.repeat)),
+        ]
+        shared = SkillLoader(args.dir, index=SkillIndex(args.dir, index_dir))
+        _delegation(shared, names)
+        results.append(("tibio-mem", _measure(lambda: shared, names, args.repeat)))
+
+        print(f"{len(packages)} paquetes .skill, catalogo + contenido de {len(names)} skills "
+              f"(mediana de {args.repeat})")
+        base = results[0][1]
+        for label, ms in results:
+            print(f"  {label:<12} {ms:9.2f} ms   x{base / ms:7.1f}")
+
+        # Catalogo de negociacion real (usa el loader compartido del proceso)
+        os.environ["APPDATA"] = os.path.join(tmp, "appdata")
+        reset_skill_loaders()
+        t0 = time.perf_counter()
+        skill_catalog._build_entries(args.dir)
+        cold = (time.perf_counter() - t0) * 1000
+        reset_skill_loaders()
+        t0 = time.perf_counter()
+        skill_catalog._build_entries(args.dir)
+        warm = (time.perf_counter() - t0) * 1000
+        print(f"  catalogo: frio {cold:.2f} ms, proceso nuevo con indice {warm:.2f} ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
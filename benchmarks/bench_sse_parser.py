@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark: replay de streams SSE con y sin el camino rapido del parser.
+
+Reproduce streams grabados (un archivo por stream, una linea SSE por
+linea, tal como se ve en F12 → Network → EventStream) o, sin archivos,
+un stream sintetico tipo thinking de contexto largo. Para cada modo
+reporta chunks/s, cuantos chunks pasaron por json.loads y el pico de
+memoria asignada (tracemalloc) durante el replay.
+
+Modos:
+    legacy  feed(str) con json.loads en cada chunk (fast_path=False)
+    fast    feed(str) con el camino rapido
+    bytes   feed_bytes(bytes): ademas evita decodificar los chunks de thinking
+
+Uso:
+    python benchmarks/bench_sse_parser.py
+    python benchmarks/bench_sse_parser.py --thinking 50000 --content 8000 --repeat 5
+    python benchmarks/bench_sse_parser.py grabacion1.sse grabacion2.sse
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from deepseek_code.client.sse_parser import SSEStreamParser, new_sse_diag  # noqa: E402
+
+_WORDS = ("el", "modelo", "analiza", "archivo", "funcion", "retorna", "valor",
+          "config", "parser", "stream", "ñandú", "token", "=", "(", ")", "\n")
+
+
+def _chunk(obj) -> str:
+    return "data: " + json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def synthetic_stream(thinking: int, content: int, seed: int = 7):
+    """Stream con la forma real: metadata, thinking largo, luego contenido."""
+    rng = random.Random(seed)
+    lines = [
+        _chunk({"request_message_id": 1, "response_message_id": 2}),
+        _chunk({"v": {"response": {"message_id": 2, "thinking_enabled": True}}}),
+        _chunk({"p": "response/thinking_content", "v": "Voy"}),
+    ]
+    lines.extend(_chunk({"v": " " + rng.choice(_WORDS)}) for _ in range(thinking))
+    lines.append(_chunk({"p": "response/content", "v": "Listo"}))
+    for i in range(content):
+        word = rng.choice(_WORDS)
+        # ~2% con escapes JSON (comillas) para ejercitar el camino completo
+        lines.append(_chunk({"v": f' "{word}"' if i % 50 == 0 else " " + word}))
+    lines.extend(["event: finish", "data: [DONE]"])
+    return lines
+
+
+def load_recorded(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\r\n") for line in f if line.strip()]
+
+
+def replay(streams, mode: str) -> dict:
+    """Procesa todos los streams con un parser nuevo por stream.
+
+    Para el modo bytes los streams ya deben venir codificados.
+    """
+    fast_path = mode != "legacy"
+    chunks = decodes = chars = 0
+    for lines in streams:
+        parser = SSEStreamParser(new_sse_diag(), fast_path=fast_path)
+        feed = parser.feed_bytes if mode == "bytes" else parser.feed
+        for line in lines:
+            token = feed(line)
+            if token:
+                chars += len(token)
+            if parser.finished:
+                break
+        parser.close()
+        chunks += parser.diag["total_data_chunks"]
+        decodes += parser.diag["total_data_chunks"] - parser.diag["fast_path_chunks"]
+    return {"chunks": chunks, "decodes": decodes, "chars": chars}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", nargs="*", help="Streams SSE grabados (una linea por linea SSE)")
+    parser.add_argument("--thinking", type=int, default=30000, help="Chunks de thinking del stream sintetico")
+    parser.add_argument("--content", type=int, default=5000, help="Chunks de contenido del stream sintetico")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.recordings:
+        streams = [load_recorded(p) for p in args.recordings]
+    else:
+        streams = [synthetic_stream(args.thinking, args.content)]
+    encoded = [[line.encode("utf-8") for line in lines] for lines in streams]
+    print(f"streams={len(streams)} lineas={sum(len(s) for s in streams)} repeat={args.repeat}")
+
+    print(f"{'modo':>7} {'chunks/s':>12} {'json.loads':>11} {'pico KB':>9} {'chars':>9}")
+    base_rate = None
+    for mode in ("legacy", "fast", "bytes"):
+        inputs = encoded if mode == "bytes" else streams
+        # Tiempo: mejor de N corridas sin tracemalloc
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            stats = replay(inputs, mode)
+            best = min(best, time.perf_counter() - t0)
+        # Memoria: una corrida aparte con tracemalloc
+        tracemalloc.start()
+        replay(inputs, mode)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        rate = stats["chunks"] / best
+        base_rate = base_rate or rate
+        print(
+            f"{mode:>7} {rate:>12,.0f} {stats['decodes']:>11} {peak / 1024:>9.1f} "
+            f"{stats['chars']:>9}  ({rate / base_rate:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Benchmark: conteo de tokens BPE vs las heuristicas por caracteres.
+
+Dos tablas:
+
+    velocidad  el BPE incluido sobre prompts de ~1 MB: count() con un
+               tokenizador recien cargado (cold), de nuevo (warm) y
+               count_tokens() repetido (LRU por hash del contenido)
+
+    error      de cada estimador respecto de una referencia, en este orden:
+                 --usage FIXTURE     conteos reales de la API de DeepSeek
+                                     (usage.prompt_tokens), grabados con
+                                     --record-usage junto con su texto
+                 DEEPSEEK_TOKENIZER  los merges del tokenizer.json oficial
+                                     (con el pre-tokenizador aproximado de
+                                     bpe.py)
+                 ninguna             el BPE incluido: es un proxy sin validar
+                                     y el "error" es solo el desacuerdo con el
+
+Las muestras del error son texto que el vocabulario incluido no vio al
+entrenarse (scripts/train_bpe_vocab.py usa src, skills y README.md):
+codigo de la biblioteca estandar y de tests/, prosa en ingles (LICENSE),
+JSON de tool results y numeros generados. Las muestras del corpus de
+entrenamiento solo aparecen en la tabla de velocidad, marcadas "(visto)".
+
+Estimaciones anteriores:
+    len/3.5  context_manager, chat_in_session, session_namespace, converse
+    len//4   skill_injector, skill_catalog, template_chunker, delegate_validator
+
+Uso:
+    python benchmarks/bench_tokenizer.py
+    DEEPSEEK_TOKENIZER=tokenizer.json python benchmarks/bench_tokenizer.py
+    DEEPSEEK_API_KEY=sk-... python benchmarks/bench_tokenizer.py --record-usage usage.jsonl
+    python benchmarks/bench_tokenizer.py --usage usage.jsonl
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import sys
+import sysconfig
+import time
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from deepseek_code.tokenization import count_tokens, reset_tokenizer  # noqa: E402
+from deepseek_code.tokenization.bpe import BPETokenizer  # noqa: E402
+from deepseek_code.tokenization.counter import TOKENIZER_ENV, VOCAB_PATH  # noqa: E402
+
+API_BASE_URL = "https://api.deepseek.com/v1"
+API_MODEL = "deepseek-chat"
+# Texto de referencia para restar el envoltorio del chat (1 token en cualquier BPE)
+BASELINE_TEXT = "a"
+
+
+def _read_paths(paths) -> str:
+    parts = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            parts.append(f.read())
+    return "\n".join(parts)
+
+
+def _read(pattern: str, base: str = ROOT) -> str:
+    return _read_paths(sorted(glob.glob(os.path.join(base, pattern), recursive=True)))
+
+
+def _read_skills() -> str:
+    parts = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "skills", "*.skill"))):
+        with zipfile.ZipFile(path) as zf:
+            parts.extend(zf.read(n).decode("utf-8", "replace") for n in zf.namelist() if n.endswith(".md"))
+    return "\n".join(parts)
+
+
+def _fill(text: str, size: int) -> str:
+    if not text:
+        return ""
+    return (text * (size // len(text) + 1))[:size]
+
+
+def held_out_samples(size: int) -> dict:
+    """Texto que el vocabulario incluido no vio al entrenarse."""
+    rng = random.Random(11)
+    tool_json = json.dumps([
+        {"path": f"src/module_{i}/file_{i}.py", "line": rng.randint(1, 5000),
+         "match": f"def handler_{i}(request, *args, **kwargs):", "size": rng.randint(100, 90000)}
+        for i in range(20000)
+    ], indent=2)
+    numbers = "\n".join(",".join(str(rng.randint(0, 10 ** 7)) for _ in range(12)) for _ in range(40000))
+    return {
+        "python stdlib": _fill(_read("*.py", sysconfig.get_paths()["stdlib"]), size),
+        "python tests/": _fill(_read("tests/*.py"), size),
+        "ingles (LICENSE)": _fill(_read("LICENSE"), size),
+        "json tool result": _fill(tool_json, size),
+        "numeros csv": _fill(numbers, size),
+    }
+
+
+def seen_samples(size: int) -> dict:
+    """Texto del corpus de entrenamiento (solo para medir velocidad)."""
+    return {
+        "python src (visto)": _fill(_read("src/**/*.py"), size),
+        "skills md (visto)": _fill(_read_skills(), size),
+    }
+
+
+def record_usage(out_path: str, samples: dict, chars: int):
+    """Graba conteos reales de la API: prompt_tokens(texto) - prompt_tokens(BASELINE_TEXT) + 1."""
+    from openai import OpenAI
+
+    api_key = os.environ.get("DEEPSEEK_API_KEY")
+    if not api_key:
+        sys.exit("DEEPSEEK_API_KEY no esta definida")
+    client = OpenAI(api_key=api_key, base_url=API_BASE_URL)
+
+    def prompt_tokens(text: str) -> int:
+        resp = client.chat.completions.create(
+            model=API_MODEL, max_tokens=1,
+            messages=[{"role": "user", "content": text}],
+        )
+        return resp.usage.prompt_tokens
+
+    baseline = prompt_tokens(BASELINE_TEXT)
+    with open(out_path, "w", encoding="utf-8") as f:
+        for name, text in samples.items():
+            text = text[:chars]
+            tokens = prompt_tokens(text) - baseline + 1
+            f.write(json.dumps({"name": name, "text": text, "tokens": tokens,
+                                "model": API_MODEL}, ensure_ascii=False) + "\n")
+            print(f"  {name}: {tokens} tokens")
+    print(f"{len(samples)} muestras -> {out_path}")
+
+
+def load_usage(path: str) -> dict:
+    samples = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                samples[rec["name"]] = (rec["text"], rec["tokens"])
+    return samples
+
+
+def speed_table(samples: dict):
+    header = (f"{'prompt':<20} {'tokens':>8} {'chars/tok':>9} {'cold MB/s':>10} "
+              f"{'warm MB/s':>10} {'cached ms':>10}")
+    print(header)
+    print("-" * len(header))
+    for name, text in samples.items():
+        mb = len(text.encode("utf-8")) / 1024 / 1024
+        tok = BPETokenizer.from_file(VOCAB_PATH)
+        t0 = time.perf_counter()
+        tokens = tok.count(text)
+        cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        tok.count(text)
+        warm = time.perf_counter() - t0
+
+        reset_tokenizer()
+        count_tokens(text)
+        t0 = time.perf_counter()
+        count_tokens(text)
+        cached = time.perf_counter() - t0
+        print(f"{name:<20} {tokens:>8} {len(text) / tokens:>9.2f} {mb / cold:>10.1f} "
+              f"{mb / warm:>10.1f} {cached * 1000:>10.2f}")
+
+
+def error_table(samples: dict, with_bundled: bool):
+    bundled = BPETokenizer.from_file(VOCAB_PATH)
+    columns = (["BPE incluido"] if with_bundled else []) + ["len/3.5", "len//4"]
+    header = f"{'muestra':<20} {'ref':>8} " + " ".join(f"{c:>12}" for c in columns)
+    print(header)
+    print("-" * len(header))
+    for name, (text, ref) in samples.items():
+        estimates = ([bundled.count(text)] if with_bundled else []) + [
+            math.ceil(len(text) / 3.5), len(text) // 4]
+        print(f"{name:<20} {ref:>8} " + " ".join(
+            f"{(est - ref) / ref * 100:>+11.0f}%" for est in estimates))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=1.0)
+    parser.add_argument("--usage", help="JSONL con conteos reales (de --record-usage)")
+    parser.add_argument("--record-usage", metavar="OUT", help="grabar conteos de la API en OUT")
+    parser.add_argument("--record-chars", type=int, default=24000,
+                        help="caracteres por muestra al grabar (default: 24000)")
+    args = parser.parse_args()
+    size = int(args.size_mb * 1024 * 1024)
+
+    if args.record_usage:
+        record_usage(args.record_usage, held_out_samples(args.record_chars), args.record_chars)
+        return
+
+    start = time.perf_counter()
+    BPETokenizer.from_file(VOCAB_PATH)
+    print(f"carga del vocabulario: {(time.perf_counter() - start) * 1000:.0f} ms\n")
+    held_out = held_out_samples(size)
+    speed_table({**held_out, **seen_samples(size)})
+    print()
+
+    official = os.environ.get(TOKENIZER_ENV)
+    if args.usage:
+        print(f"Error contra conteos reales de la API ({args.usage}):")
+        error_table(load_usage(args.usage), with_bundled=True)
+    elif official:
+        print(f"Error contra el tokenizer oficial ({official}):")
+        reference = BPETokenizer.from_file(official)
+        error_table({n: (t, reference.count(t)) for n, t in held_out.items()}, with_bundled=True)
+    else:
+        print("Sin referencia real (--usage o DEEPSEEK_TOKENIZER): desacuerdo con el BPE")
+        print("incluido, que es un proxy sin validar, no el error respecto de DeepSeek:")
+        bundled = BPETokenizer.from_file(VOCAB_PATH)
+        error_table({n: (t, bundled.count(t)) for n, t in held_out.items()}, with_bundled=False)
+
+
+if __name__ == "__main__":
+    main()
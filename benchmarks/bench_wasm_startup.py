@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark: tiempo de construccion de N clientes web (PoW WASM).
+
+Compara, para 1, 5 y 10 sesiones:
+- legacy: Engine + Module.from_file + Instance por sesion (comportamiento previo)
+- cold:   cache de proceso vacio y sin artefacto en disco (primera ejecucion)
+- warm:   artefacto precompilado en disco, proceso nuevo (siguientes ejecuciones del CLI)
+
+No hace llamadas de red: DeepSeekWebSession solo carga el WASM en __init__.
+
+Uso:
+    python benchmarks/bench_wasm_startup.py --wasm %APPDATA%/DeepSeek-Code/sha3_wasm_bg.wasm
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import wasmtime  # noqa: E402
+
+from deepseek_code.client import wasm_runtime  # noqa: E402
+from deepseek_code.client.web_session import DeepSeekWebSession  # noqa: E402
+
+COUNTS = (1, 5, 10)
+
+
+def _legacy(wasm_path: str, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        engine = wasmtime.Engine()
+        module = wasmtime.Module.from_file(engine, wasm_path)
+        store = wasmtime.Store(engine)
+        instance = wasmtime.Instance(store, module, [])
+        instance.exports(store)["wasm_solve"]
+    return time.perf_counter() - start
+
+
+def _sessions(wasm_path: str, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        DeepSeekWebSession("bench-token", {"bench": "1"}, wasm_path)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wasm", required=True, help="Ruta a sha3_wasm_bg.wasm")
+    args = parser.parse_args()
+
+    # Copia en un directorio temporal para no tocar el cache real
+    workdir = tempfile.mkdtemp(prefix="wasm_bench_")
+    wasm_path = os.path.join(workdir, "sha3_wasm_bg.wasm")
+    shutil.copyfile(args.wasm, wasm_path)
+    cache_dir = os.path.join(workdir, wasm_runtime.CACHE_DIRNAME)
+
+    print(f"wasmtime {wasm_runtime._wasmtime_version()}")
+    print(f"{'clients':>8} {'legacy':>10} {'cold':>10} {'warm':>10} {'speedup':>9}")
+    try:
+        for n in COUNTS:
+            legacy = _legacy(wasm_path, n)
+
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            wasm_runtime.clear_memory_cache()
+            cold = _sessions(wasm_path, n)
+
+            # Simula un proceso nuevo: cache en memoria vacio, artefacto en disco
+            wasm_runtime.clear_memory_cache()
+            warm = _sessions(wasm_path, n)
+
+            print(
+                f"{n:>8} {legacy * 1000:>8.1f}ms {cold * 1000:>8.1f}ms "
+                f"{warm * 1000:>8.1f}ms {legacy / warm:>8.1f}x"
+            )
+        print(f"cache: {wasm_runtime.get_cache_stats()}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,4 +17,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from cli.main import main
 
 if __name__ == '__main__':
+    # El solver de PoW multi-nucleo usa procesos spawn: en el .exe
+    # congelado los hijos deben arrancar como workers, no como el CLI.
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
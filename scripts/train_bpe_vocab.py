@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Entrena los merges BPE de bpe_vocab.json a partir de un corpus local.
+
+El vocabulario real de DeepSeek no se distribuye con el repo ni se puede
+descargar offline, asi que el incluido se entrena sobre el mismo tipo de
+texto que la herramienta manda al modelo: el codigo del proyecto, las
+skills (el markdown dentro de cada .skill) y la documentacion, mas
+los grupos de 2-3 digitos que DeepSeek-V3 tiene como tokens. Con 16K
+merges queda muy por debajo de los 128K de DeepSeek-V3: en prosa
+general cuenta algo de mas, pero sigue la forma real del texto
+(identificadores, indentacion, numeros), que es donde las heuristicas
+por caracteres fallaban. El corpus no tiene CJK: para esos caracteres
+se guarda la proporcion documentada por DeepSeek (~0.6 tokens por
+caracter) en "cjk_tokens_per_char".
+
+Si hay un tokenizer.json oficial a mano, DEEPSEEK_TOKENIZER lo usa en
+lugar de este (ver counter.py).
+
+No es parte del paquete: solo hace falta para regenerar el vocabulario.
+El corpus de entrenamiento (src, skills, README.md) no debe usarse para
+medir el error de conteo: ver benchmarks/bench_tokenizer.py, que mide
+sobre texto que el vocabulario no vio y contra conteos reales.
+
+Uso (desde la raiz del repo):
+    python scripts/train_bpe_vocab.py src skills README.md
+"""
+
+import argparse
+import collections
+import heapq
+import json
+import os
+import sys
+import zipfile
+from typing import Dict, Iterable, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from deepseek_code.tokenization.bpe import PRETOKEN_PATTERN, encode_merge  # noqa: E402
+from deepseek_code.tokenization.counter import VOCAB_PATH  # noqa: E402
+
+CORPUS_EXTENSIONS = {".py", ".md", ".skill", ".yaml", ".yml", ".json", ".js", ".ts",
+                     ".html", ".css", ".txt", ".toml", ".sh", ".ps1"}
+SKIP_DIRS = {"__pycache__", ".git", "node_modules", "build", "dist"}
+# "1 caracter chino ~ 0.6 tokens" (documentacion de precios de DeepSeek)
+CJK_TOKENS_PER_CHAR = 0.6
+
+
+def iter_corpus(paths: Iterable[str]) -> Iterable[str]:
+    for path in paths:
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = []
+            for root, dirs, names in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+                files.extend(os.path.join(root, n) for n in sorted(names)
+                             if os.path.splitext(n)[1].lower() in CORPUS_EXTENSIONS)
+        for file in files:
+            if file.endswith("bpe_vocab.json"):
+                continue
+            try:
+                if zipfile.is_zipfile(file):
+                    # .skill: zip con SKILL.md y referencias en markdown
+                    with zipfile.ZipFile(file) as zf:
+                        for name in zf.namelist():
+                            if name.endswith(".md"):
+                                yield zf.read(name).decode("utf-8")
+                    continue
+                with open(file, "r", encoding="utf-8") as f:
+                    yield f.read()
+            except (OSError, UnicodeDecodeError, zipfile.BadZipFile):
+                continue
+
+
+def train(texts: Iterable[str], merges: int, min_count: int = 2,
+          seed_digits: bool = True) -> List[Tuple[bytes, bytes]]:
+    """BPE clasico sobre frecuencias de pre-tokens, con heap y recuento incremental."""
+    counts = collections.Counter()
+    for text in texts:
+        counts.update(PRETOKEN_PATTERN.findall(text))
+    if seed_digits:
+        # Como en DeepSeek-V3, cada grupo de 1-3 digitos es un token: sembrarlos
+        # con frecuencia maxima para que sus merges salgan primero
+        top = max(counts.values(), default=1) + 1
+        for n in range(100):
+            counts[f"{n:02d}"] = top
+        for n in range(1000):
+            counts[f"{n:03d}"] = top
+
+    words: List[List[bytes]] = []
+    freqs: List[int] = []
+    for piece, freq in counts.items():
+        raw = piece.encode("utf-8", "surrogatepass")
+        if len(raw) > 1:
+            words.append([raw[i:i + 1] for i in range(len(raw))])
+            freqs.append(freq)
+
+    stats: Dict[Tuple[bytes, bytes], int] = collections.defaultdict(int)
+    where: Dict[Tuple[bytes, bytes], set] = collections.defaultdict(set)
+    for idx, symbols in enumerate(words):
+        for pair in zip(symbols, symbols[1:]):
+            stats[pair] += freqs[idx]
+            where[pair].add(idx)
+    heap = [(-count, pair) for pair, count in stats.items()]
+    heapq.heapify(heap)
+
+    result = []
+    while heap and len(result) < merges:
+        neg, pair = heapq.heappop(heap)
+        if stats.get(pair, 0) != -neg:
+            continue  # entrada vieja: el recuento cambio
+        if -neg < min_count:
+            break
+        result.append(pair)
+        left, right = pair
+        joined = left + right
+        touched = set()
+        for idx in list(where.pop(pair, ())):
+            symbols = words[idx]
+            freq = freqs[idx]
+            for old in zip(symbols, symbols[1:]):
+                stats[old] -= freq
+                touched.add(old)
+            merged = []
+            i = 0
+            while i < len(symbols):
+                if i < len(symbols) - 1 and symbols[i] == left and symbols[i + 1] == right:
+                    merged.append(joined)
+                    i += 2
+                else:
+                    merged.append(symbols[i])
+                    i += 1
+            words[idx] = merged
+            for new in zip(merged, merged[1:]):
+                stats[new] += freq
+                where[new].add(idx)
+                touched.add(new)
+        stats.pop(pair, None)
+        for changed in touched:
+            count = stats.get(changed, 0)
+            if count > 0 and changed != pair:
+                heapq.heappush(heap, (-count, changed))
+            elif count <= 0:
+                stats.pop(changed, None)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrena bpe_vocab.json")
+    parser.add_argument("paths", nargs="+", help="archivos o directorios del corpus")
+    parser.add_argument("--merges", type=int, default=16000)
+    parser.add_argument("--out", default=VOCAB_PATH)
+    args = parser.parse_args()
+
+    pairs = train(iter_corpus(args.paths), args.merges)
+    data = {
+        "name": "deepseek-code-bpe-v1",
+        "cjk_tokens_per_char": CJK_TOKENS_PER_CHAR,
+        "merges": [encode_merge(left, right) for left, right in pairs],
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"{len(pairs)} merges -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ setup(
     version="4.0.0",
     packages=find_packages(where="src"),
     package_dir={"": "src"},
+    package_data={"deepseek_code.tokenization": ["bpe_vocab.json"]},
     entry_points={
         "console_scripts": [
             "deepseek-code=cli.main:main",
@@ -12,6 +13,7 @@ setup(
     },
     install_requires=[
         "openai>=1.0.0",
+        "httpx>=0.24.0",
         "aiofiles>=23.0.0",
         "fastapi>=0.104.0",
         "uvicorn>=0.24.0",
@@ -53,9 +53,15 @@ def output_text(text: str):
     sys.stdout.flush()
 
 
-def create_app(config):
-    """Crea la app sin iniciar el modo interactivo."""
+def create_app(config, single_shot: bool = False):
+    """Crea la app sin iniciar el modo interactivo.
+
+    single_shot: el proceso atiende una sola consulta y termina; sin pool
+    de chat_session_id, cuyos ids pre-creados quedarian como chats vacios.
+    """
     from cli.main import DeepSeekCodeApp
+    if single_shot:
+        config = {**config, "chat_session_pool": False}
     return DeepSeekCodeApp(config)
 
 
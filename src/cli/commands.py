@@ -149,7 +149,7 @@ async def run_agent(client, config, mcp_server, appdata_dir: str, goal: str):
 
 async def run_skill(client, mcp_server, config, appdata_dir: str, args_str: str):
     """Ejecuta un skill por nombre con argumentos."""
-    from deepseek_code.skills.loader import SkillLoader, KnowledgeSkill
+    from deepseek_code.skills.loader import KnowledgeSkill, get_skill_loader
     from deepseek_code.skills.runner import SkillRunner
 
     parts = args_str.split(maxsplit=1)
@@ -159,7 +159,7 @@ async def run_skill(client, mcp_server, config, appdata_dir: str, args_str: str)
 
     skill_name = parts[0]
     skills_dir = config.get("skills_dir", os.path.join(appdata_dir, "skills"))
-    loader = SkillLoader(skills_dir)
+    loader = get_skill_loader(skills_dir)
     skill = loader.load_one(skill_name)
 
     if not skill:
@@ -225,10 +225,10 @@ def handle_keys_help():
 
 async def list_skills(config, appdata_dir: str):
     """Lista todos los skills disponibles."""
-    from deepseek_code.skills.loader import SkillLoader, KnowledgeSkill
+    from deepseek_code.skills.loader import KnowledgeSkill, get_skill_loader
 
     skills_dir = config.get("skills_dir", os.path.join(appdata_dir, "skills"))
-    loader = SkillLoader(skills_dir)
+    loader = get_skill_loader(skills_dir)
     skills = loader.load_all()
 
     if not skills:
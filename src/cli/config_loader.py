@@ -50,6 +50,7 @@ def load_config(config_path: str = None) -> dict:
         "max_tokens": 16384,
         "memory_path": os.path.join(APPDATA_DIR, 'memory.md'),
         "summary_threshold": 80,
+        "summary_prefetch_threshold": 65,  # Resumen en segundo plano desde este % del contexto
         "skills_dir": SKILLS_DIR,
         "wasm_path": os.path.join(APPDATA_DIR, 'sha3_wasm_bg.wasm'),
         "bearer_token": None,
@@ -62,6 +63,15 @@ def load_config(config_path: str = None) -> dict:
         "thinking_enabled": True,        # Thinking mode en web session para codigo
         "pool_size": 5,                  # Max instancias paralelas (MultiSession)
         "chunk_threshold_tokens": 30000, # Umbral tokens para activar chunking
+        "pow_prefetch": True,            # Resolver el PoW del siguiente mensaje durante el stream
+        "pow_solver": "wasm",            # PoW: "wasm" (1 hilo), "parallel" (multi-nucleo) o "auto"
+        "chat_session_pool": True,       # Reponer chat_session_id pre-creados para reintentos (--multi/quantum: pool lleno)
+        "batch_injections": True,        # Phase 2: inyectar skills/memorias en un solo mensaje (False = de a uno)
+        "injection_batch_chars": 120000, # Max chars de contexto por mensaje de inyeccion agrupada
+        "primed_sessions": True,         # Sesiones nuevas bifurcan de una sesion ya primada (omite Phase 1)
+        "tool_concurrency": 4,           # Tool calls de una respuesta en paralelo (conflictos por ruta en orden)
+        "seen_file_ledger": True,        # Sesiones: relecturas de archivos como "sin cambios" o diff
+        "tool_result_cache_mb": 32,      # Cache de resultados de tools de lectura (0 = desactivado)
     }
 
     if os.path.exists(config_path):
@@ -21,10 +21,10 @@ DeepSeek responde a cada uno con contexto de los anteriores.
 
 import asyncio
 import json
-import math
 import sys
 import time
 
+from deepseek_code.tokenization import count_tokens
 from cli.config_loader import load_config, APPDATA_DIR, SKILLS_DIR
 from cli.bridge_utils import (
     redirect_output, restore_output, output_json, output_text,
@@ -33,9 +33,7 @@ from cli.bridge_utils import (
 
 
 def _estimate_tokens(text):
-    if not text:
-        return 0
-    return math.ceil(len(text) / 3.5)
+    return count_tokens(text)
 
 
 def run_converse(
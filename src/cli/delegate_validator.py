@@ -6,6 +6,8 @@ Genera feedback automatico para retry si la respuesta tiene problemas.
 
 import re
 
+from deepseek_code.tokenization import count_tokens
+
 
 def validate_delegate_response(response, template=None):
     """Valida la respuesta de DeepSeek y retorna diagnostico.
@@ -66,7 +68,7 @@ def validate_delegate_response(response, template=None):
         "chars": len(response),
         "functions": len(re.findall(r'function\s+\w+', response)),
         "todos_total": len(result.get("todos_found", [])),
-        "estimated_tokens": len(response) // 4,
+        "estimated_tokens": count_tokens(response),
     }
 
     # --- Generar feedback para retry ---
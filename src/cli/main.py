@@ -25,7 +25,9 @@ from deepseek_code.tools.filesystem import (
     DeleteFileTool, MoveFileTool, CopyFileTool
 )
 from deepseek_code.tools.file_editor import EditFileTool
+from deepseek_code.tools.patch_tool import ApplyPatchTool
 from deepseek_code.tools.shell import RunCommandTool
+from deepseek_code.tools.process_manager import BackgroundProcessTool
 from deepseek_code.tools.memory_tool import MemoryTool
 from deepseek_code.tools.key_manager import ManageKeysTool
 from deepseek_code.tools.archive_tool import ArchiveTool
@@ -83,7 +85,10 @@ def read_multiline_input(prompt_str: str) -> str:
 class DeepSeekCodeApp:
     def __init__(self, config: dict):
         self.config = config
-        self.mcp_server = MCPServer(name="deepseek-code-local")
+        self.mcp_server = MCPServer(
+            name="deepseek-code-local",
+            result_cache_bytes=int(config.get("tool_result_cache_mb", 32) * 1024 * 1024),
+        )
 
         allowed_paths = config.get("allowed_paths", [])
         self.mcp_server.register_tool(ReadFileTool(allowed_paths))
@@ -93,6 +98,7 @@ class DeepSeekCodeApp:
         self.mcp_server.register_tool(MoveFileTool(allowed_paths))
         self.mcp_server.register_tool(CopyFileTool(allowed_paths))
         self.mcp_server.register_tool(EditFileTool(allowed_paths))
+        self.mcp_server.register_tool(ApplyPatchTool(allowed_paths))
         self.mcp_server.register_tool(ArchiveTool(allowed_paths))
         self.mcp_server.register_tool(FindFilesTool(allowed_paths))
         self.mcp_server.register_tool(FileInfoTool(allowed_paths))
@@ -100,6 +106,7 @@ class DeepSeekCodeApp:
 
         allowed_commands = config.get("allowed_commands", [])
         self.mcp_server.register_tool(RunCommandTool(allowed_commands, allowed_paths=allowed_paths))
+        self.mcp_server.register_tool(BackgroundProcessTool())
 
         memory_path = config.get("memory_path", os.path.join(APPDATA_DIR, 'memory.md'))
         self.mcp_server.register_tool(MemoryTool(memory_path))
@@ -152,6 +159,7 @@ class DeepSeekCodeApp:
             summary_threshold=config.get("summary_threshold", 80),
             skills_dir=config.get("skills_dir", SKILLS_DIR),
             session_manager=self.session_manager,
+            config=config,
         )
 
     async def run_interactive(self):
@@ -113,7 +113,7 @@ def _run_multi_inner(
     mcp = create_shared_mcp_server(config)
     instances = []
     for i, role in enumerate(roles[:n]):
-        client = create_client_from_config(config, mcp, label=role.label)
+        client = create_client_from_config(config, mcp, label=role.label, parallel=n)
         instances.append((client, role))
 
     session = MultiSession(instances)
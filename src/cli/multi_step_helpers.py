@@ -29,8 +29,8 @@ async def execute_step_dual(
     from deepseek_code.quantum.angle_detector import detect_angles, build_angle_system_prompt
     from deepseek_code.quantum.merge_engine import merge_responses
 
-    client_a = create_client_from_config(config, mcp_server, label="A")
-    client_b = create_client_from_config(config, mcp_server, label="B")
+    client_a = create_client_from_config(config, mcp_server, label="A", parallel=2)
+    client_b = create_client_from_config(config, mcp_server, label="B", parallel=2)
     dual = DualSession(client_a, client_b)
 
     angle_a, angle_b = detect_angles(task, template)
@@ -63,7 +63,7 @@ def run_oneshot(query: str, json_mode: bool = False, config_path: str = None):
         if not check_credentials(config):
             handle_no_credentials(json_mode, originals)
 
-        app = create_app(config)
+        app = create_app(config, single_shot=True)
         app.client.default_session_name = "oneshot"
 
         # SurgicalMemory + GlobalMemory: inyectar y aprender (standalone)
@@ -140,7 +140,7 @@ def run_agent_oneshot(goal: str, json_mode: bool = False, config_path: str = Non
         if not check_credentials(config):
             handle_no_credentials(json_mode, originals, mode="agent")
 
-        app = create_app(config)
+        app = create_app(config, single_shot=True)
 
         # SurgicalMemory + GlobalMemory: inyectar y aprender (standalone)
         from deepseek_code.surgical.integration import pre_delegation, post_delegation
@@ -266,7 +266,7 @@ def run_delegate_oneshot(
                     file=sys.stderr
                 )
 
-        app = create_app(config)
+        app = create_app(config, single_shot=True)
         start_time = time.time()
 
         # Detectar tipo de tarea para ensamblaje inteligente
@@ -425,11 +425,14 @@ def run_delegate_oneshot(
             let_skills_chars = 0
             let_surgical_chars = 0
             let_global_chars = 0
+            let_skill_tiers = {}
             for inj in call_params.get("pending_injections", []):
                 let_inj_type = inj.get("type", "") if isinstance(inj, dict) else ""
                 let_inj_content = inj.get("content", "") if isinstance(inj, dict) else str(inj)
                 if let_inj_type.startswith("skill"):
                     let_skills_chars += len(let_inj_content)
+                    if inj.get("tier"):
+                        let_skill_tiers[inj["name"]] = inj["tier"]
                 elif let_inj_type in ("surgical", "memory"):
                     let_surgical_chars += len(let_inj_content)
                 elif let_inj_type in ("global", "knowledge"):
@@ -446,6 +449,7 @@ def run_delegate_oneshot(
                 context=context,
                 response=response,
                 global_briefing="x" * let_global_chars,  # Phase 2 estimated
+                skill_tiers=let_skill_tiers,
             )
             result["session_injections"] = len(call_params["pending_injections"])
             output_json(result)
@@ -4,9 +4,10 @@ Funciones de utilidad para estimacion de tokens, reporte de uso
 y limpieza de respuestas de DeepSeek.
 """
 
-import math
 import re
 
+from deepseek_code.tokenization import count_tokens
+
 
 def strip_markdown_fences(text):
     """Limpia bloques de markdown que DeepSeek a veces agrega a pesar de las instrucciones.
@@ -50,10 +51,8 @@ def strip_markdown_fences(text):
 
 
 def estimate_tokens(text):
-    """Estima tokens de un texto (~3.5 chars/token)."""
-    if not text:
-        return 0
-    return math.ceil(len(text) / 3.5)
+    """Tokens de un texto (tokenizador BPE compartido)."""
+    return count_tokens(text)
 
 
 def build_token_usage(
@@ -65,10 +64,13 @@ def build_token_usage(
     context=None,
     response=None,
     global_briefing=None,
+    skill_tiers=None,
 ):
     """Construye reporte detallado de consumo de tokens.
 
     Permite a Claude Code gestionar el budget de tokens de DeepSeek (1M contexto web).
+    skill_tiers: {skill: nivel inyectado} ("full", "no-examples", "outline"
+    o "truncated"), se reporta tal cual.
     """
     sys_tokens = estimate_tokens(system_prompt)
     skills_tokens = estimate_tokens(skills_context)
@@ -100,6 +102,7 @@ def build_token_usage(
         "total_estimated": total_estimated,
         "context_remaining": max(0, context_remaining),
         "context_used_percent": f"{total_estimated * 100 / context_max:.1f}%",
+        "skill_tiers": dict(skill_tiers or {}),
     }
 
 
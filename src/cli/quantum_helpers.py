@@ -31,12 +31,17 @@ def create_shared_mcp_server(config: dict) -> MCPServer:
         DeleteFileTool, MoveFileTool, CopyFileTool,
     )
     from deepseek_code.tools.file_editor import EditFileTool
+    from deepseek_code.tools.patch_tool import ApplyPatchTool
     from deepseek_code.tools.shell import RunCommandTool
+    from deepseek_code.tools.process_manager import BackgroundProcessTool
     from deepseek_code.tools.memory_tool import MemoryTool
     from deepseek_code.tools.archive_tool import ArchiveTool
     from deepseek_code.tools.file_utils import FindFilesTool, FileInfoTool, MakeDirectoryTool
 
-    mcp = MCPServer(name="deepseek-code-quantum")
+    mcp = MCPServer(
+        name="deepseek-code-quantum",
+        result_cache_bytes=int(config.get("tool_result_cache_mb", 32) * 1024 * 1024),
+    )
     allowed_paths = config.get("allowed_paths", [])
 
     mcp.register_tool(ReadFileTool(allowed_paths))
@@ -46,6 +51,7 @@ def create_shared_mcp_server(config: dict) -> MCPServer:
     mcp.register_tool(MoveFileTool(allowed_paths))
     mcp.register_tool(CopyFileTool(allowed_paths))
     mcp.register_tool(EditFileTool(allowed_paths))
+    mcp.register_tool(ApplyPatchTool(allowed_paths))
     mcp.register_tool(ArchiveTool(allowed_paths))
     mcp.register_tool(FindFilesTool(allowed_paths))
     mcp.register_tool(FileInfoTool(allowed_paths))
@@ -53,6 +59,7 @@ def create_shared_mcp_server(config: dict) -> MCPServer:
 
     allowed_commands = config.get("allowed_commands", [])
     mcp.register_tool(RunCommandTool(allowed_commands, allowed_paths=allowed_paths))
+    mcp.register_tool(BackgroundProcessTool())
 
     memory_path = config.get("memory_path", os.path.join(APPDATA_DIR, 'memory.md'))
     mcp.register_tool(MemoryTool(memory_path))
@@ -64,6 +71,7 @@ def create_client_from_config(
     config: dict,
     mcp_server: MCPServer,
     label: str = "",
+    parallel: int = 1,
 ) -> DeepSeekCodeClient:
     """Crea un DeepSeekCodeClient independiente compartiendo MCPServer.
 
@@ -74,6 +82,9 @@ def create_client_from_config(
         config: Configuracion cargada
         mcp_server: MCPServer compartido
         label: Etiqueta para logs (ej: "A", "B")
+        parallel: Sesiones que corren en paralelo con este cliente. Con
+            mas de una, el pool de chat_session_id se llena de antemano
+            (eager) hasta ese numero en vez de reponer uno por uno
 
     Returns:
         DeepSeekCodeClient configurado
@@ -90,6 +101,8 @@ def create_client_from_config(
         raise ValueError("No se encontraron credenciales web. Ejecuta /login.")
 
     suffix = f" [{label}]" if label else ""
+    if parallel > 1:
+        config = {**config, "chat_session_pool_eager": True, "pool_size": parallel}
 
     # Auto-descargar WASM si falta
     if not os.path.exists(wasm_path):
@@ -134,7 +147,7 @@ def create_pool_clients(
     clients = []
     for i in range(n):
         label = f"P{i}"
-        client = create_client_from_config(config, mcp_server, label)
+        client = create_client_from_config(config, mcp_server, label, parallel=n)
         clients.append(client)
     print(f"  [pool] {n} clientes creados", file=sys.stderr)
     return clients
@@ -102,8 +102,8 @@ def _run_quantum_inner(
     # Crear MCPServer compartido y dos clientes
     print("  [quantum] Creando MCPServer compartido...", file=sys.stderr)
     mcp = create_shared_mcp_server(config)
-    client_a = create_client_from_config(config, mcp, label="A")
-    client_b = create_client_from_config(config, mcp, label="B")
+    client_a = create_client_from_config(config, mcp, label="A", parallel=2)
+    client_b = create_client_from_config(config, mcp, label="B", parallel=2)
     dual = DualSession(client_a, client_b)
 
     # Detectar o crear angulos
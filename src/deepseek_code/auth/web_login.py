@@ -37,9 +37,9 @@ def validate_session(bearer_token: str, cookies: dict, wasm_path: str) -> bool:
     """
     try:
         try:
-            from ..client.deepseek_client import DeepSeekWebSession
+            from ..client.web_session import DeepSeekWebSession
         except (ImportError, ValueError):
-            from deepseek_code.client.deepseek_client import DeepSeekWebSession
+            from deepseek_code.client.web_session import DeepSeekWebSession
         session = DeepSeekWebSession(bearer_token, cookies, wasm_path)
         challenge = session.get_challenge()
         session.solve_challenge(challenge)
@@ -241,7 +241,7 @@ def check_complete():
     save_config()
     if wasm_path and os.path.exists(wasm_path):
         try:
-            from deepseek_code.client.deepseek_client import DeepSeekWebSession
+            from deepseek_code.client.web_session import DeepSeekWebSession
             session = DeepSeekWebSession(_bearer, _cookies, wasm_path)
             challenge = session.get_challenge()
             session.solve_challenge(challenge)
@@ -0,0 +1,393 @@
+"""Sesion web de DeepSeek con transporte asyncio nativo (httpx).
+
+DeepSeekWebSession usa requests: cada llamada bloquea un hilo del
+executor mientras se lee el stream SSE. AsyncDeepSeekWebSession
+reutiliza el mismo PoW (WASM), parser SSE y manejo de errores, pero
+envia y lee el stream con httpx.AsyncClient (conexiones keep-alive
+en pool), de modo que N sesiones en paralelo (--multi, quantum,
+grupos de --multi-step) corren como N corrutinas en un solo event loop.
+
+Unica excepcion: solve_challenge es CPU puro dentro de WASM, asi que
+se ejecuta en el executor para no congelar los demas streams. Ademas,
+el PoW del mensaje siguiente se prefetchea mientras se lee el stream
+actual (ver pow_pipeline.PowPipeline), y las sesiones nuevas salen de
+un pool de chat_session_id pre-creados (ver chat_session_pool).
+
+Uso:
+    session = AsyncDeepSeekWebSession(bearer, cookies, wasm_path)
+    response = await session.chat_async("hola", thinking_enabled=True)
+
+    async for token in session.stream_message(msg, pow_header, chat_id):
+        ...
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator, Optional, Union
+
+import httpx
+
+from .chat_session_pool import get_chat_session_pool
+from .pow_pipeline import PowPipeline
+from .sse_parser import SSEStreamParser, new_sse_diag
+from .web_session import (
+    DeepSeekWebSession, TokenExpiredError, SessionDeadError,
+    StallDetectedError, STALL_TIMEOUT_SECONDS,
+)
+
+API_BASE = "https://chat.deepseek.com/api/v0"
+
+# Conexiones keep-alive por sesion. Cada sesion tiene a lo sumo un stream
+# activo + el challenge/creacion de sesion, asi que un pool chico alcanza.
+DEFAULT_MAX_CONNECTIONS = 4
+KEEPALIVE_EXPIRY_SECONDS = 60
+
+
+class AsyncDeepSeekWebSession(DeepSeekWebSession):
+    """DeepSeekWebSession con metodos async nativos sobre httpx.
+
+    Los metodos sincronos heredados (chat, send_message, ...) siguen
+    disponibles para codigo que no corre en un event loop.
+    """
+
+    def __init__(self, bearer_token: str, cookies: dict,
+                 wasm_path: Union[str, Path] = "sha3_wasm_bg.wasm",
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 pow_prefetch: bool = True, pow_solver: str = "wasm",
+                 session_pool_size: int = 0, session_pool_eager: bool = False):
+        super().__init__(bearer_token, cookies, wasm_path, pow_solver=pow_solver)
+        self._cookies = dict(cookies)
+        self._max_connections = max(1, max_connections)
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_loop = None
+        # PoW del siguiente mensaje se resuelve mientras se lee el stream actual
+        self._pow = PowPipeline(self.get_challenge_async, self.solve_challenge) if pow_prefetch else None
+        # chat_session_id pre-creados (compartidos por cuenta) para sesiones nuevas y reintentos
+        self._session_pool = (
+            get_chat_session_pool(bearer_token, session_pool_size, eager=session_pool_eager)
+            if session_pool_size > 0 else None
+        )
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Retorna el AsyncClient del event loop actual (lo crea si hace falta).
+
+        Las conexiones de httpx quedan ligadas al loop que las abrio; si el
+        CLI llama asyncio.run() varias veces con el mismo cliente, se abre
+        un pool nuevo para el loop nuevo.
+        """
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.is_closed or self._http_loop is not loop:
+            self._http = httpx.AsyncClient(
+                headers=dict(self.session.headers),
+                cookies=self._cookies,
+                timeout=httpx.Timeout(30, read=STALL_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_connections,
+                    keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+                ),
+            )
+            self._http_loop = loop
+        return self._http
+
+    async def aclose(self):
+        """Cierra el pool de conexiones del loop actual y descarta el PoW prefetcheado."""
+        if self._pow is not None:
+            self._pow.discard()
+        if self._http is not None and not self._http.is_closed:
+            try:
+                if self._http_loop is asyncio.get_running_loop():
+                    await self._http.aclose()
+            except RuntimeError:
+                pass
+        self._http = None
+        self._http_loop = None
+
+    async def get_challenge_async(self) -> dict:
+        """Version async de get_challenge()."""
+        resp = await self._get_http().post(
+            f"{API_BASE}/chat/create_pow_challenge",
+            json={"target_path": "/api/v0/chat/completion"},
+        )
+        if resp.status_code == 401:
+            raise TokenExpiredError("Bearer token expirado. Usa /login para renovar.")
+        if resp.status_code == 403:
+            raise TokenExpiredError("Acceso denegado. Token invalido o cuenta bloqueada.")
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("code") != 0:
+            raise RuntimeError(f"Error al obtener challenge: {data}")
+        return data["data"]["biz_data"]["challenge"]
+
+    async def create_chat_session_async(self) -> str:
+        """Version async de create_chat_session()."""
+        resp = await self._get_http().post(f"{API_BASE}/chat_session/create", json={})
+        if resp.status_code == 401:
+            raise TokenExpiredError("Bearer token expirado al crear sesion.")
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("code") != 0:
+            raise SessionDeadError(f"Error creando sesion de chat: {data}")
+        return data["data"]["biz_data"]["id"]
+
+    async def acquire_chat_session_async(self) -> str:
+        """chat_session_id sin usar: del pool pre-creado si esta activo, si no uno nuevo."""
+        if self._session_pool is not None:
+            return await self._session_pool.acquire(self.create_chat_session_async)
+        return await self.create_chat_session_async()
+
+    def session_pool_stats(self) -> dict:
+        """Metricas del pool de chat_session_id (vacio si esta desactivado)."""
+        return self._session_pool.stats() if self._session_pool is not None else {}
+
+    async def _pow_header_async(self) -> str:
+        """Challenge (HTTP async) + solve (WASM en executor) + header.
+
+        Con prefetch activo usa el challenge ya resuelto en segundo plano
+        (si sigue vigente) y arranca el del proximo mensaje.
+        """
+        if self._pow is not None:
+            challenge, answer = await self._pow.acquire()
+            self._pow.prefetch()
+            return self.prepare_pow_header(challenge, answer)
+        challenge = await self.get_challenge_async()
+        answer = await asyncio.get_running_loop().run_in_executor(
+            None, self.solve_challenge, challenge,
+        )
+        return self.prepare_pow_header(challenge, answer)
+
+    def pow_stats(self) -> dict:
+        """Metricas del prefetch de PoW (vacio si esta desactivado)."""
+        return self._pow.stats() if self._pow is not None else {}
+
+    async def stream_message(self, message: str, pow_header: str,
+                             chat_session_id: str = None,
+                             thinking_enabled: bool = False,
+                             parent_message_id=None,
+                             detached: bool = False) -> AsyncIterator[str]:
+        """Version async de send_message(): `async for` sobre los tokens.
+
+        Mismo diagnostico SSE (self._sse_diag) y mismas excepciones. Con
+        detached=True el message id y el diagnostico quedan locales al
+        stream (no pisan los de la conversacion en curso).
+
+        Raises:
+            StallDetectedError: Si no se recibe ningun chunk SSE en STALL_TIMEOUT_SECONDS
+                o la conexion se pierde durante el stream.
+            TokenExpiredError: Si el bearer token expiro o es invalido.
+        """
+        if not chat_session_id:
+            chat_session_id = await self.acquire_chat_session_async()
+
+        headers = {**self.extra_headers, "x-ds-pow-response": pow_header}
+        payload = {
+            "chat_session_id": chat_session_id,
+            "parent_message_id": parent_message_id,
+            "prompt": message,
+            "ref_file_ids": [],
+            "thinking_enabled": thinking_enabled,
+            "search_enabled": True,
+        }
+
+        let_diag = new_sse_diag()
+        if not detached:
+            self._last_message_id = None
+            self._sse_diag = let_diag
+        parser = SSEStreamParser(let_diag)
+
+        try:
+            async with self._get_http().stream(
+                "POST", f"{API_BASE}/chat/completion", headers=headers, json=payload,
+            ) as resp:
+                let_diag["http_status"] = resp.status_code
+
+                if resp.status_code == 401:
+                    parser.event("HTTP", "401 Unauthorized")
+                    raise TokenExpiredError("Bearer token expirado durante envio. Usa /login para renovar.")
+                if resp.status_code == 403:
+                    parser.event("HTTP", "403 Forbidden")
+                    raise TokenExpiredError("Acceso denegado durante envio. Token invalido.")
+                if resp.status_code != 200:
+                    parser.event("HTTP", f"{resp.status_code} {resp.reason_phrase}")
+                    resp.raise_for_status()
+
+                parser.event("HTTP", "200 OK — stream abierto")
+
+                async for line in resp.aiter_lines():
+                    if not line:
+                        continue
+                    token = parser.feed(line)
+                    if parser.last_message_id is not None and not detached:
+                        self._last_message_id = parser.last_message_id
+                    if token:
+                        yield token
+                    if parser.finished:
+                        break
+
+                parser.close()
+
+        except httpx.ReadTimeout:
+            let_diag["finish_reason"] = "timeout"
+            parser.event("TIMEOUT", f"{STALL_TIMEOUT_SECONDS}s sin datos")
+            self._dump_sse_diag("STALL (timeout)", let_diag)
+            raise StallDetectedError(
+                f"DeepSeek dejo de responder por {STALL_TIMEOUT_SECONDS}s. "
+                f"La conexion SSE se congelo silenciosamente."
+            )
+        except httpx.TransportError as e:
+            let_diag["finish_reason"] = "connection_error"
+            parser.event("CONN_ERROR", str(e)[:150])
+            self._dump_sse_diag("STALL (conexion perdida)", let_diag)
+            raise StallDetectedError(f"Conexion perdida durante streaming: {e}")
+        finally:
+            let_diag["end_ts"] = time.time()
+
+    async def _chat_internal_async(self, message: str, thinking_enabled: bool = False,
+                                   parent_message_id=None, tool_stream=None) -> str:
+        """Version async de _chat_internal(): challenge + solve + send.
+
+        Si se pasa tool_stream (tool_stream.ToolCallStream), cada token se
+        le entrega a medida que llega para detectar tool calls completas
+        antes de que termine la respuesta.
+        """
+        if tool_stream is not None:
+            tool_stream.reset()
+        pow_header = await self._pow_header_async()
+
+        if not getattr(self, '_chat_session_id', None):
+            self._chat_session_id = await self.acquire_chat_session_async()
+
+        parts = []
+        async for token in self.stream_message(
+            message, pow_header, self._chat_session_id,
+            thinking_enabled, parent_message_id,
+        ):
+            parts.append(token)
+            if tool_stream is not None:
+                tool_stream.feed(token)
+        return "".join(parts)
+
+    async def chat_async(self, message: str, thinking_enabled: bool = False,
+                         parent_message_id=None, max_stall_retries: int = 3,
+                         tool_stream=None) -> str:
+        """Version async de chat(): mismo auto-recovery de stall y respuesta vacia."""
+        let_attempts = 0
+        let_last_error = None
+
+        while let_attempts <= max_stall_retries:
+            try:
+                let_response = await self._chat_internal_async(
+                    message, thinking_enabled, parent_message_id, tool_stream,
+                )
+
+                if not let_response or not let_response.strip():
+                    self._dump_sse_diag("EMPTY RESPONSE")
+                    let_attempts += 1
+                    if let_attempts <= max_stall_retries:
+                        print(
+                            f"  [EMPTY] Respuesta vacia detectada. "
+                            f"Reintentando ({let_attempts}/{max_stall_retries})...",
+                            file=sys.stderr,
+                        )
+                        self._chat_session_id = await self.acquire_chat_session_async()
+                        continue
+                    print(
+                        f"  [EMPTY] Agotados {max_stall_retries} reintentos. "
+                        f"DeepSeek retorna respuestas vacias.",
+                        file=sys.stderr,
+                    )
+                    raise StallDetectedError(
+                        "DeepSeek retorno respuesta vacia tras "
+                        f"{max_stall_retries} reintentos."
+                    )
+
+                return let_response
+
+            except StallDetectedError as e:
+                let_attempts += 1
+                let_last_error = e
+                if let_attempts <= max_stall_retries:
+                    print(
+                        f"  [STALL] Reintentando ({let_attempts}/{max_stall_retries})...",
+                        file=sys.stderr,
+                    )
+                    self._chat_session_id = await self.acquire_chat_session_async()
+                else:
+                    print(
+                        f"  [STALL] Agotados {max_stall_retries} reintentos. "
+                        f"DeepSeek no responde.",
+                        file=sys.stderr,
+                    )
+                    raise
+            except (SessionDeadError, RuntimeError) as e:
+                err_msg = str(e).lower()
+                if "session" in err_msg or "chat_session" in err_msg:
+                    self._chat_session_id = await self.acquire_chat_session_async()
+                    return await self._chat_internal_async(
+                        message, thinking_enabled, parent_message_id, tool_stream,
+                    )
+                raise
+
+        raise let_last_error
+
+
+async def web_chat(web_session, message: str, thinking_enabled: bool = False,
+                   parent_message_id=None, max_stall_retries: int = 3,
+                   tool_stream=None) -> str:
+    """chat() sin bloquear el loop: nativo si la sesion es async, executor si no.
+
+    tool_stream recibe los tokens en vivo en la sesion async; con la sesion
+    sync se le entrega la respuesta completa al final (mismo resultado,
+    sin despacho anticipado).
+    """
+    if isinstance(web_session, AsyncDeepSeekWebSession):
+        return await web_session.chat_async(
+            message, thinking_enabled, parent_message_id, max_stall_retries,
+            tool_stream,
+        )
+    response = await asyncio.get_running_loop().run_in_executor(
+        None, web_session.chat, message,
+        thinking_enabled, parent_message_id, max_stall_retries,
+    )
+    if tool_stream is not None:
+        tool_stream.reset()
+        tool_stream.feed(response)
+    return response
+
+
+async def web_create_chat_session(web_session) -> str:
+    """create_chat_session() sin bloquear el loop (del pool pre-creado si la sesion es async)."""
+    if isinstance(web_session, AsyncDeepSeekWebSession):
+        return await web_session.acquire_chat_session_async()
+    return await asyncio.get_running_loop().run_in_executor(
+        None, web_session.create_chat_session,
+    )
+
+
+async def web_chat_detached(web_session, message: str) -> str:
+    """Un mensaje en un chat nuevo, sin tocar el estado de la conversacion.
+
+    web_chat() escribe en _chat_session_id, last_message_id y el
+    diagnostico SSE de la conversacion en curso; esto es para trabajo que
+    corre a la vez (el resumen del historial en segundo plano): usa su
+    propio chat y el stream va con detached=True, asi que ni el
+    parent_message_id de la conversacion ni sus diagnosticos se pisan.
+    """
+    if isinstance(web_session, AsyncDeepSeekWebSession):
+        chat_id = await web_session.acquire_chat_session_async()
+        pow_header = await web_session._pow_header_async()
+        parts = []
+        async for token in web_session.stream_message(message, pow_header, chat_id, detached=True):
+            parts.append(token)
+        return "".join(parts)
+
+    def run() -> str:
+        chat_id = web_session.create_chat_session()
+        challenge = web_session.get_challenge()
+        answer = web_session.solve_challenge(challenge)
+        pow_header = web_session.prepare_pow_header(challenge, answer)
+        return "".join(web_session.send_message(message, pow_header, chat_id, detached=True))
+
+    return await asyncio.get_running_loop().run_in_executor(None, run)
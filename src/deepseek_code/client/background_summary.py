@@ -0,0 +1,107 @@
+"""Resumen progresivo en segundo plano para DeepSeekCodeClient.
+
+Antes, al cruzar summary_threshold (80%) chat() esperaba a
+_generate_summary (una llamada completa al modelo) antes de atender el
+turno del usuario. Ahora el resumen se pide antes, al cruzar
+PREFETCH_THRESHOLD (65%), como una tarea asyncio que corre mientras la
+conversacion sigue; en el siguiente borde de turno, si ya termino, se
+aplica de una vez con rebuild_history_after_summary (entre turnos nadie
+mas toca el historial, asi que el cambio es atomico).
+
+La tarea resume una foto de los mensajes a comprimir. Los mensajes que
+llegan despues no la invalidan: forman parte de lo que se conserva.
+Se descarta (y se cancela si sigue corriendo) cuando:
+
+- el tramo resumido ya no esta en el historial tal cual (se reemplazo,
+  se borro o se aplico otro resumen), o
+- desde la foto entraron mas de STALE_PERCENT% del contexto: el corte
+  quedo viejo y conviene resumir de nuevo con el historial actual.
+
+Solo si el historial llega a summary_threshold sin resumen listo se
+espera en el camino critico (la tarea en vuelo si la hay, o una nueva).
+Con asyncio.run() por turno (converse) la tarea se cancela al cerrar el
+loop y se vuelve a lanzar en el turno siguiente.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .conversation_history import ConversationHistory
+
+# Porcentaje del contexto en el que se empieza a resumir en segundo plano
+PREFETCH_THRESHOLD = 65
+# Tokens agregados desde la foto (en % del contexto) que la vuelven vieja
+STALE_PERCENT = 15
+
+
+class BackgroundSummary:
+    """Una tarea de resumen en vuelo sobre un tramo del historial."""
+
+    def __init__(self, generate: Callable[[List[Dict]], Awaitable[str]]):
+        self._generate = generate
+        self._task: Optional[asyncio.Task] = None
+        self._to_summarize: List[Dict] = []
+        self._start = 0
+        self._tokens_at_start = 0
+
+    @property
+    def pending(self) -> bool:
+        return self._task is not None
+
+    def start(self, history: ConversationHistory, to_summarize: List[Dict]):
+        """Lanza el resumen de to_summarize (lo que should_summarize corta
+        justo despues de los mensajes de sistema)."""
+        self.cancel()
+        self._to_summarize = list(to_summarize)
+        self._start = history.non_system_start()
+        self._tokens_at_start = history.total_tokens
+        self._task = asyncio.ensure_future(self._generate(self._to_summarize))
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self._to_summarize = []
+
+    def _still_valid(self, history: ConversationHistory, max_context_tokens: int) -> bool:
+        task = self._task
+        if task.get_loop() is not asyncio.get_running_loop():
+            return False  # el loop que la lanzo ya cerro (asyncio.run por turno)
+        if task.done() and (task.cancelled() or task.exception() is not None):
+            return False
+        end = self._start + len(self._to_summarize)
+        if end > len(history):
+            return False
+        span = history.window(self._start, end)
+        if any(a is not b for a, b in zip(span, self._to_summarize)):
+            return False
+        grown = history.total_tokens - self._tokens_at_start
+        return grown <= max_context_tokens * STALE_PERCENT / 100
+
+    async def take(self, history: ConversationHistory, max_context_tokens: int,
+                   wait: bool = False) -> Optional[Tuple[str, List[Dict], List[Dict]]]:
+        """(resumen, resumidos, a_conservar) si el resumen esta listo y sigue valido.
+
+        Con wait=True espera a la tarea en vuelo en vez de devolver None.
+        Una tarea invalida se cancela y se olvida.
+        """
+        if self._task is None:
+            return None
+        if not self._still_valid(history, max_context_tokens):
+            self.cancel()
+            return None
+        if not self._task.done():
+            if not wait:
+                return None
+            await asyncio.wait({self._task})
+            if self._task.cancelled() or self._task.exception() is not None:
+                self.cancel()
+                return None
+        summary = self._task.result()
+        summarized = self._to_summarize
+        to_keep = list(history.window(self._start + len(summarized)))
+        self._task = None
+        self._to_summarize = []
+        if not summary:
+            return None
+        return summary, summarized, to_keep
@@ -0,0 +1,168 @@
+"""Pool de chat_session_id pre-creados para sesiones nuevas y reintentos.
+
+create_chat_session es un ida y vuelta HTTP que hoy queda en el camino
+critico al iniciar una sesion con nombre (chat_in_session), al arrancar
+run_agent_web y en cada reintento tras un stall o respuesta vacia.
+
+Un chat_session_id vacio es solo un string ligado a la cuenta (no a la
+conexion ni al event loop), asi que el pool se comparte por bearer token
+entre todas las sesiones web del proceso. acquire() entrega uno listo
+al instante (o lo crea en linea si el pool esta vacio) y dispara un
+relleno en segundo plano. Cada id pre-creado que nadie usa queda como un
+chat vacio en la cuenta al terminar el proceso, asi que el relleno
+depende del modo:
+
+    uno por uno  (por defecto) repone solo los ids entregados, hasta
+                 config["pool_size"]: una sesion interactiva deja a lo
+                 sumo un chat sin usar
+    eager        llena hasta el tamaño tras cada acquire(); solo para
+                 corridas largas con N sesiones en paralelo (--multi,
+                 quantum), que crean N chats de golpe
+
+Los modos de una sola consulta (--query, --agent, --delegate) no usan
+el pool. Los ids mas viejos que el TTL se descartan sin usarse.
+
+Uso:
+    pool = get_chat_session_pool(bearer_token, size=5, eager=True)
+    chat_session_id = await pool.acquire(session.create_chat_session_async)
+    print(pool.stats())
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+# Vida maxima de un chat_session_id pre-creado sin usar
+CHAT_SESSION_POOL_TTL_SECONDS = 600
+
+
+def _consume_exception(task: asyncio.Task):
+    """Evita 'Task exception was never retrieved' en rellenos fallidos."""
+    if not task.cancelled():
+        task.exception()
+
+
+class ChatSessionPool:
+    """Cola FIFO de chat_session_id listos, con TTL y relleno asincrono."""
+
+    def __init__(self, size: int, ttl: float = CHAT_SESSION_POOL_TTL_SECONDS,
+                 eager: bool = False):
+        self.size = max(0, size)
+        self.ttl = ttl
+        self.eager = eager
+        self._ready = deque()  # (chat_session_id, creado_ts)
+        self._owed = 0  # ids entregados aun sin reponer (modo uno por uno)
+        self._lock = threading.Lock()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._stats = {
+            "acquired": 0,
+            "hits": 0,
+            "misses": 0,
+            "created": 0,
+            "expired": 0,
+            "refill_errors": 0,
+        }
+
+    def _pop_fresh(self) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            while self._ready:
+                chat_session_id, created_ts = self._ready.popleft()
+                if now - created_ts < self.ttl:
+                    return chat_session_id
+                self._stats["expired"] += 1
+        return None
+
+    async def acquire(self, create: Callable[[], Awaitable[str]]) -> str:
+        """Retorna un chat_session_id sin usar (del pool o creado en linea)."""
+        self._stats["acquired"] += 1
+        chat_session_id = self._pop_fresh()
+        if chat_session_id is not None:
+            self._stats["hits"] += 1
+        else:
+            self._stats["misses"] += 1
+            chat_session_id = await create()
+            self._stats["created"] += 1
+        with self._lock:
+            self._owed = min(self.size, self._owed + 1)
+        self.refill(create)
+        return chat_session_id
+
+    def _wanted(self) -> int:
+        """Cuantos ids faltan crear segun el modo de relleno."""
+        with self._lock:
+            missing = self.size - len(self._ready)
+            return missing if self.eager else min(missing, self._owed)
+
+    def refill(self, create: Callable[[], Awaitable[str]]):
+        """Arranca el relleno en segundo plano (si no hay uno activo en este loop)."""
+        if self.size <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        task = self._refill_task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        # Un relleno de un loop anterior (otro asyncio.run) ya no avanza
+        self._refill_task = loop.create_task(self._refill(create))
+        self._refill_task.add_done_callback(_consume_exception)
+
+    async def _refill(self, create: Callable[[], Awaitable[str]]):
+        # De a uno: no compite con el mensaje en curso por conexiones
+        while self._wanted() > 0:
+            try:
+                chat_session_id = await create()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Token expirado, red caida...: el proximo acquire() lo
+                # reintenta en linea y propaga el error real.
+                self._stats["refill_errors"] += 1
+                return
+            self._stats["created"] += 1
+            with self._lock:
+                self._ready.append((chat_session_id, time.time()))
+                self._owed = max(0, self._owed - 1)
+
+    def discard(self):
+        """Vacia el pool y cancela el relleno pendiente."""
+        task, self._refill_task = self._refill_task, None
+        if task is not None and not task.done() and not task.get_loop().is_closed():
+            task.cancel()
+        with self._lock:
+            self._ready.clear()
+            self._owed = 0
+
+    def stats(self) -> dict:
+        """Metricas del pool (hit rate, ids creados y vencidos)."""
+        s = dict(self._stats)
+        s["ready"] = len(self._ready)
+        s["size"] = self.size
+        s["eager"] = self.eager
+        s["hit_rate"] = round(s["hits"] / s["acquired"], 3) if s["acquired"] else 0.0
+        return s
+
+
+_pools: Dict[str, ChatSessionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_chat_session_pool(bearer_token: str, size: int,
+                          ttl: float = CHAT_SESSION_POOL_TTL_SECONDS,
+                          eager: bool = False) -> ChatSessionPool:
+    """Pool compartido por proceso para una cuenta (clave: hash del token).
+
+    Si algun cliente del proceso lo pide eager, el pool queda eager.
+    """
+    key = hashlib.sha256(bearer_token.encode("utf-8")).hexdigest()
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ChatSessionPool(size, ttl, eager)
+            _pools[key] = pool
+        else:
+            pool.size = max(pool.size, size)
+            pool.eager = pool.eager or eager
+        return pool
@@ -4,27 +4,29 @@ Contiene la logica de estimacion de tokens, resumen de mensajes
 y compresion progresiva del historial.
 """
 
-import math
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
+from ..tokenization import count_tokens
+from .conversation_history import ConversationHistory, message_tokens
+
 # Re-exportar constante para uso interno
 SUMMARY_MAX_TOKENS = 2048
 
 
 def estimate_tokens(text: str) -> int:
-    """Estima tokens a partir del largo del texto (~3.5 chars/token)."""
-    return math.ceil(len(text) / 3.5)
+    """Tokens del texto segun el tokenizador BPE compartido."""
+    return count_tokens(text)
 
 
 def total_estimated_tokens(conversation_history: List[Dict]) -> int:
-    """Calcula tokens estimados de todo el historial."""
-    total = 0
-    for msg in conversation_history:
-        content = msg.get("content", "")
-        if content:
-            total += estimate_tokens(content)
-    return total
+    """Calcula tokens estimados de todo el historial.
+
+    Con un ConversationHistory es O(1): usa el total que mantiene.
+    """
+    if isinstance(conversation_history, ConversationHistory):
+        return conversation_history.total_tokens
+    return sum(message_tokens(msg) for msg in conversation_history)
 
 
 def build_summary_prompt(messages: List[Dict]) -> str:
@@ -69,8 +71,11 @@ def should_summarize(
     if summary_count >= max_summaries:
         return None
 
-    # Separar system message del resto
-    non_system = [m for m in conversation_history if m["role"] != "system"]
+    # Separar system message del resto (vista sin copiar si se puede)
+    if isinstance(conversation_history, ConversationHistory):
+        non_system = conversation_history.window(conversation_history.non_system_start())
+    else:
+        non_system = [m for m in conversation_history if m["role"] != "system"]
     if len(non_system) < 4:
         return None
 
@@ -80,8 +85,8 @@ def should_summarize(
     while split_point < len(non_system) - 1 and non_system[split_point]["role"] in ("tool", "tool_result"):
         split_point += 1
 
-    to_summarize = non_system[:split_point]
-    to_keep = non_system[split_point:]
+    to_summarize = list(non_system[:split_point])
+    to_keep = list(non_system[split_point:])
 
     return to_summarize, to_keep
 
@@ -90,9 +95,9 @@ def rebuild_history_after_summary(
     system_message: str,
     summary: str,
     to_keep: List[Dict]
-) -> List[Dict]:
+) -> ConversationHistory:
     """Reconstruye el historial despues de un resumen progresivo."""
-    history = [{"role": "system", "content": system_message}]
+    history = ConversationHistory([{"role": "system", "content": system_message}])
     # Inyectar resumen como mensaje del asistente para dar contexto
     history.append({
         "role": "assistant",
@@ -0,0 +1,209 @@
+"""Historial de conversacion con contabilidad incremental de tokens.
+
+_check_context_and_summarize recorria todo conversation_history en cada
+chat() (total_estimated_tokens y luego should_summarize), y _chat_api
+copiaba la lista entera en cada paso de herramientas. Con sesiones API
+largas y salidas de herramientas grandes eso era O(historial) por turno.
+
+ConversationHistory es una lista de mensajes (sirve tal cual para la
+API de OpenAI y para json) que guarda el costo en tokens de cada
+mensaje y los totales por rol: se actualizan al agregar, reemplazar o
+quitar mensajes, asi que total_tokens y tokens_for() son O(1). window()
+da una vista de un tramo sin copiar los mensajes.
+
+Los mensajes se cuentan al entrar. Si se modifica un dict ya guardado
+(msg["content"] = ...) hay que reasignarlo (history[i] = msg) o llamar
+a refresh(i) para que los totales lo reflejen.
+"""
+
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ..tokenization import count_tokens
+
+
+def message_tokens(msg: Dict) -> int:
+    """Tokens de un mensaje: contenido mas nombre/argumentos de tool_calls."""
+    content = msg.get("content")
+    if content and not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False)
+    total = count_tokens(content) if content else 0
+    for call in msg.get("tool_calls") or ():
+        function = call.get("function") or {}
+        total += count_tokens(function.get("name") or "")
+        total += count_tokens(function.get("arguments") or "")
+    return total
+
+
+class HistoryWindow(Sequence):
+    """Vista de solo lectura de un tramo del historial (sin copiar).
+
+    Refleja el historial en el momento de leer: si el historial cambia,
+    la vista ve los cambios.
+    """
+
+    def __init__(self, history: "ConversationHistory", start: int, stop: int):
+        self._history = history
+        self._range = range(start, stop)
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            sub = self._range[index]
+            if sub.step != 1:
+                return [list.__getitem__(self._history, i) for i in sub]
+            return HistoryWindow(self._history, sub.start, sub.stop)
+        return list.__getitem__(self._history, self._range[index])
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in self._range:
+            yield list.__getitem__(self._history, i)
+
+    @property
+    def tokens(self) -> int:
+        """Tokens del tramo (suma de los costos ya calculados)."""
+        entries = self._history._entries
+        return sum(entries[i][1] for i in self._range)
+
+    def to_list(self) -> List[Dict]:
+        return list(self)
+
+
+class ConversationHistory(list):
+    """Lista de mensajes con totales de tokens por rol mantenidos al vuelo."""
+
+    def __init__(self, messages: Iterable[Dict] = ()):
+        super().__init__()
+        # (rol, tokens) de cada mensaje, en paralelo a la lista
+        self._entries: List[Tuple[str, int]] = []
+        self._by_role: Dict[str, int] = {}
+        self._total = 0
+        self.extend(messages)
+
+    # --- contabilidad ---
+
+    def _add(self, msg: Dict) -> Tuple[str, int]:
+        entry = (msg.get("role", ""), message_tokens(msg))
+        role, cost = entry
+        self._by_role[role] = self._by_role.get(role, 0) + cost
+        self._total += cost
+        return entry
+
+    def _sub(self, entry: Tuple[str, int]):
+        role, cost = entry
+        self._by_role[role] -= cost
+        self._total -= cost
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens de todo el historial (O(1))."""
+        return self._total
+
+    def tokens_for(self, role: str) -> int:
+        """Tokens de los mensajes de un rol (O(1))."""
+        return self._by_role.get(role, 0)
+
+    def tokens_by_role(self) -> Dict[str, int]:
+        return {role: n for role, n in self._by_role.items() if n}
+
+    def message_cost(self, index: int) -> int:
+        return self._entries[index][1]
+
+    def over_budget(self, max_tokens: int, percent: int = 100) -> bool:
+        """True si el historial ocupa al menos `percent`% de max_tokens."""
+        return self._total >= int(max_tokens * percent / 100)
+
+    def refresh(self, index: int):
+        """Recalcula el costo de un mensaje modificado en su lugar."""
+        self._sub(self._entries[index])
+        self._entries[index] = self._add(list.__getitem__(self, index))
+
+    # --- vistas ---
+
+    def window(self, start: int = 0, stop: Optional[int] = None) -> HistoryWindow:
+        """Vista del tramo [start:stop] sin copiar los mensajes."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return HistoryWindow(self, start, max(start, stop))
+
+    def non_system_start(self) -> int:
+        """Indice del primer mensaje que no es de sistema."""
+        i = 0
+        while i < len(self) and self._entries[i][0] == "system":
+            i += 1
+        return i
+
+    # --- mutaciones de list ---
+
+    def append(self, msg: Dict):
+        self._entries.append(self._add(msg))
+        super().append(msg)
+
+    def extend(self, messages: Iterable[Dict]):
+        for msg in messages:
+            self.append(msg)
+
+    def __iadd__(self, messages: Iterable[Dict]):
+        self.extend(messages)
+        return self
+
+    def insert(self, index: int, msg: Dict):
+        self._entries.insert(index, self._add(msg))
+        super().insert(index, msg)
+
+    def __setitem__(self, index: Union[int, slice], value):
+        if isinstance(index, slice):
+            new = list(value)
+            old = self._entries[index]
+            super().__setitem__(index, new)  # valida el tramo antes de contar
+            for entry in old:
+                self._sub(entry)
+            self._entries[index] = [self._add(msg) for msg in new]
+            return
+        self._sub(self._entries[index])
+        self._entries[index] = self._add(value)
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index: Union[int, slice]):
+        entries = self._entries[index]
+        for entry in (entries if isinstance(index, slice) else [entries]):
+            self._sub(entry)
+        super().__delitem__(index)
+        del self._entries[index]
+
+    def pop(self, index: int = -1) -> Dict:
+        msg = super().pop(index)
+        self._sub(self._entries.pop(index))
+        return msg
+
+    def remove(self, msg: Dict):
+        del self[self.index(msg)]
+
+    def clear(self):
+        super().clear()
+        self._entries.clear()
+        self._by_role.clear()
+        self._total = 0
+
+    def replace(self, messages: Iterable[Dict]):
+        """Reemplaza todo el contenido (p.ej. tras un resumen)."""
+        self.clear()
+        self.extend(messages)
+
+    def copy(self) -> "ConversationHistory":
+        clone = ConversationHistory()
+        list.extend(clone, self)
+        clone._entries = self._entries[:]
+        clone._by_role = dict(self._by_role)
+        clone._total = self._total
+        return clone
+
+    def sort(self, *args, **kwargs):
+        raise TypeError("ConversationHistory conserva el orden de los mensajes")
+
+    def reverse(self):
+        raise TypeError("ConversationHistory conserva el orden de los mensajes")
+
+    def __imul__(self, n):
+        raise TypeError("ConversationHistory no admite repetir mensajes")
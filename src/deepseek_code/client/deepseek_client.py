@@ -8,7 +8,10 @@ from typing import Dict, Any, Optional, List, Tuple, Union
 from openai import AsyncOpenAI
 
 from ..server.protocol import MCPServer, MCPRequest, MCPMethod
-from .web_session import DeepSeekWebSession, TokenExpiredError
+from .web_session import TokenExpiredError
+from .async_web_session import AsyncDeepSeekWebSession, web_chat_detached
+from .background_summary import BackgroundSummary, PREFETCH_THRESHOLD
+from .conversation_history import ConversationHistory
 from .context_manager import (
     estimate_tokens, total_estimated_tokens, build_summary_prompt,
     should_summarize, rebuild_history_after_summary, make_memory_entry,
@@ -58,7 +61,16 @@ class DeepSeekCodeClient:
         # Modo de operacion
         if bearer_token and cookies:
             self.mode = "web"
-            self.web_session = DeepSeekWebSession(bearer_token, cookies, wasm_path)
+            self.web_session = AsyncDeepSeekWebSession(
+                bearer_token, cookies, wasm_path,
+                pow_prefetch=self.config.get("pow_prefetch", True),
+                pow_solver=self.config.get("pow_solver", "wasm"),
+                session_pool_size=(
+                    self.config.get("pool_size", 5)
+                    if self.config.get("chat_session_pool", True) else 0
+                ),
+                session_pool_eager=self.config.get("chat_session_pool_eager", False),
+            )
             self.api_client = None
         elif api_key:
             self.mode = "api"
@@ -73,15 +85,22 @@ class DeepSeekCodeClient:
         # Cargar memoria si existe
         self.memory_content = self._load_memory()
         self.system_message = self._build_system_message()
-        self.conversation_history: List[Dict[str, str]] = [
-            {"role": "system", "content": self.system_message}
-        ]
+        # Lleva los totales de tokens al vuelo: el chequeo de contexto es O(1)
+        self.conversation_history = ConversationHistory(
+            [{"role": "system", "content": self.system_message}]
+        )
         self.available_tools = None
         self.default_session_name = "default"
         self.summary_count = 0
         # Maximo de resumenes: proporcional al contexto disponible
         # Web (1M) = 10 resumenes, API (128K) = 3
         self.max_summaries = 10 if self.mode == "web" else 3
+        # Resumen en segundo plano desde summary_prefetch_threshold (65%)
+        self.summary_prefetch_threshold = min(
+            self.summary_threshold,
+            self.config.get("summary_prefetch_threshold", PREFETCH_THRESHOLD),
+        )
+        self._background_summary = BackgroundSummary(self._generate_summary)
 
     def _load_memory(self) -> str:
         if not self.memory_path or not self.memory_path.exists():
@@ -153,28 +172,45 @@ class DeepSeekCodeClient:
                 )
                 return response.choices[0].message.content.strip()
             else:
-                import asyncio
-                return await asyncio.get_event_loop().run_in_executor(
-                    None, self.web_session.chat, prompt
-                )
+                # Chat aparte: puede correr en segundo plano junto a la conversacion
+                return await web_chat_detached(self.web_session, prompt)
         except Exception as e:
             print(f"Error generando resumen: {e}")
             return ""
 
     async def _check_context_and_summarize(self) -> Tuple[bool, Optional[str], Optional[str]]:
-        """Resumen progresivo: comprime la primera mitad del historial."""
-        tokens_before = total_estimated_tokens(self.conversation_history)
-        result = should_summarize(
-            self.conversation_history, self.max_context_tokens,
-            self.summary_threshold, self.summary_count, self.max_summaries
+        """Resumen progresivo en el borde de turno: comprime la primera mitad del historial.
+
+        El resumen se prepara en segundo plano desde summary_prefetch_threshold
+        y aqui solo se aplica si ya esta listo. Se espera unicamente si el
+        historial ya cruzo summary_threshold sin un resumen listo.
+        """
+        history = self.conversation_history
+        tokens_before = total_estimated_tokens(history)
+        must_summarize = history.over_budget(self.max_context_tokens, self.summary_threshold)
+
+        ready = await self._background_summary.take(
+            history, self.max_context_tokens, wait=must_summarize,
         )
-        if result is None:
-            return False, None, None
+        if ready is None:
+            if self._background_summary.pending:
+                return False, None, None  # sigue en vuelo: se aplica en otro turno
+            result = should_summarize(
+                history, self.max_context_tokens,
+                self.summary_prefetch_threshold, self.summary_count, self.max_summaries
+            )
+            if result is None:
+                return False, None, None
+            self._background_summary.start(history, result[0])
+            if not must_summarize:
+                return False, None, None
+            ready = await self._background_summary.take(
+                history, self.max_context_tokens, wait=True,
+            )
+            if ready is None:
+                return False, None, None
 
-        to_summarize, to_keep = result
-        summary = await self._generate_summary(to_summarize)
-        if not summary:
-            return False, None, None
+        summary, to_summarize, to_keep = ready
 
         # Guardar resumen en memoria persistente
         self._save_memory(self.memory_content + make_memory_entry(summary))
@@ -282,7 +318,8 @@ class DeepSeekCodeClient:
                 user_message, system_prompt or self.system_message, max_steps
             )
 
-        from .session_chat import chat_in_session
+        from .session_chat import chat_in_session, INJECTION_BATCH_MAX_CHARS
+        from .tool_scheduler import DEFAULT_TOOL_CONCURRENCY
         tools = await self._get_tools()
         use_thinking = self.config.get("thinking_enabled", True)
 
@@ -297,6 +334,12 @@ class DeepSeekCodeClient:
             thinking_enabled=use_thinking,
             session_manager=self.session_manager,
             pending_injections=pending_injections,
+            batch_injections=self.config.get("batch_injections", True),
+            injection_batch_chars=self.config.get(
+                "injection_batch_chars", INJECTION_BATCH_MAX_CHARS),
+            primed_sessions=self.config.get("primed_sessions", True),
+            tool_concurrency=self.config.get("tool_concurrency", DEFAULT_TOOL_CONCURRENCY),
+            seen_ledger=self.config.get("seen_file_ledger", True),
         )
 
     async def _run_tool(self, tool_call_id, tool_name, arguments):
@@ -346,12 +389,13 @@ class DeepSeekCodeClient:
         Si continue_parent_id se provee, continua la sesion existente
         sin crear nueva sesion ni repetir Phase 1.
         """
-        from .web_tool_caller import run_agent_web
+        from .web_tool_caller import run_agent_web, DEFAULT_TOOL_CONCURRENCY
         tools = await self._get_tools()
         return await run_agent_web(
             self.web_session, self.mcp, system_prompt,
             user_message, tools, max_steps,
             continue_parent_id=continue_parent_id,
+            tool_concurrency=self.config.get("tool_concurrency", DEFAULT_TOOL_CONCURRENCY),
         )
 
     async def _chat_api(self, max_steps: int) -> str:
@@ -360,9 +404,10 @@ class DeepSeekCodeClient:
         last_user = next((m["content"] for m in reversed(self.conversation_history) if m["role"] == "user"), "")
         task_level = classify_task(last_user)
         for step in range(max_steps):
-            messages = self.conversation_history.copy()
+            # Sin copia: la llamada termina antes de que se agregue nada
             tools = await self._format_tools_for_deepseek()
-            params = build_api_params(self.model, messages, tools, task_level, self.config)
+            params = build_api_params(self.model, self.conversation_history, tools,
+                                      task_level, self.config)
             response = await self.api_client.chat.completions.create(**params)
             msg = response.choices[0].message
             if not msg.tool_calls:
@@ -374,10 +419,10 @@ class DeepSeekCodeClient:
                 "tool_calls": [
                     {"id": tc.id, "type": "function",
                      "function": {"name": tc.function.name, "arguments": tc.function.arguments}}
-                    for tc in message.tool_calls
+                    for tc in msg.tool_calls
                 ]
             })
-            for tc in message.tool_calls:
+            for tc in msg.tool_calls:
                 content_str = await self._run_tool(tc.id, tc.function.name, json.loads(tc.function.arguments))
                 self.conversation_history.append({"role": "tool", "tool_call_id": tc.id, "content": content_str})
 
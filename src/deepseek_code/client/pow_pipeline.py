@@ -0,0 +1,148 @@
+"""Pipeline de Proof of Work con prefetch en segundo plano.
+
+Cada mensaje web necesita: get_challenge (ida y vuelta HTTP) +
+solve_challenge (CPU en WASM) antes de poder enviar nada. En los loops
+de herramientas eso queda en el camino critico de cada paso.
+
+PowPipeline pide y resuelve el challenge del SIGUIENTE mensaje mientras
+se lee el stream SSE del actual. Si al usarlo el challenge ya expiro
+(o el prefetch fallo), se descarta y se resuelve uno nuevo en linea.
+
+Uso:
+    pipeline = PowPipeline(session.get_challenge_async, session.solve_challenge)
+    challenge, answer = await pipeline.acquire()
+    pipeline.prefetch()            # arranca el siguiente mientras se hace streaming
+    ...
+    print(pipeline.stats())        # solve time, hit rate, solves desperdiciados
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+# Margen minimo de vida restante para usar un challenge prefetcheado.
+# El envio y el primer chunk pueden tardar varios segundos.
+POW_EXPIRY_MARGIN_SECONDS = 15
+
+
+def challenge_seconds_left(challenge: dict, now: Optional[float] = None) -> float:
+    """Segundos de vida restantes de un challenge (expire_at en ms o en s)."""
+    expire_at = challenge.get("expire_at")
+    if not expire_at:
+        return float("inf")
+    expire_at = float(expire_at)
+    if expire_at > 1e12:  # milisegundos
+        expire_at /= 1000.0
+    return expire_at - (now if now is not None else time.time())
+
+
+def _consume_exception(task: asyncio.Task):
+    """Evita 'Task exception was never retrieved' en prefetches descartados."""
+    if not task.cancelled():
+        task.exception()
+
+
+class PowPipeline:
+    """Prefetch de un challenge resuelto por sesion, con metricas."""
+
+    def __init__(self, fetch_challenge: Callable[[], Awaitable[dict]],
+                 solve: Callable[[dict], int],
+                 expiry_margin: float = POW_EXPIRY_MARGIN_SECONDS):
+        self._fetch_challenge = fetch_challenge
+        self._solve = solve
+        self._expiry_margin = expiry_margin
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "acquired": 0,
+            "prefetch_hits": 0,
+            "prefetch_misses": 0,
+            "wasted_solves": 0,
+            "prefetch_errors": 0,
+            "solves": 0,
+            "total_fetch_s": 0.0,
+            "total_solve_s": 0.0,
+            "total_wait_s": 0.0,   # Tiempo en camino critico esperando PoW
+            "saved_s": 0.0,        # Tiempo de fetch+solve ocultado por el prefetch
+        }
+
+    async def _produce(self) -> Tuple[dict, int, float]:
+        """Pide y resuelve un challenge. Retorna (challenge, answer, costo_s)."""
+        t0 = time.perf_counter()
+        challenge = await self._fetch_challenge()
+        t1 = time.perf_counter()
+        answer = await asyncio.get_running_loop().run_in_executor(
+            None, self._solve, challenge,
+        )
+        t2 = time.perf_counter()
+        self._stats["solves"] += 1
+        self._stats["total_fetch_s"] += t1 - t0
+        self._stats["total_solve_s"] += t2 - t1
+        return challenge, answer, t2 - t0
+
+    def prefetch(self):
+        """Arranca en segundo plano el PoW del siguiente mensaje (si no hay uno)."""
+        if self._task is not None and not self._task.done():
+            return
+        if self._task is not None:
+            # Habia uno listo sin usar: se reemplaza
+            self.discard()
+        self._task = asyncio.get_running_loop().create_task(self._produce())
+        self._task.add_done_callback(_consume_exception)
+
+    async def acquire(self) -> Tuple[dict, int]:
+        """Retorna (challenge, answer) listos para usar.
+
+        Usa el prefetch si existe y sigue vigente; si no, resuelve en linea.
+        """
+        start = time.perf_counter()
+        task, self._task = self._task, None
+        self._stats["acquired"] += 1
+
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            # Prefetch de un event loop anterior (otro asyncio.run): inservible
+            self._task = task
+            self.discard()
+            task = None
+
+        if task is not None:
+            try:
+                challenge, answer, cost = await task
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._stats["prefetch_errors"] += 1
+            else:
+                waited = time.perf_counter() - start
+                if challenge_seconds_left(challenge) > self._expiry_margin:
+                    self._stats["prefetch_hits"] += 1
+                    self._stats["total_wait_s"] += waited
+                    self._stats["saved_s"] += max(0.0, cost - waited)
+                    return challenge, answer
+                self._stats["wasted_solves"] += 1
+
+        self._stats["prefetch_misses"] += 1
+        challenge, answer, _ = await self._produce()
+        self._stats["total_wait_s"] += time.perf_counter() - start
+        return challenge, answer
+
+    def discard(self):
+        """Descarta el prefetch pendiente (fin de sesion o challenge obsoleto)."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        if task.done():
+            if not task.cancelled() and task.exception() is None:
+                self._stats["wasted_solves"] += 1
+        elif not task.get_loop().is_closed():
+            task.cancel()
+
+    def stats(self) -> dict:
+        """Metricas del pipeline para medir latencia ahorrada por paso."""
+        s = dict(self._stats)
+        acquired = s["acquired"]
+        s["hit_rate"] = round(s["prefetch_hits"] / acquired, 3) if acquired else 0.0
+        s["avg_solve_s"] = round(s["total_solve_s"] / s["solves"], 4) if s["solves"] else 0.0
+        s["avg_wait_s"] = round(s["total_wait_s"] / acquired, 4) if acquired else 0.0
+        for key in ("total_fetch_s", "total_solve_s", "total_wait_s", "saved_s"):
+            s[key] = round(s[key], 4)
+        return s
@@ -0,0 +1,257 @@
+"""Solver de PoW multi-nucleo: particiona el espacio de nonces entre procesos.
+
+wasm_solve recorre los nonces 0..difficulty en un solo hilo, dentro del
+WASM: prueba DeepSeekHashV1(prefix + str(n)) para n en [0, difficulty).
+No acepta un nonce inicial, pero el prefijo es libre: wasm_solve sobre
+prefix + head con limite L prueba los nonces int(head + str(m)), m < L.
+nonce_tasks() parte [0, difficulty) en tareas (head, L) disjuntas que lo
+cubren exactamente, agrupando los nonces por sus primeros digitos (ver
+_cover), y cada proceso del pool corre su lote de tareas con el propio
+wasm_solve: el bucle sobre los nonces nunca sale del WASM.
+
+El primer lote que encuentra la respuesta activa un Event compartido y
+los demas workers cortan antes de su siguiente tarea.
+
+No se usa hashlib: DeepSeekHashV1 es una variante de Keccak que hashlib
+no expone, y reutilizar wasm_solve garantiza respuestas identicas sin
+reimplementar la primitiva.
+
+Uso:
+    solver = get_parallel_solver("sha3_wasm_bg.wasm")
+    answer = solver.solve(challenge)
+"""
+
+import multiprocessing
+import os
+import struct
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from .wasm_runtime import PowInstance, get_compiled_module
+
+# Modos de solver aceptados en config["pow_solver"]
+POW_SOLVER_MODES = ("wasm", "parallel", "auto")
+# En modo "auto", dificultad minima para usar el pool de procesos. Por
+# debajo, el costo fijo del pool (repartir los lotes y una instancia WASM
+# por lote) se come la ganancia; ver benchmarks/bench_pow_solver.py.
+POW_PARALLEL_MIN_DIFFICULTY = 100_000
+# Lotes por worker: mas lotes = corte mas temprano al encontrar la respuesta
+CHUNKS_PER_WORKER = 4
+
+# --- Estado del proceso worker ---
+_worker_stop = None
+_worker_wasm_path = None
+
+
+def _worker_init(wasm_path: str, stop_event):
+    global _worker_stop, _worker_wasm_path
+    _worker_stop = stop_event
+    _worker_wasm_path = wasm_path
+    get_compiled_module(wasm_path)  # Deserializar el artefacto una vez por proceso
+
+
+def _read_i32(base_addr: int, offset: int) -> int:
+    import ctypes
+    return struct.unpack("<i", ctypes.string_at(base_addr + offset, 4))[0]
+
+
+def _limit_under(head: int, bound: int) -> int:
+    """Cantidad de m >= 0 con int(str(head) + str(m)) < bound.
+
+    Es un prefijo [0, L): el mapeo m -> int(str(head) + str(m)) es creciente.
+    """
+    total = 0
+    digits = 1
+    while head * 10 ** digits < bound:
+        lo = 0 if digits == 1 else 10 ** (digits - 1)
+        hi = min(10 ** digits, bound - head * 10 ** digits)
+        total += max(0, hi - lo)
+        digits += 1
+    return total
+
+
+def _cover(head: str, limit: int, max_task: int, out: List[Tuple[str, int]]):
+    """Tareas que cubren los nonces head + str(m), m < limit, de a max_task.
+
+    Cada m >= 10 es un digito d, ceros y un resto canonico: se agrupa bajo
+    el head head + d + "0"*j. Los m < 10 quedan como la tarea (head, 10).
+    """
+    if limit <= max_task:
+        out.append((head, limit))
+        return
+    out.append((head, 10))
+    for d in range(1, 10):
+        sub = d
+        while sub * 10 < limit:
+            sub_limit = _limit_under(sub, limit)
+            _cover(head + str(sub), sub_limit, max_task, out)
+            sub *= 10
+
+
+def nonce_tasks(difficulty: int, max_task: int) -> List[Tuple[str, int]]:
+    """Parte [0, difficulty) en tareas (head, limit) para wasm_solve.
+
+    La tarea (head, limit) prueba los nonces int(head + str(m)) con
+    m en [0, limit); las tareas son disjuntas y cubren todo el rango.
+    """
+    tasks: List[Tuple[str, int]] = []
+    if difficulty > 0:
+        _cover("", difficulty, max(10, max_task), tasks)
+    return tasks
+
+
+def _batches(tasks: List[Tuple[str, int]], size: int) -> List[List[Tuple[str, int]]]:
+    """Agrupa tareas consecutivas en lotes de ~size nonces (uno por submit)."""
+    batches, current, count = [], [], 0
+    for task in tasks:
+        current.append(task)
+        count += task[1]
+        if count >= size:
+            batches.append(current)
+            current, count = [], 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _wasm_string(inst: PowInstance, store, text: str) -> Tuple[int, int]:
+    import ctypes
+    data = text.encode("utf-8")
+    ptr_val = inst.alloc(store, len(data), 1)
+    ptr = int(ptr_val.value) if hasattr(ptr_val, "value") else int(ptr_val)
+    base_addr = ctypes.cast(inst.memory.data_ptr(store), ctypes.c_void_p).value
+    ctypes.memmove(base_addr + ptr, data, len(data))
+    return ptr, len(data)
+
+
+def solve_tasks(challenge_str: str, prefix: str, tasks: List[Tuple[str, int]],
+                wasm_path: Optional[str] = None, stop_event=None) -> Optional[int]:
+    """Corre wasm_solve(prefix + head, limit) para cada tarea de nonce_tasks().
+
+    Retorna el nonce o None si no esta en las tareas (o si otro worker ya lo encontro).
+    """
+    import ctypes
+    wasm_path = wasm_path or _worker_wasm_path
+    stop_event = stop_event if stop_event is not None else _worker_stop
+
+    engine, module = get_compiled_module(wasm_path)
+    # Instancia nueva por lote: la memoria de los strings se libera con el Store
+    inst = PowInstance(engine, module)
+    store = inst.store
+    retptr = inst.stack(store, -16)
+    try:
+        for head, limit in tasks:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            # wasm_solve toma posesion de los strings: alocar en cada llamada
+            challenge_ptr, challenge_len = _wasm_string(inst, store, challenge_str)
+            prefix_ptr, prefix_len = _wasm_string(inst, store, prefix + head)
+            inst.solve_func(store, retptr, challenge_ptr, challenge_len,
+                            prefix_ptr, prefix_len, float(limit))
+            base_addr = ctypes.cast(inst.memory.data_ptr(store), ctypes.c_void_p).value
+            if _read_i32(base_addr, retptr) != 0:
+                m = int(struct.unpack("<d", ctypes.string_at(base_addr + retptr + 8, 8))[0])
+                if stop_event is not None:
+                    stop_event.set()
+                return int(head + str(m))
+        return None
+    finally:
+        inst.stack(store, 16)
+
+
+def deepseek_hash_v1(text: str, wasm_path: Union[str, Path]) -> str:
+    """DeepSeekHashV1(text) via la exportacion WASM (para verificacion y benchmarks)."""
+    import ctypes
+    engine, module = get_compiled_module(wasm_path)
+    inst = PowInstance(engine, module)
+    store = inst.store
+    data = text.encode("utf-8")
+    ptr_val = inst.alloc(store, len(data), 1)
+    in_ptr = int(ptr_val.value) if hasattr(ptr_val, "value") else int(ptr_val)
+    retptr = inst.stack(store, -16)
+    try:
+        base_addr = ctypes.cast(inst.memory.data_ptr(store), ctypes.c_void_p).value
+        ctypes.memmove(base_addr + in_ptr, data, len(data))
+        inst.hash_func(store, retptr, in_ptr, len(data))
+        base_addr = ctypes.cast(inst.memory.data_ptr(store), ctypes.c_void_p).value
+        out_ptr = _read_i32(base_addr, retptr)
+        out_len = _read_i32(base_addr, retptr + 4)
+        return ctypes.string_at(base_addr + out_ptr, out_len).decode("utf-8")
+    finally:
+        inst.stack(store, 16)
+
+
+class ParallelPowSolver:
+    """Pool de procesos que resuelve un challenge repartiendo lotes de nonces.
+
+    Un solo solve a la vez por pool: cada solve ya satura todos los nucleos,
+    y el Event de corte se comparte entre los workers.
+    """
+
+    def __init__(self, wasm_path: Union[str, Path], workers: Optional[int] = None):
+        self.wasm_path = str(Path(wasm_path).resolve())
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        ctx = multiprocessing.get_context("spawn")
+        self._stop = ctx.Event()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=ctx,
+            initializer=_worker_init, initargs=(self.wasm_path, self._stop),
+        )
+        self._lock = threading.Lock()
+
+    def solve(self, challenge: dict) -> int:
+        """Resuelve el challenge. Misma respuesta que wasm_solve."""
+        challenge_str = challenge["challenge"]
+        prefix = f"{challenge['salt']}_{challenge['expire_at']}_"
+        difficulty = int(challenge["difficulty"])
+
+        n_chunks = self.workers * CHUNKS_PER_WORKER
+        step = max(1, -(-difficulty // n_chunks))
+        batches = _batches(nonce_tasks(difficulty, step), step)
+        with self._lock:
+            self._stop.clear()
+            pending = {
+                self._pool.submit(solve_tasks, challenge_str, prefix, batch)
+                for batch in batches
+            }
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        answer = fut.result()
+                        if answer is not None:
+                            return answer
+            finally:
+                self._stop.set()
+                for fut in pending:
+                    fut.cancel()
+        raise RuntimeError("Solver paralelo no encontro respuesta (fallo al resolver PoW)")
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_solvers = {}
+_solvers_lock = threading.Lock()
+
+
+def get_parallel_solver(wasm_path: Union[str, Path], workers: Optional[int] = None) -> ParallelPowSolver:
+    """Pool compartido por proceso (uno por ruta de WASM y numero de workers)."""
+    key = (str(Path(wasm_path).resolve()), workers)
+    with _solvers_lock:
+        solver = _solvers.get(key)
+        if solver is None:
+            solver = ParallelPowSolver(wasm_path, workers)
+            _solvers[key] = solver
+        return solver
+
+
+def use_parallel(mode: str, difficulty: float) -> bool:
+    """Decide si un challenge se resuelve con el pool segun el modo configurado."""
+    if mode == "parallel":
+        return True
+    if mode == "auto":
+        return difficulty >= POW_PARALLEL_MIN_DIFFICULTY and (os.cpu_count() or 1) > 1
+    return False
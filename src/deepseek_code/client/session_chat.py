@@ -15,7 +15,6 @@ Usage from DeepSeekCodeClient:
     # DeepSeek has full context from the first call
 """
 
-import asyncio
 import json
 import os
 import re
@@ -23,8 +22,15 @@ import sys
 import time
 from typing import Optional, List, Dict
 
-from ..sessions.session_store import SessionStore, ChatSession
+from ..sessions.seen_ledger import apply_seen_ledger
+from ..sessions.session_store import (
+    SessionStore, ChatSession, PrimedSession, content_hash, primed_key,
+)
+from ..tokenization import count_tokens
 from .web_session import DeepSeekWebSession, TokenExpiredError, StallDetectedError
+from .async_web_session import web_chat, web_create_chat_session
+from .tool_scheduler import DEFAULT_TOOL_CONCURRENCY, run_tool_calls
+from .tool_stream import SpeculativeToolRunner
 from .web_tool_caller import (
     build_tools_prompt, extract_tool_calls,
     format_tool_result, clean_final_response,
@@ -62,6 +68,94 @@ def _sanitize_phase3(message: str) -> str:
     return cleaned if cleaned else message
 
 
+# Max characters of context per batched Phase 2 message. A single block
+# larger than this is still sent, alone in its own message.
+INJECTION_BATCH_MAX_CHARS = 120_000
+
+
+def _injection_ack(injection: Dict) -> str:
+    """Type-specific acknowledgment text for one injected context block."""
+    ctx_type = injection["type"].capitalize()
+    ctx_name = injection["name"]
+    ack_map = {
+        "skill": f"Skill {ctx_name} aceptada",
+        "memory": f"Memoria {ctx_name} integrada",
+        "global": f"Perfil {ctx_name} integrado",
+        "error": f"Errores de {ctx_name} registrados",
+        "knowledge": f"Conocimiento de {ctx_name} integrado",
+    }
+    return ack_map.get(injection["type"], f"{ctx_type} {ctx_name} aceptada")
+
+
+def _frame_block(injection: Dict) -> str:
+    ctx_type = injection["type"].upper()
+    return (
+        f"== {ctx_type}: {injection['name']} ==\n\n"
+        f"{injection['content']}\n\n"
+        f"== FIN {ctx_type} =="
+    )
+
+
+def _frame_injections(batch: List[Dict]):
+    """Build the Phase 2 message for a group of blocks. Returns (prompt, ack_text).
+
+    A single block keeps the original one-by-one framing and ack.
+    """
+    if len(batch) == 1:
+        ack_text = _injection_ack(batch[0])
+        return f"{_frame_block(batch[0])}\n\nResponde UNICAMENTE: '{ack_text}'", ack_text
+
+    ack_text = f"Contexto integrado ({len(batch)} bloques)"
+    blocks = "\n\n".join(_frame_block(inj) for inj in batch)
+    prompt = (
+        f"== CONTEXTO: {len(batch)} bloques ==\n\n"
+        f"{blocks}\n\n"
+        f"== FIN CONTEXTO ==\n\n"
+        f"Responde UNICAMENTE: '{ack_text}'"
+    )
+    return prompt, ack_text
+
+
+def _batch_injections(injections: List[Dict], max_chars: int) -> List[List[Dict]]:
+    """Group blocks in order so each group's content stays within max_chars."""
+    batches: List[List[Dict]] = []
+    current: List[Dict] = []
+    current_chars = 0
+    for injection in injections:
+        size = len(injection.get("content", ""))
+        if current and current_chars + size > max_chars:
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(injection)
+        current_chars += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _lookup_primed(store: SessionStore, session_name: str, system_prompt: str,
+                   tools: Optional[List[Dict]], pending_injections: Optional[List[Dict]]):
+    """Find the primed session for this prompt/tools/skill set.
+
+    Returns (primed, None) on a hit, or (None, priming) where priming is the
+    PrimedSession this call should build and register once acknowledged.
+    """
+    prompt_hash = content_hash(system_prompt)
+    tools_hash = content_hash(json.dumps(tools or [], sort_keys=True, ensure_ascii=False))
+    skills = sorted({
+        f"skill:{inj['name']}" for inj in (pending_injections or []) if inj["type"] == "skill"
+    })
+    key = primed_key(prompt_hash, tools_hash, skills)
+    primed = store.get_primed(key)
+    if primed:
+        return primed, None
+    return None, PrimedSession(
+        key=key, chat_session_id="", ack_message_id=None,
+        mode=store.mode_for(session_name), prompt_hash=prompt_hash,
+        tools_hash=tools_hash, contexts=skills,
+    )
+
+
 def get_session_store_path() -> str:
     """Get the path to the sessions store file."""
     appdata = os.environ.get('APPDATA')
@@ -88,12 +182,18 @@ async def chat_in_session(
     thinking_enabled: bool = True,
     session_manager=None,
     pending_injections: Optional[List[Dict]] = None,
+    batch_injections: bool = True,
+    injection_batch_chars: int = INJECTION_BATCH_MAX_CHARS,
+    primed_sessions: bool = True,
+    tool_concurrency: int = DEFAULT_TOOL_CONCURRENCY,
+    seen_ledger: bool = True,
 ) -> str:
     """Chat within a named session with full conversation continuity.
 
     Flow per message:
     1. System prompt → "DEEPSEEK CODE ACTIVADO" (first message only)
-    2. Context injections → "Skill X aceptada" (only new ones)
+    2. Context injections → "Skill X aceptada" (only new ones; batched into
+       one message + one ack by default)
     3. User message (clean, just the text)
 
     Args:
@@ -108,6 +208,18 @@ async def chat_in_session(
         session_manager: Optional session manager for auth validation
         pending_injections: Context blocks to inject before user message.
             Each dict: {"type": "skill"|"memory"|"error", "name": "...", "content": "..."}
+        batch_injections: Send pending injections packed into as few framed
+            messages as injection_batch_chars allows, with one combined
+            acknowledgment each. False sends them one by one.
+        injection_batch_chars: Max context characters per batched message
+        primed_sessions: New sessions branch from a primed session with the
+            same system prompt, tool schema and skill set (skipping Phase 1
+            and those skills); the first one to run primes it for the rest.
+        tool_concurrency: Max tool calls of one response running at once
+            (calls touching the same path still run in order)
+        seen_ledger: Answer repeat file reads with "unchanged since message N"
+            or a unified diff against the version the model already saw
+            (the model can pass full=true to get the whole text)
 
     Returns:
         The assistant's response text
@@ -122,12 +234,32 @@ async def chat_in_session(
     store.cleanup_old(max_age_hours=48)
     session = store.get(session_name)
 
+    # Primed session being built by this call (registered once Phase 1 and
+    # the skill injections are acknowledged), or None
+    priming = None
+    forked = False
+    if not session and primed_sessions and system_prompt:
+        primed, priming = _lookup_primed(store, session_name, system_prompt,
+                                         tools, pending_injections)
+        if primed:
+            # Branch from the golden thread: Phase 1 and its skills are skipped
+            session = store.fork(session_name, primed)
+            forked = True
+            print(
+                f"  [session] Nueva sesion '{session_name}' desde sesion primada "
+                f"{primed.key} (~{primed.system_prompt_tokens + primed.injected_tokens} "
+                f"tokens reutilizados)",
+                file=sys.stderr,
+            )
+
     if not session:
         # Create new DeepSeek chat session
-        chat_session_id = web_session.create_chat_session()
+        chat_session_id = await web_create_chat_session(web_session)
         session = store.create(session_name, chat_session_id)
+        if priming:
+            priming.chat_session_id = chat_session_id
         print(f"  [session] Nueva sesion '{session_name}' creada", file=sys.stderr)
-    else:
+    elif not forked:
         print(
             f"  [session] Reanudando '{session_name}' "
             f"(mensajes: {session.message_count})",
@@ -146,8 +278,8 @@ async def chat_in_session(
         )
         print(f"  [session] Enviando prompt tecnico...", file=sys.stderr)
         try:
-            _init_response = await asyncio.get_event_loop().run_in_executor(
-                None, web_session.chat, init_prompt,
+            _init_response = await web_chat(
+                web_session, init_prompt,
                 thinking_enabled, session.parent_message_id,
             )
         except TokenExpiredError as e:
@@ -159,60 +291,84 @@ async def chat_in_session(
         init_msg_id = web_session.last_message_id
         store.update(session_name, parent_message_id=init_msg_id)
         # Track system prompt tokens
-        import math
+        init_tokens = count_tokens(init_prompt)
         session_obj = store.sessions.get(session_name)
         if session_obj:
-            session_obj.system_prompt_tokens = math.ceil(len(init_prompt) / 3.5)
+            session_obj.system_prompt_tokens = init_tokens
             store.save()
         session = store.get(session_name)
-        print(f"  [session] Prompt tecnico aceptado (~{math.ceil(len(init_prompt)/3.5)} tokens)", file=sys.stderr)
+        print(f"  [session] Prompt tecnico aceptado (~{init_tokens} tokens)", file=sys.stderr)
+        if priming:
+            priming.ack_message_id = init_msg_id
+            priming.system_prompt_tokens = init_tokens
+            if not priming.contexts:
+                store.register_primed(priming)
+                priming = None
+    else:
+        priming = None
 
     # --- Phase 2: Context injections (skills, memory, errors, etc.) ---
     if pending_injections:
         already = set(session.injected_contexts or [])
-        injected_tokens = 0
+        new_injections = []
         for injection in pending_injections:
             ctx_id = f"{injection['type']}:{injection['name']}"
             if ctx_id in already:
                 continue
+            already.add(ctx_id)
+            new_injections.append(injection)
+
+        # Batched: one framed message (and one PoW + ack) per size-limited
+        # group. One-by-one mode is the same with groups of a single block.
+        # When priming, skills go first so the golden thread ends right
+        # after them (memories/errors are specific to this session).
+        def _split(group):
+            if batch_injections:
+                return _batch_injections(group, injection_batch_chars)
+            return [[injection] for injection in group]
+
+        if priming:
+            batches = _split([inj for inj in new_injections if inj["type"] == "skill"])
+            prime_after = len(batches)
+            batches += _split([inj for inj in new_injections if inj["type"] != "skill"])
+        else:
+            batches = _split(new_injections)
+            prime_after = 0
 
-            ctx_type = injection["type"].capitalize()
-            ctx_name = injection["name"]
-
-            # Type-specific acknowledgment prompts
-            ack_map = {
-                "skill": f"Skill {ctx_name} aceptada",
-                "memory": f"Memoria {ctx_name} integrada",
-                "global": f"Perfil {ctx_name} integrado",
-                "error": f"Errores de {ctx_name} registrados",
-                "knowledge": f"Conocimiento de {ctx_name} integrado",
-            }
-            ack_text = ack_map.get(injection["type"], f"{ctx_type} {ctx_name} aceptada")
-
-            inject_prompt = (
-                f"== {ctx_type.upper()}: {ctx_name} ==\n\n"
-                f"{injection['content']}\n\n"
-                f"== FIN {ctx_type.upper()} ==\n\n"
-                f"Responde UNICAMENTE: '{ack_text}'"
-            )
-
-            print(f"  [session] Inyectando {injection['type']} '{ctx_name}'...", file=sys.stderr)
+        injected_tokens = 0
+        for batch_idx, batch in enumerate(batches):
+            inject_prompt, ack_text = _frame_injections(batch)
+            names = ", ".join(f"{inj['type']} '{inj['name']}'" for inj in batch)
+            print(f"  [session] Inyectando {names}...", file=sys.stderr)
             try:
-                _inject_response = await asyncio.get_event_loop().run_in_executor(
-                    None, web_session.chat, inject_prompt,
+                _inject_response = await web_chat(
+                    web_session, inject_prompt,
                     thinking_enabled, session.parent_message_id,
                 )
             except TokenExpiredError as e:
                 return f"[Error de sesion] {e}. Ejecuta /login para renovar."
 
             inject_msg_id = web_session.last_message_id
-            store.update(session_name, parent_message_id=inject_msg_id,
-                         add_context=ctx_id)
+            # Every ctx_id is recorded so later calls skip it (reuse savings)
+            store.update(
+                session_name, parent_message_id=inject_msg_id,
+                add_contexts=[f"{inj['type']}:{inj['name']}" for inj in batch],
+            )
             # Track injected tokens
-            import math
-            injected_tokens += math.ceil(len(injection.get("content", "")) / 3.5)
+            for injection in batch:
+                injected_tokens += count_tokens(injection.get("content", ""))
             session = store.get(session_name)
-            print(f"  [session] {ack_text}", file=sys.stderr)
+            if len(batch) == 1:
+                print(f"  [session] {ack_text}", file=sys.stderr)
+            else:
+                for injection in batch:
+                    print(f"  [session] {_injection_ack(injection)}", file=sys.stderr)
+
+            if priming and batch_idx == prime_after - 1:
+                priming.ack_message_id = inject_msg_id
+                priming.injected_tokens = injected_tokens
+                store.register_primed(priming)
+                priming = None
 
         # Update total injected tokens on session
         if injected_tokens > 0 and session:
@@ -227,14 +383,19 @@ async def chat_in_session(
 
     # Tool-calling loop
     for step in range(max_steps):
+        # Read-only tools start while the response is still streaming
+        speculative = SpeculativeToolRunner(mcp_server, f"session_{session_name}_{step}")
         try:
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, web_session.chat, prompt,
+            response = await web_chat(
+                web_session, prompt,
                 thinking_enabled, session.parent_message_id,
+                tool_stream=speculative.stream(),
             )
         except TokenExpiredError as e:
+            speculative.cancel_pending()
             return f"[Error de sesion] {e}. Ejecuta /login para renovar."
         except StallDetectedError as e:
+            speculative.cancel_pending()
             print(f"  [session] STALL detectado: {e}", file=sys.stderr)
             return f"[Error] DeepSeek se congelo. Reintentos agotados. Ejecuta el comando de nuevo."
 
@@ -245,6 +406,7 @@ async def chat_in_session(
         tool_calls, clean_text = extract_tool_calls(response)
 
         if not tool_calls:
+            speculative.cancel_pending()
             # Final response — update session and return
             store.update(session_name, parent_message_id=msg_id)
             cleaned = clean_final_response(response) if step > 0 else response
@@ -259,15 +421,16 @@ async def chat_in_session(
             return cleaned
 
         # Execute tools
+        # Independent calls run concurrently, path conflicts in order;
+        # results come back in the original call order
         results = []
-        for call in tool_calls:
-            from ..server.protocol import MCPRequest, MCPMethod
-            tool_request = MCPRequest(
-                id=f"session_{session_name}_{step}_{call['tool']}",
-                method=MCPMethod.TOOLS_CALL,
-                params={"name": call["tool"], "arguments": call["args"]},
-            )
-            tool_response = await mcp_server.handle_request(tool_request)
+        scheduled = await run_tool_calls(
+            mcp_server, tool_calls, f"session_{session_name}_{step}",
+            max_concurrency=tool_concurrency, speculative=speculative,
+        )
+        for item in scheduled:
+            call = item.call
+            tool_response = item.response
 
             if hasattr(tool_response, 'error'):
                 result_str = f"Error: {tool_response.error.message}"
@@ -278,12 +441,21 @@ async def chat_in_session(
                     if isinstance(result, dict) else str(result)
                 )
 
+            if seen_ledger:
+                result_str = apply_seen_ledger(
+                    store, session_name, mcp_server, call, result_str,
+                    chat_session_id=getattr(web_session, "_chat_session_id", None),
+                )
+
             results.append(format_tool_result(call["tool"], result_str))
             print(
-                f"  [session:{session_name}] {call['tool']} -> {len(result_str)} chars",
+                f"  [session:{session_name}] {call['tool']} -> {len(result_str)} chars "
+                f"({'early' if item.speculative else f'{item.wall_s:.2f}s'})",
                 file=sys.stderr,
             )
 
+        speculative.cancel_pending()
+
         # Update session state after this step
         store.update(session_name, parent_message_id=msg_id)
 
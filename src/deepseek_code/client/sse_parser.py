@@ -0,0 +1,293 @@
+"""Parser incremental del stream SSE de /api/v0/chat/completion.
+
+Separa la interpretacion de lineas SSE del transporte HTTP para que
+la sesion sincrona (requests) y la asincrona (httpx) compartan
+exactamente el mismo manejo de modos thinking/content, message_id
+y diagnosticos.
+
+Camino rapido: la gran mayoria de los chunks tienen la forma
+{"v":"..."} o {"p":"response/content","v":"..."} con un string sin
+escapes. Esos se reconocen por prefijo/sufijo y se cortan sin
+json.loads (ni dict intermedio); los chunks de thinking ni siquiera se
+decodifican de bytes. Todo lo demas pasa por el camino completo.
+Los eventos de diagnostico se guardan como tuplas en un deque de
+tamaño fijo y solo se formatean en format_sse_events() (al volcar el
+diagnostico).
+
+Uso:
+    parser = SSEStreamParser(diag)
+    for line in lines:
+        token = parser.feed(line)
+        if token:
+            yield token
+        if parser.finished:
+            break
+    parser.close()
+"""
+
+import json
+import sys
+import time
+from collections import deque
+from typing import List, Optional
+
+# Eventos de diagnostico que se conservan (los mas recientes)
+SSE_DIAG_MAX_EVENTS = 30
+# Cada cuantos chunks de thinking se consulta el reloj para el heartbeat
+HEARTBEAT_CHECK_EVERY = 32
+
+_V_PREFIX = '{"v":"'
+_P_PREFIX = '{"p":"'
+_PV_SEP = '","v":"'
+_STR_SUFFIX = '"}'
+_DATA_V_PREFIX = b'data: {"v":"'
+_THINKING_PREFIX = b'data: {"p":"response/thinking_content","v":"'
+
+
+def new_sse_diag() -> dict:
+    """Crea el dict de diagnostico SSE (como F12 Network)."""
+    return {
+        "start_ts": time.time(),
+        "end_ts": None,
+        "http_status": None,
+        "total_lines": 0,
+        "total_data_chunks": 0,
+        "thinking_chunks": 0,
+        "content_chunks": 0,
+        "content_chars": 0,
+        "fast_path_chunks": 0,  # Chunks resueltos sin json.loads
+        "events": deque(maxlen=SSE_DIAG_MAX_EVENTS),  # (ts, tipo, detalle) sin formatear
+        "errors": [],           # Errores silenciosos en el stream
+        "mode_transitions": [], # init→thinking→content
+        "finish_reason": None,  # "event:finish", "done", "stream_end", "timeout", "error"
+    }
+
+
+def format_sse_events(diag: dict, last: Optional[int] = None) -> List[str]:
+    """Formatea los eventos del diagnostico ("+1.2s tipo: detalle")."""
+    let_events = list(diag["events"])
+    if last is not None:
+        let_events = let_events[-last:]
+    let_start = diag["start_ts"]
+    return [
+        f"+{round(ts - let_start, 2)}s {event_type}: {detail}"[:200]
+        for ts, event_type, detail in let_events
+    ]
+
+
+class SSEStreamParser:
+    """Interpreta lineas SSE de DeepSeek y extrae tokens de contenido.
+
+    Mantiene el modo del stream (init/thinking/content), captura el
+    response message_id y llena el dict de diagnostico compartido.
+    fast_path=False fuerza json.loads en cada chunk (referencia para
+    tests y benchmarks).
+    """
+
+    def __init__(self, diag: dict, fast_path: bool = True):
+        self.diag = diag
+        self.fast_path = fast_path
+        self.last_message_id = None
+        self.finished = False
+        self._last_event = ""
+        self._stream_mode = "init"
+        self._last_heartbeat = time.time()
+        self._heartbeat_countdown = HEARTBEAT_CHECK_EVERY
+
+    def event(self, event_type: str, detail: str = ""):
+        """Agrega evento al buffer diagnostico (deque de tamaño fijo).
+
+        Solo guarda la tupla: el string se arma en format_sse_events().
+        """
+        self.diag["events"].append((time.time(), event_type, detail))
+
+    def _heartbeat(self):
+        """Heartbeat cada 10s durante thinking largo."""
+        self._heartbeat_countdown -= 1
+        if self._heartbeat_countdown > 0:
+            return
+        self._heartbeat_countdown = HEARTBEAT_CHECK_EVERY
+        let_now = time.time()
+        if let_now - self._last_heartbeat >= 10:
+            print(
+                f"  [thinking] {round(let_now - self.diag['start_ts'], 1)}s... "
+                f"({self.diag['thinking_chunks']} chunks)",
+                file=sys.stderr,
+            )
+            self._last_heartbeat = let_now
+
+    def _thinking_chunk(self):
+        if self._stream_mode != "thinking":
+            self.diag["mode_transitions"].append(f"{self._stream_mode}→thinking")
+            self.event("mode", f"{self._stream_mode}→thinking")
+        self._stream_mode = "thinking"
+        self.diag["thinking_chunks"] += 1
+        self._heartbeat()
+
+    def _content_value(self, val: str) -> str:
+        let_diag = self.diag
+        let_diag["content_chunks"] += 1
+        let_diag["content_chars"] += len(val)
+        return val
+
+    def feed_bytes(self, line: bytes) -> Optional[str]:
+        """Como feed(), pero sobre la linea cruda sin decodificar.
+
+        Los chunks de thinking con string simple (el grueso de un stream
+        con thinking largo) se cuentan sin decodificar ni copiar el valor.
+        """
+        if self.fast_path and line.endswith(b'"}'):
+            if line.startswith(_THINKING_PREFIX):
+                let_start = len(_THINKING_PREFIX)
+            elif self._stream_mode == "thinking" and line.startswith(_DATA_V_PREFIX):
+                let_start = len(_DATA_V_PREFIX)
+            else:
+                let_start = 0
+            if let_start and line.find(b'"', let_start, len(line) - 2) < 0:
+                let_diag = self.diag
+                let_diag["total_lines"] += 1
+                let_diag["total_data_chunks"] += 1
+                let_diag["fast_path_chunks"] += 1
+                self._thinking_chunk()
+                return None
+        return self.feed(line.decode("utf-8", errors="replace"))
+
+    def _feed_fast(self, raw: str):
+        """Reconoce {"v":"s"} / {"p":"x","v":"s"} sin json.loads.
+
+        Retorna (path, valor) o None si el chunk necesita el camino completo.
+        El string debe no tener comillas ni backslashes (sin escapes JSON),
+        asi el slice es exactamente lo que devolveria json.loads.
+        """
+        if not raw.endswith(_STR_SUFFIX):
+            return None
+        if raw.startswith(_V_PREFIX):
+            path = ""
+            val = raw[6:-2]
+        elif raw.startswith(_P_PREFIX):
+            let_sep = raw.find(_PV_SEP, 6)
+            if let_sep < 0:
+                return None
+            path = raw[6:let_sep]
+            if '"' in path or "\\" in path:
+                return None
+            val = raw[let_sep + 7:-2]
+        else:
+            return None
+        if '"' in val or "\\" in val:
+            return None
+        return path, val
+
+    def feed(self, line_str: str) -> Optional[str]:
+        """Procesa una linea SSE ya decodificada. Retorna el token o None.
+
+        Tras una linea 'event: finish' marca self.finished y el caller
+        debe dejar de leer.
+        """
+        if not line_str:
+            return None
+        let_diag = self.diag
+        let_diag["total_lines"] += 1
+
+        # --- SSE event lines ---
+        if line_str.startswith("event: "):
+            self._last_event = line_str[7:].strip()
+            self.event("event", self._last_event)
+            if self._last_event == "finish":
+                let_diag["finish_reason"] = "event:finish"
+                self.finished = True
+            return None
+
+        # --- SSE data lines ---
+        if not line_str.startswith("data: "):
+            return None
+        raw = line_str[6:]
+        if raw == "[DONE]":
+            self.event("data", "[DONE]")
+            let_diag["finish_reason"] = "done"
+            return None
+        if raw == "{}":
+            return None
+
+        if self.fast_path:
+            let_fast = self._feed_fast(raw)
+            if let_fast is not None:
+                let_diag["total_data_chunks"] += 1
+                let_diag["fast_path_chunks"] += 1
+                return self._route(let_fast[0], let_fast[1])
+
+        try:
+            chunk = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.event("parse_error", f"{e} — raw: {raw[:100]}")
+            let_diag["errors"].append(f"JSONDecodeError: {raw[:100]}")
+            return None
+
+        let_diag["total_data_chunks"] += 1
+
+        # Capturar response_message_id del chunk metadata inicial
+        if "response_message_id" in chunk:
+            self.last_message_id = chunk["response_message_id"]
+            self.event("metadata", f"response_msg_id={chunk['response_message_id']}")
+
+        if "v" not in chunk:
+            # Chunk sin valor — podria ser error o status
+            let_keys = list(chunk.keys())
+            if let_keys != ["response_message_id"] and let_keys != ["request_message_id", "response_message_id"]:
+                self.event("chunk_sin_v", f"keys={let_keys}")
+            return None
+
+        val = chunk["v"]
+
+        # Capturar message_id del objeto response inicial
+        if isinstance(val, dict) and "response" in val:
+            resp_obj = val["response"]
+            if isinstance(resp_obj, dict) and "message_id" in resp_obj:
+                self.last_message_id = resp_obj["message_id"]
+                self.event("response_obj", f"msg_id={resp_obj['message_id']}")
+            return None
+
+        return self._route(chunk.get("p", ""), val)
+
+    def _route(self, path: str, val) -> Optional[str]:
+        """Aplica path/valor de un chunk al modo del stream. Retorna el token o None."""
+        # Track stream mode transitions
+        if path == "response/thinking_content":
+            self._thinking_chunk()
+            return None
+        if path == "response/content":
+            if self._stream_mode != "content":
+                self.diag["mode_transitions"].append(f"{self._stream_mode}→content")
+                self.event("mode", f"{self._stream_mode}→content")
+            self._stream_mode = "content"
+            if isinstance(val, str):
+                return self._content_value(val)
+            return None
+
+        # Non-empty path we don't handle
+        if path:
+            self.event("unknown_path", f"p={path}")
+            return None
+
+        # p="" chunks — only yield in content mode
+        if self._stream_mode == "thinking":
+            self.diag["thinking_chunks"] += 1
+            self._heartbeat()
+            return None
+        if self._stream_mode != "content":
+            return None
+
+        # Extraer texto de respuesta
+        if isinstance(val, str):
+            return self._content_value(val)
+        if isinstance(val, dict):
+            content = val.get("content", "")
+            if content:
+                return self._content_value(content)
+        return None
+
+    def close(self):
+        """Marca el fin normal del stream si no hubo event:finish ni [DONE]."""
+        if not self.diag["finish_reason"]:
+            self.diag["finish_reason"] = "stream_end"
+            self.event("stream", "termino sin event:finish ni [DONE]")
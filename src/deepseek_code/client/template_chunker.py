@@ -16,6 +16,8 @@ import re
 from dataclasses import dataclass, field
 from typing import List, Optional, Tuple
 
+from ..tokenization import count_tokens
+
 
 @dataclass
 class TemplateChunk:
@@ -28,12 +30,12 @@ class TemplateChunk:
 
     @property
     def estimated_tokens(self) -> int:
-        return len(self.content) // 4
+        return count_tokens(self.content)
 
 
 def estimate_tokens(text: str) -> int:
-    """Estimacion rapida: ~4 chars por token."""
-    return len(text) // 4
+    """Tokens del texto (tokenizador BPE compartido)."""
+    return count_tokens(text)
 
 
 def should_chunk(template: str, threshold_tokens: int = 30000) -> bool:
@@ -78,6 +80,7 @@ def chunk_by_todos(
     lines = template.split('\n')
     chunks = []
     current_lines = []
+    current_tokens = 0  # suma por linea: no recontar el chunk en cada TODO
     current_todos = []
     current_start = 0
 
@@ -92,20 +95,21 @@ def chunk_by_todos(
 
         # Si encontramos un nuevo TODO y el chunk actual es grande, cortar
         if is_todo_boundary:
-            current_text = '\n'.join(current_lines)
-            if estimate_tokens(current_text) >= max_tokens_per_chunk:
+            if current_tokens >= max_tokens_per_chunk:
                 chunks.append(TemplateChunk(
-                    content=current_text,
+                    content='\n'.join(current_lines),
                     todo_names=list(current_todos),
                     label=f"TODOs: {', '.join(current_todos)}" if current_todos else "",
                     start_line=current_start,
                     end_line=i - 1,
                 ))
                 current_lines = []
+                current_tokens = 0
                 current_todos = []
                 current_start = i
 
         current_lines.append(line)
+        current_tokens += count_tokens(line) + 1  # + salto de linea
 
         # Extraer nombre del TODO si esta linea es un marker
         if i in todo_line_nums:
@@ -142,19 +146,29 @@ def chunk_by_lines(
         Lista de TemplateChunk
     """
     lines = template.split('\n')
-    max_lines = max(10, (max_tokens_per_chunk * 4) // 80)  # ~80 chars/linea
     chunks = []
+    start = 0
+    current_tokens = 0
 
-    for start in range(0, len(lines), max_lines):
-        end = min(start + max_lines, len(lines))
-        content = '\n'.join(lines[start:end])
+    def close(end: int):
         chunks.append(TemplateChunk(
-            content=content,
+            content='\n'.join(lines[start:end]),
             label=f"lineas {start+1}-{end}",
             start_line=start,
             end_line=end - 1,
         ))
 
+    for i, line in enumerate(lines):
+        line_tokens = count_tokens(line) + 1  # + salto de linea
+        # Minimo 10 lineas por chunk, como antes
+        if current_tokens + line_tokens > max_tokens_per_chunk and i - start >= 10:
+            close(i)
+            start = i
+            current_tokens = 0
+        current_tokens += line_tokens
+    if start < len(lines):
+        close(len(lines))
+
     return chunks
 
 
@@ -0,0 +1,113 @@
+"""Ejecucion concurrente de las tool calls de una misma respuesta.
+
+Los loops de herramientas (run_agent_web, chat_in_session) ejecutaban
+las hasta 5 tool calls de cada respuesta en serie. Aqui cada call
+declara que rutas lee y escribe (BaseTool.path_access) y solo espera a
+las calls anteriores con las que entra en conflicto:
+
+    - lectura vs lectura: nunca conflicto
+    - escritura vs lectura/escritura de la misma ruta (o una contenida): en orden
+    - tools sin rutas declaradas que mutan (run_command, memoria...): barrera
+
+Las calls independientes corren en paralelo hasta max_concurrency.
+El resultado respeta el orden original de las calls y cada una registra
+su tiempo de ejecucion (wall_s).
+
+Uso:
+    scheduled = await run_tool_calls(mcp_server, tool_calls, f"agent_{step}")
+    for item in scheduled:   # mismo orden que tool_calls
+        item.response, item.wall_s
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..server.tool import paths_overlap as _overlap
+
+# Calls de una misma respuesta ejecutandose a la vez
+DEFAULT_TOOL_CONCURRENCY = 4
+
+# (lecturas, escrituras); None = barrera
+Access = Optional[Tuple[List[str], List[str]]]
+
+
+@dataclass
+class ScheduledCall:
+    """Resultado de una tool call planificada."""
+    index: int
+    call: Dict[str, Any]
+    response: Any = None
+    wall_s: float = 0.0        # Tiempo ejecutando la herramienta
+    waited_s: float = 0.0      # Tiempo esperando dependencias / cupo
+    speculative: bool = False  # Resultado tomado de la ejecucion anticipada
+
+
+def call_access(mcp_server, call: Dict[str, Any]) -> Access:
+    """Rutas que toca una call segun su herramienta (None = barrera)."""
+    tool = mcp_server.tools.get(call["tool"]) if mcp_server else None
+    if tool is None:
+        # Herramienta inexistente: el servidor responde error sin tocar nada
+        return [], []
+    try:
+        return tool.path_access(call.get("args") or {})
+    except Exception:
+        return None
+
+
+def calls_conflict(first: Access, second: Access) -> bool:
+    """True si dos calls no pueden correr a la vez (alguna escribe lo que la otra toca)."""
+    if first is None or second is None:
+        return True
+    reads_a, writes_a = first
+    reads_b, writes_b = second
+    return (
+        any(_overlap(w, p) for w in writes_a for p in reads_b + writes_b)
+        or any(_overlap(w, p) for w in writes_b for p in reads_a)
+    )
+
+
+async def run_tool_calls(mcp_server, calls: List[Dict[str, Any]], id_prefix: str,
+                         max_concurrency: int = DEFAULT_TOOL_CONCURRENCY,
+                         speculative=None) -> List[ScheduledCall]:
+    """Ejecuta las calls respetando dependencias por ruta. Retorna en orden original.
+
+    speculative (tool_stream.SpeculativeToolRunner) aporta resultados ya
+    calculados durante el stream; solo se usan en calls sin dependencias,
+    es decir, que ninguna escritura anterior pudo haber invalidado.
+    """
+    from ..server.protocol import MCPMethod, MCPRequest
+    accesses = [call_access(mcp_server, call) for call in calls]
+    results = [ScheduledCall(index=i, call=call) for i, call in enumerate(calls)]
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    tasks: List[asyncio.Task] = []
+
+    async def _run(idx: int, deps: List[asyncio.Task]):
+        item = results[idx]
+        start = time.perf_counter()
+        if deps:
+            await asyncio.wait(deps)
+        elif speculative is not None:
+            response = await speculative.take(item.call)
+            if response is not None:
+                item.response = response
+                item.speculative = True
+                return
+        async with semaphore:
+            item.waited_s = time.perf_counter() - start
+            t0 = time.perf_counter()
+            request = MCPRequest(
+                id=f"{id_prefix}_{idx}_{item.call['tool']}",
+                method=MCPMethod.TOOLS_CALL,
+                params={"name": item.call["tool"], "arguments": item.call["args"]},
+            )
+            item.response = await mcp_server.handle_request(request)
+            item.wall_s = time.perf_counter() - t0
+
+    for idx in range(len(calls)):
+        deps = [tasks[j] for j in range(idx) if calls_conflict(accesses[j], accesses[idx])]
+        tasks.append(asyncio.ensure_future(_run(idx, deps)))
+    if tasks:
+        await asyncio.gather(*tasks)
+    return results
@@ -0,0 +1,199 @@
+"""Deteccion incremental de bloques tool_call durante el stream SSE.
+
+extract_tool_calls() solo corre cuando llego la respuesta completa, pero
+un bloque ```tool_call``` suele cerrarse mucho antes de que el modelo
+termine de hablar. ToolCallStream recibe los tokens a medida que llegan
+y emite cada tool call en cuanto se parsea su fence de cierre, con la
+misma deduplicacion que extract_tool_calls().
+
+SpeculativeToolRunner usa esas emisiones para arrancar herramientas de
+solo lectura (BaseTool.read_only) antes de que termine el stream; el
+loop de herramientas luego toma el resultado ya calculado.
+
+Uso:
+    runner = SpeculativeToolRunner(mcp_server, "agent_3")
+    stream = runner.stream()
+    response = await web_chat(web_session, prompt, tool_stream=stream)
+    tool_calls, clean_text = extract_tool_calls(response)
+    scheduled = await run_tool_calls(mcp_server, tool_calls, "agent_3", speculative=runner)
+"""
+
+import asyncio
+import json
+import re
+from typing import Callable, Dict, List, Optional
+
+TOOL_CALL_OPENER = "```tool_call"
+# Mismo patron que extract_tool_calls(): los spans deben coincidir
+TOOL_CALL_BLOCK_RE = re.compile(r'```tool_call\s*\n(.*?)\n```', re.DOTALL)
+
+
+def parse_tool_block(block: str) -> List[Dict]:
+    """Parsea el contenido de un bloque tool_call a [{'tool', 'args'}, ...]."""
+    calls = []
+
+    def _append_call(item):
+        """Extrae tool+args de un dict y lo agrega a calls."""
+        if isinstance(item, dict) and "tool" in item:
+            calls.append({
+                "tool": item["tool"],
+                "args": item.get("args", item.get("arguments", {}))
+            })
+
+    try:
+        data = json.loads(block.strip())
+        if isinstance(data, list):
+            # Array de tool calls: [{tool:..., args:...}, ...]
+            for item in data:
+                _append_call(item)
+        else:
+            _append_call(data)
+    except json.JSONDecodeError:
+        # Intentar extraer JSON parcial
+        try:
+            # A veces el modelo pone texto extra
+            json_match = re.search(r'\{.*\}', block, re.DOTALL)
+            if json_match:
+                _append_call(json.loads(json_match.group()))
+        except (json.JSONDecodeError, AttributeError):
+            pass
+    return calls
+
+
+def tool_call_key(call: Dict) -> str:
+    """Clave de deduplicacion de una tool call (tool + args)."""
+    return json.dumps(call, sort_keys=True)
+
+
+class ToolCallStream:
+    """Acumula tokens y emite tool calls apenas se cierra su bloque.
+
+    Solo se re-escanea cuando llega un backtick (posible fence de cierre),
+    y solo sobre el texto desde el primer opener sin cerrar, asi que el
+    costo por token es O(1) fuera de bloques tool_call.
+    """
+
+    def __init__(self, on_call: Optional[Callable[[Dict], None]] = None,
+                 on_reset: Optional[Callable[[], None]] = None):
+        self.on_call = on_call
+        self.on_reset = on_reset
+        self._init_state()
+
+    def _init_state(self):
+        self._parts: List[str] = []
+        self._pending: List[str] = []
+        self._seen = set()
+        self.calls: List[Dict] = []
+
+    def reset(self):
+        """Descarta el estado (nuevo intento tras stall o respuesta vacia)."""
+        self._init_state()
+        if self.on_reset:
+            self.on_reset()
+
+    def feed(self, token: str) -> List[Dict]:
+        """Agrega un token. Retorna las tool calls nuevas que completo."""
+        if not token:
+            return []
+        self._parts.append(token)
+        self._pending.append(token)
+        if "`" not in token:
+            return []
+
+        text = "".join(self._pending)
+        new_calls = []
+        match = TOOL_CALL_BLOCK_RE.search(text)
+        while match:
+            for call in parse_tool_block(match.group(1)):
+                key = tool_call_key(call)
+                if key in self._seen:
+                    continue
+                self._seen.add(key)
+                self.calls.append(call)
+                new_calls.append(call)
+            text = text[match.end():]
+            match = TOOL_CALL_BLOCK_RE.search(text)
+
+        # Conservar solo lo que aun puede formar parte de un bloque futuro
+        idx = text.find(TOOL_CALL_OPENER)
+        if idx >= 0:
+            text = text[idx:]
+        else:
+            text = text[-(len(TOOL_CALL_OPENER) - 1):]
+        self._pending = [text] if text else []
+
+        if self.on_call:
+            for call in new_calls:
+                self.on_call(call)
+        return new_calls
+
+    @property
+    def text(self) -> str:
+        """Respuesta acumulada hasta ahora."""
+        return "".join(self._parts)
+
+
+class SpeculativeToolRunner:
+    """Ejecuta herramientas read-only en cuanto el stream las emite.
+
+    Los resultados solo se usan si ninguna escritura anterior de la
+    respuesta final toca la misma ruta (tool_scheduler solo llama take()
+    en calls sin dependencias), asi el orden observable es el mismo que
+    en serie.
+    """
+
+    def __init__(self, mcp_server, id_prefix: str):
+        self._mcp = mcp_server
+        self._id_prefix = id_prefix
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._blocked = False
+        self.started = 0
+        self.used = 0
+
+    def is_read_only(self, tool_name: str) -> bool:
+        tool = self._mcp.tools.get(tool_name) if self._mcp else None
+        return bool(tool is not None and getattr(tool, "read_only", False))
+
+    def on_call(self, call: Dict):
+        """Callback de ToolCallStream: arranca la herramienta si es read-only."""
+        if self._blocked:
+            return
+        if not self.is_read_only(call["tool"]):
+            # Lo que venga despues podria depender de esta escritura
+            self._blocked = True
+            return
+        key = tool_call_key(call)
+        if key in self._tasks:
+            return
+        from ..server.protocol import MCPRequest, MCPMethod
+        request = MCPRequest(
+            id=f"{self._id_prefix}_pre{len(self._tasks)}_{call['tool']}",
+            method=MCPMethod.TOOLS_CALL,
+            params={"name": call["tool"], "arguments": call["args"]},
+        )
+        self._tasks[key] = asyncio.get_running_loop().create_task(
+            self._mcp.handle_request(request)
+        )
+        self.started += 1
+
+    def stream(self) -> ToolCallStream:
+        """ToolCallStream conectado a este runner."""
+        return ToolCallStream(on_call=self.on_call, on_reset=self.reset_attempt)
+
+    def reset_attempt(self):
+        """Nuevo intento de stream: se vuelve a permitir especular."""
+        self._blocked = False
+
+    async def take(self, call: Dict):
+        """Retorna la respuesta MCP ya calculada para esta call, o None."""
+        task = self._tasks.pop(tool_call_key(call), None)
+        if task is None:
+            return None
+        self.used += 1
+        return await task
+
+    def cancel_pending(self):
+        """Cancela especulaciones que no se usaron (calls descartadas)."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
@@ -0,0 +1,146 @@
+"""Cache de proceso y en disco del modulo WASM de Proof of Work.
+
+Compilar sha3_wasm_bg.wasm con wasmtime es lo mas caro de construir una
+DeepSeekWebSession. Este modulo compila el WASM una sola vez por proceso
+(un Engine + Module compartidos) y guarda el artefacto precompilado en
+disco, con clave (sha256 del .wasm, version de wasmtime), para que las
+siguientes invocaciones del CLI solo lo deserialicen.
+
+Cada sesion obtiene su propio Store/Instance por hilo: instanciar un
+modulo ya compilado es barato y los Store de wasmtime no son thread-safe.
+
+Uso:
+    engine, module = get_compiled_module("sha3_wasm_bg.wasm")
+    instance = PowInstance(engine, module)
+    instance.solve_func(instance.store, ...)
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import wasmtime
+
+# Subdirectorio (junto al .wasm) donde se guardan los artefactos precompilados
+CACHE_DIRNAME = "wasm_cache"
+
+_lock = threading.Lock()
+_engine: Optional[wasmtime.Engine] = None
+_modules: Dict[str, wasmtime.Module] = {}
+_stats = {"compiled": 0, "deserialized": 0, "memory_hits": 0}
+
+
+def _file_sha256(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _wasmtime_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("wasmtime")
+    except Exception:
+        return getattr(wasmtime, "__version__", "unknown")
+
+
+def _artifact_path(wasm_path: Path, digest: str, cache_dir: Optional[Path]) -> Path:
+    base = cache_dir or (wasm_path.parent / CACHE_DIRNAME)
+    return base / f"{wasm_path.stem}-{digest[:16]}-wasmtime{_wasmtime_version()}.cwasm"
+
+
+def _get_engine() -> wasmtime.Engine:
+    global _engine
+    if _engine is None:
+        _engine = wasmtime.Engine()
+    return _engine
+
+
+def _load_or_compile(engine: wasmtime.Engine, wasm_path: Path, artifact: Path) -> wasmtime.Module:
+    """Deserializa el artefacto si existe; si no, compila y lo guarda."""
+    if artifact.exists():
+        try:
+            module = wasmtime.Module.deserialize_file(engine, str(artifact))
+            _stats["deserialized"] += 1
+            return module
+        except Exception:
+            # Artefacto corrupto o de otra build de wasmtime: recompilar
+            try:
+                artifact.unlink()
+            except OSError:
+                pass
+
+    module = wasmtime.Module.from_file(engine, str(wasm_path))
+    _stats["compiled"] += 1
+    try:
+        artifact.parent.mkdir(parents=True, exist_ok=True)
+        tmp = artifact.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_bytes(module.serialize())
+        os.replace(tmp, artifact)
+    except OSError:
+        pass  # Directorio de solo lectura: seguimos con el modulo en memoria
+    return module
+
+
+def get_compiled_module(wasm_path: Union[str, Path],
+                        cache_dir: Optional[Union[str, Path]] = None,
+                        ) -> Tuple[wasmtime.Engine, wasmtime.Module]:
+    """Retorna (engine, module) compartidos por todo el proceso.
+
+    Args:
+        wasm_path: Ruta a sha3_wasm_bg.wasm
+        cache_dir: Directorio de artefactos. Default: <dir del wasm>/wasm_cache
+    """
+    wasm_path = Path(wasm_path).resolve()
+    digest = _file_sha256(wasm_path)
+    key = f"{digest}:{_wasmtime_version()}"
+    with _lock:
+        module = _modules.get(key)
+        if module is not None:
+            _stats["memory_hits"] += 1
+            return _get_engine(), module
+        engine = _get_engine()
+        artifact = _artifact_path(wasm_path, digest, Path(cache_dir) if cache_dir else None)
+        module = _load_or_compile(engine, wasm_path, artifact)
+        _modules[key] = module
+        return engine, module
+
+
+def get_cache_stats() -> dict:
+    """Contadores del cache: compilaciones, deserializaciones y hits en memoria."""
+    with _lock:
+        return {**_stats, "modules": len(_modules)}
+
+
+def clear_memory_cache():
+    """Olvida los modulos en memoria (los artefactos en disco se conservan)."""
+    global _engine
+    with _lock:
+        _modules.clear()
+        _engine = None
+        for k in _stats:
+            _stats[k] = 0
+
+
+class PowInstance:
+    """Store + Instance de un hilo, con las exportaciones que usa el PoW."""
+
+    def __init__(self, engine: wasmtime.Engine, module: wasmtime.Module):
+        self.store = wasmtime.Store(engine)
+        self.instance = wasmtime.Instance(self.store, module, [])
+
+        # Obtener las funciones exportadas por el modulo
+        exports = self.instance.exports(self.store)
+
+        # Verificar que las funciones existan (nombres reales con prefijo "wasm_")
+        if "wasm_solve" not in exports:
+            raise RuntimeError(f"El archivo WASM no exporta la funcion 'wasm_solve'. Exportaciones disponibles: {list(exports.keys())}")
+        if "wasm_deepseek_hash_v1" not in exports:
+            raise RuntimeError(f"El archivo WASM no exporta la funcion 'wasm_deepseek_hash_v1'. Exportaciones disponibles: {list(exports.keys())}")
+
+        self.solve_func = exports["wasm_solve"]
+        self.hash_func = exports["wasm_deepseek_hash_v1"]
+        self.memory = exports["memory"]
+        self.alloc = exports.get("__wbindgen_export_0")  # malloc
+        self.stack = exports.get("__wbindgen_add_to_stack_pointer")
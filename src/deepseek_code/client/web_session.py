@@ -5,11 +5,15 @@ import base64
 import struct
 import time
 import sys
+import threading
 from pathlib import Path
 from typing import Union, Generator
 
 import requests
-import wasmtime
+
+from .sse_parser import SSEStreamParser, format_sse_events, new_sse_diag
+from .pow_solver import POW_SOLVER_MODES, get_parallel_solver, use_parallel
+from .wasm_runtime import PowInstance, get_compiled_module
 
 # Timeout en segundos sin recibir NINGUN chunk SSE antes de declarar stall.
 # DeepSeek puede tardar en "pensar", pero siempre envia chunks de thinking.
@@ -42,8 +46,11 @@ class DeepSeekWebSession:
     Requiere el archivo sha3_wasm_bg.wasm (proporcionado por DeepSeek).
     """
 
-    def __init__(self, bearer_token: str, cookies: dict, wasm_path: Union[str, Path] = "sha3_wasm_bg.wasm"):
+    def __init__(self, bearer_token: str, cookies: dict, wasm_path: Union[str, Path] = "sha3_wasm_bg.wasm",
+                 pow_solver: str = "wasm"):
         self.bearer_token = bearer_token
+        # "wasm" (wasm_solve, 1 hilo), "parallel" (pool de procesos) o "auto"
+        self.pow_solver = pow_solver if pow_solver in POW_SOLVER_MODES else "wasm"
         self.session = requests.Session()
         self.session.headers.update({
             "Authorization": f"Bearer {bearer_token}",
@@ -74,36 +81,58 @@ class DeepSeekWebSession:
         if wasm_path.stat().st_size == 0:
             raise RuntimeError(f"Archivo WASM vacio: {wasm_path}. Vuelve a descargarlo.")
 
-        self.engine = wasmtime.Engine()
-        self.module = wasmtime.Module.from_file(self.engine, str(wasm_path))
-        self.store = wasmtime.Store(self.engine)
-        self.instance = wasmtime.Instance(self.store, self.module, [])
+        self._wasm_path = wasm_path
 
-        # Obtener las funciones exportadas por el modulo
-        exports = self.instance.exports(self.store)
+        # Engine/Module compartidos por el proceso (precompilados en disco);
+        # cada hilo que resuelve PoW obtiene su propio Store/Instance.
+        self.engine, self.module = get_compiled_module(wasm_path)
+        self._wasm_local = threading.local()
+        self._wasm_instance()  # Instanciar ya para validar las exportaciones
 
-        # Verificar que las funciones existan (nombres reales con prefijo "wasm_")
-        if "wasm_solve" not in exports:
-            raise RuntimeError(f"El archivo WASM no exporta la funcion 'wasm_solve'. Exportaciones disponibles: {list(exports.keys())}")
-        if "wasm_deepseek_hash_v1" not in exports:
-            raise RuntimeError(f"El archivo WASM no exporta la funcion 'wasm_deepseek_hash_v1'. Exportaciones disponibles: {list(exports.keys())}")
+    def _wasm_instance(self) -> PowInstance:
+        """Store/Instance WASM del hilo actual (se crea en el primer uso)."""
+        inst = getattr(self._wasm_local, "instance", None)
+        if inst is None:
+            inst = PowInstance(self.engine, self.module)
+            self._wasm_local.instance = inst
+        return inst
 
-        self.solve_func = exports["wasm_solve"]
-        self.hash_func = exports["wasm_deepseek_hash_v1"]
-        self.wasm_memory = exports["memory"]
-        self.wasm_alloc = exports.get("__wbindgen_export_0")  # malloc
-        self.wasm_stack = exports.get("__wbindgen_add_to_stack_pointer")
+    @property
+    def store(self):
+        return self._wasm_instance().store
+
+    @property
+    def solve_func(self):
+        return self._wasm_instance().solve_func
+
+    @property
+    def hash_func(self):
+        return self._wasm_instance().hash_func
+
+    @property
+    def wasm_memory(self):
+        return self._wasm_instance().memory
+
+    @property
+    def wasm_alloc(self):
+        return self._wasm_instance().alloc
+
+    @property
+    def wasm_stack(self):
+        return self._wasm_instance().stack
 
     def _wasm_write_mem(self, offset: int, data: bytes):
         """Escribe bytes en la memoria WASM en el offset indicado."""
         import ctypes
-        base_addr = ctypes.cast(self.wasm_memory.data_ptr(self.store), ctypes.c_void_p).value
+        inst = self._wasm_instance()
+        base_addr = ctypes.cast(inst.memory.data_ptr(inst.store), ctypes.c_void_p).value
         ctypes.memmove(base_addr + offset, data, len(data))
 
     def _wasm_read_mem(self, offset: int, length: int) -> bytes:
         """Lee bytes de la memoria WASM desde el offset indicado."""
         import ctypes
-        base_addr = ctypes.cast(self.wasm_memory.data_ptr(self.store), ctypes.c_void_p).value
+        inst = self._wasm_instance()
+        base_addr = ctypes.cast(inst.memory.data_ptr(inst.store), ctypes.c_void_p).value
         return ctypes.string_at(base_addr + offset, length)
 
     def _wasm_encode_string(self, text: str) -> tuple:
@@ -130,6 +159,12 @@ class DeepSeekWebSession:
         return data["data"]["biz_data"]["challenge"]
 
     def solve_challenge(self, challenge: dict) -> int:
+        """Resuelve el Proof of Work con el solver configurado (self.pow_solver)."""
+        if use_parallel(self.pow_solver, float(challenge["difficulty"])):
+            return get_parallel_solver(self._wasm_path).solve(challenge)
+        return self._solve_challenge_wasm(challenge)
+
+    def _solve_challenge_wasm(self, challenge: dict) -> int:
         """Resuelve el Proof of Work usando wasm_solve.
 
         Signatura WASM (wasm-bindgen):
@@ -204,7 +239,7 @@ class DeepSeekWebSession:
 
     def send_message(self, message: str, pow_header: str, chat_session_id: str = None,
                      thinking_enabled: bool = False,
-                     parent_message_id=None) -> Generator[str, None, None]:
+                     parent_message_id=None, detached: bool = False) -> Generator[str, None, None]:
         """Envia un mensaje con la cabecera PoW. Retorna generador de tokens (streaming SSE).
 
         Captura diagnosticos SSE en self._sse_diag para depuracion:
@@ -215,6 +250,8 @@ class DeepSeekWebSession:
         Args:
             parent_message_id: ID del mensaje padre para continuidad de conversacion.
                 Si es None, DeepSeek usa el ultimo mensaje de la sesion.
+            detached: No tocar last_message_id ni _sse_diag (mensajes que corren
+                a la vez que la conversacion, ej. el resumen en segundo plano).
 
         Raises:
             StallDetectedError: Si no se recibe ningun chunk SSE en STALL_TIMEOUT_SECONDS.
@@ -234,31 +271,14 @@ class DeepSeekWebSession:
             "search_enabled": True,
         }
 
-        self._last_message_id = None
+        if not detached:
+            self._last_message_id = None
 
         # --- Diagnostico SSE (como F12 Network) ---
-        let_diag = {
-            "start_ts": time.time(),
-            "end_ts": None,
-            "http_status": None,
-            "total_lines": 0,
-            "total_data_chunks": 0,
-            "thinking_chunks": 0,
-            "content_chunks": 0,
-            "content_chars": 0,
-            "events": [],           # Ultimos 30 eventos SSE
-            "errors": [],           # Errores silenciosos en el stream
-            "mode_transitions": [], # init→thinking→content
-            "finish_reason": None,  # "event:finish", "done", "stream_end", "timeout", "error"
-        }
-        self._sse_diag = let_diag
-
-        def _diag_event(event_type: str, detail: str = ""):
-            """Agrega evento al buffer diagnostico (max 30)."""
-            let_elapsed = round(time.time() - let_diag["start_ts"], 2)
-            let_diag["events"].append(f"+{let_elapsed}s {event_type}: {detail}"[:200])
-            if len(let_diag["events"]) > 30:
-                let_diag["events"].pop(0)
+        let_diag = new_sse_diag()
+        if not detached:
+            self._sse_diag = let_diag
+        parser = SSEStreamParser(let_diag)
 
         # timeout=(connect, read) — read timeout actua como per-chunk timeout.
         try:
@@ -269,161 +289,50 @@ class DeepSeekWebSession:
                 let_diag["http_status"] = resp.status_code
 
                 if resp.status_code == 401:
-                    _diag_event("HTTP", "401 Unauthorized")
+                    parser.event("HTTP", "401 Unauthorized")
                     raise TokenExpiredError("Bearer token expirado durante envio. Usa /login para renovar.")
                 if resp.status_code == 403:
-                    _diag_event("HTTP", "403 Forbidden")
+                    parser.event("HTTP", "403 Forbidden")
                     raise TokenExpiredError("Acceso denegado durante envio. Token invalido.")
                 if resp.status_code != 200:
-                    _diag_event("HTTP", f"{resp.status_code} {resp.reason}")
+                    parser.event("HTTP", f"{resp.status_code} {resp.reason}")
                     resp.raise_for_status()
 
-                _diag_event("HTTP", "200 OK — stream abierto")
-                last_event = ""
-                stream_mode = "init"
-                let_last_heartbeat = time.time()
+                parser.event("HTTP", "200 OK — stream abierto")
 
                 for line in resp.iter_lines():
                     if not line:
                         continue
-                    line_str = line.decode("utf-8", errors="replace")
-                    let_diag["total_lines"] += 1
-
-                    # --- SSE event lines ---
-                    if line_str.startswith("event: "):
-                        last_event = line_str[7:].strip()
-                        _diag_event("event", last_event)
-                        if last_event == "finish":
-                            let_diag["finish_reason"] = "event:finish"
-                            break
-                        continue
-
-                    # --- SSE data lines ---
-                    if line_str.startswith("data: "):
-                        raw = line_str[6:]
-                        if raw == "[DONE]":
-                            _diag_event("data", "[DONE]")
-                            let_diag["finish_reason"] = "done"
-                            continue
-                        if raw == "{}":
-                            continue
-
-                        try:
-                            chunk = json.loads(raw)
-                        except json.JSONDecodeError as e:
-                            _diag_event("parse_error", f"{e} — raw: {raw[:100]}")
-                            let_diag["errors"].append(f"JSONDecodeError: {raw[:100]}")
-                            continue
-
-                        let_diag["total_data_chunks"] += 1
-
-                        # Capturar response_message_id del chunk metadata inicial
-                        if "response_message_id" in chunk:
-                            self._last_message_id = chunk["response_message_id"]
-                            _diag_event("metadata", f"response_msg_id={chunk['response_message_id']}")
-
-                        if "v" not in chunk:
-                            # Chunk sin valor — podria ser error o status
-                            let_keys = list(chunk.keys())
-                            if let_keys != ["response_message_id"] and let_keys != ["request_message_id", "response_message_id"]:
-                                _diag_event("chunk_sin_v", f"keys={let_keys}")
-                            continue
-
-                        path = chunk.get("p", "")
-                        val = chunk["v"]
-
-                        # Capturar message_id del objeto response inicial
-                        if isinstance(val, dict) and "response" in val:
-                            resp_obj = val["response"]
-                            if isinstance(resp_obj, dict) and "message_id" in resp_obj:
-                                self._last_message_id = resp_obj["message_id"]
-                                _diag_event("response_obj", f"msg_id={resp_obj['message_id']}")
-                            continue
-
-                        # Track stream mode transitions
-                        if path == "response/thinking_content":
-                            if stream_mode != "thinking":
-                                let_diag["mode_transitions"].append(f"{stream_mode}→thinking")
-                                _diag_event("mode", f"{stream_mode}→thinking")
-                            stream_mode = "thinking"
-                            let_diag["thinking_chunks"] += 1
-                            # Heartbeat cada 10s durante thinking largo
-                            let_now = time.time()
-                            if let_now - let_last_heartbeat >= 10:
-                                print(
-                                    f"  [thinking] {round(let_now - let_diag['start_ts'], 1)}s... "
-                                    f"({let_diag['thinking_chunks']} chunks)",
-                                    file=sys.stderr,
-                                )
-                                let_last_heartbeat = let_now
-                            continue
-                        if path == "response/content":
-                            if stream_mode != "content":
-                                let_diag["mode_transitions"].append(f"{stream_mode}→content")
-                                _diag_event("mode", f"{stream_mode}→content")
-                            stream_mode = "content"
-                            if isinstance(val, str):
-                                let_diag["content_chunks"] += 1
-                                let_diag["content_chars"] += len(val)
-                                yield val
-                            continue
-
-                        # Non-empty path we don't handle
-                        if path:
-                            _diag_event("unknown_path", f"p={path}")
-                            continue
-
-                        # p="" chunks — only yield in content mode
-                        if stream_mode == "thinking":
-                            let_diag["thinking_chunks"] += 1
-                            let_now = time.time()
-                            if let_now - let_last_heartbeat >= 10:
-                                print(
-                                    f"  [thinking] {round(let_now - let_diag['start_ts'], 1)}s... "
-                                    f"({let_diag['thinking_chunks']} chunks)",
-                                    file=sys.stderr,
-                                )
-                                let_last_heartbeat = let_now
-                            continue
-                        if stream_mode != "content":
-                            continue
-
-                        # Extraer texto de respuesta
-                        if isinstance(val, str):
-                            let_diag["content_chunks"] += 1
-                            let_diag["content_chars"] += len(val)
-                            yield val
-                        elif isinstance(val, dict):
-                            content = val.get("content", "")
-                            if content:
-                                let_diag["content_chunks"] += 1
-                                let_diag["content_chars"] += len(content)
-                                yield content
+                    token = parser.feed_bytes(line)
+                    if parser.last_message_id is not None and not detached:
+                        self._last_message_id = parser.last_message_id
+                    if token:
+                        yield token
+                    if parser.finished:
+                        break
 
                 # Stream termino normalmente
-                if not let_diag["finish_reason"]:
-                    let_diag["finish_reason"] = "stream_end"
-                    _diag_event("stream", "termino sin event:finish ni [DONE]")
+                parser.close()
 
         except requests.exceptions.ReadTimeout:
             let_diag["finish_reason"] = "timeout"
-            _diag_event("TIMEOUT", f"{STALL_TIMEOUT_SECONDS}s sin datos")
-            self._dump_sse_diag("STALL (timeout)")
+            parser.event("TIMEOUT", f"{STALL_TIMEOUT_SECONDS}s sin datos")
+            self._dump_sse_diag("STALL (timeout)", let_diag)
             raise StallDetectedError(
                 f"DeepSeek dejo de responder por {STALL_TIMEOUT_SECONDS}s. "
                 f"La conexion SSE se congelo silenciosamente."
             )
         except requests.exceptions.ConnectionError as e:
             let_diag["finish_reason"] = "connection_error"
-            _diag_event("CONN_ERROR", str(e)[:150])
-            self._dump_sse_diag("STALL (conexion perdida)")
+            parser.event("CONN_ERROR", str(e)[:150])
+            self._dump_sse_diag("STALL (conexion perdida)", let_diag)
             raise StallDetectedError(f"Conexion perdida durante streaming: {e}")
         finally:
             let_diag["end_ts"] = time.time()
 
-    def _dump_sse_diag(self, label: str):
-        """Vuelca el diagnostico SSE a stderr (como F12 Console)."""
-        let_d = getattr(self, '_sse_diag', None)
+    def _dump_sse_diag(self, label: str, diag: dict = None):
+        """Vuelca el diagnostico SSE (por defecto el del ultimo stream) a stderr."""
+        let_d = diag if diag is not None else getattr(self, '_sse_diag', None)
         if not let_d:
             return
         let_elapsed = round((let_d["end_ts"] or time.time()) - let_d["start_ts"], 2)
@@ -441,7 +350,7 @@ class DeepSeekWebSession:
         if let_d["errors"]:
             print(f"  ║ Errors: {let_d['errors'][:5]}", file=sys.stderr)
         print(f"  ║ Ultimos eventos:", file=sys.stderr)
-        for ev in let_d["events"][-10:]:
+        for ev in format_sse_events(let_d, last=10):
             print(f"  ║   {ev}", file=sys.stderr)
         print(f"  ╚═══════════════════════════════════════════\n", file=sys.stderr)
 
@@ -455,13 +364,14 @@ class DeepSeekWebSession:
         if not hasattr(self, '_chat_session_id') or not self._chat_session_id:
             self._chat_session_id = self.create_chat_session()
 
-        full_response = ""
+        # Lista + join: += sobre str es cuadratico en respuestas largas
+        parts = []
         for token in self.send_message(
             message, pow_header, self._chat_session_id,
             thinking_enabled, parent_message_id
         ):
-            full_response += token
-        return full_response
+            parts.append(token)
+        return "".join(parts)
 
     def chat(self, message: str, thinking_enabled: bool = False,
              parent_message_id=None, max_stall_retries: int = 3) -> str:
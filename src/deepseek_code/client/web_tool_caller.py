@@ -11,6 +11,11 @@ import os
 import re
 from typing import List, Dict, Optional, Tuple
 
+from .tool_scheduler import DEFAULT_TOOL_CONCURRENCY, run_tool_calls
+from .tool_stream import (
+    TOOL_CALL_BLOCK_RE, SpeculativeToolRunner, parse_tool_block, tool_call_key,
+)
+
 
 def build_tools_prompt(tools: List[Dict]) -> str:
     """Construye la seccion de herramientas para inyectar en el prompt."""
@@ -146,43 +151,15 @@ def extract_tool_calls(response: str) -> Tuple[List[Dict], str]:
         - Texto de la respuesta sin los bloques tool_call
     """
     raw_calls = []
-    # Patron para bloques ```tool_call ... ```
-    pattern = r'```tool_call\s*\n(.*?)\n```'
-    matches = re.findall(pattern, response, re.DOTALL)
-
-    def _append_call(item):
-        """Extrae tool+args de un dict y lo agrega a raw_calls."""
-        if isinstance(item, dict) and "tool" in item:
-            raw_calls.append({
-                "tool": item["tool"],
-                "args": item.get("args", item.get("arguments", {}))
-            })
-
-    for match in matches:
-        try:
-            data = json.loads(match.strip())
-            if isinstance(data, list):
-                # Array de tool calls: [{tool:..., args:...}, ...]
-                for item in data:
-                    _append_call(item)
-            else:
-                _append_call(data)
-        except json.JSONDecodeError:
-            # Intentar extraer JSON parcial
-            try:
-                # A veces el modelo pone texto extra
-                json_match = re.search(r'\{.*\}', match, re.DOTALL)
-                if json_match:
-                    data = json.loads(json_match.group())
-                    _append_call(data)
-            except (json.JSONDecodeError, AttributeError):
-                pass
+    # Patron para bloques ```tool_call ... ``` (compartido con ToolCallStream)
+    for match in TOOL_CALL_BLOCK_RE.findall(response):
+        raw_calls.extend(parse_tool_block(match))
 
     # Deduplicar: solo mantener la primera instancia de cada (tool, args)
     seen = set()
     calls = []
     for call in raw_calls:
-        key = json.dumps(call, sort_keys=True)
+        key = tool_call_key(call)
         if key not in seen:
             seen.add(key)
             calls.append(call)
@@ -205,7 +182,7 @@ def format_tool_result(tool_name: str, result) -> str:
 
     # Truncar resultados extremadamente largos (120K chars ~ 30K tokens, ~3% del contexto 1M)
     if len(result_str) > 120000:
-        result_str = result_str[:120000] + "\n... [resultado truncado, usa read_file con max_lines para ver mas]"
+        result_str = result_str[:120000] + "\n... [resultado truncado, usa read_file con offset/limit para ver el resto]"
 
     return f"Resultado de `{tool_name}`:\n```\n{result_str}\n```"
 
@@ -263,7 +240,8 @@ def clean_final_response(response: str) -> str:
 
 async def run_agent_web(web_session, mcp_server, system_prompt: str,
                         user_message: str, tools: list, max_steps: int = 50,
-                        continue_parent_id: int = None) -> str:
+                        continue_parent_id: int = None,
+                        tool_concurrency: int = DEFAULT_TOOL_CONCURRENCY) -> str:
     """Ejecuta un paso de agente en modo web con tool calling simulado.
 
     Usa Phase 1 (identidad + herramientas) con message chaining via parent_message_id.
@@ -280,12 +258,14 @@ async def run_agent_web(web_session, mcp_server, system_prompt: str,
     2. User message (chained via continue_parent_id)
     3. Tool loop (igual)
 
+    Las tool calls de cada respuesta corren via tool_scheduler: hasta
+    tool_concurrency a la vez, serializando las que se pisan por ruta.
+
     Usado por AgentEngine y _chat_with_system_web().
     """
-    import asyncio
     import sys
-    from ..server.protocol import MCPRequest, MCPMethod
     from .web_session import TokenExpiredError, StallDetectedError
+    from .async_web_session import web_chat, web_create_chat_session
 
     if continue_parent_id is not None:
         # --- Continuacion: reusar sesion existente, saltar Phase 1 ---
@@ -293,7 +273,7 @@ async def run_agent_web(web_session, mcp_server, system_prompt: str,
         print(f"  [agente] Continuando sesion (parent_id={let_parent_id})", file=sys.stderr)
     else:
         # --- Crear sesion fresca para este agente ---
-        let_chat_session_id = web_session.create_chat_session()
+        let_chat_session_id = await web_create_chat_session(web_session)
         web_session._chat_session_id = let_chat_session_id
 
         # --- Phase 1: Identidad + herramientas → "DEEPSEEK CODE ACTIVADO" ---
@@ -305,9 +285,7 @@ async def run_agent_web(web_session, mcp_server, system_prompt: str,
 
         print(f"  [agente] Phase 1: Enviando identidad + herramientas...", file=sys.stderr)
         try:
-            _init_response = await asyncio.get_event_loop().run_in_executor(
-                None, web_session.chat, init_prompt, True, None,
-            )
+            _init_response = await web_chat(web_session, init_prompt, True, None)
         except TokenExpiredError as e:
             return f"[Error de sesion] {e}. Ejecuta /login para renovar."
         except StallDetectedError as e:
@@ -332,12 +310,19 @@ async def run_agent_web(web_session, mcp_server, system_prompt: str,
     let_max_stall_nudges = 2   # Max nudges antes de rendirse
     let_max_tools_per_iter = 5  # Limitar tools por iteracion
 
+    let_speculative = None
+
     for step in range(max_steps):
+        # Tools read-only arrancan mientras DeepSeek sigue escribiendo
+        if let_speculative is not None:
+            let_speculative.cancel_pending()
+        let_speculative = SpeculativeToolRunner(mcp_server, f"agent_{step}")
         try:
             # max_stall_retries=0: NO crear sesiones nuevas en stalls.
             # La logica de recovery la manejamos aqui con nudges inteligentes.
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, web_session.chat, prompt, True, let_parent_id, 0,
+            response = await web_chat(
+                web_session, prompt, True, let_parent_id, 0,
+                tool_stream=let_speculative.stream(),
             )
         except TokenExpiredError as e:
             return f"[Error de sesion] {e}. Ejecuta /login para renovar."
@@ -487,15 +472,15 @@ async def run_agent_web(web_session, mcp_server, system_prompt: str,
         let_iter_errors = 0
         let_iter_ok = 0
         let_last_successful_tools = []  # Reset para esta iteracion
-        for idx, call in enumerate(tool_calls):
-            tool_name = call["tool"]
-            arguments = call["args"]
-            tool_request = MCPRequest(
-                id=f"agent_{step}_{idx}_{tool_name}",
-                method=MCPMethod.TOOLS_CALL,
-                params={"name": tool_name, "arguments": arguments}
-            )
-            tool_response = await mcp_server.handle_request(tool_request)
+        # Calls independientes en paralelo; conflictos por ruta en orden.
+        # Los resultados vuelven en el orden original de tool_calls.
+        let_scheduled = await run_tool_calls(
+            mcp_server, tool_calls, f"agent_{step}",
+            max_concurrency=tool_concurrency, speculative=let_speculative,
+        )
+        for let_item in let_scheduled:
+            tool_name = let_item.call["tool"]
+            tool_response = let_item.response
 
             if hasattr(tool_response, 'error'):
                 result_str = f"Error: {tool_response.error.message}"
@@ -514,14 +499,19 @@ async def run_agent_web(web_session, mcp_server, system_prompt: str,
 
             results.append(format_tool_result(tool_name, result_str))
             print(
-                f"  [agente] iter={step+1}/{max_steps} {tool_name} -> {len(result_str)} chars",
+                f"  [agente] iter={step+1}/{max_steps} {tool_name} -> {len(result_str)} chars "
+                f"({'anticipada' if let_item.speculative else f'{let_item.wall_s:.2f}s'})",
                 file=sys.stderr,
             )
 
+        let_speculative.cancel_pending()
+
         # Resumen de iteracion
         print(
             f"  [agente] === iter {step+1}/{max_steps}: "
-            f"{len(tool_calls)} tools ({let_iter_ok} OK, {let_iter_errors} err) ===",
+            f"{len(tool_calls)} tools ({let_iter_ok} OK, {let_iter_errors} err"
+            + (f", {let_speculative.used} anticipadas" if let_speculative.used else "")
+            + ") ===",
             file=sys.stderr,
         )
 
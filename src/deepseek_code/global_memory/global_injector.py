@@ -5,6 +5,8 @@ del usuario: estilo de codigo, skills efectivas, complejidad optima,
 errores recurrentes, y rendimiento por modo.
 """
 
+from ..tokenization import count_tokens
+
 
 # Budget de tokens para el briefing global (1M context → budgets proporcionales)
 DEFAULT_BUDGET = 8000
@@ -16,8 +18,8 @@ MIN_SKILL_SAMPLES = 3
 
 
 def _estimate_tokens(text: str) -> int:
-    """Estima tokens de un texto (~4 chars/token)."""
-    return max(1, len(text) // 4)
+    """Tokens de un texto (tokenizador BPE compartido, minimo 1)."""
+    return max(1, count_tokens(text))
 
 
 def build_global_briefing(store_data: dict, token_budget: int = DEFAULT_BUDGET) -> str:
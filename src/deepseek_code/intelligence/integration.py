@@ -126,6 +126,7 @@ def get_intelligence_briefing(
     try:
         if not store_data:
             return ""
+        from deepseek_code.tokenization import count_tokens, truncate_to_tokens
 
         sections = []
 
@@ -157,10 +158,8 @@ def get_intelligence_briefing(
 
         # Estimar tokens y truncar si necesario
         result = "\n\n".join(sections) + "\n"
-        estimated_tokens = len(result) // 4
-        if estimated_tokens > token_budget:
-            max_chars = token_budget * 4
-            result = result[:max_chars] + "\n[... truncado ...]\n"
+        if count_tokens(result) > token_budget:
+            result = truncate_to_tokens(result, token_budget) + "\n[... truncado ...]\n"
 
         return result
     except Exception:
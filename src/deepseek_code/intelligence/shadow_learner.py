@@ -15,6 +15,8 @@ import subprocess
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+from ..tokenization import count_tokens, truncate_to_tokens
+
 
 @dataclass
 class CorrectionPattern:
@@ -288,9 +290,7 @@ def build_shadow_briefing(store_data: dict, token_budget: int = 5000) -> str:
     result = "\n".join(lines) + "\n"
 
     # Truncar si excede budget
-    estimated = len(result) // 4
-    if estimated > token_budget:
-        max_chars = token_budget * 4
-        result = result[:max_chars] + "\n[... truncado ...]\n"
+    if count_tokens(result) > token_budget:
+        result = truncate_to_tokens(result, token_budget) + "\n[... truncado ...]\n"
 
     return result
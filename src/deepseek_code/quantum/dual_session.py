@@ -59,6 +59,8 @@ class DualSession:
 
     Ambos clientes comparten el mismo MCPServer (seguro para lecturas
     concurrentes via asyncio) pero tienen sesiones web/API propias.
+    En modo web cada cliente usa AsyncDeepSeekWebSession, asi que ambos
+    streams SSE corren en el mismo event loop sin ocupar hilos.
     """
 
     def __init__(self, client_a: DeepSeekCodeClient, client_b: DeepSeekCodeClient):
@@ -3,6 +3,8 @@
 Ejecuta N instancias de DeepSeek en paralelo con roles diferenciados.
 Cada instancia tiene su propio client y system prompt, pero comparten
 el mismo MCPServer (seguro para lecturas concurrentes via asyncio).
+En modo web los N streams SSE son corrutinas del mismo event loop
+(AsyncDeepSeekWebSession), sin depender del tamano del thread pool.
 
 Uso:
     mcp = create_shared_mcp_server(config)
@@ -7,7 +7,7 @@ en archivos de distintos lenguajes de programacion.
 import os
 import re
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Pattern, Tuple
 
 # Directorios y archivos a ignorar en busquedas
 IGNORE_DIRS = {
@@ -137,55 +137,99 @@ def read_file_lines(path: Path) -> List[str]:
     return []
 
 
-def extract_python_body(lines: List[str], start: int) -> str:
-    """Extrae cuerpo Python por indentacion."""
+_COMPILED_PATTERNS: Dict[str, List[Tuple[str, Pattern]]] = {}
+
+
+def compiled_symbol_patterns(ext: str) -> List[Tuple[str, Pattern]]:
+    """Patrones de SYMBOL_PATTERNS para una extension, compilados una sola vez."""
+    compiled = _COMPILED_PATTERNS.get(ext)
+    if compiled is None:
+        compiled = [(kind, re.compile(pattern, re.MULTILINE))
+                    for kind, pattern in SYMBOL_PATTERNS.get(ext, {}).items()]
+        _COMPILED_PATTERNS[ext] = compiled
+    return compiled
+
+
+def python_body_end(lines: List[str], start: int) -> int:
+    """Fin (exclusivo) del cuerpo Python que empieza en start, por indentacion."""
     if start >= len(lines):
-        return ""
+        return start
 
     first_line = lines[start]
     base_indent = len(first_line) - len(first_line.lstrip())
-    body_lines = [first_line.rstrip()]
+    end = start + 1
 
     for i in range(start + 1, min(start + 200, len(lines))):
         line = lines[i]
         stripped = line.strip()
         if not stripped:
-            body_lines.append("")
             continue
         current_indent = len(line) - len(line.lstrip())
-        if current_indent <= base_indent and stripped:
+        if current_indent <= base_indent:
             break
-        body_lines.append(line.rstrip())
+        end = i + 1
 
-    if len(body_lines) > 300:
-        body_lines = body_lines[:300]
-        body_lines.append("    # ... (truncado)")
-
-    return "\n".join(body_lines)
+    return end
 
 
-def extract_brace_body(lines: List[str], start: int) -> str:
-    """Extrae cuerpo por llaves (JS, TS, Java, Go, Rust)."""
-    body_lines = []
+def brace_body_end(lines: List[str], start: int) -> int:
+    """Fin (exclusivo) del cuerpo por llaves (JS, TS, Java, Go, Rust)."""
     brace_count = 0
     found_open = False
+    end = start
 
     for i in range(start, min(start + 500, len(lines))):
         line = lines[i]
-        body_lines.append(line.rstrip())
-
-        for ch in line:
-            if ch == "{":
-                brace_count += 1
-                found_open = True
-            elif ch == "}":
-                brace_count -= 1
-
+        end = i + 1
+        brace_count += line.count("{") - line.count("}")
+        if "{" in line:
+            found_open = True
         if found_open and brace_count <= 0:
             break
+        if not found_open and line.rstrip().endswith(";"):
+            break  # sentencia terminada sin bloque (const x = 1;)
 
+    return end
+
+
+def symbol_body_end(ext: str, lines: List[str], start: int) -> int:
+    """Fin (exclusivo) del cuerpo de un simbolo segun el lenguaje."""
+    if ext == ".py":
+        return python_body_end(lines, start)
+    return brace_body_end(lines, start)
+
+
+def format_body(lines: List[str], start: int, end: int, ext: str) -> str:
+    """Texto del cuerpo lines[start:end], truncado a 300 lineas."""
+    body_lines = [line.rstrip() for line in lines[start:end]]
     if len(body_lines) > 300:
         body_lines = body_lines[:300]
-        body_lines.append("  // ... (truncado)")
-
+        body_lines.append("    # ... (truncado)" if ext == ".py" else "  // ... (truncado)")
     return "\n".join(body_lines)
+
+
+def extract_python_body(lines: List[str], start: int) -> str:
+    """Extrae cuerpo Python por indentacion."""
+    if start >= len(lines):
+        return ""
+    return format_body(lines, start, python_body_end(lines, start), ".py")
+
+
+def extract_brace_body(lines: List[str], start: int) -> str:
+    """Extrae cuerpo por llaves (JS, TS, Java, Go, Rust)."""
+    return format_body(lines, start, brace_body_end(lines, start), "")
+
+
+def extract_symbols(ext: str, lines: List[str]) -> List[Tuple[str, str, int, int, int, str]]:
+    """Simbolos de un archivo: (nombre, tipo, orden del tipo, linea, linea final, preview).
+
+    Las lineas son base 1 e inclusivas; el orden del tipo es su posicion en
+    SYMBOL_PATTERNS (asi se agrupan como siempre en el overview).
+    """
+    symbols = []
+    for rank, (kind, compiled) in enumerate(compiled_symbol_patterns(ext)):
+        for i, m in enumerate(map(compiled.match, lines)):
+            if m is not None:
+                end = symbol_body_end(ext, lines, i)
+                symbols.append((m.group(1), kind, rank, i + 1, end, lines[i].strip()[:500]))
+    return symbols
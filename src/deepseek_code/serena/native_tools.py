@@ -5,27 +5,36 @@ find_symbol) usando regex puro, sin necesidad de instalar serena-agent.
 Funcionan con cualquier proyecto local.
 """
 
+import asyncio
 import os
 import re
+import sqlite3
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from ..server.tool import BaseTool
 from .code_patterns import (
     SYMBOL_PATTERNS, iter_project_files, read_file_lines,
-    extract_python_body, extract_brace_body,
+    compiled_symbol_patterns, extract_symbols, format_body, symbol_body_end,
 )
+from .project_files import project_file_paths, read_text
+from .symbol_index import get_symbol_index, split_lines
+from .trigram_index import get_trigram_index, line_of, line_starts
 
 
 class SearchPatternTool(BaseTool):
     """Busca un patron regex en archivos del proyecto."""
 
+    read_only = True
+    path_args = ("relative_path",)
+
     def __init__(self, allowed_paths: Optional[List[str]] = None):
         self.allowed_paths = allowed_paths or []
         super().__init__(
             name="serena_search_for_pattern",
             description=(
-                "Busca un patron regex en archivos del proyecto. "
+                "Busca un patron regex en archivos del proyecto "
+                "(omite node_modules, .git, build y lo ignorado por .gitignore). "
                 "Retorna coincidencias con contexto de lineas alrededor."
             )
         )
@@ -77,11 +86,89 @@ class SearchPatternTool(BaseTool):
         except re.error as e:
             return {"error": f"Regex invalido: {e}"}
 
-        search_path = self.allowed_paths[0] if self.allowed_paths else "."
-        if relative_path:
-            search_path = os.path.join(search_path, relative_path)
+        base = self.allowed_paths[0] if self.allowed_paths else "."
+        search_path = os.path.join(base, relative_path) if relative_path else base
 
-        files = iter_project_files(search_path, file_glob, self.allowed_paths)
+        # Indice de trigramas del proyecto: solo se leen los candidatos.
+        # Fuera de la raiz indexada o sin FTS5 se recorre como antes.
+        prefix = os.path.relpath(os.path.abspath(search_path), os.path.abspath(base))
+        if not prefix.startswith("..") and not os.path.isfile(search_path):
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, self._search_indexed, regex, pattern_str, base,
+                    "" if prefix == "." else prefix.replace(os.sep, "/"),
+                    file_glob, context_lines, max_results,
+                )
+            except sqlite3.Error:
+                pass
+        return self._search_scan(regex, base, search_path, file_glob,
+                                 context_lines, max_results)
+
+    @staticmethod
+    def _match_entry(text: str, starts, pos: int, context_lines: int) -> Dict[str, Any]:
+        line_num = line_of(starts, pos)
+        start_line = max(0, line_num - context_lines)
+        end_line = min(len(starts), line_num + context_lines + 1)
+        snippet = []
+        for i in range(start_line, end_line):
+            line_end = starts[i + 1] if i + 1 < len(starts) else len(text)
+            prefix = ">> " if i == line_num else "   "
+            snippet.append(f"{prefix}{i + 1}: {text[starts[i]:line_end].rstrip()}")
+        return {"line": line_num + 1, "snippet": "\n".join(snippet)}
+
+    @staticmethod
+    def _indexed_line_table(index, rel: str, full_path: str):
+        """Offsets de lineas del indice si el archivo no cambio desde que se indexo."""
+        table = index.line_table(rel)
+        if table is None:
+            return None
+        starts, mtime_ns, size = table
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            return None
+        return starts if (st.st_mtime_ns, st.st_size) == (mtime_ns, size) else None
+
+    def _search_indexed(self, regex, pattern_str: str, base: str, prefix: str,
+                        file_glob: str, context_lines: int, max_results: int) -> Dict[str, Any]:
+        index = get_trigram_index(base)
+        index.refresh()
+        candidates = index.candidates(pattern_str, prefix, file_glob)
+        results = {}
+        total_matches = 0
+        searched = 0
+        for rel in candidates:
+            if total_matches >= max_results:
+                break
+            full_path = os.path.join(index.root, rel)
+            text = read_text(full_path)
+            if not text:
+                continue
+            searched += 1
+            starts = None
+            for match in regex.finditer(text):
+                if total_matches >= max_results:
+                    break
+                if starts is None:
+                    starts = self._indexed_line_table(index, rel, full_path) or line_starts(text)
+                results.setdefault(rel, []).append(
+                    self._match_entry(text, starts, match.start(), context_lines))
+                total_matches += 1
+
+        return {
+            "matches": results,
+            "total_matches": total_matches,
+            "files_searched": searched,
+            "files_indexed": index.file_count(),
+        }
+
+    def _search_scan(self, regex, base: str, search_path: str, file_glob: str,
+                     context_lines: int, max_results: int) -> Dict[str, Any]:
+        if os.path.isfile(search_path):
+            files = iter_project_files(search_path, file_glob, self.allowed_paths)
+        else:
+            # Misma seleccion de archivos que el indice (incluye .gitignore)
+            files = project_file_paths(base, search_path, file_glob)
         results = {}
         total_matches = 0
 
@@ -89,37 +176,23 @@ class SearchPatternTool(BaseTool):
             if total_matches >= max_results:
                 break
 
-            lines = read_file_lines(fpath)
-            if not lines:
+            text = read_text(str(fpath))
+            if not text:
                 continue
 
-            full_text = "".join(lines)
-            for match in regex.finditer(full_text):
+            starts = line_starts(text)
+            for match in regex.finditer(text):
                 if total_matches >= max_results:
                     break
 
-                line_num = full_text[:match.start()].count("\n")
-                start_line = max(0, line_num - context_lines)
-                end_line = min(len(lines), line_num + context_lines + 1)
-
-                snippet = []
-                for i in range(start_line, end_line):
-                    prefix = ">> " if i == line_num else "   "
-                    snippet.append(f"{prefix}{i + 1}: {lines[i].rstrip()}")
-
                 rel = str(fpath)
                 try:
-                    base = self.allowed_paths[0] if self.allowed_paths else "."
                     rel = str(fpath.relative_to(base))
                 except ValueError:
                     pass
 
-                if rel not in results:
-                    results[rel] = []
-                results[rel].append({
-                    "line": line_num + 1,
-                    "snippet": "\n".join(snippet)
-                })
+                results.setdefault(rel, []).append(
+                    self._match_entry(text, starts, match.start(), context_lines))
                 total_matches += 1
 
         return {
@@ -132,6 +205,9 @@ class SearchPatternTool(BaseTool):
 class SymbolsOverviewTool(BaseTool):
     """Lista simbolos (clases, funciones, variables) de un archivo."""
 
+    read_only = True
+    path_args = ("relative_path",)
+
     def __init__(self, allowed_paths: Optional[List[str]] = None):
         self.allowed_paths = allowed_paths or []
         super().__init__(
@@ -168,50 +244,59 @@ class SymbolsOverviewTool(BaseTool):
             return {"error": f"No es un archivo: {relative_path}"}
 
         ext = full_path.suffix.lower()
-        patterns = SYMBOL_PATTERNS.get(ext)
-        if not patterns:
+        if ext not in SYMBOL_PATTERNS:
             return {
                 "error": f"Extension no soportada: {ext}",
                 "supported": list(SYMBOL_PATTERNS.keys())
             }
 
-        lines = read_file_lines(full_path)
-        if not lines:
-            return {"error": "No se pudo leer el archivo"}
-
-        symbols = {}
-        for kind, pattern in patterns.items():
-            compiled = re.compile(pattern, re.MULTILINE)
-            found = []
-            for i, line in enumerate(lines):
-                m = compiled.match(line)
-                if m:
-                    found.append({
-                        "name": m.group(1),
-                        "line": i + 1,
-                        "preview": line.strip()[:500],
-                    })
-            if found:
-                symbols[kind] = found
+        # Tabla de simbolos del proyecto: solo se reparsea si el archivo cambio
+        overview = None
+        rel = os.path.relpath(os.path.abspath(full_path), os.path.abspath(base))
+        if not rel.startswith(".."):
+            try:
+                overview = await asyncio.get_running_loop().run_in_executor(
+                    None, get_symbol_index(base).file_symbols, rel)
+            except sqlite3.Error:
+                overview = None
+        if overview is None:
+            overview = self._parse_overview(full_path, ext)
+            if overview is None:
+                return {"error": "No se pudo leer el archivo"}
 
         return {
             "file": relative_path,
             "extension": ext,
-            "total_lines": len(lines),
-            "symbols": symbols,
+            "total_lines": overview["total_lines"],
+            "symbols": overview["symbols"],
         }
 
+    @staticmethod
+    def _parse_overview(full_path: Path, ext: str) -> Optional[Dict[str, Any]]:
+        lines = read_file_lines(full_path)
+        if not lines:
+            return None
+        symbols = {}
+        for name, kind, _rank, line, end_line, preview in extract_symbols(ext, lines):
+            symbols.setdefault(kind, []).append(
+                {"name": name, "line": line, "end_line": end_line, "preview": preview})
+        return {"total_lines": len(lines), "symbols": symbols}
+
 
 class FindSymbolTool(BaseTool):
     """Busca definiciones de un simbolo por nombre en el proyecto."""
 
+    read_only = True
+    path_args = ("relative_path",)
+
     def __init__(self, allowed_paths: Optional[List[str]] = None):
         self.allowed_paths = allowed_paths or []
         super().__init__(
             name="serena_find_symbol",
             description=(
                 "Busca definiciones de clases, funciones o variables por nombre "
-                "en todo el proyecto. Retorna ubicacion y contexto."
+                "en todo el proyecto (omite lo ignorado por .gitignore). "
+                "Retorna ubicacion y contexto."
             )
         )
 
@@ -233,6 +318,11 @@ class FindSymbolTool(BaseTool):
                     "description": "Incluir el cuerpo completo del simbolo",
                     "default": False
                 },
+                "prefix_match": {
+                    "type": "boolean",
+                    "description": "Buscar simbolos cuyo nombre empieza con el patron",
+                    "default": False
+                },
                 "max_results": {
                     "type": "integer",
                     "description": "Maximo de resultados (default: 20)",
@@ -246,6 +336,7 @@ class FindSymbolTool(BaseTool):
         name_pattern = kwargs.get("name_path_pattern", "")
         relative_path = kwargs.get("relative_path", "")
         include_body = kwargs.get("include_body", False)
+        prefix_match = kwargs.get("prefix_match", False)
         max_results = min(kwargs.get("max_results", 20), 50)
 
         if not name_pattern:
@@ -257,7 +348,61 @@ class FindSymbolTool(BaseTool):
         base = self.allowed_paths[0] if self.allowed_paths else "."
         search_path = os.path.join(base, relative_path) if relative_path else base
 
-        files = iter_project_files(search_path, "", self.allowed_paths)
+        results = None
+        prefix = os.path.relpath(os.path.abspath(search_path), os.path.abspath(base))
+        if not prefix.startswith(".."):
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    None, self._find_indexed, base, "" if prefix == "." else prefix.replace(os.sep, "/"),
+                    symbol_name, prefix_match, include_body, max_results,
+                )
+            except sqlite3.Error:
+                results = None
+        if results is None:
+            results = self._find_scan(base, search_path, symbol_name, prefix_match,
+                                      include_body, max_results)
+
+        return {
+            "symbol": name_pattern,
+            "results": results,
+            "total_found": len(results),
+        }
+
+    @staticmethod
+    def _find_indexed(base: str, prefix: str, symbol_name: str, prefix_match: bool,
+                      include_body: bool, max_results: int) -> List[Dict[str, Any]]:
+        index = get_symbol_index(base)
+        index.refresh()
+        results = index.lookup(symbol_name, prefix, prefix_match, max_results)
+        if include_body:
+            files: Dict[str, Any] = {}
+            for entry in results:
+                rel = entry["file"]
+                if rel not in files:
+                    full_path = os.path.join(index.root, rel)
+                    text = read_text(full_path)
+                    lines = split_lines(text) if text is not None else []
+                    try:
+                        st = os.stat(full_path)
+                        fresh = (st.st_mtime_ns, st.st_size) == index.file_identity(rel)
+                    except OSError:
+                        fresh = False
+                    files[rel] = (lines, fresh)
+                lines, fresh = files[rel]
+                ext = os.path.splitext(rel)[1].lower()
+                start = entry["line"] - 1
+                # El span guardado vale mientras el archivo no haya cambiado
+                end = entry["end_line"] if fresh else symbol_body_end(ext, lines, start)
+                entry["body"] = format_body(lines, start, end, ext)
+        return results
+
+    @staticmethod
+    def _find_scan(base: str, search_path: str, symbol_name: str, prefix_match: bool,
+                   include_body: bool, max_results: int) -> List[Dict[str, Any]]:
+        if os.path.isfile(search_path):
+            files = iter_project_files(search_path)
+        else:
+            files = project_file_paths(base, search_path)
         results = []
 
         for fpath in files:
@@ -265,7 +410,7 @@ class FindSymbolTool(BaseTool):
                 break
 
             ext = fpath.suffix.lower()
-            patterns = SYMBOL_PATTERNS.get(ext)
+            patterns = compiled_symbol_patterns(ext)
             if not patterns:
                 continue
 
@@ -273,39 +418,37 @@ class FindSymbolTool(BaseTool):
             if not lines:
                 continue
 
-            for kind, pattern in patterns.items():
-                compiled = re.compile(pattern, re.MULTILINE)
+            for kind, compiled in patterns:
                 for i, line in enumerate(lines):
                     m = compiled.match(line)
-                    if m and m.group(1) == symbol_name:
-                        rel = str(fpath)
-                        try:
-                            rel = str(fpath.relative_to(base))
-                        except ValueError:
-                            pass
-
-                        entry = {
-                            "name": symbol_name,
-                            "kind": kind,
-                            "file": rel,
-                            "line": i + 1,
-                            "preview": line.strip()[:500],
-                        }
-
-                        if include_body:
-                            if ext == ".py":
-                                entry["body"] = extract_python_body(lines, i)
-                            else:
-                                entry["body"] = extract_brace_body(lines, i)
-
-                        results.append(entry)
-                        if len(results) >= max_results:
-                            break
+                    if not m:
+                        continue
+                    name = m.group(1)
+                    if name != symbol_name and not (prefix_match and name.startswith(symbol_name)):
+                        continue
+                    rel = str(fpath)
+                    try:
+                        rel = str(fpath.relative_to(base))
+                    except ValueError:
+                        pass
+
+                    end = symbol_body_end(ext, lines, i)
+                    entry = {
+                        "name": name,
+                        "kind": kind,
+                        "file": rel,
+                        "line": i + 1,
+                        "end_line": end,
+                        "preview": line.strip()[:500],
+                    }
+
+                    if include_body:
+                        entry["body"] = format_body(lines, i, end, ext)
+
+                    results.append(entry)
+                    if len(results) >= max_results:
+                        break
                 if len(results) >= max_results:
                     break
 
-        return {
-            "symbol": name_pattern,
-            "results": results,
-            "total_found": len(results),
-        }
+        return results
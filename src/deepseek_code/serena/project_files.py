@@ -0,0 +1,180 @@
+"""Inventario de archivos de texto de un proyecto para los indices persistentes.
+
+Los indices persistentes (trigram_index.py, symbol_index.py) se actualizan de forma
+incremental: comparan (mtime_ns, tamaño) de cada archivo con lo que
+tienen guardado y solo releen lo que cambio. Aqui esta el recorrido
+comun (IGNORE_DIRS, extensiones binarias, MAX_FILE_SIZE y .gitignore)
+y el directorio de datos donde viven los indices. Las herramientas que
+recorren el disco cuando no hay indice usan esta misma regla
+(project_file_paths), asi que un archivo ignorado no aparece por
+ningun camino.
+
+Tras una mutacion hecha por una herramienta no hace falta recorrer todo:
+scan_paths() revisa solo las rutas que la herramienta declaro escribir.
+pending_paths() decide entre eso y el recorrido completo, que es O(archivos)
+y por eso solo se hace cuando el registro de mutaciones no alcanza.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple
+
+from ..server.tool import external_writes_since, mutations_since
+from ..tools.dir_walker import is_path_ignored, walk_tree
+from .code_patterns import IGNORE_EXTENSIONS, MAX_FILE_SIZE
+
+
+# Cambios hechos fuera de las herramientas y de los procesos en background
+# (editor, git en otra terminal) se ven a lo sumo tras este intervalo
+FULL_REFRESH_SECONDS = 60.0
+# Con un proceso en background escribiendo, recorrido completo como mucho
+# cada tantos segundos
+EXTERNAL_REFRESH_SECONDS = 2.0
+
+
+def pending_paths(last_full: Optional[float], epoch: int, force: bool = False,
+                  interval: float = FULL_REFRESH_SECONDS) -> Optional[List[str]]:
+    """Rutas que un indice debe revisar; None = recorrido completo, [] = nada.
+
+    last_full es el time.monotonic() del inicio del ultimo recorrido
+    completo (None: nunca en este proceso) y epoch la epoca de mutaciones
+    vista entonces. Se recorre todo la primera vez, tras una mutacion sin
+    rutas declaradas (o con el registro vencido), si un proceso en
+    background pudo escribir y cada `interval` segundos.
+    """
+    if force or last_full is None:
+        return None
+    elapsed = time.monotonic() - last_full
+    if elapsed >= interval:
+        return None
+    if elapsed >= EXTERNAL_REFRESH_SECONDS and external_writes_since(last_full):
+        return None
+    return mutations_since(epoch)
+
+
+def app_data_dir() -> str:
+    """Directorio de datos de la aplicacion (APPDATA/DeepSeek-Code o ~/.config)."""
+    appdata = os.environ.get('APPDATA')
+    if appdata:
+        return os.path.join(appdata, 'DeepSeek-Code')
+    return os.path.join(os.path.expanduser('~'), '.config', 'DeepSeek-Code')
+
+
+def index_path(kind: str, root: str, suffix: str = ".db") -> str:
+    """Ruta del indice `kind` para un proyecto (un archivo por raiz)."""
+    root_key = hashlib.sha256(os.path.normcase(os.path.abspath(root)).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(app_data_dir(), kind, root_key + suffix)
+
+
+def connect_index(db_path: str) -> sqlite3.Connection:
+    """Conexion SQLite de un indice: autocommit explicito, WAL, usable desde el executor."""
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def scan_project(root: str, subdir: str = "") -> Dict[str, Tuple[int, int]]:
+    """Archivos de texto bajo root: ruta relativa ('/') -> (mtime_ns, tamaño).
+
+    subdir (relativo a root) limita el recorrido a ese subarbol, con los
+    mismos .gitignore que aplicaria el recorrido completo.
+    """
+    files = {}
+    base = os.path.join(root, subdir) if subdir else root
+    for item in walk_tree(base, root=root):
+        if item.is_dir or item.ignored:
+            continue
+        if os.path.splitext(item.entry.name)[1].lower() in IGNORE_EXTENSIONS:
+            continue
+        try:
+            st = item.stat()
+        except OSError:
+            continue
+        if st.st_size > MAX_FILE_SIZE:
+            continue
+        files[item.rel] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+def scan_paths(root: str, paths: List[str]) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+    """Como scan_project pero solo para las rutas (absolutas) dadas.
+
+    Retorna (archivos, prefijos): los archivos de texto vigentes bajo esas
+    rutas y los prefijos relativos cubiertos. Lo indexado bajo un prefijo
+    que no figure en archivos ya no existe (o quedo ignorado).
+    """
+    root = os.path.abspath(root)
+    real_root = os.path.realpath(root)
+    files: Dict[str, Tuple[int, int]] = {}
+    prefixes: List[str] = []
+    for path in dict.fromkeys(paths):
+        rel = os.path.relpath(os.path.abspath(path), root)
+        if rel.startswith(".."):
+            # Las herramientas declaran rutas resueltas (sin symlinks)
+            rel = os.path.relpath(os.path.abspath(path), real_root)
+        if rel == ".":
+            return scan_project(root), [""]
+        if rel.startswith(".."):
+            continue
+        rel = rel.replace(os.sep, "/")
+        prefixes.append(rel)
+        if os.path.isdir(path):
+            files.update(scan_project(root, rel))
+            continue
+        if os.path.splitext(rel)[1].lower() in IGNORE_EXTENSIONS:
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if st.st_size <= MAX_FILE_SIZE and not is_path_ignored(root, rel, False):
+            files[rel] = (st.st_mtime_ns, st.st_size)
+    return files, prefixes
+
+
+def prefix_condition(column: str, prefixes: List[str]) -> Tuple[str, list]:
+    """Condicion SQL (y parametros) de `column` igual a, o bajo, algun prefijo."""
+    if "" in prefixes:
+        return "1", []
+    clauses, params = [], []
+    for prefix in prefixes:
+        # 'prefix/' <= path < 'prefix0' ('0' sigue a '/')
+        clauses.append(f"({column} = ? OR ({column} >= ? AND {column} < ?))")
+        params += [prefix, prefix + "/", prefix + "0"]
+    return "(" + " OR ".join(clauses) + ")" if clauses else "0", params
+
+
+def project_file_paths(root: str, search_path: str, file_glob: str = "") -> List[Path]:
+    """Archivos de texto bajo search_path con la regla de scan_project.
+
+    Si search_path esta dentro de root se aplican los .gitignore desde
+    root (igual que los indices); si no, desde search_path.
+    """
+    rel = os.path.relpath(os.path.abspath(search_path), os.path.abspath(root))
+    if rel.startswith(".."):
+        root, rel = search_path, "."
+    scanned = scan_project(root, "" if rel == "." else rel)
+    return [Path(root) / rel_path for rel_path in sorted(scanned)
+            if not file_glob or PurePosixPath(rel_path).match(file_glob)]
+
+
+def read_text(path: str) -> Optional[str]:
+    """Contenido de un archivo como texto (utf-8, si no latin-1); None si no se puede leer."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.decode("latin-1")
+    # Saltos de linea universales, como una lectura en modo texto
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
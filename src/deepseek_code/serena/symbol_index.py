@@ -0,0 +1,345 @@
+"""Base de datos persistente de simbolos para find_symbol y get_symbols_overview.
+
+FindSymbolTool recorria el proyecto en cada busqueda, releia cada archivo
+fuente y recompilaba los regex de SYMBOL_PATTERNS dentro del bucle por
+archivo; SymbolsOverviewTool reparseaba el archivo en cada llamada.
+
+Aqui cada proyecto tiene una tabla de simbolos SQLite bajo el directorio
+de datos (APPDATA/DeepSeek-Code/symbol_index/<hash de la raiz>.db):
+
+    - files: id, ruta, (mtime_ns, tamaño) y total de lineas
+    - symbols: id del archivo, nombre, tipo, orden del tipo, linea
+      inicial y final del cuerpo, preview. Indice B-tree por nombre: una
+      busqueda por nombre exacto o por prefijo es O(log n)
+
+refresh() compara (mtime_ns, tamaño) de cada archivo con lo guardado y
+solo reparsea lo que cambio (limitado por intervalo y por la epoca de
+mutaciones del servidor MCP, como el indice de trigramas: tras una
+mutacion solo se revisan las rutas escritas). Si hay muchos
+archivos que parsear (primera indexacion de un repo grande) el trabajo
+se reparte en un pool de procesos; el proceso principal solo escribe.
+
+Uso:
+    index = get_symbol_index(project_root)
+    index.refresh()
+    for sym in index.lookup("load_config", prefix="src"):
+        ...   # {"name", "kind", "file", "line", "end_line", "preview"}
+    overview = index.file_symbols("src/config.py")
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..server.tool import mutation_epoch
+from .code_patterns import SYMBOL_PATTERNS, extract_symbols
+from .project_files import (
+    FULL_REFRESH_SECONDS, connect_index, index_path, pending_paths, prefix_condition,
+    read_text, scan_paths, scan_project,
+)
+
+INDEX_VERSION = 1
+
+# Como en el indice de trigramas: recorrido completo al primer uso y
+# despues solo cuando el registro de mutaciones no alcanza
+REFRESH_INTERVAL_SECONDS = FULL_REFRESH_SECONDS
+
+# Archivos por reparsear a partir de los cuales se usa el pool de procesos
+PARALLEL_MIN_FILES = 2000
+# Archivos por tarea enviada a cada proceso
+PARALLEL_CHUNK = 256
+
+# Indices de symbols: por nombre (lookup) y por archivo (overview, borrado)
+_SYMBOL_INDEXES = (
+    ("symbols_name", "symbols(name)"),
+    ("symbols_file", "symbols(file_id)"),
+)
+
+_SYMBOL_COLUMNS = "f.path, s.name, s.kind, s.line, s.end_line, s.preview"
+
+# Fila de symbols
+SymbolRow = Tuple[str, str, int, int, int, str]
+
+
+def split_lines(text: str) -> List[str]:
+    """Lineas sin salto final, con el mismo conteo que readlines()."""
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def parse_file(path: str) -> Optional[Tuple[int, List[SymbolRow]]]:
+    """(total de lineas, simbolos) de un archivo fuente; None si no se puede leer."""
+    text = read_text(path)
+    if text is None:
+        return None
+    lines = split_lines(text)
+    return len(lines), extract_symbols(os.path.splitext(path)[1].lower(), lines)
+
+
+def _parse_chunk(root: str, rels: List[str]) -> List[Tuple[str, Optional[Tuple[int, List[SymbolRow]]]]]:
+    """Tarea del pool de procesos: parsea un lote de archivos."""
+    return [(rel, parse_file(os.path.join(root, rel))) for rel in rels]
+
+
+def _prefix_range(prefix: str) -> Tuple[str, str]:
+    """Limites [lo, hi) de las cadenas que empiezan con prefix (orden binario)."""
+    return prefix, prefix + "\U0010ffff"
+
+
+class SymbolIndex:
+    """Tabla de simbolos de un proyecto, persistida en SQLite."""
+
+    def __init__(self, root: str, db_path: Optional[str] = None,
+                 refresh_interval: float = REFRESH_INTERVAL_SECONDS):
+        self.root = os.path.abspath(root)
+        self.db_path = db_path or index_path("symbol_index", self.root)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_refresh: Optional[float] = None
+        self._epoch: Optional[int] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = connect_index(self.db_path)
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+            row = conn.execute("SELECT value FROM meta WHERE key='version'").fetchone()
+            if row is None or row[0] != INDEX_VERSION:
+                self._create_schema(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DROP TABLE IF EXISTS files")
+            conn.execute("DROP TABLE IF EXISTS symbols")
+            conn.execute(
+                "CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, "
+                "mtime_ns INTEGER, size INTEGER, total_lines INTEGER)"
+            )
+            conn.execute(
+                "CREATE TABLE symbols (file_id INTEGER, name TEXT, kind TEXT, rank INTEGER, "
+                "line INTEGER, end_line INTEGER, preview TEXT)"
+            )
+            for name, columns in _SYMBOL_INDEXES:
+                conn.execute(f"CREATE INDEX {name} ON {columns}")
+            conn.execute("DELETE FROM meta")
+            conn.execute("INSERT INTO meta VALUES ('version', ?)", (INDEX_VERSION,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _store(conn, rel: str, ident: Tuple[int, int], parsed, fresh: bool = False) -> None:
+        total_lines, symbols = parsed
+        row = None if fresh else conn.execute("SELECT id FROM files WHERE path=?", (rel,)).fetchone()
+        if row is None:
+            file_id = conn.execute("INSERT INTO files(path, mtime_ns, size, total_lines) "
+                                   "VALUES (?, ?, ?, ?)", (rel, ident[0], ident[1], total_lines)).lastrowid
+        else:
+            file_id = row[0]
+            conn.execute("DELETE FROM symbols WHERE file_id=?", (file_id,))
+            conn.execute("UPDATE files SET mtime_ns=?, size=?, total_lines=? WHERE id=?",
+                         (ident[0], ident[1], total_lines, file_id))
+        conn.executemany("INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         [(file_id,) + sym for sym in symbols])
+
+    @staticmethod
+    def _forget(conn, rel: str) -> None:
+        row = conn.execute("SELECT id FROM files WHERE path=?", (rel,)).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM symbols WHERE file_id=?", (row[0],))
+            conn.execute("DELETE FROM files WHERE id=?", (row[0],))
+
+    def _parse_all(self, rels: List[str], workers: Optional[int]):
+        """Itera (rel, parsed) — en paralelo si son muchos archivos."""
+        if workers != 1 and len(rels) >= PARALLEL_MIN_FILES:
+            chunks = [rels[i:i + PARALLEL_CHUNK] for i in range(0, len(rels), PARALLEL_CHUNK)]
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    for batch in pool.map(_parse_chunk, repeat(self.root), chunks):
+                        yield from batch
+                return
+            except (OSError, BrokenProcessPool, NotImplementedError):
+                pass  # sin procesos (sandbox, plataforma): en serie
+        for rel in rels:
+            yield rel, parse_file(os.path.join(self.root, rel))
+
+    def refresh(self, force: bool = False, workers: Optional[int] = None) -> Optional[Dict[str, float]]:
+        """Reparsea lo que cambio en disco. None si el indice se considero fresco.
+
+        workers: procesos del pool (None = cpu_count, 1 = siempre en serie).
+        """
+        with self._lock:
+            epoch = mutation_epoch()
+            written = pending_paths(self._last_refresh, self._epoch, force, self.refresh_interval)
+            if written == []:
+                self._epoch = epoch
+                return None
+            t0 = time.perf_counter()
+            started = time.monotonic()
+            conn = self._db()
+            sql, params = "SELECT path, mtime_ns, size FROM files", []
+            if written is None:
+                found, prefixes = scan_project(self.root), None
+            else:
+                found, prefixes = scan_paths(self.root, written)
+                where, params = prefix_condition("path", prefixes)
+                sql += " WHERE " + where
+            scanned = {rel: ident for rel, ident in found.items()
+                       if os.path.splitext(rel)[1].lower() in SYMBOL_PATTERNS}
+            known = {path: (mtime, size) for path, mtime, size in
+                     conn.execute(sql, params)}
+            changed = [p for p, ident in scanned.items() if known.get(p) != ident]
+            removed = [p for p in known if p not in scanned]
+
+            # Carga inicial: es mas rapido crear los indices al final
+            bulk = prefixes is None and not known and bool(changed)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if bulk:
+                    for name, _ in _SYMBOL_INDEXES:
+                        conn.execute(f"DROP INDEX IF EXISTS {name}")
+                for rel, parsed in self._parse_all(changed, workers):
+                    if parsed is None:
+                        if not bulk:
+                            self._forget(conn, rel)
+                    else:
+                        self._store(conn, rel, scanned[rel], parsed, fresh=bulk)
+                for rel in removed:
+                    self._forget(conn, rel)
+                if bulk:
+                    for name, columns in _SYMBOL_INDEXES:
+                        conn.execute(f"CREATE INDEX {name} ON {columns}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+            self._epoch = epoch
+            if prefixes is None:
+                self._last_refresh = started
+            return {
+                "partial": prefixes is not None,
+                "files": len(scanned),
+                "indexed": len(changed),
+                "removed": len(removed),
+                "seconds": round(time.perf_counter() - t0, 3),
+            }
+
+    def rebuild(self, workers: Optional[int] = None) -> Dict[str, float]:
+        """Reconstruye todo el indice desde cero (indexacion inicial en paralelo)."""
+        with self._lock:
+            self._create_schema(self._db())
+        return self.refresh(force=True, workers=workers)
+
+    def lookup(self, name: str, prefix: str = "", match_prefix: bool = False,
+               limit: int = 50) -> List[Dict[str, Any]]:
+        """Simbolos llamados `name` (o que empiezan con name si match_prefix).
+
+        prefix restringe a un subdirectorio o archivo (ruta relativa con '/').
+        """
+        sql = f"SELECT {_SYMBOL_COLUMNS} FROM symbols s JOIN files f ON f.id = s.file_id"
+        if match_prefix:
+            lo, hi = _prefix_range(name)
+            sql += " WHERE s.name >= ? AND s.name < ?"
+            params: list = [lo, hi]
+        else:
+            sql += " WHERE s.name = ?"
+            params = [name]
+        prefix = prefix.strip("/")
+        if prefix:
+            # 'prefix/' <= path < 'prefix0' ('0' sigue a '/')
+            sql += " AND (f.path = ? OR (f.path >= ? AND f.path < ?))"
+            params += [prefix, prefix + "/", prefix + "0"]
+        sql += " ORDER BY f.path, s.rank, s.line, s.name LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db().execute(sql, params).fetchall()
+        return [self._symbol(row) for row in rows]
+
+    def file_symbols(self, rel: str) -> Optional[Dict[str, Any]]:
+        """Simbolos de un archivo agrupados por tipo, reparseandolo solo si cambio.
+
+        None si el archivo no existe o su extension no tiene patrones.
+        """
+        rel = rel.replace(os.sep, "/").strip("/")
+        ext = os.path.splitext(rel)[1].lower()
+        if ext not in SYMBOL_PATTERNS:
+            return None
+        try:
+            st = os.stat(os.path.join(self.root, rel))
+        except OSError:
+            return None
+        ident = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            conn = self._db()
+            row = conn.execute(
+                "SELECT mtime_ns, size, total_lines FROM files WHERE path=?", (rel,)).fetchone()
+            if row is None or tuple(row[:2]) != ident:
+                parsed = parse_file(os.path.join(self.root, rel))
+                if parsed is None:
+                    return None
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._store(conn, rel, ident, parsed)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                total_lines = parsed[0]
+            else:
+                total_lines = row[2]
+            rows = conn.execute(
+                f"SELECT {_SYMBOL_COLUMNS} FROM symbols s JOIN files f ON f.id = s.file_id "
+                "WHERE f.path=? ORDER BY s.rank, s.line", (rel,)).fetchall()
+        symbols: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            sym = self._symbol(row)
+            symbols.setdefault(sym.pop("kind"), []).append(sym)
+            del sym["file"]
+        return {"total_lines": total_lines, "symbols": symbols}
+
+    def file_identity(self, rel: str) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, tamaño) con que se indexo un archivo."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT mtime_ns, size FROM files WHERE path=?", (rel,)).fetchone()
+        return tuple(row) if row else None
+
+    @staticmethod
+    def _symbol(row) -> Dict[str, Any]:
+        path, name, kind, line, end_line, preview = row
+        return {"name": name, "kind": kind, "file": path, "line": line,
+                "end_line": end_line, "preview": preview}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_indexes: Dict[str, SymbolIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_symbol_index(root: str) -> SymbolIndex:
+    """Indice compartido por proceso para una raiz de proyecto."""
+    key = os.path.normcase(os.path.abspath(root))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = SymbolIndex(root)
+            _indexes[key] = index
+        return index
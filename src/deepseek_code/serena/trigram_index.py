@@ -0,0 +1,355 @@
+"""Indice persistente de trigramas para serena_search_for_pattern.
+
+SearchPatternTool recorria el proyecto entero en cada llamada, leia cada
+archivo (con dos intentos de encoding) y calculaba el numero de linea
+con full_text[:match.start()].count("\\n"), cuadratico en coincidencias
+por archivo. En un repo de 50K archivos cada busqueda tardaba segundos.
+
+Aqui cada proyecto tiene un indice SQLite bajo el directorio de datos
+(APPDATA/DeepSeek-Code/search_index/<hash de la raiz>.db):
+
+    - grams: tabla FTS5 con el tokenizer trigram, sin contenido ni
+      posiciones (content='', detail='none'): solo listas de archivos
+      por trigrama
+    - files: ruta, (mtime_ns, tamaño) y tabla de offsets de inicio de
+      cada linea, para convertir una posicion en numero de linea con
+      bisect
+
+El indice se actualiza de forma incremental: refresh() compara
+(mtime_ns, tamaño) de cada archivo y solo relee lo que cambio. Tras
+una mutacion hecha por una herramienta solo se revisan las rutas que
+esa herramienta declaro escribir (path_access); el recorrido completo
+queda para cuando vence el intervalo o la mutacion no declaro rutas
+(run_command, ...). Una
+version vieja no se borra de grams (sin contenido FTS5 no puede): su
+docid deja de figurar en files y queda como fila muerta; cuando las
+muertas superan a las vivas se reconstruye todo.
+
+Una consulta extrae del regex los literales que toda coincidencia debe
+contener (required_literals) y los traduce a una expresion FTS5 de
+trigramas. Solo los archivos candidatos se leen y verifican con el
+regex real; un regex sin literales de 3+ caracteres verifica todos.
+
+Uso:
+    index = get_trigram_index(project_root)
+    index.refresh()                       # incremental, limitado por intervalo
+    for rel in index.candidates(r"def\\s+load_\\w+", "src", "*.py"):
+        ...   # leer y verificar con el regex; en cada coincidencia:
+        starts, mtime_ns, size = index.line_table(rel)
+        line = line_of(starts, match.start())
+"""
+
+import bisect
+import operator
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from itertools import accumulate
+from pathlib import PurePosixPath
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    from re import _constants as _sre
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants as _sre
+    import sre_parse as _sre_parse
+
+from ..server.tool import mutation_epoch
+from .project_files import (
+    FULL_REFRESH_SECONDS, connect_index, index_path, pending_paths, prefix_condition,
+    read_text, scan_paths, scan_project,
+)
+
+INDEX_VERSION = 1
+
+# El arbol completo (recorrido con stat, lo unico O(archivos)) se recorre
+# al primer uso y despues solo cuando el registro de mutaciones no alcanza
+# (ver project_files.pending_paths)
+REFRESH_INTERVAL_SECONDS = FULL_REFRESH_SECONDS
+
+# Trigramas por literal en la consulta (muestreados de forma pareja)
+MAX_TRIGRAMS_PER_LITERAL = 16
+
+# Filas de candidatos leidas por vez
+CANDIDATE_BATCH = 256
+
+# Requisito de un regex: literal, conjuncion o disyuncion
+Requirement = Union[Tuple[str, str], Tuple[str, list]]
+
+_REPEATS = {op for op in (getattr(_sre, "MAX_REPEAT", None), getattr(_sre, "MIN_REPEAT", None),
+                          getattr(_sre, "POSSESSIVE_REPEAT", None)) if op is not None}
+_ATOMIC = getattr(_sre, "ATOMIC_GROUP", None)
+
+
+def _sequence_requirements(items) -> List[Requirement]:
+    reqs: List[Requirement] = []
+    run: List[str] = []
+
+    def flush():
+        if len(run) >= 3:
+            reqs.append(("lit", "".join(run)))
+        run.clear()
+
+    for op, av in items:
+        if op is _sre.LITERAL:
+            run.append(chr(av))
+            continue
+        flush()
+        req = None
+        if op is _sre.SUBPATTERN:
+            req = _pattern_requirement(av[-1])
+        elif op in _REPEATS:
+            low, _high, item = av
+            req = _pattern_requirement(item) if low >= 1 else None
+        elif _ATOMIC is not None and op is _ATOMIC:
+            req = _pattern_requirement(av)
+        elif op is _sre.BRANCH:
+            alternatives = [_pattern_requirement(alt) for alt in av[1]]
+            if alternatives and all(alt is not None for alt in alternatives):
+                req = ("or", alternatives)
+        if req is not None:
+            reqs.append(req)
+    flush()
+    return reqs
+
+
+def _pattern_requirement(items) -> Optional[Requirement]:
+    reqs = _sequence_requirements(items)
+    if not reqs:
+        return None
+    return reqs[0] if len(reqs) == 1 else ("and", reqs)
+
+
+def required_literals(pattern: str) -> Optional[Requirement]:
+    """Literales (3+ chars) que toda coincidencia del regex contiene, o None."""
+    try:
+        return _pattern_requirement(_sre_parse.parse(pattern))
+    except Exception:
+        return None
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def fts_query(req: Optional[Requirement]) -> Optional[str]:
+    """Expresion FTS5 (trigramas) equivalente a un requisito."""
+    if req is None:
+        return None
+    kind, value = req
+    if kind == "lit":
+        grams = list(dict.fromkeys(value[i:i + 3].lower() for i in range(len(value) - 2)))
+        if len(grams) > MAX_TRIGRAMS_PER_LITERAL:
+            step = len(grams) / MAX_TRIGRAMS_PER_LITERAL
+            grams = [grams[int(i * step)] for i in range(MAX_TRIGRAMS_PER_LITERAL)]
+        return "(" + " AND ".join(_quote(g) for g in grams) + ")"
+    parts = [fts_query(sub) for sub in value]
+    joiner = " AND " if kind == "and" else " OR "
+    return "(" + joiner.join(parts) + ")"
+
+
+def line_starts(text: str) -> array:
+    """Offsets (en caracteres) donde empieza cada linea del texto."""
+    parts = text.split("\n")[:-1]
+    starts = array("I", [0])
+    starts.extend(map(operator.add, accumulate(map(len, parts)), range(1, len(parts) + 1)))
+    return starts
+
+
+def line_of(starts: array, pos: int) -> int:
+    """Numero de linea (base 0) de una posicion del texto."""
+    return bisect.bisect_right(starts, pos) - 1
+
+
+class TrigramIndex:
+    """Indice de trigramas de un proyecto, persistido en SQLite (FTS5)."""
+
+    def __init__(self, root: str, db_path: Optional[str] = None,
+                 refresh_interval: float = REFRESH_INTERVAL_SECONDS):
+        self.root = os.path.abspath(root)
+        self.db_path = db_path or index_path("search_index", self.root)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_refresh: Optional[float] = None
+        self._epoch: Optional[int] = None
+
+    def _db(self) -> sqlite3.Connection:
+        """Conexion abierta (crea el esquema). Lanza sqlite3.Error si no hay FTS5 trigram."""
+        if self._conn is None:
+            conn = connect_index(self.db_path)
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+            row = conn.execute("SELECT value FROM meta WHERE key='version'").fetchone()
+            if row is None or row[0] != INDEX_VERSION:
+                self._create_schema(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DROP TABLE IF EXISTS files")
+            conn.execute("DROP TABLE IF EXISTS grams")
+            conn.execute(
+                "CREATE TABLE files (path TEXT PRIMARY KEY, docid INTEGER UNIQUE, "
+                "mtime_ns INTEGER, size INTEGER, lines BLOB)"
+            )
+            conn.execute(
+                "CREATE VIRTUAL TABLE grams USING fts5("
+                "body, tokenize='trigram', detail='none', content='')"
+            )
+            conn.execute("DELETE FROM meta")
+            conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                             [("version", INDEX_VERSION), ("next_docid", 1), ("dead", 0)])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _meta(self, conn, key: str) -> int:
+        return conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()[0]
+
+    def refresh(self, force: bool = False) -> Optional[Dict[str, float]]:
+        """Reindexa lo que cambio en disco. None si el indice se considero fresco."""
+        with self._lock:
+            epoch = mutation_epoch()
+            written = pending_paths(self._last_refresh, self._epoch, force, self.refresh_interval)
+            if written == []:
+                self._epoch = epoch
+                return None
+            t0 = time.perf_counter()
+            started = time.monotonic()
+            conn = self._db()
+            sql, params = "SELECT path, docid, mtime_ns, size FROM files", []
+            if written is None:
+                scanned, prefixes = scan_project(self.root), None
+            else:
+                scanned, prefixes = scan_paths(self.root, written)
+                where, params = prefix_condition("path", prefixes)
+                sql += " WHERE " + where
+            known = {path: (docid, mtime, size) for path, docid, mtime, size in
+                     conn.execute(sql, params)}
+            dead = self._meta(conn, "dead")
+            if prefixes is None and dead > max(1000, len(known)):
+                # Demasiadas versiones muertas: reconstruir desde cero
+                self._create_schema(conn)
+                known, dead = {}, 0
+
+            changed = [p for p, ident in scanned.items()
+                       if p not in known or known[p][1:] != ident]
+            removed = [p for p in known if p not in scanned]
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                next_docid = self._meta(conn, "next_docid")
+                for rel in changed:
+                    text = read_text(os.path.join(self.root, rel))
+                    if text is None:
+                        if rel in known:
+                            removed.append(rel)
+                        continue
+                    if rel in known:
+                        dead += 1  # la version anterior queda muerta en grams
+                    conn.execute("INSERT INTO grams(rowid, body) VALUES (?, ?)", (next_docid, text))
+                    mtime_ns, size = scanned[rel]
+                    conn.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                        (rel, next_docid, mtime_ns, size, line_starts(text).tobytes()),
+                    )
+                    next_docid += 1
+                for rel in removed:
+                    conn.execute("DELETE FROM files WHERE path=?", (rel,))
+                dead += len(removed)
+                conn.executemany("UPDATE meta SET value=? WHERE key=?",
+                                 [(next_docid, "next_docid"), (dead, "dead")])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+            self._epoch = epoch
+            if prefixes is None:
+                self._last_refresh = started
+            return {
+                "partial": prefixes is not None,
+                "files": len(scanned),
+                "indexed": len(changed),
+                "removed": len(removed),
+                "seconds": round(time.perf_counter() - t0, 3),
+            }
+
+    def file_count(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def candidates(self, pattern: str, prefix: str = "", file_glob: str = "") -> Iterator[str]:
+        """Rutas relativas (ordenadas) de los archivos que pueden contener el regex.
+
+        Es un generador que lee de a CANDIDATE_BATCH filas: quien corta al
+        llegar a max_results no paga por el resto. prefix restringe a un
+        subdirectorio o archivo (ruta relativa con '/'); file_glob filtra
+        como Path.match.
+        """
+        query = fts_query(required_literals(pattern))
+        prefix = prefix.strip("/")
+        sql = "SELECT path FROM files"
+        params: list = []
+        where = []
+        if query:
+            where.append("docid IN (SELECT rowid FROM grams WHERE grams MATCH ?)")
+            params.append(query)
+        if prefix:
+            # Rango de la clave primaria: 'prefix/' <= path < 'prefix0' ('0' sigue a '/')
+            where.append("(path = ? OR (path >= ? AND path < ?))")
+            params += [prefix, prefix + "/", prefix + "0"]
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            cursor = self._db().execute(sql + " ORDER BY path", params)
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(CANDIDATE_BATCH)
+                if not rows:
+                    return
+                for (rel,) in rows:
+                    if not file_glob or PurePosixPath(rel).match(file_glob):
+                        yield rel
+        finally:
+            cursor.close()
+
+    def line_table(self, rel: str) -> Optional[Tuple[array, int, int]]:
+        """Offsets de lineas indexados de un archivo, con su (mtime_ns, tamaño)."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT lines, mtime_ns, size FROM files WHERE path=?", (rel,)).fetchone()
+        if row is None:
+            return None
+        starts = array("I")
+        starts.frombytes(row[0])
+        return starts, row[1], row[2]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_indexes: Dict[str, TrigramIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_trigram_index(root: str) -> TrigramIndex:
+    """Indice compartido por proceso para una raiz de proyecto."""
+    key = os.path.normcase(os.path.abspath(root))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = TrigramIndex(root)
+            _indexes[key] = index
+        return index
@@ -5,6 +5,9 @@ from enum import Enum
 from typing import Any, Dict, Optional, Union
 from pydantic import BaseModel
 
+from .result_cache import DEFAULT_RESULT_CACHE_BYTES, ToolResultCache
+from .tool import bump_mutation_epoch
+
 logger = logging.getLogger(__name__)
 
 MCP_VERSION = "2025-03-26"
@@ -40,11 +43,14 @@ class MCPErrorResponse(BaseModel):
     error: MCPError
 
 class MCPServer:
-    def __init__(self, name: str = "deepseek-code", version: str = "0.1.0"):
+    def __init__(self, name: str = "deepseek-code", version: str = "0.1.0",
+                 result_cache_bytes: int = DEFAULT_RESULT_CACHE_BYTES):
         self.name = name
         self.version = version
         self.tools: Dict[str, 'BaseTool'] = {}
         self.resources: Dict[str, 'BaseResource'] = {}
+        # Resultados de tools read_only, validados por mtime/tamaño/inodo (0 = desactivado)
+        self.result_cache = ToolResultCache(result_cache_bytes)
         self._setup_logging()
 
     def _setup_logging(self):
@@ -52,6 +58,8 @@ class MCPServer:
         self.logger = logging.getLogger(f"mcp.{self.name}")
 
     def register_tool(self, tool: 'BaseTool'):
+        if tool.name in self.tools:
+            self.result_cache.clear()
         self.tools[tool.name] = tool
         self.logger.info(f"Tool registered: {tool.name}")
 
@@ -59,6 +67,7 @@ class MCPServer:
         """Desregistra una herramienta por nombre."""
         if tool_name in self.tools:
             del self.tools[tool_name]
+            self.result_cache.clear()
             self.logger.info(f"Tool unregistered: {tool_name}")
             return True
         return False
@@ -120,9 +129,28 @@ class MCPServer:
             import sys
             print(f"  [protocol] {tool_name}: parametros ignorados {dropped}", file=sys.stderr)
 
-        result = await tool.execute(**filtered_args)
+        cache = self.result_cache
+        key, hit, cached = cache.lookup(tool, filtered_args)
+        if hit:
+            return MCPResponse(id=request.id, result={"content": cached})
+        try:
+            result = await tool.execute(**filtered_args)
+        finally:
+            # Aunque falle a mitad, una herramienta mutante pudo dejar cambios
+            cache.invalidate(tool, filtered_args)
+            if not tool.read_only:
+                try:
+                    access = tool.path_access(filtered_args)
+                except Exception:
+                    access = None
+                bump_mutation_epoch(access[1] if access is not None else None)
+        cache.store(key, result, cached)
         return MCPResponse(id=request.id, result={"content": result})
 
+    def cache_stats(self) -> dict:
+        """Metricas del cache de resultados de herramientas."""
+        return self.result_cache.stats()
+
     async def _handle_resources_list(self, request: MCPRequest) -> MCPResponse:
         resources_list = [
             {
@@ -0,0 +1,242 @@
+"""Cache validado de resultados de herramientas de solo lectura.
+
+En un mismo turno (o entre instancias de quantum/multi que comparten el
+MCPServer) DeepSeek vuelve a pedir read_file, list_directory,
+search_pattern... con los mismos argumentos. Aqui se guarda el resultado
+junto con la identidad de cada ruta leida (mtime_ns, tamaño, inodo) y
+solo se reutiliza si esa identidad sigue igual al consultarlo:
+
+    - archivos: validacion exacta, sin vencimiento
+    - directorios, rutas inexistentes y busquedas sin ruta (ANY_PATH):
+      la identidad no cubre cambios en subcarpetas ni rutas resueltas
+      de otra forma por la herramienta, asi que ademas vencen a los
+      SHALLOW_TTL_SECONDS, y no se sirven si un proceso en background
+      (run_command) corria o termino despues de la consulta: escribe
+      sin pasar por las invalidaciones
+    - toda herramienta que escribe (write_file, edit_file, move_file,
+      run_command...) invalida las entradas que leen rutas que pisa;
+      las barreras (sin rutas declaradas) vacian el cache
+
+El cache es un LRU acotado por bytes del resultado serializado.
+
+Uso:
+    cache = ToolResultCache(max_bytes=32 * 1024 * 1024)
+    key, hit, value = cache.lookup(tool, args)
+    if hit: return value
+    result = await tool.execute(**args)
+    cache.store(key, result, value)
+    cache.invalidate(tool, args)  # tras ejecutar una herramienta mutante
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .tool import ANY_PATH, external_writes_since, paths_overlap
+
+# Tamaño maximo por defecto (bytes de resultados guardados)
+DEFAULT_RESULT_CACHE_BYTES = 32 * 1024 * 1024
+
+# Vida de entradas cuya validacion no es exacta (directorios, ANY_PATH)
+SHALLOW_TTL_SECONDS = 30.0
+
+# (mtime_ns, tamaño, inodo, es_directorio); None = la ruta no existe
+Identity = Optional[Tuple[int, int, int, bool]]
+
+
+def file_identity(path: str) -> Identity:
+    """Identidad de una ruta en disco (None si no existe o no es accesible)."""
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino, os.path.isdir(path)
+
+
+def _result_size(result: Any) -> int:
+    if isinstance(result, str):
+        return len(result)
+    try:
+        return len(json.dumps(result, default=str))
+    except (TypeError, ValueError):
+        return len(str(result))
+
+
+@dataclass
+class _Entry:
+    result: Any
+    reads: List[str]
+    identities: List[Identity]
+    size: int
+    expires: Optional[float]
+    queried: float  # time.monotonic() de la consulta que lo produjo
+
+
+class _Miss:
+    """Token de una consulta fallida: recuerda la generacion al consultar."""
+    __slots__ = ("generation", "reads", "identities", "queried")
+
+    def __init__(self, generation: int, reads: List[str], identities: List[Identity]):
+        self.generation = generation
+        self.reads = reads
+        self.identities = identities
+        self.queried = time.monotonic()
+
+
+class ToolResultCache:
+    """LRU de resultados de herramientas read_only, validado por identidad de archivo."""
+
+    def __init__(self, max_bytes: int = DEFAULT_RESULT_CACHE_BYTES,
+                 shallow_ttl: float = SHALLOW_TTL_SECONDS):
+        self.max_bytes = max(0, max_bytes)
+        self.shallow_ttl = shallow_ttl
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        # Se incrementa en cada invalidacion: un resultado calculado
+        # mientras otra herramienta escribia no se guarda.
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "stores": 0,
+            "invalidated": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Clave normalizada (None si los argumentos no son serializables)."""
+        try:
+            return tool_name + "\0" + json.dumps(arguments, sort_keys=True, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _reads(tool, arguments: Dict[str, Any]) -> Optional[List[str]]:
+        try:
+            access = tool.path_access(arguments)
+        except Exception:
+            return None
+        return access[0] if access is not None else None
+
+    def lookup(self, tool, arguments: Dict[str, Any]) -> Tuple[Optional[str], bool, Any]:
+        """Busca un resultado valido. Retorna (clave, hit, resultado o token).
+
+        En un miss el token se pasa a store(). La clave es None si la
+        llamada no es cacheable.
+        """
+        if not self.enabled or not getattr(tool, "read_only", False):
+            return None, False, None
+        key = self.make_key(tool.name, arguments)
+        if key is None:
+            return None, False, None
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+        if entry is not None:
+            fresh = entry.expires is None or (
+                time.monotonic() < entry.expires and not external_writes_since(entry.queried))
+            current = [file_identity(p) if p != ANY_PATH else None for p in entry.reads]
+            if fresh and current == entry.identities:
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                return key, True, entry.result
+            self._drop(key)
+            self._stats["stale"] += 1
+        self._stats["misses"] += 1
+        reads = self._reads(tool, arguments)
+        if reads is None:
+            return None, False, None
+        # La identidad se toma ANTES de ejecutar: si el archivo cambia
+        # durante la lectura, la entrada nace invalida y no se reutiliza.
+        identities = [file_identity(p) if p != ANY_PATH else None for p in reads]
+        return key, False, _Miss(generation, reads, identities)
+
+    def store(self, key: Optional[str], result: Any, token: Any):
+        """Guarda el resultado de una consulta fallida (token de lookup)."""
+        if key is None or not isinstance(token, _Miss):
+            return
+        size = _result_size(result)
+        if size > self.max_bytes:
+            return
+        reads = token.reads
+        # Solo los archivos existentes se validan de forma exacta
+        shallow = any(ident is None or ident[3] for ident in token.identities)
+        entry = _Entry(
+            result=result,
+            reads=reads,
+            identities=token.identities,
+            size=size,
+            expires=time.monotonic() + self.shallow_ttl if shallow else None,
+            queried=token.queried,
+        )
+        with self._lock:
+            if token.generation != self._generation:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += size
+            self._stats["stores"] += 1
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._stats["evictions"] += 1
+
+    def _drop(self, key: str):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def invalidate(self, tool, arguments: Dict[str, Any]):
+        """Descarta lo que una herramienta mutante pudo haber cambiado."""
+        if not self.enabled or getattr(tool, "read_only", False):
+            return
+        try:
+            access = tool.path_access(arguments)
+        except Exception:
+            access = None
+        if access is None:
+            self.clear()
+            return
+        writes = access[1]
+        if not writes:
+            return
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, entry in self._entries.items()
+                     if any(paths_overlap(w, r) for w in writes for r in entry.reads)]
+            for key in stale:
+                self._bytes -= self._entries.pop(key).size
+            self._stats["invalidated"] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._stats["invalidated"] += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Metricas del cache (hit rate, entradas, bytes usados)."""
+        s = dict(self._stats)
+        s["entries"] = len(self._entries)
+        s["bytes"] = self._bytes
+        s["max_bytes"] = self.max_bytes
+        lookups = s["hits"] + s["misses"]
+        s["hit_rate"] = round(s["hits"] / lookups, 3) if lookups else 0.0
+        return s
@@ -1,9 +1,108 @@
 """Clase base para herramientas MCP"""
 
+import os
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Ruta comodin: la llamada puede leer/escribir cualquier archivo
+ANY_PATH = "*"
+
+
+# Contador de ejecuciones de herramientas que modifican algo. Los indices
+# derivados de archivos (busqueda, simbolos) lo consultan para saber si
+# deben revisar el disco antes de responder; el registro de las ultimas
+# MUTATION_LOG_SIZE mutaciones les dice que rutas revisar.
+MUTATION_LOG_SIZE = 256
+_mutation_epoch = 0
+# (epoca, rutas escritas o None si la mutacion pudo tocar cualquier cosa)
+_mutation_log: deque = deque(maxlen=MUTATION_LOG_SIZE)
+
+
+def mutation_epoch() -> int:
+    return _mutation_epoch
+
+
+def bump_mutation_epoch(paths: Optional[List[str]] = None):
+    """Registra una mutacion; paths = rutas escritas (None: cualquier cosa)."""
+    global _mutation_epoch
+    _mutation_epoch += 1
+    if paths is not None and ANY_PATH in paths:
+        paths = None
+    _mutation_log.append((_mutation_epoch, list(paths) if paths is not None else None))
+
+
+def mutations_since(epoch: Optional[int]) -> Optional[List[str]]:
+    """Rutas escritas despues de `epoch`; None si no se sabe (barrera o registro vencido)."""
+    if epoch is None:
+        return None
+    if epoch == _mutation_epoch:
+        return []
+    entries = [e for e in list(_mutation_log) if e[0] > epoch]
+    if not entries or entries[0][0] != epoch + 1:
+        return None
+    paths: List[str] = []
+    for _epoch, written in entries:
+        if written is None:
+            return None
+        paths.extend(written)
+    return paths
+
+
+# Procesos que escriben en disco por fuera de las herramientas (run_command
+# en background: dev servers, watchers, builds). No pasan por el registro
+# de mutaciones, asi que lo leido mientras corren solo es confiable si se
+# valida archivo por archivo.
+_external_writers = 0
+_external_last_end = 0.0
+_external_lock = threading.Lock()
+
+
+def external_writer_started():
+    global _external_writers
+    with _external_lock:
+        _external_writers += 1
+
+
+def external_writer_finished():
+    global _external_writers, _external_last_end
+    with _external_lock:
+        _external_writers = max(0, _external_writers - 1)
+        _external_last_end = time.monotonic()
+
+
+def external_writes_since(since: float) -> bool:
+    """True si un proceso externo pudo escribir despues de `since` (time.monotonic())."""
+    with _external_lock:
+        return _external_writers > 0 or _external_last_end >= since
+
+
+def _norm_path(path: str) -> str:
+    return os.path.normcase(path.rstrip("/\\")) if path != ANY_PATH else path
+
+
+def paths_overlap(a: str, b: str) -> bool:
+    """True si las rutas son la misma o una contiene a la otra."""
+    if a == ANY_PATH or b == ANY_PATH:
+        return True
+    a, b = _norm_path(a), _norm_path(b)
+    if a == b:
+        return True
+    return a.startswith(b + os.sep) or b.startswith(a + os.sep)
+
 
 class BaseTool(ABC):
+    # True si la herramienta no modifica nada (archivos, procesos, estado):
+    # puede ejecutarse de forma anticipada o concurrente sin riesgo
+    read_only: bool = False
+    # Argumentos que contienen las rutas que toca una llamada. El scheduler
+    # de tool calls serializa llamadas que se pisan en alguna ruta si al
+    # menos una escribe. Un tool mutante sin path_args es una barrera.
+    path_args: Tuple[str, ...] = ()
+
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
@@ -17,4 +116,27 @@ class BaseTool(ABC):
     @abstractmethod
     async def execute(self, **kwargs) -> Any:
         """Ejecuta la herramienta con los argumentos dados"""
-        pass
\ No newline at end of file
+        pass
+
+    def resolve_access_path(self, raw: str) -> str:
+        """Ruta absoluta de un argumento, resuelta igual que SecurePath."""
+        from ..security.sandbox import SecurePath
+        allowed = [Path(p).expanduser().resolve() for p in getattr(self, "allowed_paths", None) or []]
+        try:
+            return str(SecurePath(raw, allowed).resolved_path)
+        except Exception:
+            return os.path.abspath(os.path.expanduser(raw))
+
+    def path_access(self, arguments: Dict[str, Any]) -> Optional[Tuple[List[str], List[str]]]:
+        """Rutas (leidas, escritas) por una llamada con estos argumentos.
+
+        None significa que la llamada puede afectar cualquier cosa
+        (comandos, memoria, config): se ejecuta sin nada en paralelo.
+        """
+        paths = [self.resolve_access_path(str(arguments[a]))
+                 for a in self.path_args if arguments.get(a)]
+        if self.read_only:
+            return paths or [ANY_PATH], []
+        if not paths:
+            return None
+        return [], paths
@@ -0,0 +1,117 @@
+"""Seen-file ledger: answer repeat file reads with "unchanged" or a diff.
+
+In long chat_in_session conversations the model re-reads files it
+already has in context. Every re-read pushes the whole file (up to
+120K chars per tool result) through the web session again, growing
+both the request and the server-side context of every later turn.
+
+The ledger remembers, per session, the content hash of each file view
+the model was sent (SessionStore.record_seen). A repeat read of the
+same view then returns:
+    - "unchanged since message N" when the hash matches
+    - a unified diff against the recorded version when it is smaller
+      than MAX_DIFF_RATIO of the new text
+    - the full text otherwise (and that becomes the recorded version)
+
+A "view" is the path plus any range arguments (max_lines, offsets...),
+so a partial read is never diffed against a full one. Passing
+full=true in the tool call always returns the complete text.
+
+Each entry also records the DeepSeek chat_session_id that received the
+text. Stall and empty-response retries move the conversation to a new
+chat that has never seen it, so an entry from another chat counts as
+unseen.
+
+Usage (inside the tool loop, results in call order):
+    result_str = apply_seen_ledger(store, session_name, mcp_server, call, result_str,
+                                   chat_session_id=web_session._chat_session_id)
+"""
+
+import difflib
+import os
+from typing import Any, Dict, Optional
+
+from .session_store import SessionStore, content_hash
+
+# Tools whose results are file contents tracked by the ledger
+LEDGER_TOOLS = {"read_file"}
+
+# Opt-out argument: the model really needs the complete text again
+FULL_ARG = "full"
+
+# Arguments that do not change which part of the file is shown
+_NON_VIEW_ARGS = {"path", "encoding", FULL_ARG}
+
+# A diff bigger than this fraction of the new text is not worth it
+MAX_DIFF_RATIO = 0.5
+
+
+def _truthy(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "si")
+    return bool(value)
+
+
+def ledger_key(mcp_server, call: Dict[str, Any]) -> Optional[str]:
+    """Ledger key of a tool call (resolved path + view), or None if not tracked."""
+    if call.get("tool") not in LEDGER_TOOLS:
+        return None
+    args = call.get("args") or {}
+    raw = args.get("path")
+    if not raw:
+        return None
+    tool = mcp_server.tools.get(call["tool"]) if mcp_server else None
+    if tool is not None:
+        path = tool.resolve_access_path(str(raw))
+    else:
+        path = os.path.abspath(os.path.expanduser(str(raw)))
+    view = ",".join(f"{k}={args[k]}" for k in sorted(args)
+                    if k not in _NON_VIEW_ARGS and args[k] is not None)
+    return f"{path}|{view}" if view else path
+
+
+def _unified_diff(old: str, new: str, path: str) -> str:
+    return "".join(difflib.unified_diff(
+        old.splitlines(keepends=True), new.splitlines(keepends=True),
+        fromfile=f"a/{os.path.basename(path)}", tofile=f"b/{os.path.basename(path)}",
+    ))
+
+
+def apply_seen_ledger(store: SessionStore, session_name: str, mcp_server,
+                      call: Dict[str, Any], result_str: str,
+                      chat_session_id: Optional[str] = None) -> str:
+    """Text to send the model for a tool result, deduplicated against the ledger.
+
+    Records the version actually sent in full. Untracked tools, errors
+    and full=true calls pass through unchanged. chat_session_id is the
+    chat the result goes to; entries recorded in another chat are ignored.
+    """
+    key = ledger_key(mcp_server, call)
+    if key is None or result_str.startswith("Error"):
+        return result_str
+    path = key.split("|", 1)[0]
+    args = call.get("args") or {}
+    previous = store.get_seen(session_name, key)
+    if previous and previous.get("chat") != chat_session_id:
+        previous = None  # the current chat never saw that version
+
+    if previous and not _truthy(args.get(FULL_ARG)):
+        if previous["hash"] == content_hash(result_str):
+            return (
+                f"[{path} sin cambios desde el mensaje {previous['message']}: "
+                f"ya esta en el contexto de esta sesion. "
+                f"Usa {FULL_ARG}=true solo si necesitas el texto completo de nuevo.]"
+            )
+        old = store.load_seen(previous["hash"])
+        if old is not None:
+            diff = _unified_diff(old, result_str, path)
+            if diff and len(diff) < len(result_str) * MAX_DIFF_RATIO:
+                store.record_seen(session_name, key, result_str, chat_session_id)
+                return (
+                    f"[{path} cambio desde el mensaje {previous['message']}. "
+                    f"Diff unificado contra esa version "
+                    f"({FULL_ARG}=true para el texto completo):]\n{diff}"
+                )
+
+    store.record_seen(session_name, key, result_str, chat_session_id)
+    return result_str
@@ -12,9 +12,10 @@ cross-contamination between sessions:
 """
 
 import re
-import math
 from typing import Tuple, Optional
 
+from ..tokenization import count_tokens
+
 VALID_MODES = {"chat", "oneshot", "delegate", "converse", "quantum", "multi-step"}
 
 
@@ -73,7 +74,5 @@ def slugify(text: str, max_len: int = 30) -> str:
 
 
 def estimate_tokens(text: str) -> int:
-    """Estimate token count for a text string (~3.5 chars per token)."""
-    if not text:
-        return 0
-    return math.ceil(len(text) / 3.5)
+    """Token count for a text string (shared BPE tokenizer, cached)."""
+    return count_tokens(text)
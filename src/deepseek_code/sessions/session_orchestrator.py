@@ -177,7 +177,8 @@ class SessionOrchestrator:
                 return []
 
         try:
-            from ..skills.skill_injector import detect_relevant_skills, load_skill_contents
+            from ..skills.skill_injector import score_relevant_skills, pack_skill_contents
+            from ..skills.skill_constants import ADAPTIVE_BUDGETS
             from ..client.task_classifier import classify_task, TaskLevel
 
             # Respetar clasificacion: no inyectar skills para chat/simple
@@ -185,21 +186,26 @@ class SessionOrchestrator:
             if level <= TaskLevel.SIMPLE:
                 return []
             max_sk = 2 if level == TaskLevel.CODE_SIMPLE else 5
-            relevant = detect_relevant_skills(task_text, max_skills=max_sk)
+            relevant = [
+                (name, score) for name, score in score_relevant_skills(task_text, max_skills=max_sk)
+                if f"skill:{name}" not in already
+            ]
             if not relevant:
                 return []
 
-            loaded = load_skill_contents(self.skills_dir, relevant)
-            injections = []
-            for name, content, tokens in loaded:
-                ctx_id = f"skill:{name}"
-                if ctx_id not in already:
-                    injections.append({
-                        "type": "skill",
-                        "name": name,
-                        "content": content,
-                    })
-            return injections
+            # Pick the tier of each skill (full / no-examples / outline) that
+            # maximises total relevance within the level's domain budget
+            budget = ADAPTIVE_BUDGETS.get(level.name.lower(), ADAPTIVE_BUDGETS["delegation"])
+            return [
+                {
+                    "type": "skill",
+                    "name": tier.name,
+                    "content": tier.content,
+                    "tier": tier.tier,
+                    "tokens": tier.tokens,
+                }
+                for tier in pack_skill_contents(self.skills_dir, relevant, budget["domain"])
+            ]
         except Exception as e:
             print(f"  [orchestrator] Error detecting skills: {e}", file=sys.stderr)
             return []
@@ -9,8 +9,21 @@ Usage:
     session = store.create("auth-module", "uuid-from-deepseek")
     store.update("auth-module", parent_message_id="msg-uuid")
     session = store.get("auth-module")  # Retrieves with state
+
+Primed ("golden") sessions: a session that already completed Phase 1
+(system prompt + tools) and its skill injections is registered under
+primed_key(). New named sessions with the same prompt, tool schema and
+skill set branch from its acknowledged message id (store.fork) instead
+of re-sending the whole prompt.
+
+Seen-file ledger: each session records the content hash of every file
+version the model has read (ChatSession.seen_files). The text itself is
+kept once per hash in a content-addressed directory next to the store
+file, so repeat reads can be answered with "unchanged" or a diff (see
+seen_ledger.py).
 """
 
+import hashlib
 import json
 import os
 import time
@@ -41,6 +54,39 @@ class ChatSession:
     system_prompt_tokens: int = 0         # Estimated tokens of system prompt sent
     total_injected_tokens: int = 0        # Running total of context tokens injected
 
+    # --- Seen-file ledger: ledger key -> {"hash": ..., "message": N} ---
+    seen_files: Dict[str, Dict] = field(default_factory=dict)
+
+
+def content_hash(text: str) -> str:
+    """Short stable hash of a prompt or serialized schema."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def primed_key(prompt_hash: str, tools_hash: str, contexts: List[str]) -> str:
+    """Key of a primed session: (system prompt, tool schema, skill set)."""
+    return content_hash("|".join([prompt_hash, tools_hash] + sorted(contexts)))
+
+
+@dataclass
+class PrimedSession:
+    """A DeepSeek chat thread that already acknowledged Phase 1 (+ skills).
+
+    Forks continue from ack_message_id inside the same chat_session_id,
+    the same way a regular session continues from its last message.
+    """
+    key: str
+    chat_session_id: str
+    ack_message_id: Optional[Union[str, int]]
+    mode: str
+    prompt_hash: str
+    tools_hash: str
+    contexts: List[str] = field(default_factory=list)
+    system_prompt_tokens: int = 0
+    injected_tokens: int = 0
+    created_at: float = field(default_factory=time.time)
+    forks: int = 0
+
 
 class SessionStore:
     """Manages multiple persistent chat sessions on disk.
@@ -52,6 +98,7 @@ class SessionStore:
     def __init__(self, store_path: str):
         self.store_path = store_path
         self.sessions: Dict[str, ChatSession] = {}
+        self.primed: Dict[str, PrimedSession] = {}
         self._load()
 
     def _load(self):
@@ -63,33 +110,162 @@ class SessionStore:
                 data = json.load(f)
             for name, sdata in data.get("sessions", {}).items():
                 self.sessions[name] = ChatSession(**sdata)
+            for key, pdata in data.get("primed", {}).items():
+                self.primed[key] = PrimedSession(**pdata)
         except (json.JSONDecodeError, KeyError, TypeError):
             self.sessions = {}
+            self.primed = {}
 
     def save(self):
         """Persist sessions to disk."""
         os.makedirs(os.path.dirname(os.path.abspath(self.store_path)), exist_ok=True)
-        data = {"sessions": {n: asdict(s) for n, s in self.sessions.items()}}
+        data = {
+            "sessions": {n: asdict(s) for n, s in self.sessions.items()},
+            "primed": {k: asdict(p) for k, p in self.primed.items()},
+        }
         with open(self.store_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
 
+    @staticmethod
+    def mode_for(name: str) -> str:
+        """Mode namespace from a session name prefix (e.g. 'delegate:auth' -> 'delegate')."""
+        if ":" in name:
+            prefix = name.split(":")[0]
+            valid_modes = {"chat", "oneshot", "delegate", "converse", "quantum", "multi-step"}
+            if prefix in valid_modes:
+                return prefix
+        return "chat"
+
     def create(self, name: str, chat_session_id: str) -> ChatSession:
         """Create a new named session.
 
         Auto-detects mode from namespace prefix (e.g. 'delegate:auth' -> mode='delegate').
         """
-        # Extract mode from namespace prefix
-        mode = "chat"
-        if ":" in name:
-            prefix = name.split(":")[0]
-            valid_modes = {"chat", "oneshot", "delegate", "converse", "quantum", "multi-step"}
-            if prefix in valid_modes:
-                mode = prefix
-        session = ChatSession(name=name, chat_session_id=chat_session_id, mode=mode)
+        session = ChatSession(name=name, chat_session_id=chat_session_id,
+                              mode=self.mode_for(name))
         self.sessions[name] = session
         self.save()
         return session
 
+    def get_primed(self, key: str) -> Optional[PrimedSession]:
+        """Primed session for this key, if one is registered and acknowledged."""
+        primed = self.primed.get(key)
+        if primed and primed.ack_message_id is not None:
+            return primed
+        return None
+
+    def register_primed(self, primed: PrimedSession):
+        """Register a primed session, replacing stale ones of the same lineage.
+
+        An entry with the same mode and skill set but a different prompt or
+        tool schema hash was primed with an outdated prompt: it is dropped.
+        """
+        contexts = sorted(primed.contexts)
+        for key, other in list(self.primed.items()):
+            if (other.mode == primed.mode and sorted(other.contexts) == contexts
+                    and (other.prompt_hash, other.tools_hash)
+                    != (primed.prompt_hash, primed.tools_hash)):
+                del self.primed[key]
+        self.primed[primed.key] = primed
+        self.save()
+
+    def invalidate_primed(self, prompt_hash: Optional[str] = None,
+                          tools_hash: Optional[str] = None) -> int:
+        """Drop primed sessions built from a given prompt and/or tool schema.
+
+        Without arguments drops all of them. Returns the number removed.
+        """
+        removed = [
+            key for key, p in self.primed.items()
+            if (prompt_hash is None or p.prompt_hash == prompt_hash)
+            and (tools_hash is None or p.tools_hash == tools_hash)
+        ]
+        for key in removed:
+            del self.primed[key]
+        if removed:
+            self.save()
+        return len(removed)
+
+    def fork(self, name: str, primed: PrimedSession) -> ChatSession:
+        """Create a named session branching from a primed session's ack message.
+
+        The new session starts with Phase 1 done and the primed contexts
+        already injected, so only new contexts and the task are sent.
+        """
+        session = ChatSession(
+            name=name,
+            chat_session_id=primed.chat_session_id,
+            parent_message_id=primed.ack_message_id,
+            system_prompt_sent=True,
+            mode=self.mode_for(name),
+            injected_contexts=list(primed.contexts),
+            system_prompt_tokens=primed.system_prompt_tokens,
+            total_injected_tokens=primed.injected_tokens,
+        )
+        primed.forks += 1
+        self.sessions[name] = session
+        self.save()
+        return session
+
+    @property
+    def seen_dir(self) -> str:
+        """Directory holding the file versions referenced by seen-file ledgers."""
+        return os.path.join(os.path.dirname(os.path.abspath(self.store_path)), "seen_files")
+
+    def record_seen(self, name: str, key: str, content: str,
+                    chat_session_id: Optional[str] = None) -> Optional[str]:
+        """Record that a session's model has seen this version of a file.
+
+        Stores the text under its hash (once for all sessions) and the
+        current message number and the DeepSeek chat that received it in
+        the session ledger. The caller saves
+        (usually via the update() that follows every tool step).
+        Returns the hash, or None if the session does not exist.
+        """
+        session = self.sessions.get(name)
+        if not session:
+            return None
+        digest = content_hash(content)
+        blob = os.path.join(self.seen_dir, digest + ".txt")
+        if not os.path.exists(blob):
+            os.makedirs(self.seen_dir, exist_ok=True)
+            tmp = f"{blob}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8', newline='') as f:
+                f.write(content)
+            os.replace(tmp, blob)
+        session.seen_files[key] = {"hash": digest, "message": session.message_count,
+                                   "chat": chat_session_id}
+        return digest
+
+    def get_seen(self, name: str, key: str) -> Optional[Dict]:
+        """Ledger entry ({"hash", "message", "chat"}) for a file already seen in a session."""
+        session = self.sessions.get(name)
+        return session.seen_files.get(key) if session else None
+
+    def load_seen(self, digest: str) -> Optional[str]:
+        """Text of a recorded file version, or None if it was pruned."""
+        try:
+            with open(os.path.join(self.seen_dir, digest + ".txt"), 'r',
+                      encoding='utf-8', newline='') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _prune_seen(self):
+        """Delete file versions no active session's ledger references."""
+        if not os.path.isdir(self.seen_dir):
+            return
+        live = {
+            entry["hash"] for s in self.sessions.values() if s.status == "active"
+            for entry in s.seen_files.values()
+        }
+        for fname in os.listdir(self.seen_dir):
+            if fname.endswith(".txt") and fname[:-4] not in live:
+                try:
+                    os.remove(os.path.join(self.seen_dir, fname))
+                except OSError:
+                    pass
+
     def get(self, name: str) -> Optional[ChatSession]:
         """Get an active session by name. Returns None if not found or inactive."""
         session = self.sessions.get(name)
@@ -117,21 +293,25 @@ class SessionStore:
         return active
 
     def update(self, name: str, parent_message_id: Optional[Union[str, int]] = None,
-               add_context: Optional[str] = None):
+               add_context: Optional[str] = None,
+               add_contexts: Optional[List[str]] = None):
         """Update session state after a message exchange.
 
         Args:
             name: Session name
             parent_message_id: New parent message ID for chaining
             add_context: Context identifier to add to injected list (e.g. "skill:design")
+            add_contexts: Several context identifiers acknowledged by one message
+                (batched injection); recorded in order with a single save
         """
         session = self.sessions.get(name)
         if not session:
             return
         if parent_message_id is not None:
             session.parent_message_id = parent_message_id
-        if add_context and add_context not in session.injected_contexts:
-            session.injected_contexts.append(add_context)
+        for ctx_id in ([add_context] if add_context else []) + list(add_contexts or []):
+            if ctx_id not in session.injected_contexts:
+                session.injected_contexts.append(ctx_id)
         session.message_count += 1
         session.last_active = time.time()
         session.system_prompt_sent = True
@@ -164,8 +344,13 @@ class SessionStore:
             if session.status == "active" and session.last_active < cutoff:
                 session.status = "expired"
                 changed = True
+        # Primed threads age out too: DeepSeek may have dropped the chat
+        for key in [k for k, p in self.primed.items() if p.created_at < cutoff]:
+            del self.primed[key]
+            changed = True
         if changed:
             self.save()
+            self._prune_seen()
 
     def list_by_mode(self, mode: str) -> List[ChatSession]:
         """List active sessions filtered by mode namespace."""
@@ -1,11 +1,21 @@
-"""Carga y valida definiciones de skills desde archivos YAML y .skill (ZIP)."""
+"""Carga y valida definiciones de skills desde archivos YAML y .skill (ZIP).
 
+get_skill_loader() da un SkillLoader compartido por proceso para cada
+directorio: su cache en memoria se valida con (mtime_ns, tamaño) de cada
+archivo, y los .skill se leen a traves de un SkillIndex persistente
+(ver skill_index.py), asi que ni las delegaciones repetidas ni el
+catalogo vuelven a abrir los ZIP.
+"""
+
+import os
+import threading
 import yaml
-import zipfile
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
 
+from .skill_index import SkillIndex, file_stamp
+
 
 @dataclass
 class SkillParameter:
@@ -46,61 +56,88 @@ class KnowledgeSkill:
     description: str
     content: str  # Markdown completo
     skill_type: str = "knowledge"
+    tokens: Optional[int] = None  # tokens de content (del indice, si se conocen)
+
+
+@dataclass
+class SkillMeta:
+    """Metadatos de una skill sin su contenido (para el catalogo)."""
+    name: str
+    description: str
+    skill_type: str  # "knowledge" o "workflow"
+    tokens: Optional[int] = None
 
 
 class SkillLoader:
     """Carga skills desde archivos YAML y .skill (ZIP).
 
-    Incluye cache interno para evitar recargar skills frecuentes (ej: core).
+    Cache en memoria validado por (mtime_ns, tamaño): un archivo editado
+    se recarga. Los .skill pasan por un SkillIndex (persistente por
+    defecto; index=False lo desactiva y cada carga lee el ZIP).
     """
 
-    def __init__(self, skills_dir: str):
+    def __init__(self, skills_dir: str, index: Union[SkillIndex, bool, None] = None):
         self.skills_dir = Path(skills_dir)
-        self._cache: Dict[str, 'KnowledgeSkill'] = {}
+        if index is None or index is True:
+            index = SkillIndex(str(skills_dir))
+        elif index is False:
+            index = SkillIndex(str(skills_dir), persistent=False)
+        self.index = index
+        self._cache: Dict[str, Tuple[List[int], object]] = {}
+        self._lock = threading.Lock()
+
+    def _files(self) -> List[Path]:
+        if not self.skills_dir.exists():
+            return []
+        return (sorted(self.skills_dir.glob("*.yaml")) + sorted(self.skills_dir.glob("*.yml"))
+                + sorted(self.skills_dir.glob("*.skill")))
 
     def load_all(self) -> dict:
         """Carga todos los skills del directorio (YAML workflows + .skill knowledge)."""
         skills = {}
-        if not self.skills_dir.exists():
-            return skills
-        for f in self.skills_dir.glob("*.yaml"):
-            try:
-                skill = self._load_file(f)
-                skills[skill.name] = skill
-            except Exception as e:
-                print(f"Error cargando skill {f.name}: {e}")
-        for f in self.skills_dir.glob("*.yml"):
+        for f in self._files():
             try:
-                skill = self._load_file(f)
-                if skill.name not in skills:
+                skill = self._load_path(f)
+                if skill and skill.name not in skills:
                     skills[skill.name] = skill
             except Exception as e:
                 print(f"Error cargando skill {f.name}: {e}")
-        for f in self.skills_dir.glob("*.skill"):
+        self.index.save()
+        return skills
+
+    def load_metadata(self) -> Dict[str, SkillMeta]:
+        """Nombre y descripcion de todos los skills sin cargar su contenido.
+
+        Salen del indice; un .skill nuevo o modificado se lee solo hasta el
+        final de su frontmatter y un YAML modificado se parsea y valida.
+        """
+        metas: Dict[str, SkillMeta] = {}
+        for f in self._files():
             try:
-                skill = self._load_skill_package(f)
-                if skill and skill.name not in skills:
-                    skills[skill.name] = skill
+                if f.suffix == ".skill":
+                    entry = self.index.metadata(f.stem, str(f), save=False)
+                    if entry is None:
+                        continue
+                    meta = SkillMeta(entry["name"], entry["description"], "knowledge",
+                                     entry["tokens"])
+                else:
+                    entry = self.index.workflow_metadata(str(f), lambda _: self._load_path(f))
+                    if entry is None:
+                        continue
+                    meta = SkillMeta(entry["name"], entry["description"], "workflow")
+                if meta.name not in metas:
+                    metas[meta.name] = meta
             except Exception as e:
-                print(f"Error cargando skill package {f.name}: {e}")
-        return skills
+                print(f"Error cargando skill {f.name}: {e}")
+        self.index.save()
+        return metas
 
     def load_one(self, name: str):
-        """Carga un skill especifico por nombre (con cache para .skill)."""
-        # Cache hit para knowledge skills
-        if name in self._cache:
-            return self._cache[name]
-        for ext in (".yaml", ".yml"):
+        """Carga un skill especifico por nombre (con cache validado por mtime)."""
+        for ext in (".yaml", ".yml", ".skill"):
             path = self.skills_dir / f"{name}{ext}"
             if path.exists():
-                return self._load_file(path)
-        # Buscar como .skill package
-        path = self.skills_dir / f"{name}.skill"
-        if path.exists():
-            skill = self._load_skill_package(path)
-            if skill:
-                self._cache[name] = skill
-            return skill
+                return self._load_path(path)
         return None
 
     def load_multiple(self, names: List[str]) -> List['KnowledgeSkill']:
@@ -112,37 +149,35 @@ class SkillLoader:
                 results.append(skill)
         return results
 
+    def _load_path(self, path: Path):
+        stamp = file_stamp(str(path))
+        if stamp is None:
+            return None
+        key = str(path)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+        if path.suffix == ".skill":
+            skill = self._load_skill_package(path)
+        else:
+            skill = self._load_file(path)
+        if skill is not None:
+            with self._lock:
+                self._cache[key] = (stamp, skill)
+        return skill
+
     def _load_skill_package(self, path: Path) -> Optional[KnowledgeSkill]:
-        """Carga un archivo .skill (ZIP con SKILL.md dentro)."""
-        if not zipfile.is_zipfile(path):
+        """Carga un archivo .skill (ZIP con SKILL.md dentro) via el indice."""
+        loaded = self.index.body(path.stem, str(path))
+        if loaded is None:
             return None
-        with zipfile.ZipFile(path, 'r') as z:
-            # Buscar SKILL.md dentro del ZIP
-            skill_md = None
-            for name in z.namelist():
-                if name.endswith('SKILL.md'):
-                    skill_md = name
-                    break
-            if not skill_md:
-                return None
-            with z.open(skill_md) as f:
-                content = f.read().decode('utf-8')
-        # Parsear frontmatter YAML del markdown
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                frontmatter = yaml.safe_load(parts[1])
-                body = parts[2].strip()
-                return KnowledgeSkill(
-                    name=frontmatter.get('name', path.stem),
-                    description=frontmatter.get('description', ''),
-                    content=body
-                )
-        # Sin frontmatter, usar nombre del archivo
+        entry, body = loaded
         return KnowledgeSkill(
-            name=path.stem,
-            description='',
-            content=content
+            name=entry["name"],
+            description=entry["description"],
+            content=body,
+            tokens=entry["tokens"],
         )
 
     def _load_file(self, path: Path) -> SkillDefinition:
@@ -202,3 +237,23 @@ class SkillLoader:
             version=data.get("version", "1.0"),
             author=data.get("author", "")
         )
+
+
+_loaders: Dict[str, SkillLoader] = {}
+_loaders_lock = threading.Lock()
+
+
+def get_skill_loader(skills_dir: str) -> SkillLoader:
+    """SkillLoader compartido por proceso para un directorio de skills."""
+    key = os.path.normcase(os.path.abspath(str(skills_dir)))
+    with _loaders_lock:
+        loader = _loaders.get(key)
+        if loader is None:
+            loader = _loaders[key] = SkillLoader(skills_dir)
+        return loader
+
+
+def reset_skill_loaders():
+    """Olvida los loaders compartidos (tests, benchmarks)."""
+    with _loaders_lock:
+        _loaders.clear()
@@ -12,7 +12,8 @@ Flujo:
 
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from .loader import SkillLoader, KnowledgeSkill, SkillDefinition
+from .loader import get_skill_loader
+from .skill_injector import pack_skill_contents
 
 
 # Cache global: se genera una vez y se reutiliza toda la sesion
@@ -23,19 +24,21 @@ _catalog_entries: Optional[Dict[str, str]] = None  # name -> description
 def _build_entries(skills_dir: str) -> Dict[str, str]:
     """Extrae nombre+descripcion de todas las skills sin cargar contenido.
 
+    Solo lee metadatos: del indice de skills o, si un paquete es nuevo,
+    unicamente su frontmatter (ver SkillLoader.load_metadata).
+
     Returns:
         Dict {nombre: descripcion} de todas las skills disponibles
     """
-    loader = SkillLoader(skills_dir)
-    all_skills = loader.load_all()
+    metas = get_skill_loader(skills_dir).load_metadata()
     entries = {}
 
-    for name, skill in sorted(all_skills.items()):
-        if isinstance(skill, KnowledgeSkill):
-            desc = skill.description or "(knowledge skill)"
+    for name, meta in sorted(metas.items()):
+        if meta.skill_type == "knowledge":
+            desc = meta.description or "(knowledge skill)"
             entries[name] = desc.strip().replace("\n", " ")[:500]
-        elif isinstance(skill, SkillDefinition):
-            desc = skill.description or "(workflow)"
+        else:
+            desc = meta.description or "(workflow)"
             entries[name] = f"[workflow] {desc.strip()[:500]}"
 
     return entries
@@ -91,8 +94,9 @@ def load_requested_skills(
 ) -> Tuple[str, int, List[str]]:
     """Carga solo las skills que DeepSeek pidio.
 
-    Respeta un presupuesto de tokens. Si una skill excede el
-    presupuesto restante, se omite (sin truncar skills individuales).
+    Respeta un presupuesto de tokens: el orden del pedido se toma como
+    relevancia y cada skill entra en el nivel (completa, sin ejemplos o
+    esquema) que maximiza la relevancia total (ver skill_packer).
 
     Args:
         skills_dir: Directorio de skills
@@ -105,30 +109,18 @@ def load_requested_skills(
     if not requested_names:
         return "", 0, []
 
-    loader = SkillLoader(skills_dir)
-    parts = ["== SKILLS SOLICITADAS =="]
     total_tokens = 10  # overhead del header
-    loaded_names = []
-
-    for name in requested_names:
-        skill = loader.load_one(name)
-        if not skill or not isinstance(skill, KnowledgeSkill):
-            continue
-
-        skill_tokens = len(skill.content) // 4
-        if total_tokens + skill_tokens > token_budget:
-            # No truncar — simplemente omitir
-            continue
-
-        parts.append(f"\n--- {name} ---\n{skill.content}\n")
-        total_tokens += skill_tokens
-        loaded_names.append(name)
-
-    if len(loaded_names) == 0:
+    picked = pack_skill_contents(skills_dir, requested_names, token_budget - total_tokens)
+    if not picked:
         return "", 0, []
 
+    parts = ["== SKILLS SOLICITADAS =="]
+    for tier in picked:
+        parts.append(f"\n--- {tier.name} ---\n{tier.content}\n")
+        total_tokens += tier.tokens
+
     parts.append("== FIN SKILLS ==")
-    return "\n".join(parts), total_tokens, loaded_names
+    return "\n".join(parts), total_tokens, [tier.name for tier in picked]
 
 
 def invalidate_catalog_cache():
@@ -0,0 +1,262 @@
+"""Indice persistente de paquetes .skill ya extraidos.
+
+Cada delegacion (un proceso CLI nuevo) abria los ZIP de las skills
+relevantes, recorria namelist(), descomprimia SKILL.md y volvia a
+parsear el frontmatter YAML; el catalogo de negociacion descomprimia
+los 51 paquetes solo para leer sus descripciones.
+
+SkillIndex guarda por paquete, en APPDATA/DeepSeek-Code/skill_index/
+<hash del directorio>/:
+
+    index.json   nombre, descripcion, tokens del cuerpo y offset/largo
+                 (en bytes) del cuerpo dentro del SKILL.md extraido,
+                 validados por (mtime_ns, tamaño) del .skill; tambien
+                 nombre y descripcion de los workflows YAML
+    <skill>.md   el SKILL.md extraido tal cual
+
+Con el indice al dia, cargar una skill es un stat del .skill y leer el
+tramo [offset, offset+largo) del .md extraido: no se abre el ZIP ni se
+parsea YAML. Las entradas que solo necesitan metadatos (catalogo) se
+llenan leyendo unicamente el frontmatter del ZIP; el cuerpo se extrae
+la primera vez que alguien lo pide.
+
+Si el directorio de datos no se puede escribir el indice funciona igual
+en memoria (cada proceso vuelve a leer los ZIP).
+"""
+
+import codecs
+import json
+import os
+import threading
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from ..serena.project_files import index_path
+from ..tokenization import count_tokens, get_tokenizer
+
+INDEX_VERSION = 1
+# Bytes que se descomprimen por vez al buscar el cierre del frontmatter
+FRONTMATTER_CHUNK = 4096
+
+
+def file_stamp(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _skill_md_name(zf: zipfile.ZipFile) -> Optional[str]:
+    for name in zf.namelist():
+        if name.endswith('SKILL.md'):
+            return name
+    return None
+
+
+def parse_frontmatter(text: str) -> Tuple[dict, Optional[str]]:
+    """(frontmatter, resto) de un SKILL.md; ({}, None) si no tiene frontmatter.
+
+    Mismo criterio que el loader original: empieza con '---' y el
+    frontmatter llega hasta el siguiente '---'.
+    """
+    if not text.startswith('---'):
+        return {}, None
+    parts = text.split('---', 2)
+    if len(parts) < 3:
+        return {}, None
+    data = yaml.safe_load(parts[1])
+    return (data if isinstance(data, dict) else {}), parts[2]
+
+
+def read_frontmatter(path: str) -> Optional[dict]:
+    """Frontmatter del SKILL.md de un .skill descomprimiendo solo el principio."""
+    if not zipfile.is_zipfile(path):
+        return None
+    with zipfile.ZipFile(path, 'r') as z:
+        member = _skill_md_name(z)
+        if not member:
+            return None
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        text = ""
+        with z.open(member) as f:
+            while True:
+                chunk = f.read(FRONTMATTER_CHUNK)
+                text += decoder.decode(chunk, final=not chunk)
+                if not chunk or (text.startswith('---') and text.find('---', 3) != -1):
+                    break
+                if len(text) >= 3 and not text.startswith('---'):
+                    break
+    meta, _ = parse_frontmatter(text)
+    return meta
+
+
+def _body_span(raw: bytes, text: str) -> Tuple[dict, int, int]:
+    """(frontmatter, offset, largo) en bytes del cuerpo dentro de raw."""
+    meta, rest = parse_frontmatter(text)
+    if rest is None:
+        return meta, 0, len(raw)
+    body = rest.strip()
+    if not body:
+        return meta, len(raw), 0
+    start = text.index(body, len(text) - len(rest))
+    offset = len(text[:start].encode('utf-8'))
+    return meta, offset, len(body.encode('utf-8'))
+
+
+class SkillIndex:
+    """Metadatos y cuerpos extraidos de los .skill de un directorio."""
+
+    def __init__(self, skills_dir: str, index_dir: Optional[str] = None,
+                 persistent: bool = True):
+        self.skills_dir = skills_dir
+        self.index_dir = index_dir or index_path("skill_index", skills_dir, "")
+        self.persistent = persistent
+        self._lock = threading.RLock()
+        self._entries: Optional[Dict[str, dict]] = None
+        self._tokenizer = ""
+        self._dirty = False
+
+    @property
+    def index_file(self) -> str:
+        return os.path.join(self.index_dir, "index.json")
+
+    def _extracted(self, stem: str) -> str:
+        return os.path.join(self.index_dir, f"{stem}.md")
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            self._tokenizer = getattr(get_tokenizer(), "name", "")
+            self._entries = {}
+            if self.persistent:
+                try:
+                    with open(self.index_file, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if data.get("version") == INDEX_VERSION:
+                        self._entries = data.get("skills", {})
+                        if data.get("tokenizer") != self._tokenizer:
+                            # Otro tokenizador: los conteos guardados no sirven
+                            for entry in self._entries.values():
+                                entry["tokens"] = None
+                except (OSError, ValueError):
+                    pass
+        return self._entries
+
+    def save(self):
+        """Escribe index.json si hubo cambios (atomico)."""
+        with self._lock:
+            if not (self.persistent and self._dirty):
+                return
+            try:
+                os.makedirs(self.index_dir, exist_ok=True)
+                tmp = f"{self.index_file}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"version": INDEX_VERSION, "tokenizer": self._tokenizer,
+                               "skills": self._entries}, f, ensure_ascii=False)
+                os.replace(tmp, self.index_file)
+                self._dirty = False
+            except OSError:
+                pass  # sin indice en disco: el proximo proceso relee los ZIP
+
+    def metadata(self, stem: str, path: str, save: bool = True) -> Optional[dict]:
+        """Entrada del indice (name, description, tokens...) sin extraer el cuerpo."""
+        stamp = file_stamp(path)
+        if stamp is None:
+            return None
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(stem)
+            if entry is not None and entry["stamp"] == stamp:
+                return entry
+            meta = read_frontmatter(path)
+            if meta is None:
+                entries.pop(stem, None)
+                return None
+            entry = {
+                "stamp": stamp,
+                "name": meta.get('name', stem),
+                "description": meta.get('description', '') or '',
+                "tokens": None, "offset": None, "length": None,
+            }
+            entries[stem] = entry
+            self._dirty = True
+        if save:
+            self.save()
+        return entry
+
+    def workflow_metadata(self, path: str, parse) -> Optional[dict]:
+        """name/description de un workflow YAML; parse(path) solo si cambio.
+
+        parse devuelve la SkillDefinition validada (o lanza): un YAML
+        invalido nunca entra al indice.
+        """
+        stamp = file_stamp(path)
+        if stamp is None:
+            return None
+        key = f"yaml:{os.path.basename(path)}"
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is not None and entry["stamp"] == stamp:
+                return entry
+        skill = parse(path)
+        if skill is None:
+            return None
+        entry = {"stamp": stamp, "name": skill.name, "description": skill.description or ''}
+        with self._lock:
+            self._load()[key] = entry
+            self._dirty = True
+        return entry
+
+    def body(self, stem: str, path: str) -> Optional[Tuple[dict, str]]:
+        """(entrada, cuerpo markdown) del .skill; extrae del ZIP solo si hace falta."""
+        entry = self.metadata(stem, path, save=False)
+        if entry is None:
+            return None
+        with self._lock:
+            text = None
+            if entry["offset"] is not None and self.persistent:
+                text = self._read_extracted(stem, entry)
+            if text is None:
+                text = self._extract(stem, path, entry)
+            if text is not None and entry["tokens"] is None:
+                entry["tokens"] = count_tokens(text)
+                self._dirty = True
+        self.save()
+        return (entry, text) if text is not None else None
+
+    def _read_extracted(self, stem: str, entry: dict) -> Optional[str]:
+        try:
+            with open(self._extracted(stem), "rb") as f:
+                f.seek(entry["offset"])
+                data = f.read(entry["length"])
+        except OSError:
+            return None
+        if len(data) != entry["length"]:
+            return None
+        return data.decode('utf-8')
+
+    def _extract(self, stem: str, path: str, entry: dict) -> Optional[str]:
+        if not zipfile.is_zipfile(path):
+            return None
+        with zipfile.ZipFile(path, 'r') as z:
+            member = _skill_md_name(z)
+            if not member:
+                return None
+            raw = z.read(member)
+        text = raw.decode('utf-8')
+        meta, offset, length = _body_span(raw, text)
+        entry.update(name=meta.get('name', stem), description=meta.get('description', '') or '',
+                     offset=offset, length=length, tokens=None)
+        self._dirty = True
+        if self.persistent:
+            try:
+                os.makedirs(self.index_dir, exist_ok=True)
+                tmp = f"{self._extracted(stem)}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(raw)
+                os.replace(tmp, self._extracted(stem))
+            except OSError:
+                entry["offset"] = None  # no quedo extraido: no apuntar a el
+        return raw[offset:offset + length].decode('utf-8')
@@ -8,13 +8,20 @@ Sistema adaptivo con 2 modos:
 - Heuristico: keyword matching como fallback (siempre disponible)
 
 Budgets escalan con complejidad: chat=0, simple=0, code=10-40K, delegation=80K.
+Dentro del budget, skill_packer elige que skills entran y en que nivel
+(completa, sin ejemplos o solo esquema, ver skill_tiers) maximizando la
+relevancia total.
 """
 
 import re
-from typing import List, Dict, Optional, Tuple
+from dataclasses import replace
+from typing import List, Dict, Optional, Sequence, Tuple, Union
 from pathlib import Path
-from .loader import SkillLoader, KnowledgeSkill
+from ..tokenization import count_tokens, truncate_to_tokens
+from .loader import KnowledgeSkill, get_skill_loader
 from .semantic_skill_index import SemanticSkillIndex
+from .skill_packer import PackCandidate, pack_skills, rank_relevance
+from .skill_tiers import SkillTier, get_tier_cache
 from .skill_constants import (
     SKILL_KEYWORD_MAP, GAME_KEYWORDS, GAME_SKILLS, CORE_SKILLS,
     DELEGATE_TOKEN_BUDGET, INTERACTIVE_TOKEN_BUDGET,
@@ -35,8 +42,8 @@ def _normalize_text(text: str) -> str:
 
 
 def _estimate_tokens(text: str) -> int:
-    """Estima tokens de un texto (~4 chars por token)."""
-    return len(text) // 4
+    """Tokens de un texto (tokenizador BPE compartido)."""
+    return count_tokens(text)
 
 
 _semantic_index = None
@@ -86,6 +93,19 @@ def detect_relevant_skills(
 ) -> List[str]:
     """Detecta skills relevantes usando scoring hibrido TF-IDF + keywords.
 
+    Returns:
+        Lista de nombres de skills ordenados por relevancia hibrida
+    """
+    return [name for name, _ in score_relevant_skills(message, max_skills, exclude)]
+
+
+def score_relevant_skills(
+    message: str,
+    max_skills: int = 5,
+    exclude: List[str] = None
+) -> List[Tuple[str, float]]:
+    """Como detect_relevant_skills, pero con el score hibrido de cada skill.
+
     Combina ambas fuentes de scoring para evitar que TF-IDF introduzca
     falsos positivos (ej: json-canvas por queries de HTML Canvas) y para
     que el bonus de contexto de juegos siempre se aplique.
@@ -96,7 +116,7 @@ def detect_relevant_skills(
         exclude: Skills a excluir (ej: core skills ya cargados)
 
     Returns:
-        Lista de nombres de skills ordenados por relevancia hibrida
+        Lista de (nombre, score) ordenada por relevancia hibrida
     """
     exclude_set = set(exclude or [])
 
@@ -121,7 +141,7 @@ def detect_relevant_skills(
     # Filtrar por threshold y ordenar
     results = [(n, s) for n, s in combined.items() if s > _HYBRID_THRESHOLD]
     results.sort(key=lambda x: -x[1])
-    return [name for name, _ in results[:max_skills]]
+    return results[:max_skills]
 
 
 def _compute_keyword_scores(
@@ -186,25 +206,82 @@ def load_skill_contents(
     Returns:
         Lista de (nombre, contenido, tokens_estimados)
     """
-    loader = SkillLoader(skills_dir)
+    loader = get_skill_loader(skills_dir)
     results = []
     for name in skill_names:
         skill = loader.load_one(name)
         if skill and isinstance(skill, KnowledgeSkill):
-            estimated_tokens = _estimate_tokens(skill.content)
+            estimated_tokens = skill.tokens
+            if estimated_tokens is None:
+                estimated_tokens = _estimate_tokens(skill.content)
             results.append((skill.name, skill.content, estimated_tokens))
     return results
 
 
+def _skill_block(name: str, content: str) -> str:
+    return f"\n--- {name} ---\n{content}\n"
+
+
+def pack_skill_contents(
+    skills_dir: str,
+    skills: Union[Sequence[str], Sequence[Tuple[str, float]]],
+    token_budget: int,
+) -> List[SkillTier]:
+    """Elige skill y nivel (full/no-examples/outline) dentro de token_budget.
+
+    skills: nombres por relevancia o pares (nombre, score) de
+    score_relevant_skills. El budget incluye el separador de cada skill.
+    Si ni el nivel mas chico de la mas relevante cabe, se incluye ese nivel
+    recortado en un salto de linea (nivel "truncated").
+
+    Returns:
+        SkillTier elegidos, en orden de relevancia
+    """
+    scored = [s if isinstance(s, tuple) else (s, None) for s in skills]
+    ranks = rank_relevance([name for name, _ in scored])
+    cache = get_tier_cache(skills_dir)
+    candidates = []
+    originals = {}
+    for name, score in scored:
+        tiers = cache.get(name, save=False)
+        if not tiers:
+            continue
+        originals.update(((t.name, k), t) for k, t in tiers.items())
+        overhead = _estimate_tokens(_skill_block(tiers["full"].name, ""))
+        candidates.append(PackCandidate(
+            name=name,
+            relevance=score if score is not None else ranks[name],
+            tiers={k: replace(t, tokens=t.tokens + overhead) for k, t in tiers.items()},
+        ))
+    cache.save()  # una escritura para todas las skills nuevas
+    if not candidates:
+        return []
+
+    picked = pack_skills(candidates, token_budget)
+    if not picked:
+        # Ni el nivel mas chico de ninguna cabe: recortar el de la mas relevante
+        top = min(candidates[0].tiers.values(), key=lambda t: t.tokens)
+        overhead = top.tokens - _estimate_tokens(top.content)
+        remaining = token_budget - overhead
+        if remaining <= 125:
+            return []
+        content = truncate_to_tokens(top.content, remaining)
+        content = content.rsplit("\n", 1)[0] if "\n" in content else content
+        return [SkillTier(top.name, "truncated", content, _estimate_tokens(content))]
+    # Tokens reales (sin el separador sumado para la mochila)
+    return [originals[(t.name, t.tier)] for t in picked]
+
+
 def _load_skills_with_budget(
     skills_dir: str,
-    skill_names: List[str],
+    skill_names: Union[List[str], List[Tuple[str, float]]],
     token_budget: int,
     header: str = ""
 ) -> Tuple[str, int]:
     """Carga skills respetando un presupuesto de tokens.
 
-    No trunca skills individuales — respeta el budget global.
+    Elige el nivel de cada skill con pack_skill_contents: nunca corta una
+    skill a mitad de seccion salvo que ni su esquema quepa.
 
     Returns:
         (contexto_formateado, tokens_usados)
@@ -212,29 +289,16 @@ def _load_skills_with_budget(
     if not skill_names:
         return "", 0
 
-    loaded = load_skill_contents(skills_dir, skill_names)
-    if not loaded:
+    header_tokens = _estimate_tokens(header)
+    picked = pack_skill_contents(skills_dir, skill_names, token_budget - header_tokens)
+    if not picked:
         return "", 0
 
-    parts = []
-    if header:
-        parts.append(header)
-    total_tokens = _estimate_tokens(header)
-
-    for name, content, tokens in loaded:
-        if total_tokens + tokens > token_budget:
-            # Si es la primera skill y excede, incluir lo que quepa
-            if not parts or (len(parts) == 1 and header):
-                remaining_chars = (token_budget - total_tokens) * 4
-                if remaining_chars > 500:
-                    content = content[:remaining_chars]
-                    tokens = remaining_chars // 4
-                else:
-                    break
-            else:
-                break
-        parts.append(f"\n--- {name} ---\n{content}\n")
-        total_tokens += tokens
+    parts = [header] if header else []
+    total_tokens = header_tokens
+    for tier in picked:
+        parts.append(_skill_block(tier.name, tier.content))
+        total_tokens += tier.tokens
 
     return "".join(parts), total_tokens
 
@@ -267,7 +331,7 @@ def build_skills_context(
 
     # Limitar skills segun complejidad: code_simple maximo 2
     effective_max = min(max_skills, 2) if task_level == "code_simple" else max_skills
-    relevant = detect_relevant_skills(message, effective_max)
+    relevant = score_relevant_skills(message, effective_max)
     if not relevant:
         return ""
 
@@ -330,7 +394,7 @@ def build_delegate_skills_context(
             total_used += err_tokens
 
     # --- Domain Skills (por relevancia) ---
-    relevant = detect_relevant_skills(
+    relevant = score_relevant_skills(
         task_description, max_skills, exclude=CORE_SKILLS
     )
 
@@ -347,9 +411,9 @@ def build_delegate_skills_context(
     # --- Specialist overflow (si hay espacio) ---
     remaining = budget["total"] - total_used
     if remaining > 2000 and relevant:
-        extra = detect_relevant_skills(
+        extra = score_relevant_skills(
             task_description, max_skills + 5,
-            exclude=CORE_SKILLS + relevant
+            exclude=CORE_SKILLS + [name for name, _ in relevant]
         )
         if extra:
             spec_budget = min(budget.get("specialist", 20000), remaining)
@@ -0,0 +1,81 @@
+"""Seleccion de skills y niveles que maximiza la relevancia dentro del presupuesto.
+
+Cada skill candidata trae su relevancia (score de detect_relevant_skills)
+y sus niveles (skill_tiers: full, no-examples, outline) con sus tokens.
+Elegir a lo sumo un nivel por skill sin pasarse del presupuesto y
+maximizando sum(relevancia * TIER_VALUE[nivel]) es una mochila de
+eleccion multiple; con pocas skills (<= ~10) y presupuestos de decenas
+de miles de tokens se resuelve exacta por programacion dinamica sobre
+los tokens agrupados en unidades de TOKEN_UNIT (redondeando hacia
+arriba, asi que el resultado nunca se pasa del presupuesto).
+
+Antes se recorrian las skills por relevancia y se cortaba en la primera
+que no cabia: una skill grande dejaba fuera a todas las siguientes y el
+presupuesto sobrante se perdia.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+from .skill_tiers import TIER_VALUE, SkillTier
+
+# Granularidad de la tabla de la mochila (tokens por celda)
+TOKEN_UNIT = 50
+
+
+@dataclass
+class PackCandidate:
+    """Una skill candidata: relevancia y niveles disponibles."""
+    name: str
+    relevance: float
+    tiers: Dict[str, SkillTier]
+
+
+def _units(tokens: int) -> int:
+    return -(-tokens // TOKEN_UNIT)
+
+
+def pack_skills(candidates: Sequence[PackCandidate], budget: int) -> List[SkillTier]:
+    """Niveles elegidos (en el orden de los candidatos) que caben en budget tokens.
+
+    A igual valor total se prefiere la opcion que usa menos tokens.
+    """
+    capacity = budget // TOKEN_UNIT
+    if capacity <= 0 or not candidates:
+        return []
+
+    # best[c] = (valor, -unidades usadas) con capacidad c; choice[i][c] = nivel elegido
+    best: List[Tuple[float, int]] = [(0.0, 0)] * (capacity + 1)
+    choices: List[List[str]] = []
+    for cand in candidates:
+        options = [(tier, _units(t.tokens), cand.relevance * TIER_VALUE.get(tier, 0.0))
+                   for tier, t in cand.tiers.items()]
+        new_best = list(best)
+        choice = [""] * (capacity + 1)
+        for c in range(capacity + 1):
+            for tier, units, value in options:
+                if units > c:
+                    continue
+                prev_value, prev_used = best[c - units]
+                option = (prev_value + value, prev_used - units)
+                if option > new_best[c]:
+                    new_best[c] = option
+                    choice[c] = tier
+        best = new_best
+        choices.append(choice)
+
+    # Reconstruir desde la capacidad total hacia atras
+    picked: List[SkillTier] = []
+    c = capacity
+    for cand, choice in zip(reversed(candidates), reversed(choices)):
+        tier = choice[c]
+        if tier:
+            picked.append(cand.tiers[tier])
+            c -= _units(cand.tiers[tier].tokens)
+    picked.reverse()
+    return picked
+
+
+def rank_relevance(names: Sequence[str]) -> Dict[str, float]:
+    """Relevancia por posicion para listas sin score (1, 1/2, 1/3...)."""
+    return {name: 1.0 / (i + 1) for i, name in enumerate(names)}
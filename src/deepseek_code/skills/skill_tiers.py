@@ -0,0 +1,276 @@
+"""Niveles condensados de cada skill, precalculados y cacheados en disco.
+
+_load_skills_with_budget solo podia elegir entre la skill completa o
+nada (y recortar a ciegas la primera si no cabia). Cada paquete .skill
+tiene ahora tres niveles:
+
+    "full"         el SKILL.md completo
+    "no-examples"  sin las secciones de ejemplos; de cada bloque de codigo
+                   queda el primer grupo de lineas (hasta la primera linea
+                   en blanco, maximo CODE_LINES): la API queda, las
+                   variantes no
+    "outline"      solo titulos y reglas (listas, lineas con MUST/NUNCA,
+                   negritas, y los comentarios-titulo de los bloques de
+                   codigo): el esqueleto de la skill
+
+Los niveles se calculan una vez por paquete y se guardan con su conteo
+de tokens en APPDATA/DeepSeek-Code/skill_tiers/<hash del directorio>.json,
+validados por (mtime_ns, tamaño) del .skill y por el nombre del
+tokenizador (otro tokenizador invalida los conteos). Un nivel que casi no ahorra
+respecto del anterior (MIN_SAVING) no se ofrece.
+
+Precalcular todo el directorio:
+    PYTHONPATH=src python -m deepseek_code.skills.skill_tiers skills
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ..serena.project_files import index_path
+from ..tokenization import count_tokens, get_tokenizer
+from .loader import KnowledgeSkill, get_skill_loader
+
+TIERS = ("full", "no-examples", "outline")
+# Fraccion de la utilidad de una skill que conserva cada nivel
+TIER_VALUE = {"full": 1.0, "no-examples": 0.7, "outline": 0.35}
+# Un nivel se ofrece solo si ahorra al menos este % de tokens sobre el anterior
+MIN_SAVING = 0.15
+# Lineas de cada bloque de codigo que conserva "no-examples"
+CODE_LINES = 12
+CACHE_VERSION = 1
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_EXAMPLE_HEADING = re.compile(
+    r"\b(examples?|ejemplos?|samples?|demos?|usage examples?|casos? de uso|walkthrough)\b",
+    re.IGNORECASE,
+)
+_CODE_COMMENT = re.compile(r"^\s*(//|#|--|/\*|\*|<!--)")
+_RULE_LINE = re.compile(
+    r"^\s*([-*+]\s|\d+[.)]\s|\|)"
+    r"|\*\*|__"
+    r"|\b(MUST|NEVER|ALWAYS|DO NOT|DON'T|SHOULD|AVOID|IMPORTANT|NUNCA|SIEMPRE|DEBE|EVITA|IMPORTANTE)\b"
+)
+
+
+@dataclass
+class SkillTier:
+    """Un nivel de una skill: contenido listo para inyectar y sus tokens."""
+    name: str
+    tier: str
+    content: str
+    tokens: int
+
+
+def _sections(content: str) -> List[List[str]]:
+    """Parte el markdown en secciones (cada una empieza en un titulo)."""
+    sections: List[List[str]] = [[]]
+    in_code = False
+    for line in content.splitlines():
+        if _FENCE.match(line):
+            in_code = not in_code
+        elif not in_code and _HEADING.match(line):
+            sections.append([])
+        sections[-1].append(line)
+    return [s for s in sections if s]
+
+
+def _without_examples(content: str) -> str:
+    out = []
+    skip_level = None
+    for section in _sections(content):
+        heading = _HEADING.match(section[0])
+        if heading:
+            level = len(heading.group(1))
+            if skip_level is not None and level > skip_level:
+                continue  # subseccion de una seccion de ejemplos
+            skip_level = None
+            if level > 1 and _EXAMPLE_HEADING.search(heading.group(2)):
+                skip_level = level
+                continue
+        code = None  # lineas del bloque de codigo abierto
+        for line in section:
+            if _FENCE.match(line):
+                if code is None:
+                    code = []
+                    out.append(line)
+                    continue
+                kept = code
+                if "" in code:
+                    kept = code[:code.index("")]
+                if len(kept) > CODE_LINES:
+                    kept = kept[:CODE_LINES]
+                out.extend(kept)
+                if len(kept) < len(code):
+                    out.append("...")
+                out.append(line)
+                code = None
+            elif code is not None:
+                code.append(line if line.strip() else "")
+            else:
+                out.append(line)
+        if code is not None:
+            out.extend(code)  # bloque sin cerrar: se deja como estaba
+    return "\n".join(out).strip()
+
+
+def _outline(content: str) -> str:
+    out = []
+    in_code = False
+    for line in content.splitlines():
+        if _FENCE.match(line):
+            in_code = not in_code
+            continue
+        if not line.strip():
+            continue
+        if in_code:
+            if _CODE_COMMENT.match(line):
+                out.append(line.strip())
+        elif _HEADING.match(line):
+            if out:
+                out.append("")
+            out.append(line)
+        elif _RULE_LINE.search(line):
+            out.append(line)
+    return "\n".join(out).strip()
+
+
+def condense(content: str, tier: str) -> str:
+    """Contenido de la skill en el nivel pedido."""
+    if tier == "full":
+        return content
+    if tier == "no-examples":
+        return _without_examples(content)
+    if tier == "outline":
+        return _outline(content)
+    raise ValueError(f"Nivel de skill desconocido: {tier}")
+
+
+def build_tiers(name: str, content: str) -> Dict[str, SkillTier]:
+    """Calcula los niveles utiles de una skill (siempre incluye "full")."""
+    tiers = {"full": SkillTier(name, "full", content, count_tokens(content))}
+    previous = tiers["full"].tokens
+    for tier in TIERS[1:]:
+        text = condense(content, tier)
+        tokens = count_tokens(text)
+        if text and tokens <= previous * (1 - MIN_SAVING):
+            tiers[tier] = SkillTier(name, tier, text, tokens)
+            previous = tokens
+    return tiers
+
+
+class SkillTierCache:
+    """Niveles de las skills de un directorio, persistidos en un JSON."""
+
+    def __init__(self, skills_dir: str, cache_path: Optional[str] = None):
+        self.skills_dir = skills_dir
+        self.cache_path = cache_path or index_path("skill_tiers", skills_dir, ".json")
+        self._lock = threading.RLock()
+        self._entries: Optional[Dict[str, dict]] = None
+        self._tokenizer = ""
+        self._dirty = False
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            self._tokenizer = getattr(get_tokenizer(), "name", "")
+            self._entries = {}
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                # Otro tokenizador: los conteos guardados no sirven
+                if data.get("version") == CACHE_VERSION and data.get("tokenizer") == self._tokenizer:
+                    self._entries = data.get("skills", {})
+            except (OSError, ValueError):
+                pass
+        return self._entries
+
+    def save(self):
+        """Escribe el JSON si hubo niveles nuevos (atomico)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"version": CACHE_VERSION, "tokenizer": self._tokenizer,
+                               "skills": self._entries}, f,
+                              ensure_ascii=False, separators=(",", ":"))
+                os.replace(tmp, self.cache_path)
+                self._dirty = False
+            except OSError:
+                pass  # sin cache en disco: se recalcula la proxima vez
+
+    def get(self, name: str, save: bool = True) -> Optional[Dict[str, SkillTier]]:
+        """Niveles de la skill `name` (.skill); None si no es de conocimiento.
+
+        Con save=False el JSON no se reescribe: el llamador junta los
+        niveles nuevos de varias skills y llama a save() una vez.
+        """
+        path = os.path.join(self.skills_dir, f"{name}.skill")
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = [st.st_mtime_ns, st.st_size]
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(name)
+            if entry is None or entry.get("stamp") != stamp:
+                skill = get_skill_loader(self.skills_dir).load_one(name)
+                if not isinstance(skill, KnowledgeSkill):
+                    return None
+                tiers = build_tiers(skill.name, skill.content)
+                entry = {
+                    "stamp": stamp,
+                    "name": skill.name,
+                    "tiers": {t.tier: {"tokens": t.tokens, "content": t.content}
+                              for t in tiers.values()},
+                }
+                entries[name] = entry
+                self._dirty = True
+        if save:
+            self.save()
+        return {tier: SkillTier(entry["name"], tier, data["content"], data["tokens"])
+                for tier, data in entry["tiers"].items()}
+
+    def precompute(self) -> int:
+        """Calcula los niveles de todos los .skill del directorio; retorna cuantos."""
+        names = sorted(f[:-len(".skill")] for f in os.listdir(self.skills_dir)
+                       if f.endswith(".skill"))
+        done = sum(1 for name in names if self.get(name, save=False))
+        self.save()
+        return done
+
+
+_caches: Dict[str, SkillTierCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_tier_cache(skills_dir: str) -> SkillTierCache:
+    """Cache de niveles compartida por proceso para un directorio de skills."""
+    key = os.path.normcase(os.path.abspath(skills_dir))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = SkillTierCache(skills_dir)
+        return cache
+
+
+def main():
+    skills_dir = sys.argv[1] if len(sys.argv) > 1 else "skills"
+    cache = get_tier_cache(skills_dir)
+    count = cache.precompute()
+    print(f"{count} skills -> {cache.cache_path}")
+    for name in sorted(cache._load()):
+        tiers = cache._load()[name]["tiers"]
+        print(f"  {name}: " + ", ".join(f"{t}={tiers[t]['tokens']}" for t in TIERS if t in tiers))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ Respeta un budget de tokens configurable.
 
 from typing import Optional
 
+from ..tokenization import count_tokens, truncate_to_tokens
 
 # Budget de tokens para el briefing (1M context → budgets proporcionales)
 DEFAULT_TOKEN_BUDGET = 15000
@@ -15,8 +16,8 @@ MAX_TOKEN_BUDGET = 25000
 
 
 def _estimate_tokens(text: str) -> int:
-    """Estima tokens de un texto (~3.5 chars/token)."""
-    return max(1, len(text) // 4)
+    """Tokens de un texto (tokenizador BPE compartido, minimo 1)."""
+    return max(1, count_tokens(text))
 
 
 def build_briefing(
@@ -98,9 +99,8 @@ def build_briefing(
     if claude_md_content:
         remaining = budget - used_tokens
         if remaining > 200:
-            max_chars = remaining * 4  # ~4 chars/token
-            truncated = claude_md_content[:max_chars]
-            if len(claude_md_content) > max_chars:
+            truncated = truncate_to_tokens(claude_md_content, remaining)
+            if len(truncated) < len(claude_md_content):
                 truncated += "\n[... truncado ...]"
             text = f"\nDOCUMENTACION DEL PROYECTO:\n{truncated}\n"
             sections.append(text)
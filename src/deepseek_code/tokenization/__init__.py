@@ -0,0 +1,18 @@
+"""Conteo de tokens unificado (BPE offline + cache por contenido).
+
+Todas las decisiones de presupuesto (skills, briefings, chunking de
+templates, resumen del historial, sesiones web) cuentan con
+count_tokens() en vez de heuristicas len/3.5 o len//4 por modulo.
+"""
+
+from .bpe import BPETokenizer
+from .counter import (
+    CharEstimator, count_messages_tokens, count_tokens, get_tokenizer,
+    reset_tokenizer, truncate_to_tokens,
+)
+
+__all__ = [
+    "BPETokenizer", "CharEstimator",
+    "count_tokens", "count_messages_tokens", "truncate_to_tokens",
+    "get_tokenizer", "reset_tokenizer",
+]
@@ -0,0 +1,170 @@
+"""Tokenizador BPE a nivel de bytes (formato de merges de HuggingFace).
+
+El texto se parte primero en pre-tokens con PRETOKEN_PATTERN, una
+aproximacion con `re` del pre-tokenizador de DeepSeek-V3 (numeros en
+grupos de hasta 3 digitos, CJK aparte, palabras con el espacio o signo
+que las precede, signos, saltos de linea y espacios). Cada pre-token se
+codifica en UTF-8 y se le aplican los merges por rango, como en GPT-2.
+
+Los merges se leen de un JSON con la clave "merges" (lista de "a b" o
+de pares [a, b] en la representacion byte->unicode de GPT-2): sirve
+tanto el vocabulario incluido (bpe_vocab.json, ver
+scripts/train_bpe_vocab.py) como un
+tokenizer.json de HuggingFace ("model.merges").
+
+Si el JSON trae "cjk_tokens_per_char" (el vocabulario incluido, que
+no vio texto CJK) las rachas CJK se cuentan con esa proporcion en vez
+de byte a byte.
+
+Solo se cuentan tokens (no se asignan ids): es lo que necesitan los
+presupuestos de contexto. Cada pre-token distinto se resuelve una vez y
+se guarda en un cache de palabras.
+"""
+
+import json
+import math
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Letras sin digitos, '_' ni CJK (los CJK van en su propio grupo)
+_CJK = "一-龥぀-ゟ゠-ヿ"
+_LETTER = rf"[^\W\d_{_CJK}]"
+
+PRETOKEN_PATTERN = re.compile(rf"""
+      \d{{1,3}}
+    | [{_CJK}]+
+    | [^\r\n\w]?{_LETTER}+
+    | \ ?(?:[^\s\w]|_)+[\r\n]*
+    | \s*[\r\n]+
+    | \s+(?!\S)
+    | \s+
+""", re.VERBOSE)
+
+_CJK_RUN = re.compile(rf"[{_CJK}]")
+
+# Pre-tokens distintos que se recuerdan (se vacia al llenarse)
+WORD_CACHE_SIZE = 200_000
+
+
+@lru_cache(maxsize=1)
+def bytes_to_unicode() -> Dict[int, str]:
+    """Tabla byte -> caracter imprimible de GPT-2 (la de los merges HF)."""
+    printable = (list(range(ord("!"), ord("~") + 1)) + list(range(ord("¡"), ord("¬") + 1))
+                 + list(range(ord("®"), ord("ÿ") + 1)))
+    chars = printable[:]
+    extra = 0
+    for b in range(256):
+        if b not in printable:
+            printable.append(b)
+            chars.append(256 + extra)
+            extra += 1
+    return dict(zip(printable, map(chr, chars)))
+
+
+def _symbol_bytes(symbol: str, decoder: Dict[str, int]) -> bytes:
+    return bytes(decoder[ch] for ch in symbol)
+
+
+def parse_merges(raw: Iterable) -> List[Tuple[bytes, bytes]]:
+    """Merges "a b" o [a, b] (texto GPT-2) -> pares de bytes en orden de rango."""
+    decoder = {ch: b for b, ch in bytes_to_unicode().items()}
+    pairs = []
+    for item in raw:
+        if isinstance(item, str):
+            if item.startswith("#version"):
+                continue
+            left, right = item.split(" ", 1)
+        else:
+            left, right = item
+        pairs.append((_symbol_bytes(left, decoder), _symbol_bytes(right, decoder)))
+    return pairs
+
+
+def encode_merge(left: bytes, right: bytes) -> str:
+    """Par de bytes -> linea de merge "a b" (inversa de parse_merges)."""
+    table = bytes_to_unicode()
+    return "".join(table[b] for b in left) + " " + "".join(table[b] for b in right)
+
+
+class BPETokenizer:
+    """Cuenta tokens BPE de un texto."""
+
+    def __init__(self, merges: List[Tuple[bytes, bytes]], name: str = "bpe",
+                 cjk_tokens_per_char: Optional[float] = None):
+        self.name = name
+        self.cjk_tokens_per_char = cjk_tokens_per_char
+        self.ranks = {pair: rank for rank, pair in enumerate(merges)}
+        # Tokens completos: un pre-token que ya es uno cuesta 1 sin hacer merges
+        self.vocab = {bytes([b]) for b in range(256)}
+        self.vocab.update(left + right for left, right in merges)
+        self._words: Dict[str, int] = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> "BPETokenizer":
+        """Carga bpe_vocab.json o un tokenizer.json de HuggingFace."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        raw = data.get("merges")
+        if raw is None:
+            raw = (data.get("model") or {}).get("merges")
+        if raw is None:
+            raise ValueError(f"{path}: no tiene 'merges' ni 'model.merges'")
+        return cls(parse_merges(raw), name=data.get("name") or path,
+                   cjk_tokens_per_char=data.get("cjk_tokens_per_char"))
+
+    def pretokenize(self, text: str) -> List[str]:
+        return PRETOKEN_PATTERN.findall(text)
+
+    def word_tokens(self, word: bytes) -> List[bytes]:
+        """Aplica los merges por rango a un pre-token (GPT-2)."""
+        if word in self.vocab:
+            return [word]
+        parts = [word[i:i + 1] for i in range(len(word))]
+        ranks = self.ranks
+        while len(parts) > 1:
+            best = None
+            best_rank = None
+            for i in range(len(parts) - 1):
+                rank = ranks.get((parts[i], parts[i + 1]))
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best, best_rank = i, rank
+            if best is None:
+                break
+            left, right = parts[best], parts[best + 1]
+            merged = []
+            i = 0
+            while i < len(parts):
+                if i < len(parts) - 1 and parts[i] == left and parts[i + 1] == right:
+                    merged.append(left + right)
+                    i += 2
+                else:
+                    merged.append(parts[i])
+                    i += 1
+            parts = merged
+        return parts
+
+    def tokenize(self, text: str) -> List[bytes]:
+        """Tokens del texto (para tests y diagnostico; count() no los arma)."""
+        out = []
+        for piece in self.pretokenize(text):
+            out.extend(self.word_tokens(piece.encode("utf-8", "surrogatepass")))
+        return out
+
+    def piece_count(self, piece: str) -> int:
+        if self.cjk_tokens_per_char and _CJK_RUN.match(piece):
+            return math.ceil(len(piece) * self.cjk_tokens_per_char)
+        return len(self.word_tokens(piece.encode("utf-8", "surrogatepass")))
+
+    def count(self, text: str) -> int:
+        words = self._words
+        total = 0
+        for piece in PRETOKEN_PATTERN.findall(text):
+            n = words.get(piece)
+            if n is None:
+                n = self.piece_count(piece)
+                if len(words) >= WORD_CACHE_SIZE:
+                    words.clear()
+                words[piece] = n
+            total += n
+        return total
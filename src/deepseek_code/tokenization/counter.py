@@ -0,0 +1,117 @@
+"""Conteo de tokens compartido por todos los presupuestos de contexto.
+
+count_tokens() usa un unico tokenizador BPE por proceso (get_tokenizer):
+el tokenizer.json indicado en DEEPSEEK_TOKENIZER si existe, si no el
+vocabulario incluido (bpe_vocab.json). Si ninguno carga se cae a la
+estimacion antigua por caracteres, para no romper nunca un prompt.
+
+Los textos grandes (skills, system prompts, historial) se cuentan una y
+otra vez entre turnos: sus resultados quedan en un LRU indexado por el
+hash del contenido (blake2b de 128 bits), asi que el cache no retiene
+los textos y un prompt de 1 MB repetido cuesta solo el hash.
+"""
+
+import hashlib
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from .bpe import PRETOKEN_PATTERN, BPETokenizer
+
+TOKENIZER_ENV = "DEEPSEEK_TOKENIZER"
+VOCAB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bpe_vocab.json")
+
+# Entradas del LRU por contenido y largo minimo para usarlo
+CACHE_SIZE = 4096
+CACHE_MIN_CHARS = 256
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+_cache: "OrderedDict[bytes, int]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class CharEstimator:
+    """Respaldo sin vocabulario: ~3.5 caracteres por token."""
+
+    name = "chars/3.5"
+
+    def count(self, text: str) -> int:
+        return math.ceil(len(text) / 3.5)
+
+
+def _load() -> object:
+    for path in (os.environ.get(TOKENIZER_ENV), VOCAB_PATH):
+        if not path:
+            continue
+        try:
+            return BPETokenizer.from_file(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  [tokens] No se pudo cargar {path}: {e}", file=sys.stderr)
+    return CharEstimator()
+
+
+def get_tokenizer():
+    """Tokenizador del proceso (se carga una vez, ~50 ms)."""
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                _tokenizer = _load()
+    return _tokenizer
+
+
+def reset_tokenizer():
+    """Olvida el tokenizador y el cache (tests, cambio de DEEPSEEK_TOKENIZER)."""
+    global _tokenizer
+    with _tokenizer_lock:
+        _tokenizer = None
+    with _cache_lock:
+        _cache.clear()
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Tokens de un texto segun el tokenizador BPE (0 para vacio/None)."""
+    if not text:
+        return 0
+    if len(text) < CACHE_MIN_CHARS:
+        return get_tokenizer().count(text)
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+            return hit
+    count = get_tokenizer().count(text)
+    with _cache_lock:
+        _cache[key] = count
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return count
+
+
+def count_messages_tokens(messages: Iterable[Dict]) -> int:
+    """Tokens del contenido de una lista de mensajes estilo OpenAI."""
+    return sum(count_tokens(msg.get("content") or "") for msg in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Prefijo de text que cabe en max_tokens (corta entre pre-tokens)."""
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    tokenizer = get_tokenizer()
+    if not isinstance(tokenizer, BPETokenizer):
+        return text[:int(max_tokens * 3.5)]
+    used = 0
+    end = 0
+    for match in PRETOKEN_PATTERN.finditer(text):
+        used += tokenizer.count(match.group())
+        if used > max_tokens:
+            break
+        end = match.end()
+    return text[:end]
@@ -0,0 +1,520 @@
+"""Motor de ArchiveTool: compresion en paralelo y extraccion por streaming.
+
+Todo aqui es sincrono y corre en un hilo del executor: ArchiveTool nunca
+comprime ni extrae en el hilo del event loop, asi que las demas tool
+calls del MCPServer siguen respondiendo mientras se empaqueta un build.
+
+Compresion: la entrada se corta en bloques de CHUNK_SIZE y cada bloque
+se comprime en un ThreadPoolExecutor (zlib y lzma liberan el GIL). Un
+unico hilo escribe los resultados en orden, con a lo sumo
+`workers * INFLIGHT_PER_WORKER` bloques en vuelo (memoria acotada).
+
+    zip      cada bloque es deflate crudo independiente; los intermedios
+             cierran con Z_SYNC_FLUSH y el ultimo con Z_FINISH, asi que
+             concatenados forman un stream deflate valido (como pigz).
+             El CRC32 se calcula en orden en el hilo que lee.
+    tar.gz   el stream tar se comprime igual, dentro de un unico miembro
+             gzip (cabecera + bloques + CRC32/ISIZE).
+    tar.xz   cada bloque es un stream xz completo; el formato xz admite
+             streams concatenados (xz -d, lzma.open y tarfile 'r:xz' los
+             leen seguidos; el modo stream 'r|xz' de tarfile no).
+
+Extraccion: miembro a miembro y en bloques, descontando de un
+presupuesto de bytes (MAX_EXTRACT_SIZE); los zip se extraen en paralelo
+con un ZipFile por hilo. Rutas absolutas o con '..' se rechazan (en zip
+antes de escribir nada) y solo se extraen archivos y directorios.
+"""
+
+import collections
+import lzma
+import os
+import stat
+import struct
+import tarfile
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# Bloque que se comprime de una vez en un hilo
+CHUNK_SIZE = 1024 * 1024
+XZ_CHUNK_SIZE = 4 * 1024 * 1024
+# Bloques en vuelo por hilo (lectura adelantada del productor)
+INFLIGHT_PER_WORKER = 2
+DEFLATE_LEVEL = 6
+XZ_PRESET = 6
+# Un compresor xz con preset 6 usa ~94 MB: limitar hilos
+MAX_XZ_WORKERS = 4
+# Presupuesto por defecto de bytes descomprimidos al extraer
+MAX_EXTRACT_SIZE = 2 * 1024 * 1024 * 1024
+
+FORMATS = ("zip", "tar.gz", "tar.xz")
+_SUFFIXES = {".zip": "zip", ".tar.gz": "tar.gz", ".tgz": "tar.gz",
+             ".tar.xz": "tar.xz", ".txz": "tar.xz"}
+
+
+class ArchiveError(Exception):
+    """Error de creacion/extraccion (el mensaje va tal cual al modelo)."""
+
+
+@dataclass
+class ArchiveStats:
+    """Progreso y rendimiento de una operacion."""
+    files: int = 0
+    bytes_in: int = 0     # bytes sin comprimir procesados
+    bytes_out: int = 0    # bytes escritos (archivo comprimido o extraidos)
+    elapsed: float = 0.0
+    workers: int = 1
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes_in / 1024 / 1024 / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return f"{self.elapsed:.2f}s ({self.mb_per_s:.1f} MB/s, {self.workers} hilo(s))"
+
+
+def default_workers() -> int:
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def detect_format(path: Path) -> Optional[str]:
+    """Formato por la extension del nombre (None si no es conocida)."""
+    name = path.name.lower()
+    for suffix, fmt in _SUFFIXES.items():
+        if name.endswith(suffix):
+            return fmt
+    return None
+
+
+def base_name(path: Path) -> str:
+    """Nombre sin la extension de archivo ('build.tar.gz' -> 'build')."""
+    name = path.name
+    for suffix in _SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return path.stem
+
+
+def with_format_suffix(path: Path, fmt: str) -> Path:
+    """Ruta con la extension del formato (reemplaza la que tenga)."""
+    return path.with_name(f"{base_name(path)}.{fmt}")
+
+
+def archive_kind(path: Path) -> Optional[str]:
+    """'zip' o 'tar' segun el contenido del archivo, None si no es ninguno."""
+    if zipfile.is_zipfile(str(path)):
+        return "zip"
+    try:
+        if tarfile.is_tarfile(str(path)):
+            return "tar"
+    except (OSError, EOFError, lzma.LZMAError, zlib.error):
+        pass
+    return None
+
+
+def collect_entries(src: Path, max_files: int, max_bytes: int) -> List[Tuple[Path, str, int]]:
+    """Archivos a empaquetar: (ruta, nombre dentro del archivo, tamaño)."""
+    if src.is_file():
+        size = src.stat().st_size
+        if size > max_bytes:
+            raise ArchiveError(
+                f"archivo demasiado grande ({size / 1024 / 1024:.1f} MB). "
+                f"Limite: {max_bytes // 1024 // 1024} MB.")
+        return [(src, src.name, size)]
+    entries = []
+    total = 0
+    for file in sorted(src.rglob('*')):
+        if not file.is_file():
+            continue
+        if len(entries) >= max_files:
+            raise ArchiveError(f"demasiados archivos (>{max_files}). Reduce el directorio.")
+        size = file.stat().st_size
+        total += size
+        if total > max_bytes:
+            raise ArchiveError(f"tamaño total excede {max_bytes // 1024 // 1024} MB.")
+        entries.append((file, file.relative_to(src).as_posix(), size))
+    return entries
+
+
+# --- Compresion por bloques -------------------------------------------------
+
+def _deflate_block(data: bytes, level: int, final: bool) -> bytes:
+    comp = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return comp.compress(data) + comp.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _store_block(data: bytes, level: int, final: bool) -> bytes:
+    return data
+
+
+def _xz_block(data: bytes, level: int, final: bool) -> bytes:
+    return lzma.compress(data, format=lzma.FORMAT_XZ, preset=level)
+
+
+def _drain_in_order(events: Iterator[tuple], handle: Callable[[tuple], None], limit: int):
+    """Consume eventos del productor manteniendo <= limit bloques en vuelo.
+
+    Los eventos ('data', future) se entregan a handle en el orden en que
+    se produjeron; el productor (un generador) solo avanza, y por tanto
+    solo lee y encola mas bloques, cuando hay hueco.
+    """
+    pending = collections.deque()
+    inflight = 0
+    for event in events:
+        pending.append(event)
+        if event[0] == "data":
+            inflight += 1
+        while inflight > limit:
+            done = pending.popleft()
+            if done[0] == "data":
+                inflight -= 1
+            handle(done)
+    while pending:
+        handle(pending.popleft())
+
+
+def _read_blocks(path: Path, size: int) -> Iterator[Tuple[bytes, bool]]:
+    """Bloques de un archivo con la marca de ultimo bloque (minimo uno)."""
+    with open(path, "rb") as f:
+        block = f.read(size)
+        while True:
+            following = f.read(size) if len(block) == size else b""
+            yield block, not following
+            if not following:
+                return
+            block = following
+
+
+def write_zip(dst: Path, entries: List[Tuple[Path, str, int]], compression: str = "deflated",
+              workers: Optional[int] = None, level: int = DEFLATE_LEVEL) -> ArchiveStats:
+    """Crea un ZIP comprimiendo los bloques de cada miembro en paralelo."""
+    workers = workers or default_workers()
+    method = zipfile.ZIP_DEFLATED if compression == "deflated" else zipfile.ZIP_STORED
+    block_fn = _deflate_block if method == zipfile.ZIP_DEFLATED else _store_block
+    stats = ArchiveStats(workers=workers)
+    start = time.perf_counter()
+
+    with zipfile.ZipFile(str(dst), "w", compression=method) as zf, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zip") as pool:
+
+        def produce():
+            for path, arcname, _size in entries:
+                zinfo = zipfile.ZipInfo.from_file(str(path), arcname)
+                zinfo.compress_type = method
+                zinfo.CRC = zinfo.compress_size = 0
+                yield ("begin", zinfo)
+                crc = 0
+                length = 0
+                for block, final in _read_blocks(path, CHUNK_SIZE):
+                    crc = zlib.crc32(block, crc)
+                    length += len(block)
+                    yield ("data", pool.submit(block_fn, block, level, final))
+                zinfo.CRC = crc
+                zinfo.file_size = length
+                yield ("end", zinfo)
+
+        writer = _ZipMemberWriter(zf)
+
+        def handle(event):
+            kind, value = event
+            if kind == "begin":
+                writer.begin(value)
+            elif kind == "data":
+                writer.write(value.result())
+            else:
+                writer.end(value)
+                stats.files += 1
+                stats.bytes_in += value.file_size
+
+        _drain_in_order(produce(), handle, workers * INFLIGHT_PER_WORKER)
+
+    stats.bytes_out = dst.stat().st_size
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+class _ZipMemberWriter:
+    """Escribe miembros ya comprimidos en un ZipFile abierto en modo 'w'.
+
+    Replica ZipFile._open_to_write/_ZipWriteFile.close: cabecera local
+    provisional, datos, y reescritura de la cabecera con CRC y tamaños
+    (la salida es un archivo normal, siempre seekable).
+    """
+
+    def __init__(self, zf: zipfile.ZipFile):
+        self.zf = zf
+        self.zip64 = False
+
+    def begin(self, zinfo: zipfile.ZipInfo):
+        zf = self.zf
+        # CRC y file_size los completa el productor (quizas ya lo hizo:
+        # va por delante); la cabecera se reescribe en end()
+        zinfo.flag_bits = 0
+        if not zinfo.external_attr:
+            zinfo.external_attr = 0o600 << 16
+        self.zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+        zf.fp.seek(zf.start_dir)
+        zinfo.header_offset = zf.fp.tell()
+        zf._writecheck(zinfo)
+        zf._didModify = True
+        zf.fp.write(zinfo.FileHeader(self.zip64))
+
+    def write(self, data: bytes):
+        self.zf.fp.write(data)
+        self.zf.start_dir = self.zf.fp.tell()
+
+    def end(self, zinfo: zipfile.ZipInfo):
+        zf = self.zf
+        end = zf.fp.tell()
+        zinfo.compress_size = end - zinfo.header_offset - len(zinfo.FileHeader(self.zip64))
+        if not self.zip64 and max(zinfo.file_size, zinfo.compress_size) > zipfile.ZIP64_LIMIT:
+            raise ArchiveError(f"'{zinfo.filename}' crecio mientras se comprimia")
+        zf.fp.seek(zinfo.header_offset)
+        zf.fp.write(zinfo.FileHeader(self.zip64))
+        zf.fp.seek(end)
+        zf.start_dir = end
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+
+
+class _ParallelCompressedStream:
+    """Archivo de solo escritura que comprime lo recibido por bloques en paralelo.
+
+    tarfile escribe aqui en modo stream ('w|'); los bloques completos se
+    mandan al pool y los resultados se escriben en orden en `raw`.
+    """
+
+    def __init__(self, raw, fmt: str, pool: ThreadPoolExecutor, limit: int, level: int):
+        self.raw = raw
+        self.gzip = fmt == "tar.gz"
+        self.block_fn = _deflate_block if self.gzip else _xz_block
+        self.chunk_size = CHUNK_SIZE if self.gzip else XZ_CHUNK_SIZE
+        self.pool = pool
+        self.limit = limit
+        self.level = level
+        self.buffer = bytearray()
+        self.pending = collections.deque()
+        self.crc = 0
+        self.size = 0
+        if self.gzip:
+            # ID1 ID2 CM=deflate FLG=0 MTIME=0 XFL=0 OS=255 (desconocido)
+            raw.write(struct.pack("<BBBBLBB", 0x1F, 0x8B, 8, 0, 0, 0, 255))
+
+    def write(self, data) -> int:
+        self.buffer += data
+        while len(self.buffer) >= self.chunk_size:
+            block = bytes(self.buffer[:self.chunk_size])
+            del self.buffer[:self.chunk_size]
+            self._submit(block, False)
+        return len(data)
+
+    def _submit(self, block: bytes, final: bool):
+        if self.gzip:
+            self.crc = zlib.crc32(block, self.crc)
+        self.size += len(block)
+        self.pending.append(self.pool.submit(self.block_fn, block, self.level, final))
+        while len(self.pending) > self.limit:
+            self.raw.write(self.pending.popleft().result())
+
+    def close(self):
+        self._submit(bytes(self.buffer), True)
+        self.buffer.clear()
+        while self.pending:
+            self.raw.write(self.pending.popleft().result())
+        if self.gzip:
+            self.raw.write(struct.pack("<LL", self.crc, self.size & 0xFFFFFFFF))
+
+
+def write_tar(dst: Path, entries: List[Tuple[Path, str, int]], fmt: str,
+              workers: Optional[int] = None, level: Optional[int] = None) -> ArchiveStats:
+    """Crea un tar.gz/tar.xz comprimiendo el stream tar por bloques en paralelo."""
+    if fmt not in ("tar.gz", "tar.xz"):
+        raise ArchiveError(f"formato tar desconocido: {fmt}")
+    workers = workers or default_workers()
+    if fmt == "tar.xz":
+        workers = min(workers, MAX_XZ_WORKERS)
+        level = XZ_PRESET if level is None else level
+    else:
+        level = DEFLATE_LEVEL if level is None else level
+    stats = ArchiveStats(workers=workers)
+    start = time.perf_counter()
+
+    with open(dst, "wb") as raw, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tar") as pool:
+        stream = _ParallelCompressedStream(raw, fmt, pool, workers * INFLIGHT_PER_WORKER, level)
+        with tarfile.open(fileobj=stream, mode="w|") as tf:
+            for path, arcname, size in entries:
+                tf.add(str(path), arcname=arcname, recursive=False)
+                stats.files += 1
+                stats.bytes_in += size
+        stream.close()
+
+    stats.bytes_out = dst.stat().st_size
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+# --- Extraccion ---------------------------------------------------------------
+
+class _Budget:
+    """Bytes descomprimidos que aun se pueden escribir (compartido entre hilos)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self, amount: int):
+        with self._lock:
+            self.used += amount
+            if self.used > self.limit:
+                raise ArchiveError(
+                    f"el contenido descomprimido excede el limite de "
+                    f"{self.limit // 1024 // 1024} MB")
+
+
+def safe_target(dst: Path, name: str) -> Path:
+    """Ruta de destino de un miembro; ArchiveError si intenta salir de dst."""
+    normalized = name.replace("\\", "/")
+    parts = PurePosixPath(normalized).parts
+    if (normalized.startswith("/") or ".." in parts
+            or (parts and len(parts[0]) > 1 and parts[0][1] == ":")):
+        raise ArchiveError(f"el archivo contiene rutas peligrosas (path traversal): {name}")
+    target = (dst / Path(*[p for p in parts if p not in ("", ".")])).resolve()
+    if target != dst and dst not in target.parents:
+        raise ArchiveError(f"el archivo contiene rutas peligrosas (path traversal): {name}")
+    return target
+
+
+def _copy_stream(src, target: Path, budget: _Budget) -> int:
+    written = 0
+    with open(target, "wb") as out:
+        while True:
+            block = src.read(CHUNK_SIZE)
+            if not block:
+                return written
+            budget.take(len(block))
+            out.write(block)
+            written += len(block)
+
+
+def extract_zip(src: Path, dst: Path, max_files: int, max_bytes: int = MAX_EXTRACT_SIZE,
+                workers: Optional[int] = None) -> ArchiveStats:
+    """Extrae un ZIP en paralelo (un ZipFile por hilo) con presupuesto de bytes."""
+    workers = workers or default_workers()
+    stats = ArchiveStats(workers=workers)
+    start = time.perf_counter()
+    dst = dst.resolve()
+
+    with zipfile.ZipFile(str(src), "r") as zf:
+        infos = zf.infolist()
+    if len(infos) > max_files:
+        raise ArchiveError(f"demasiados archivos (>{max_files}).")
+    # Validar todas las rutas y el tamaño declarado antes de escribir nada
+    targets = [(info, safe_target(dst, info.filename)) for info in infos]
+    declared = sum(info.file_size for info in infos)
+    if declared > max_bytes:
+        raise ArchiveError(
+            f"el contenido descomprimido ({declared / 1024 / 1024:.1f} MB) excede el "
+            f"limite de {max_bytes // 1024 // 1024} MB")
+
+    files = []
+    for info, target in targets:
+        if info.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            files.append((info, target))
+
+    budget = _Budget(max_bytes)
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+
+    def extract_one(item) -> int:
+        info, target = item
+        handle = getattr(local, "zf", None)
+        if handle is None:
+            handle = local.zf = zipfile.ZipFile(str(src), "r")
+            with handles_lock:
+                handles.append(handle)
+        with handle.open(info) as member:
+            return _copy_stream(member, target, budget)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="unzip") as pool:
+            for written in pool.map(extract_one, files):
+                stats.files += 1
+                stats.bytes_out += written
+    finally:
+        for handle in handles:
+            handle.close()
+
+    stats.bytes_in = stats.bytes_out
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def extract_tar(src: Path, dst: Path, max_files: int,
+                max_bytes: int = MAX_EXTRACT_SIZE) -> ArchiveStats:
+    """Extrae un tar (comprimido o no) en un solo pase hacia adelante.
+
+    Se abre con 'r:*' (no 'r|*') para leer tar.xz de varios streams; aun
+    asi los miembros se recorren y copian en orden, por bloques.
+
+    Solo archivos y directorios: enlaces, dispositivos y FIFOs se omiten
+    (quedan en stats.skipped). Si se pasa el presupuesto a mitad de camino
+    lo ya extraido queda en dst y el error lo indica.
+    """
+    stats = ArchiveStats(workers=1)
+    start = time.perf_counter()
+    dst = dst.resolve()
+    budget = _Budget(max_bytes)
+    seen = 0
+
+    try:
+        with tarfile.open(str(src), mode="r:*") as tf:
+            for member in tf:
+                seen += 1
+                if seen > max_files:
+                    raise ArchiveError(f"demasiados archivos (>{max_files})")
+                target = safe_target(dst, member.name)
+                if member.isdir():
+                    target.mkdir(parents=True, exist_ok=True)
+                    continue
+                if not member.isfile():
+                    stats.skipped.append(member.name)
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                stats.bytes_out += _copy_stream(tf.extractfile(member), target, budget)
+                # Conservar permisos de ejecucion, nunca setuid/setgid
+                os.chmod(target, (member.mode & 0o777) | stat.S_IRUSR | stat.S_IWUSR)
+                stats.files += 1
+    except ArchiveError as e:
+        if not stats.files:
+            raise
+        raise ArchiveError(f"{e}. Se extrajeron {stats.files} archivo(s) en {dst} antes de cortar.")
+
+    stats.bytes_in = stats.bytes_out
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def list_tar(src: Path, limit: int) -> Tuple[List[tarfile.TarInfo], int, int]:
+    """Primeros `limit` miembros, total de miembros y bytes sin comprimir."""
+    shown = []
+    count = 0
+    total = 0
+    with tarfile.open(str(src), mode="r:*") as tf:
+        for member in tf:
+            count += 1
+            total += member.size if member.isfile() else 0
+            if len(shown) < limit:
+                shown.append(member)
+    return shown, count, total
@@ -1,29 +1,43 @@
-"""Herramienta para crear, extraer y listar archivos ZIP."""
+"""Herramienta para crear, extraer y listar archivos ZIP, tar.gz y tar.xz.
 
-import os
+El trabajo pesado (ver archive_engine) corre en un hilo del executor y
+comprime en paralelo, asi que no bloquea el event loop del MCPServer.
+"""
+
+import asyncio
 import zipfile
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import List, Optional
 from ..server.tool import BaseTool
 from ..security.sandbox import SecurePath
+from .archive_engine import (
+    FORMATS, MAX_EXTRACT_SIZE, ArchiveError, archive_kind, base_name, collect_entries,
+    detect_format, extract_tar, extract_zip, list_tar, with_format_suffix, write_tar, write_zip,
+)
 
 # Limites de seguridad
 MAX_ARCHIVE_SIZE = 500 * 1024 * 1024  # 500 MB
 MAX_FILES_IN_ARCHIVE = 10000
+# Entradas mostradas por 'list'
+MAX_LISTED = 5000
 
 
 class ArchiveTool(BaseTool):
-    """Crea, extrae y lista archivos ZIP."""
+    """Crea, extrae y lista archivos ZIP, tar.gz y tar.xz."""
+
+    path_args = ("source", "destination")
 
     def __init__(self, allowed_paths: List[str]):
         super().__init__(
             name="archive",
             description=(
-                "Gestiona archivos ZIP. Acciones: "
-                "'create' comprime archivos/directorios en un ZIP, "
-                "'extract' descomprime un ZIP a un directorio, "
-                "'list' muestra el contenido de un ZIP sin extraer."
+                "Gestiona archivos ZIP, tar.gz y tar.xz. Acciones: "
+                "'create' comprime archivos/directorios (en paralelo), "
+                "'extract' descomprime a un directorio, "
+                "'list' muestra el contenido sin extraer. "
+                "El resultado incluye tiempo y velocidad (MB/s)."
             )
         )
         self.allowed_paths = [Path(p).expanduser().resolve() for p in allowed_paths]
@@ -36,38 +50,58 @@ class ArchiveTool(BaseTool):
                     "type": "string",
                     "enum": ["create", "extract", "list"],
                     "description": (
-                        "'create': comprime archivos/directorios en ZIP. "
-                        "'extract': descomprime ZIP a directorio. "
-                        "'list': muestra contenido del ZIP."
+                        "'create': comprime archivos/directorios. "
+                        "'extract': descomprime a un directorio. "
+                        "'list': muestra el contenido del archivo."
                     )
                 },
                 "source": {
                     "type": "string",
                     "description": (
                         "Para create: ruta del archivo o directorio a comprimir. "
-                        "Para extract/list: ruta del archivo ZIP."
+                        "Para extract/list: ruta del archivo ZIP/tar."
                     )
                 },
                 "destination": {
                     "type": "string",
                     "description": (
-                        "Para create: ruta del ZIP destino (ej: 'proyecto.zip'). "
-                        "Para extract: directorio donde extraer (default: mismo dir del ZIP)."
+                        "Para create: ruta del archivo destino (ej: 'proyecto.zip', 'build.tar.xz'). "
+                        "Para extract: directorio donde extraer (default: mismo dir del archivo)."
+                    )
+                },
+                "format": {
+                    "type": "string",
+                    "enum": list(FORMATS),
+                    "description": (
+                        "Para create: formato de salida. Default: segun la extension de "
+                        "destination, o 'zip'. 'tar.xz' comprime mas pero es mas lento."
                     )
                 },
                 "compression": {
                     "type": "string",
                     "enum": ["deflated", "stored"],
-                    "description": "Tipo de compresion: 'deflated' (default, mas pequeno) o 'stored' (sin compresion, mas rapido).",
+                    "description": "Solo ZIP: 'deflated' (default, mas pequeno) o 'stored' (sin compresion, mas rapido).",
                     "default": "deflated"
                 }
             },
             "required": ["action", "source"]
         }
 
-    async def execute(self, action: str, source: str, destination: Optional[str] = None, compression: str = "deflated") -> str:
+    def path_access(self, arguments):
+        # create/extract leen source y escriben destination; list solo lee
+        if not arguments.get("source"):
+            return None
+        source = self.resolve_access_path(str(arguments["source"]))
+        if arguments.get("action") == "list":
+            return [source], []
+        if not arguments.get("destination"):
+            return None  # Destino implicito: no se sabe que escribe
+        return [source], [self.resolve_access_path(str(arguments["destination"]))]
+
+    async def execute(self, action: str, source: str, destination: Optional[str] = None,
+                      compression: str = "deflated", format: Optional[str] = None) -> str:
         if action == "create":
-            return await self._create(source, destination, compression)
+            return await self._create(source, destination, compression, format)
         elif action == "extract":
             return await self._extract(source, destination)
         elif action == "list":
@@ -75,58 +109,59 @@ class ArchiveTool(BaseTool):
         else:
             return f"Error: accion desconocida '{action}'. Usa: create, extract, list."
 
-    async def _create(self, source: str, destination: Optional[str], compression: str) -> str:
+    @staticmethod
+    async def _in_thread(func, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args, **kwargs))
+
+    async def _create(self, source: str, destination: Optional[str], compression: str,
+                      fmt: Optional[str] = None) -> str:
         secure_src = SecurePath(source, self.allowed_paths)
         await secure_src.validate_read()
         src_path = secure_src.resolved_path
 
         if not src_path.exists():
             return f"Error: '{source}' no existe."
+        if fmt is not None and fmt not in FORMATS:
+            return f"Error: formato desconocido '{fmt}'. Usa: {', '.join(FORMATS)}."
 
-        # Determinar destino
+        # Determinar destino y formato
         if destination:
             secure_dst = SecurePath(destination, self.allowed_paths)
             await secure_dst.validate_write()
             dst_path = secure_dst.resolved_path
+            fmt = fmt or detect_format(dst_path) or "zip"
         else:
-            dst_path = src_path.with_suffix('.zip') if src_path.is_file() else src_path.parent / f"{src_path.name}.zip"
+            fmt = fmt or "zip"
+            dst_path = (with_format_suffix(src_path, fmt) if src_path.is_file()
+                        else src_path.parent / f"{src_path.name}.{fmt}")
 
-        if not dst_path.suffix == '.zip':
-            dst_path = dst_path.with_suffix('.zip')
+        if detect_format(dst_path) != fmt:
+            dst_path = with_format_suffix(dst_path, fmt)
 
         dst_path.parent.mkdir(parents=True, exist_ok=True)
 
-        comp = zipfile.ZIP_DEFLATED if compression == "deflated" else zipfile.ZIP_STORED
-        file_count = 0
-        total_size = 0
-
-        with zipfile.ZipFile(str(dst_path), 'w', compression=comp) as zf:
-            if src_path.is_file():
-                size = src_path.stat().st_size
-                if size > MAX_ARCHIVE_SIZE:
-                    return f"Error: archivo demasiado grande ({size / 1024 / 1024:.1f} MB). Limite: 500 MB."
-                zf.write(str(src_path), src_path.name)
-                file_count = 1
-                total_size = size
-            elif src_path.is_dir():
-                for file in src_path.rglob('*'):
-                    if file.is_file():
-                        file_count += 1
-                        if file_count > MAX_FILES_IN_ARCHIVE:
-                            return f"Error: demasiados archivos (>{MAX_FILES_IN_ARCHIVE}). Reduce el directorio."
-                        total_size += file.stat().st_size
-                        if total_size > MAX_ARCHIVE_SIZE:
-                            return f"Error: tamaño total excede 500 MB."
-                        arcname = file.relative_to(src_path)
-                        zf.write(str(file), str(arcname))
-
-        zip_size = dst_path.stat().st_size
-        ratio = (1 - zip_size / total_size) * 100 if total_size > 0 else 0
+        try:
+            entries = await self._in_thread(
+                collect_entries, src_path, MAX_FILES_IN_ARCHIVE, MAX_ARCHIVE_SIZE)
+            if fmt == "zip":
+                stats = await self._in_thread(write_zip, dst_path, entries, compression)
+            else:
+                stats = await self._in_thread(write_tar, dst_path, entries, fmt)
+        except ArchiveError as e:
+            dst_path.unlink(missing_ok=True)
+            return f"Error: {e}"
+        except Exception:
+            dst_path.unlink(missing_ok=True)
+            raise
+
+        label = fmt.upper()
+        ratio = (1 - stats.bytes_out / stats.bytes_in) * 100 if stats.bytes_in > 0 else 0
         return (
-            f"ZIP creado: {dst_path}\n"
-            f"  Archivos: {file_count}\n"
-            f"  Tamaño original: {self._fmt_size(total_size)}\n"
-            f"  Tamaño ZIP: {self._fmt_size(zip_size)} ({ratio:.1f}% compresion)"
+            f"{label} creado: {dst_path}\n"
+            f"  Archivos: {stats.files}\n"
+            f"  Tamaño original: {self._fmt_size(stats.bytes_in)}\n"
+            f"  Tamaño {label}: {self._fmt_size(stats.bytes_out)} ({ratio:.1f}% compresion)\n"
+            f"  Tiempo: {stats.summary()}"
         )
 
     async def _extract(self, source: str, destination: Optional[str]) -> str:
@@ -136,27 +171,37 @@ class ArchiveTool(BaseTool):
 
         if not src_path.exists():
             return f"Error: '{source}' no existe."
-        if not zipfile.is_zipfile(str(src_path)):
-            return f"Error: '{source}' no es un archivo ZIP valido."
+        kind = await self._in_thread(archive_kind, src_path)
+        if kind is None:
+            return f"Error: '{source}' no es un archivo ZIP/tar valido."
 
         if destination:
             secure_dst = SecurePath(destination, self.allowed_paths)
             await secure_dst.validate_write()
             dst_path = secure_dst.resolved_path
         else:
-            dst_path = src_path.parent / src_path.stem
+            dst_path = src_path.parent / base_name(src_path)
 
         dst_path.mkdir(parents=True, exist_ok=True)
 
-        with zipfile.ZipFile(str(src_path), 'r') as zf:
-            # Seguridad: verificar que no hay paths maliciosos (path traversal)
-            for info in zf.infolist():
-                if info.filename.startswith('/') or '..' in info.filename:
-                    return f"Error: ZIP contiene rutas peligrosas (path traversal): {info.filename}"
-            file_count = len(zf.infolist())
-            zf.extractall(str(dst_path))
-
-        return f"ZIP extraido: {dst_path} ({file_count} archivos)"
+        try:
+            if kind == "zip":
+                stats = await self._in_thread(
+                    extract_zip, src_path, dst_path, MAX_FILES_IN_ARCHIVE, MAX_EXTRACT_SIZE)
+            else:
+                stats = await self._in_thread(
+                    extract_tar, src_path, dst_path, MAX_FILES_IN_ARCHIVE, MAX_EXTRACT_SIZE)
+        except ArchiveError as e:
+            return f"Error: {e}"
+
+        result = (f"{'ZIP' if kind == 'zip' else 'TAR'} extraido: {dst_path} "
+                  f"({stats.files} archivos, {self._fmt_size(stats.bytes_out)})\n"
+                  f"  Tiempo: {stats.summary()}")
+        if stats.skipped:
+            shown = ", ".join(stats.skipped[:10])
+            more = f" y {len(stats.skipped) - 10} mas" if len(stats.skipped) > 10 else ""
+            result += f"\n  Omitidos (enlaces/especiales): {shown}{more}"
+        return result
 
     async def _list(self, source: str) -> str:
         secure_src = SecurePath(source, self.allowed_paths)
@@ -165,22 +210,36 @@ class ArchiveTool(BaseTool):
 
         if not src_path.exists():
             return f"Error: '{source}' no existe."
-        if not zipfile.is_zipfile(str(src_path)):
-            return f"Error: '{source}' no es un archivo ZIP valido."
-
+        kind = await self._in_thread(archive_kind, src_path)
+        if kind is None:
+            return f"Error: '{source}' no es un archivo ZIP/tar valido."
+        if kind == "tar":
+            return await self._in_thread(self._list_tar, src_path)
+        return await self._in_thread(self._list_zip, src_path)
+
+    def _list_zip(self, src_path: Path) -> str:
         with zipfile.ZipFile(str(src_path), 'r') as zf:
             entries = zf.infolist()
-            total_size = sum(e.file_size for e in entries)
-            compressed = sum(e.compress_size for e in entries)
+        total_size = sum(e.file_size for e in entries)
 
-            lines = [f"Contenido de {src_path.name} ({len(entries)} archivos, {self._fmt_size(total_size)}):\n"]
-            for entry in entries[:5000]:
-                date = f"{entry.date_time[0]:04d}-{entry.date_time[1]:02d}-{entry.date_time[2]:02d}"
-                lines.append(f"  {self._fmt_size(entry.file_size):>10}  {date}  {entry.filename}")
+        lines = [f"Contenido de {src_path.name} ({len(entries)} archivos, {self._fmt_size(total_size)}):\n"]
+        for entry in entries[:MAX_LISTED]:
+            date = f"{entry.date_time[0]:04d}-{entry.date_time[1]:02d}-{entry.date_time[2]:02d}"
+            lines.append(f"  {self._fmt_size(entry.file_size):>10}  {date}  {entry.filename}")
 
-            if len(entries) > 5000:
-                lines.append(f"\n  ... y {len(entries) - 5000} archivos mas")
+        if len(entries) > MAX_LISTED:
+            lines.append(f"\n  ... y {len(entries) - MAX_LISTED} archivos mas")
+        return "\n".join(lines)
 
+    def _list_tar(self, src_path: Path) -> str:
+        members, count, total_size = list_tar(src_path, MAX_LISTED)
+        lines = [f"Contenido de {src_path.name} ({count} entradas, {self._fmt_size(total_size)}):\n"]
+        for member in members:
+            date = datetime.fromtimestamp(member.mtime).strftime("%Y-%m-%d")
+            name = member.name + ("/" if member.isdir() else "")
+            lines.append(f"  {self._fmt_size(member.size):>10}  {date}  {name}")
+        if count > MAX_LISTED:
+            lines.append(f"\n  ... y {count - MAX_LISTED} entradas mas")
         return "\n".join(lines)
 
     @staticmethod
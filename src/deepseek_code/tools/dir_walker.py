@@ -0,0 +1,235 @@
+"""Recorrido de directorios en streaming con poda temprana (os.scandir).
+
+list_directory (recursive=true) hacia list(rglob("*")) y ordenaba el
+arbol entero antes de aplicar max_results; find_files hacia glob sin
+podar. En un monorepo con node_modules eso son millones de stat() para
+devolver 500 lineas.
+
+walk_tree() recorre en profundidad con os.scandir (el tipo de cada
+entrada viene del propio directorio, sin stat), ordena cada directorio
+por nombre y es un generador: el llamador corta al llegar a max_results
+y nada mas se visita. El orden resultante es el mismo que sorted() de
+las rutas completas (preorden con hijos por nombre), asi que es
+deterministico aunque el listado quede truncado.
+
+Se podan sin descender:
+    - IGNORE_DIRS de serena/code_patterns.py (node_modules, .git, dist...)
+    - lo que excluyan los .gitignore encontrados en el camino
+      (patrones con '*', '**', '?', '[...]', '/' anclado, '!' y '/' final)
+
+Uso:
+    for entry in walk_tree(base):
+        entry.rel, entry.is_dir, entry.ignored
+    regex = glob_to_regex("**/*.py")
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Pattern, Tuple
+
+from ..serena.code_patterns import IGNORE_DIRS
+
+_CASE_FLAGS = re.IGNORECASE if os.name == "nt" else 0
+
+
+def glob_to_regex(pattern: str) -> Pattern:
+    """Compila un glob sobre rutas relativas con '/' ('**' cruza directorios)."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return re.compile("".join(out) + r"\Z", _CASE_FLAGS)
+
+
+class GitIgnore:
+    """Reglas de un .gitignore, relativas al directorio que lo contiene."""
+
+    def __init__(self, rules: List[Tuple[Pattern, bool, bool]]):
+        self.rules = rules  # (regex, negada, solo_directorios)
+
+    @classmethod
+    def parse(cls, text: str) -> "GitIgnore":
+        rules = []
+        for raw in text.splitlines():
+            line = raw.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.strip("/") if dir_only else line
+            if line.startswith("/"):
+                line = line[1:]
+            elif "/" not in line:
+                # Sin '/' intermedia: aplica en cualquier nivel
+                line = "**/" + line
+            if line:
+                rules.append((glob_to_regex(line), negated, dir_only))
+        return cls(rules)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["GitIgnore"]:
+        try:
+            with open(os.path.join(directory, ".gitignore"), "r",
+                      encoding="utf-8", errors="replace") as f:
+                rules = cls.parse(f.read())
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+    def match(self, rel: str, is_dir: bool) -> Optional[bool]:
+        """True ignorado, False re-incluido ('!'), None si ninguna regla aplica."""
+        result = None
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel):
+                result = not negated
+        return result
+
+
+@dataclass
+class WalkEntry:
+    """Entrada del recorrido. rel usa '/' como separador."""
+    rel: str
+    entry: os.DirEntry
+    is_dir: bool
+    depth: int
+    ignored: bool = False  # Directorio podado (no se desciende en el)
+
+    @property
+    def path(self) -> str:
+        return self.entry.path
+
+    def stat(self) -> os.stat_result:
+        return self.entry.stat()
+
+
+def _is_ignored(name: str, rel_parts: List[str], is_dir: bool,
+                gitignores: List[Tuple[int, GitIgnore]]) -> bool:
+    if is_dir and (name in IGNORE_DIRS or name.endswith(".egg-info")):
+        return True
+    verdict = None
+    for depth, gi in gitignores:
+        # Ruta relativa al directorio del .gitignore
+        match = gi.match("/".join(rel_parts[depth:]), is_dir)
+        if match is not None:
+            verdict = match
+    return bool(verdict)
+
+
+def _ancestor_gitignores(root: str, parts: List[str]) -> Optional[List[Tuple[int, GitIgnore]]]:
+    """.gitignore de root hasta el padre de root/parts; None si el camino esta podado."""
+    gitignores: List[Tuple[int, GitIgnore]] = []
+    directory = root
+    for depth, name in enumerate(parts):
+        gi = GitIgnore.load(directory)
+        if gi is not None:
+            gitignores.append((depth, gi))
+        if depth < len(parts) - 1:
+            if _is_ignored(name, parts[:depth + 1], True, gitignores):
+                return None
+            directory = os.path.join(directory, name)
+    return gitignores
+
+
+def is_path_ignored(root: str, rel: str, is_dir: bool) -> bool:
+    """True si walk_tree(root) no emitiria (o podaria) la ruta relativa rel."""
+    parts = [p for p in rel.replace(os.sep, "/").split("/") if p]
+    if not parts:
+        return False
+    gitignores = _ancestor_gitignores(root, parts)
+    return gitignores is None or _is_ignored(parts[-1], parts, is_dir, gitignores)
+
+
+def walk_tree(base: str, max_depth: Optional[int] = None,
+              prune: bool = True, root: Optional[str] = None) -> Iterator[WalkEntry]:
+    """Recorre base en preorden (hijos por nombre), sin seguir symlinks a directorios.
+
+    max_depth=1 lista solo base. prune=False no aplica IGNORE_DIRS ni
+    .gitignore. Los directorios podados se emiten con ignored=True; los
+    archivos ignorados por .gitignore no se emiten.
+
+    Con root (un ancestro de base) rel es relativa a root y se aplican
+    tambien los .gitignore de root hasta base: el subarbol sale igual que
+    en walk_tree(root). Si base misma esta podada no se emite nada.
+    """
+    gitignores: List[Tuple[int, GitIgnore]] = []
+    start: List[str] = []
+    if root is not None:
+        rel = os.path.relpath(os.path.abspath(base), os.path.abspath(root))
+        if rel != ".":
+            start = rel.replace(os.sep, "/").split("/")
+            if prune:
+                inherited = _ancestor_gitignores(os.fspath(root), start)
+                if inherited is None or _is_ignored(start[-1], start, True, inherited):
+                    return iter(())
+                gitignores.extend(inherited)
+
+    def _walk(directory: str, rel_parts: List[str]) -> Iterator[WalkEntry]:
+        depth = len(rel_parts)
+        pushed = False
+        if prune:
+            gi = GitIgnore.load(directory)
+            if gi is not None:
+                gitignores.append((depth, gi))
+                pushed = True
+        try:
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                return
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                parts = rel_parts + [entry.name]
+                ignored = prune and _is_ignored(entry.name, parts, is_dir, gitignores)
+                if ignored and not is_dir:
+                    continue
+                yield WalkEntry("/".join(parts), entry, is_dir, depth + 1, ignored)
+                if (is_dir and not ignored and not entry.is_symlink()
+                        and (max_depth is None or depth + 1 < max_depth)):
+                    yield from _walk(entry.path, parts)
+        finally:
+            if pushed:
+                gitignores.pop()
+
+    return _walk(os.fspath(base), start)
+
+
+def glob_depth(pattern: str) -> Optional[int]:
+    """Profundidad maxima que puede alcanzar un glob (None si usa '**')."""
+    if "**" in pattern:
+        return None
+    return pattern.strip("/").count("/") + 1
@@ -3,16 +3,93 @@
 import os
 import aiofiles
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from ..server.tool import BaseTool
 from ..security.sandbox import SecurePath
 
 # Limite para mostrar contenido en el resultado (10 KB)
 MAX_DISPLAY_SIZE = 10240
 
+
+class EditError(Exception):
+    """Operacion de edicion invalida (el mensaje va tal cual al modelo)."""
+
+
+def apply_edit_operations(content: str, operations: List[Dict[str, Any]]) -> Tuple[str, List[str]]:
+    """Aplica operaciones replace/insert/delete en orden sobre el texto.
+
+    Retorna (contenido nuevo, resumen por operacion). Lanza EditError en
+    la primera operacion invalida.
+    """
+    lines = content.splitlines(keepends=True)
+    applied = []
+
+    for i, op in enumerate(operations):
+        op_type = op.get("op")
+
+        if op_type == "replace":
+            old = op.get("old_text")
+            new = op.get("new_text", "")
+            max_repl = op.get("max_replacements", 1)
+
+            if old is None:
+                raise EditError(f"Error en operacion {i+1}: replace requiere 'old_text'")
+            if old not in content:
+                preview = old[:300] + '...' if len(old) > 300 else old
+                raise EditError(f"Error en operacion {i+1}: texto no encontrado: '{preview}'")
+
+            occurrences = content.count(old)
+            if max_repl == -1:
+                content = content.replace(old, new)
+                applied.append(f"replace: {occurrences} ocurrencia(s)")
+            else:
+                content = content.replace(old, new, max_repl)
+                applied.append(f"replace: {min(max_repl, occurrences)} de {occurrences} ocurrencia(s)")
+
+            lines = content.splitlines(keepends=True)
+
+        elif op_type == "insert":
+            line_num = op.get("line")
+            new_text = op.get("new_text", "")
+            if line_num is None:
+                raise EditError(f"Error en operacion {i+1}: insert requiere 'line'")
+            idx = line_num - 1
+            if idx < 0 or idx > len(lines):
+                raise EditError(f"Error en operacion {i+1}: linea {line_num} fuera de rango (archivo tiene {len(lines)} lineas)")
+            new_lines = new_text.splitlines(keepends=True)
+            if new_lines and not new_lines[-1].endswith('\n'):
+                new_lines[-1] += '\n'
+            lines[idx:idx] = new_lines
+            content = ''.join(lines)
+            applied.append(f"insert: {len(new_lines)} linea(s) en posicion {line_num}")
+
+        elif op_type == "delete":
+            line_num = op.get("line")
+            count = op.get("count", 1)
+            if line_num is None:
+                raise EditError(f"Error en operacion {i+1}: delete requiere 'line'")
+            if count < 1:
+                raise EditError(f"Error en operacion {i+1}: count debe ser >= 1")
+            idx = line_num - 1
+            if idx < 0 or idx >= len(lines):
+                raise EditError(f"Error en operacion {i+1}: linea {line_num} fuera de rango (archivo tiene {len(lines)} lineas)")
+            end_idx = min(idx + count, len(lines))
+            deleted_count = end_idx - idx
+            del lines[idx:end_idx]
+            content = ''.join(lines)
+            applied.append(f"delete: {deleted_count} linea(s) desde posicion {line_num}")
+
+        else:
+            raise EditError(f"Error en operacion {i+1}: operacion desconocida '{op_type}'")
+
+    return content, applied
+
+
 class EditFileTool(BaseTool):
     """Permite editar un archivo existente con operaciones precisas."""
 
+    path_args = ("path",)
+
     def __init__(self, allowed_paths: List[str]):
         super().__init__(
             name="edit_file",
@@ -93,67 +170,11 @@ class EditFileTool(BaseTool):
         except UnicodeDecodeError:
             return f"Error: No se puede leer '{path}' como texto UTF-8."
 
-        # Aplicar operaciones una por una
+        try:
+            content, applied = apply_edit_operations(content, operations)
+        except EditError as e:
+            return str(e)
         lines = content.splitlines(keepends=True)
-        applied = []
-
-        for i, op in enumerate(operations):
-            op_type = op.get("op")
-
-            if op_type == "replace":
-                old = op.get("old_text")
-                new = op.get("new_text", "")
-                max_repl = op.get("max_replacements", 1)
-
-                if old is None:
-                    return f"Error en operacion {i+1}: replace requiere 'old_text'"
-                if old not in content:
-                    preview = old[:300] + '...' if len(old) > 300 else old
-                    return f"Error en operacion {i+1}: texto no encontrado: '{preview}'"
-
-                occurrences = content.count(old)
-                if max_repl == -1:
-                    content = content.replace(old, new)
-                    applied.append(f"replace: {occurrences} ocurrencia(s)")
-                else:
-                    content = content.replace(old, new, max_repl)
-                    applied.append(f"replace: {min(max_repl, occurrences)} de {occurrences} ocurrencia(s)")
-
-                lines = content.splitlines(keepends=True)
-
-            elif op_type == "insert":
-                line_num = op.get("line")
-                new_text = op.get("new_text", "")
-                if line_num is None:
-                    return f"Error en operacion {i+1}: insert requiere 'line'"
-                idx = line_num - 1
-                if idx < 0 or idx > len(lines):
-                    return f"Error en operacion {i+1}: linea {line_num} fuera de rango (archivo tiene {len(lines)} lineas)"
-                new_lines = new_text.splitlines(keepends=True)
-                if new_lines and not new_lines[-1].endswith('\n'):
-                    new_lines[-1] += '\n'
-                lines[idx:idx] = new_lines
-                content = ''.join(lines)
-                applied.append(f"insert: {len(new_lines)} linea(s) en posicion {line_num}")
-
-            elif op_type == "delete":
-                line_num = op.get("line")
-                count = op.get("count", 1)
-                if line_num is None:
-                    return f"Error en operacion {i+1}: delete requiere 'line'"
-                if count < 1:
-                    return f"Error en operacion {i+1}: count debe ser >= 1"
-                idx = line_num - 1
-                if idx < 0 or idx >= len(lines):
-                    return f"Error en operacion {i+1}: linea {line_num} fuera de rango (archivo tiene {len(lines)} lineas)"
-                end_idx = min(idx + count, len(lines))
-                deleted_count = end_idx - idx
-                del lines[idx:end_idx]
-                content = ''.join(lines)
-                applied.append(f"delete: {deleted_count} linea(s) desde posicion {line_num}")
-
-            else:
-                return f"Error en operacion {i+1}: operacion desconocida '{op_type}'"
 
         # Escritura atomica: escribir a archivo temporal, luego renombrar
         temp_path = full_path.with_suffix(full_path.suffix + '.tmp')
@@ -7,11 +7,16 @@ from pathlib import Path
 from typing import List, Optional
 from ..server.tool import BaseTool
 from ..security.sandbox import SecurePath
+from ..serena.code_patterns import IGNORE_DIRS
+from .dir_walker import glob_depth, glob_to_regex, walk_tree
 
 
 class FindFilesTool(BaseTool):
     """Busca archivos por patron glob en un directorio."""
 
+    read_only = True
+    path_args = ("path",)
+
     def __init__(self, allowed_paths: List[str]):
         super().__init__(
             name="find_files",
@@ -19,7 +24,8 @@ class FindFilesTool(BaseTool):
                 "Busca archivos por patron glob. Ejemplos: "
                 "'*.py' (archivos Python), '**/*.txt' (recursivo), "
                 "'report_202*' (patron parcial). "
-                "Retorna rutas coincidentes con tamaño opcional."
+                "Retorna rutas coincidentes con tamaño opcional. "
+                "Omite node_modules, .git, build y lo ignorado por .gitignore."
             )
         )
         self.allowed_paths = [Path(p).expanduser().resolve() for p in allowed_paths]
@@ -50,12 +56,18 @@ class FindFilesTool(BaseTool):
                     "type": "boolean",
                     "description": "Incluir tamaño de cada archivo (default false)",
                     "default": False
+                },
+                "include_ignored": {
+                    "type": "boolean",
+                    "description": "Buscar tambien en node_modules, .git, build... y lo excluido por .gitignore (default false)",
+                    "default": False
                 }
             },
             "required": ["path", "pattern"]
         }
 
-    async def execute(self, path: str, pattern: str, max_results: int = 200, include_size: bool = False) -> str:
+    async def execute(self, path: str, pattern: str, max_results: int = 200,
+                      include_size: bool = False, include_ignored: bool = False) -> str:
         secure_path = SecurePath(path, self.allowed_paths)
         await secure_path.validate_read()
         base = secure_path.resolved_path
@@ -63,22 +75,33 @@ class FindFilesTool(BaseTool):
         if not base.is_dir():
             return f"Error: '{path}' no es un directorio."
 
+        # Recorrido en streaming, podado por profundidad del patron y por
+        # directorios ignorados (salvo que el patron apunte a uno de ellos)
+        pattern = pattern.replace("\\", "/")
+        while pattern.startswith("./"):
+            pattern = pattern[2:]
+        regex = glob_to_regex(pattern)
+        prune = not include_ignored and not any(
+            seg in IGNORE_DIRS for seg in pattern.split("/"))
+
         results = []
         count = 0
-        for match in base.glob(pattern):
+        for item in walk_tree(base, max_depth=glob_depth(pattern), prune=prune):
+            if item.ignored or not regex.match(item.rel):
+                continue
             count += 1
             if count > max_results:
                 break
+            rel = item.rel
             try:
-                rel = match.relative_to(base)
-                if include_size and match.is_file():
-                    size = match.stat().st_size
+                if include_size and not item.is_dir:
+                    size = item.stat().st_size
                     results.append(f"  {rel}  ({_fmt_size(size)})")
                 else:
-                    prefix = "[DIR] " if match.is_dir() else "      "
+                    prefix = "[DIR] " if item.is_dir else "      "
                     results.append(f"{prefix}{rel}")
             except (PermissionError, OSError):
-                results.append(f"      {match.name}  (sin acceso)")
+                results.append(f"      {rel}  (sin acceso)")
 
         truncated = count > max_results
         header = f"Busqueda: '{pattern}' en {base} — {min(count, max_results)} resultados"
@@ -94,6 +117,9 @@ class FindFilesTool(BaseTool):
 class FileInfoTool(BaseTool):
     """Muestra informacion detallada de un archivo o directorio."""
 
+    read_only = True
+    path_args = ("path",)
+
     def __init__(self, allowed_paths: List[str]):
         super().__init__(
             name="file_info",
@@ -197,6 +223,8 @@ class FileInfoTool(BaseTool):
 class MakeDirectoryTool(BaseTool):
     """Crea directorios con estructura de padres."""
 
+    path_args = ("path",)
+
     def __init__(self, allowed_paths: List[str]):
         super().__init__(
             name="make_directory",
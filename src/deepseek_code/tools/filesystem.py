@@ -1,5 +1,6 @@
 """Herramientas para operaciones con el sistema de archivos (lectura, escritura, eliminacion, movimiento, copia)."""
 
+import asyncio
 import os
 import aiofiles
 import shutil
@@ -8,20 +9,29 @@ from pathlib import Path
 from typing import Optional, List
 from ..server.tool import BaseTool
 from ..security.sandbox import SecurePath
+from .dir_walker import walk_tree
+from .file_sync import SYNC_MODES, copy_one, copy_tree, is_unchanged
+from .line_index import read_byte_range, read_line_range, supports_encoding
 
 # Limite de tamaño de archivo para lectura (50 MB)
 MAX_FILE_SIZE_BYTES = 50 * 1024 * 1024
+# Lecturas por rango (mmap): no cargan el archivo entero
+MAX_RANGED_FILE_BYTES = 4 * 1024 * 1024 * 1024
 
 class ReadFileTool(BaseTool):
     """Lee el contenido de un archivo de texto"""
 
+    read_only = True
+    path_args = ("path",)
+
     def __init__(self, allowed_paths: List[str]):
         super().__init__(
             name="read_file",
             description=(
                 "Lee el contenido de un archivo de texto. "
-                "Soporta lectura parcial con max_lines para archivos grandes. "
-                "Limite de 50MB. No soporta archivos binarios."
+                "Para archivos grandes usa offset/limit (rango de lineas) o "
+                "byte_offset/byte_limit; la respuesta indica el total de lineas para paginar. "
+                "Limite de 50MB para lectura completa. No soporta archivos binarios."
             )
         )
         self.allowed_paths = [Path(p).expanduser().resolve() for p in allowed_paths]
@@ -41,36 +51,98 @@ class ReadFileTool(BaseTool):
                 },
                 "max_lines": {
                     "type": "integer",
-                    "description": "Numero maximo de lineas a leer. Util para archivos grandes.",
+                    "description": "Numero maximo de lineas a leer desde el inicio. Util para archivos grandes.",
                     "minimum": 1
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Linea inicial (base 1) de un rango de lineas.",
+                    "minimum": 1
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Cantidad de lineas a leer desde offset.",
+                    "minimum": 1
+                },
+                "byte_offset": {
+                    "type": "integer",
+                    "description": "Byte inicial de un rango de bytes.",
+                    "minimum": 0
+                },
+                "byte_limit": {
+                    "type": "integer",
+                    "description": "Cantidad de bytes a leer desde byte_offset.",
+                    "minimum": 1
+                },
+                "full": {
+                    "type": "boolean",
+                    "description": "En sesiones, una relectura devuelve 'sin cambios' o un diff contra la version ya leida. true fuerza el texto completo.",
+                    "default": False
                 }
             },
             "required": ["path"]
         }
 
-    async def execute(self, path: str, encoding: str = "utf-8", max_lines: Optional[int] = None) -> str:
+    async def execute(self, path: str, encoding: str = "utf-8", max_lines: Optional[int] = None,
+                      offset: Optional[int] = None, limit: Optional[int] = None,
+                      byte_offset: Optional[int] = None, byte_limit: Optional[int] = None,
+                      full: bool = False) -> str:
+        # full lo consume el ledger de archivos vistos de la sesion (seen_ledger)
         secure_path = SecurePath(path, self.allowed_paths)
         await secure_path.validate_read()
         full_path = secure_path.resolved_path
-
-        # Validar tamaño antes de leer
         file_size = full_path.stat().st_size
-        if file_size > MAX_FILE_SIZE_BYTES:
-            return f"Error: Archivo demasiado grande ({file_size / 1024 / 1024:.1f} MB). Limite: 50 MB."
+        loop = asyncio.get_running_loop()
 
         try:
-            if max_lines:
+            # Rangos: mmap + indice de lineas cacheado, sin cargar el archivo
+            if byte_offset is not None or byte_limit is not None:
+                if file_size > MAX_RANGED_FILE_BYTES:
+                    return f"Error: Archivo demasiado grande ({file_size / 1024 / 1024:.1f} MB) incluso para lectura por rango."
+                start = byte_offset or 0
+                length = min(byte_limit or MAX_FILE_SIZE_BYTES, MAX_FILE_SIZE_BYTES)
+                text, end, size = await loop.run_in_executor(
+                    None, read_byte_range, str(full_path), start, length, encoding)
+                return f"[bytes {min(start, size)}-{end} de {size}]\n{text}"
+
+            ranged = offset is not None or limit is not None or max_lines
+            if ranged and supports_encoding(encoding) and file_size <= MAX_RANGED_FILE_BYTES:
+                count = limit if limit is not None else max_lines
+                window = await loop.run_in_executor(
+                    None, read_line_range, str(full_path), offset or 1, count, encoding)
+                if offset is None and limit is None:
+                    # max_lines clasico: mismo formato de siempre, con el total
+                    if window.last < window.total_lines:
+                        return (f"{window.text}\n... (truncado a {max_lines} de "
+                                f"{window.total_lines} lineas; usa offset/limit para paginar)")
+                    return window.text
+                if window.total_lines == 0 or window.first == 0:
+                    return f"[lineas: ninguna desde {offset or 1}; el archivo tiene {window.total_lines} lineas]"
+                header = f"[lineas {window.first}-{window.last} de {window.total_lines}]"
+                if window.last < window.total_lines:
+                    sep = "" if window.text.endswith("\n") else "\n"
+                    return f"{header}\n{window.text}{sep}... (siguiente: offset={window.last + 1})"
+                return f"{header}\n{window.text}"
+
+            if file_size > MAX_FILE_SIZE_BYTES:
+                return (f"Error: Archivo demasiado grande ({file_size / 1024 / 1024:.1f} MB). "
+                        f"Limite: 50 MB. Usa offset/limit o byte_offset/byte_limit para leerlo por partes.")
+
+            if ranged:
+                # Codificaciones donde '\n' no es un byte (utf-16...): lectura en modo texto
+                first = (offset or 1) - 1
+                count = limit if limit is not None else max_lines
+                stop = first + count if count is not None else None
                 lines = []
-                count = 0
+                total = 0
                 async with aiofiles.open(full_path, 'r', encoding=encoding) as f:
                     async for line in f:
-                        if count >= max_lines:
-                            break
-                        lines.append(line)
-                        count += 1
+                        if total >= first and (stop is None or total < stop):
+                            lines.append(line)
+                        total += 1
                 result = ''.join(lines)
-                if count >= max_lines:
-                    result += f"\n... (truncado a {max_lines} lineas)"
+                if stop is not None and stop < total:
+                    result += f"\n... (lineas {first + 1}-{stop} de {total})"
                 return result
             else:
                 async with aiofiles.open(full_path, 'r', encoding=encoding) as f:
@@ -81,6 +153,8 @@ class ReadFileTool(BaseTool):
 class WriteFileTool(BaseTool):
     """Escribe contenido en un archivo (crea o sobrescribe, o añade al final)"""
 
+    path_args = ("path",)
+
     def __init__(self, allowed_paths: List[str]):
         super().__init__(
             name="write_file",
@@ -144,6 +218,8 @@ class WriteFileTool(BaseTool):
 class DeleteFileTool(BaseTool):
     """Elimina un archivo o directorio"""
 
+    path_args = ("path",)
+
     def __init__(self, allowed_paths: List[str]):
         super().__init__(
             name="delete_file",
@@ -201,6 +277,8 @@ class DeleteFileTool(BaseTool):
 class MoveFileTool(BaseTool):
     """Mueve o renombra un archivo o directorio"""
 
+    path_args = ("source", "destination")
+
     def __init__(self, allowed_paths: List[str]):
         super().__init__(
             name="move_file",
@@ -251,13 +329,16 @@ class MoveFileTool(BaseTool):
 class CopyFileTool(BaseTool):
     """Copia un archivo o directorio"""
 
+    path_args = ("source", "destination")
+
     def __init__(self, allowed_paths: List[str]):
         super().__init__(
             name="copy_file",
             description=(
                 "Copia un archivo o directorio. "
                 "Para directorios usa recursive=true. "
-                "Si el destino ya existe, se fusiona el contenido."
+                "Si el destino ya existe, se fusiona el contenido. "
+                "sync='mtime' o 'content' copia solo los archivos que cambiaron."
             )
         )
         self.allowed_paths = [Path(p).expanduser().resolve() for p in allowed_paths]
@@ -278,12 +359,30 @@ class CopyFileTool(BaseTool):
                     "type": "boolean",
                     "description": "Requerido para copiar directorios con su contenido",
                     "default": False
+                },
+                "sync": {
+                    "type": "string",
+                    "enum": list(SYNC_MODES),
+                    "description": (
+                        "Omitir archivos que ya estan al dia en el destino: "
+                        "'mtime' (mismo tamaño y fecha, rapido), 'content' (mismo contenido) "
+                        "o 'none' (default, copia todo)."
+                    ),
+                    "default": "none"
                 }
             },
             "required": ["source", "destination"]
         }
 
-    async def execute(self, source: str, destination: str, recursive: bool = False) -> str:
+    def path_access(self, arguments):
+        # Solo escribe el destino: el origen puede leerse en paralelo
+        if not arguments.get("source") or not arguments.get("destination"):
+            return None
+        return ([self.resolve_access_path(str(arguments["source"]))],
+                [self.resolve_access_path(str(arguments["destination"]))])
+
+    async def execute(self, source: str, destination: str, recursive: bool = False,
+                      sync: str = "none") -> str:
         src_secure = SecurePath(source, self.allowed_paths)
         dst_secure = SecurePath(destination, self.allowed_paths)
         await src_secure.validate_read()
@@ -294,31 +393,51 @@ class CopyFileTool(BaseTool):
 
         if not src_path.exists():
             return f"Error: origen {source} no existe"
+        if sync not in SYNC_MODES:
+            return f"Error: sync debe ser uno de: {', '.join(SYNC_MODES)}"
 
         dst_path.parent.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
 
         if src_path.is_file():
-            shutil.copy2(str(src_path), str(dst_path))
-            size = src_path.stat().st_size
+            if dst_path.is_dir():
+                # Como shutil.copy2: copiar dentro del directorio existente
+                dst_path = dst_path / src_path.name
+            if src_path == dst_path:
+                return "Error: origen y destino son el mismo archivo"
+            if await loop.run_in_executor(None, is_unchanged, src_path, dst_path, sync):
+                return f"Archivo sin cambios: {dst_path} (omitido)"
+            size = await loop.run_in_executor(None, copy_one, src_path, dst_path)
             return f"Archivo copiado: {src_path} -> {dst_path} ({size} bytes)"
         elif src_path.is_dir():
-            if recursive:
-                total_files = sum(1 for _ in src_path.rglob('*') if _.is_file())
-                shutil.copytree(str(src_path), str(dst_path), dirs_exist_ok=True)
-                return f"Directorio copiado: {src_path} -> {dst_path} ({total_files} archivos)"
-            else:
+            if not recursive:
                 return "Error: Para copiar directorios, usa recursive=true"
+            if dst_path == src_path or src_path in dst_path.parents:
+                return "Error: el destino no puede estar dentro del origen"
+            stats = await loop.run_in_executor(None, copy_tree, src_path, dst_path, sync)
+            result = (
+                f"Directorio copiado: {src_path} -> {dst_path} "
+                f"({stats.copied} copiados, {stats.skipped} sin cambios, "
+                f"{stats.bytes} bytes transferidos en {stats.elapsed:.2f}s)"
+            )
+            if stats.errors:
+                result += f"\nErrores ({len(stats.errors)}):\n  " + "\n  ".join(stats.errors[:20])
+            return result
 
 class ListDirectoryTool(BaseTool):
     """Lista el contenido de un directorio"""
 
+    read_only = True
+    path_args = ("path",)
+
     def __init__(self, allowed_paths: List[str]):
         super().__init__(
             name="list_directory",
             description=(
                 "Lista archivos y carpetas de un directorio. "
                 "Muestra nombre, tamaño y opcionalmente fecha de modificacion. "
-                "recursive=true para ver subdirectorios (limitado a max_results)."
+                "recursive=true para ver subdirectorios (limitado a max_results; "
+                "omite node_modules, .git, build y lo ignorado por .gitignore)."
             )
         )
         self.allowed_paths = [Path(p).expanduser().resolve() for p in allowed_paths]
@@ -347,12 +466,18 @@ class ListDirectoryTool(BaseTool):
                     "type": "boolean",
                     "description": "Mostrar fecha de ultima modificacion (default false)",
                     "default": False
+                },
+                "include_ignored": {
+                    "type": "boolean",
+                    "description": "Con recursive, entrar tambien en node_modules, .git, build... y lo excluido por .gitignore (default false)",
+                    "default": False
                 }
             },
             "required": ["path"]
         }
 
-    async def execute(self, path: str, recursive: bool = False, max_results: int = 500, show_dates: bool = False) -> str:
+    async def execute(self, path: str, recursive: bool = False, max_results: int = 500,
+                      show_dates: bool = False, include_ignored: bool = False) -> str:
         secure_path = SecurePath(path, self.allowed_paths)
         await secure_path.validate_read()
         full_path = secure_path.resolved_path
@@ -360,27 +485,27 @@ class ListDirectoryTool(BaseTool):
         if not full_path.is_dir():
             return f"Error: {path} no es un directorio"
 
-        if recursive:
-            files = list(full_path.rglob("*"))
-        else:
-            files = list(full_path.iterdir())
-
-        total_count = len(files)
-        truncated = total_count > max_results
-        files = sorted(files)[:max_results]
-
+        # Streaming: se detiene al pasar max_results, sin recorrer el resto.
+        # recursive poda node_modules/.git/... y lo que excluya .gitignore
         result = []
-        for f in files:
-            rel_path = f.relative_to(full_path)
+        truncated = False
+        walker = walk_tree(full_path, max_depth=None if recursive else 1,
+                           prune=recursive and not include_ignored)
+        for item in walker:
+            if len(result) >= max_results:
+                truncated = True
+                break
+            rel_path = item.rel
             try:
-                stat = f.stat()
-                if f.is_dir():
+                if item.is_dir:
+                    note = "  (omitido)" if item.ignored else ""
                     if show_dates:
-                        mtime = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M')
-                        result.append(f"[DIR] {rel_path}/  ({mtime})")
+                        mtime = datetime.fromtimestamp(item.stat().st_mtime).strftime('%Y-%m-%d %H:%M')
+                        result.append(f"[DIR] {rel_path}/  ({mtime}){note}")
                     else:
-                        result.append(f"[DIR] {rel_path}/")
+                        result.append(f"[DIR] {rel_path}/{note}")
                 else:
+                    stat = item.stat()
                     size = stat.st_size
                     if show_dates:
                         mtime = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M')
@@ -391,6 +516,8 @@ class ListDirectoryTool(BaseTool):
                 result.append(f"      {rel_path}  (sin acceso)")
 
         if truncated:
-            result.append(f"\n... truncado: mostrando {max_results} de {total_count} items. Aumenta max_results si necesitas mas.")
+            result.append(f"\n... truncado: mostrando los primeros {max_results} items. Aumenta max_results si necesitas mas.")
+        elif recursive and any(line.endswith("(omitido)") for line in result):
+            result.append("\n(omitido = directorio ignorado, no listado; include_ignored=true para incluirlo)")
 
         return "\n".join(result) if result else "(directorio vacio)"
@@ -0,0 +1,158 @@
+"""Lecturas por rango de lineas o bytes sobre mmap con indice de saltos de linea.
+
+ReadFileTool solo podia leer desde el inicio (max_lines) o cargar el
+archivo entero en un string. Para logs grandes, bundles generados o
+lockfiles, pedir las lineas 40.000-40.200 obligaba a leer todo.
+
+Aqui el archivo se mapea en memoria y se construye (una vez) la tabla
+de offsets donde empieza cada linea. La tabla se cachea por
+(ruta, mtime_ns, tamaño), asi que lecturas repetidas por ventanas del
+mismo archivo solo cortan el mmap: tiempo constante sin importar en
+que parte del archivo este la ventana.
+
+Uso:
+    window = read_line_range("/var/log/app.log", start=40000, count=200)
+    window.text, window.first, window.last, window.total_lines
+    chunk = read_byte_range("/var/log/app.log", 1_000_000, 4096)
+"""
+
+import mmap
+import operator
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Optional, Tuple
+
+# Indices de archivos recientes en memoria (8 bytes por linea)
+LINE_INDEX_CACHE_SIZE = 32
+
+# Bloque de escaneo al construir el indice
+_SCAN_CHUNK = 8 * 1024 * 1024
+
+
+class LineIndex:
+    """Offsets de inicio de cada linea de un archivo (array de uint64)."""
+
+    __slots__ = ("starts", "size")
+
+    def __init__(self, starts: array, size: int):
+        self.starts = starts
+        self.size = size
+
+    @property
+    def total_lines(self) -> int:
+        return len(self.starts)
+
+    def span(self, first: int, last: int) -> Tuple[int, int]:
+        """Rango de bytes [inicio, fin) de las lineas first..last (base 0, inclusivo)."""
+        begin = self.starts[first]
+        end = self.starts[last + 1] if last + 1 < len(self.starts) else self.size
+        return begin, end
+
+    @classmethod
+    def build(cls, mm, size: int) -> "LineIndex":
+        starts = array("Q")
+        if size == 0:
+            return cls(starts, 0)
+        starts.append(0)
+        pos = 0
+        while pos < size:
+            chunk = mm[pos:pos + _SCAN_CHUNK]
+            # Todo en C (split, map, accumulate): la linea i+1 empieza en
+            # pos + largo acumulado de las partes 0..i + (i + 1) saltos
+            parts = chunk.split(b"\n")[:-1]
+            starts.extend(map(operator.add, accumulate(map(len, parts)),
+                              range(pos + 1, pos + 1 + len(parts))))
+            pos += len(chunk)
+        if starts[-1] == size:
+            # El archivo termina en '\n': no hay una linea vacia extra
+            starts.pop()
+        return cls(starts, size)
+
+
+_cache: "OrderedDict[Tuple[str, int, int], LineIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _get_index(path: str, mm, st: os.stat_result) -> LineIndex:
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+    index = LineIndex.build(mm, st.st_size)
+    with _cache_lock:
+        # Una version anterior del mismo archivo ya no sirve
+        for old in [k for k in _cache if k[0] == path]:
+            del _cache[old]
+        _cache[key] = index
+        while len(_cache) > LINE_INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
+
+
+def clear_line_index_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def supports_encoding(encoding: str) -> bool:
+    """True si la codificacion representa '\\n' como el byte 0x0A (utf-8, latin-1...)."""
+    try:
+        return "\n".encode(encoding) == b"\n"
+    except LookupError:
+        return False
+
+
+@dataclass
+class LineWindow:
+    """Ventana de lineas leida de un archivo (numeros de linea base 1)."""
+    text: str
+    first: int
+    last: int
+    total_lines: int
+
+
+def read_line_range(path: str, start: int, count: Optional[int],
+                    encoding: str = "utf-8") -> LineWindow:
+    """Lee count lineas desde la linea start (base 1). count=None hasta el final.
+
+    Los saltos '\\r\\n' se normalizan a '\\n' como en una lectura en modo texto.
+    """
+    path = os.path.abspath(path)
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            return LineWindow("", 0, 0, 0)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            index = _get_index(path, mm, st)
+            total = index.total_lines
+            first = max(1, start) - 1
+            if first >= total:
+                return LineWindow("", 0, 0, total)
+            last = total - 1 if count is None else min(total, first + max(1, count)) - 1
+            begin, end = index.span(first, last)
+            data = mm[begin:end]
+    text = data.decode(encoding).replace("\r\n", "\n")
+    return LineWindow(text, first + 1, last + 1, total)
+
+
+def read_byte_range(path: str, offset: int, length: Optional[int],
+                    encoding: str = "utf-8") -> Tuple[str, int, int]:
+    """Lee length bytes desde offset. Retorna (texto, fin_exclusivo, tamaño_total).
+
+    Un corte en medio de un caracter multibyte se reemplaza por U+FFFD.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        offset = min(max(0, offset), size)
+        end = size if length is None else min(size, offset + max(0, length))
+        if end <= offset:
+            return "", offset, size
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[offset:end]
+    return data.decode(encoding, errors="replace"), end, size
@@ -0,0 +1,498 @@
+"""Herramienta apply_patch: edita varios archivos en una sola llamada, de forma atomica.
+
+Una delegacion tipica tocaba varios archivos con llamadas separadas a
+edit_file/write_file (una ida y vuelta modelo -> tool -> modelo por
+archivo), y edit_file ademas devuelve el archivo entero editado. Aqui el
+modelo manda un diff unificado (o una lista de operaciones por archivo)
+que abarca todos los archivos:
+
+    1. se parsea y valida TODO (rutas, cada hunk contra el contenido
+       actual, operaciones de edit_file) antes de escribir nada
+    2. se escribe cada archivo a un temporal junto al original y luego
+       se reemplazan todos; si algo falla se restauran los originales
+    3. el resultado es solo un resumen por archivo (hunks, +/- lineas,
+       lineas finales), no el contenido
+
+Los hunks se buscan primero en la posicion indicada y luego hacia
+afuera (como patch, que tolera desplazamientos); si no aparecen exactos
+se prueba ignorando espacios al final de linea.
+"""
+
+import asyncio
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..server.tool import BaseTool
+from ..security.sandbox import SecurePath, SecurityError
+from .file_editor import EditError, apply_edit_operations
+
+# Limite de archivos por llamada
+MAX_PATCH_FILES = 200
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(Exception):
+    """Patch invalido o que no aplica (el mensaje va tal cual al modelo)."""
+
+
+@dataclass
+class Hunk:
+    old_start: int
+    new_start: int
+    header: str
+    old: List[str] = field(default_factory=list)
+    new: List[str] = field(default_factory=list)
+    added: int = 0
+    removed: int = 0
+    # '\ No newline at end of file' tras la ultima linea de cada lado
+    old_no_eol: bool = False
+    new_no_eol: bool = False
+
+
+@dataclass
+class FilePatch:
+    old_path: Optional[str]  # None: archivo nuevo (/dev/null)
+    new_path: Optional[str]  # None: archivo eliminado
+    hunks: List[Hunk] = field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        return self.new_path or self.old_path
+
+
+def _diff_path(raw: str) -> Optional[str]:
+    path = raw.split("\t")[0].strip()
+    if path.startswith('"') and path.endswith('"'):
+        path = path[1:-1]
+    return None if path == "/dev/null" else path
+
+
+def _strip_git_prefix(patch: FilePatch):
+    """a/x y b/x (diff de git) -> x."""
+    paths = [p for p in (patch.old_path, patch.new_path) if p]
+    if paths and all(p[:2] in ("a/", "b/") for p in paths):
+        if patch.old_path:
+            patch.old_path = patch.old_path[2:]
+        if patch.new_path:
+            patch.new_path = patch.new_path[2:]
+
+
+def parse_unified_diff(text: str) -> List[FilePatch]:
+    """Parsea un diff unificado (diff -u / git diff) de uno o varios archivos.
+
+    Tolerante con lo que suelen generar los modelos: el hunk termina en
+    el siguiente encabezado (no se confia en los conteos de @@) y una
+    linea vacia dentro del hunk es contexto vacio sin el espacio inicial.
+    """
+    lines = text.splitlines()
+    patches: List[FilePatch] = []
+    current: Optional[FilePatch] = None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            current = FilePatch(_diff_path(line[4:]), _diff_path(lines[i + 1][4:]))
+            _strip_git_prefix(current)
+            if current.path is None:
+                raise PatchError(f"Encabezado sin ruta: {line}")
+            patches.append(current)
+            i += 2
+            continue
+        m = _HUNK_HEADER.match(line)
+        if m:
+            if current is None:
+                raise PatchError(f"Hunk sin encabezado ---/+++: {line}")
+            old_count = int(m.group(2)) if m.group(2) is not None else 1
+            new_count = int(m.group(4)) if m.group(4) is not None else 1
+            hunk = Hunk(int(m.group(1)), int(m.group(3)), line.split("@@")[1].strip())
+            i += 1
+            last = None
+            while i < len(lines):
+                body = lines[i]
+                tag = body[:1]
+                if tag == "\\":
+                    if last in (" ", "-"):
+                        hunk.old_no_eol = True
+                    if last in (" ", "+"):
+                        hunk.new_no_eol = True
+                    i += 1
+                    continue
+                if body.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+                    break
+                if body == "":
+                    if len(hunk.old) >= old_count and len(hunk.new) >= new_count:
+                        break  # linea en blanco despues del hunk
+                    tag, body = " ", " "
+                if tag not in (" ", "-", "+"):
+                    break
+                if tag in (" ", "-"):
+                    hunk.old.append(body[1:])
+                if tag in (" ", "+"):
+                    hunk.new.append(body[1:])
+                hunk.added += tag == "+"
+                hunk.removed += tag == "-"
+                last = tag
+                i += 1
+            current.hunks.append(hunk)
+            continue
+        i += 1
+    if not patches:
+        raise PatchError("El patch no contiene archivos (se esperan encabezados --- / +++)")
+    return patches
+
+
+def _split(text: str) -> Tuple[List[str], bool]:
+    """Lineas sin salto y si el texto termina en salto de linea."""
+    if not text:
+        return [], True
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+        return lines, True
+    return lines, False
+
+
+def _find_hunk(lines: List[str], old: List[str], expected: int, lowest: int) -> Optional[int]:
+    """Posicion de old en lines mas cercana a expected (>= lowest)."""
+    size = len(old)
+    last = len(lines) - size
+    if last < lowest:
+        return None
+    expected = min(max(expected, lowest), last)
+    for equal in (lambda a, b: a == b, lambda a, b: a.rstrip() == b.rstrip()):
+        for dist in range(0, max(expected - lowest, last - expected) + 1):
+            for pos in (expected - dist, expected + dist) if dist else (expected,):
+                if lowest <= pos <= last and all(
+                        equal(lines[pos + k], old[k]) for k in range(size)):
+                    return pos
+    return None
+
+
+def apply_hunks(text: str, hunks: List[Hunk], label: str) -> Tuple[str, int, int]:
+    """Aplica los hunks de un archivo. Retorna (texto nuevo, +lineas, -lineas)."""
+    newline = "\r\n" if "\r\n" in text else "\n"
+    lines, eol = _split(text.replace("\r\n", "\n"))
+    delta = 0
+    lowest = 0
+    added = removed = 0
+    for n, hunk in enumerate(hunks, 1):
+        if hunk.old:
+            pos = _find_hunk(lines, hunk.old, hunk.old_start - 1 + delta, lowest)
+        else:
+            # Solo agrega lineas: old_start es la linea despues de la cual se inserta
+            pos = min(max(hunk.old_start + delta, lowest), len(lines))
+        if pos is None:
+            raise PatchError(
+                f"{label}: hunk {n} (@@ {hunk.header} @@) no coincide con el archivo "
+                f"(esperado cerca de la linea {hunk.old_start}): '{hunk.old[0][:200]}'"
+            )
+        lines[pos:pos + len(hunk.old)] = hunk.new
+        delta += len(hunk.new) - len(hunk.old)
+        lowest = pos + len(hunk.new)
+        if lowest == len(lines):
+            if hunk.new_no_eol:
+                eol = False
+            elif hunk.old_no_eol:
+                eol = True
+        added += hunk.added
+        removed += hunk.removed
+    body = newline.join(lines)
+    if lines and eol:
+        body += newline
+    return body, added, removed
+
+
+@dataclass
+class _Change:
+    """Cambio planificado sobre un archivo (contenidos en bytes)."""
+    label: str
+    path: Path
+    before: Optional[bytes]  # None: el archivo no existia
+    after: Optional[bytes]   # None: se elimina
+    summary: str
+    mode: Optional[int] = None
+
+
+def _line_count(data: bytes) -> int:
+    return data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+
+
+def _commit(changes: List[_Change]):
+    """Escribe todos los cambios o ninguno."""
+    temps: Dict[int, Path] = {}
+    created_dirs: List[Path] = []
+    done: List[_Change] = []
+    try:
+        for n, ch in enumerate(changes):
+            if ch.after is None:
+                continue
+            missing = []
+            parent = ch.path.parent
+            while not parent.exists():
+                missing.append(parent)
+                parent = parent.parent
+            for d in reversed(missing):
+                d.mkdir()
+                created_dirs.append(d)
+            tmp = ch.path.with_name(f".{ch.path.name}.{os.getpid()}.patch.tmp")
+            tmp.write_bytes(ch.after)
+            if ch.mode is not None:
+                os.chmod(tmp, ch.mode)
+            temps[n] = tmp
+        for n, ch in enumerate(changes):
+            if ch.after is None:
+                os.remove(ch.path)
+            else:
+                os.replace(temps[n], ch.path)
+                del temps[n]
+            done.append(ch)
+    except OSError as e:
+        for ch in reversed(done):
+            try:
+                if ch.before is None:
+                    os.remove(ch.path)
+                else:
+                    ch.path.write_bytes(ch.before)
+            except OSError:
+                pass
+        for tmp in temps.values():
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+        for d in reversed(created_dirs):
+            try:
+                d.rmdir()
+            except OSError:
+                pass
+        raise PatchError(f"Error escribiendo {getattr(e, 'filename', '') or ''}: {e}. "
+                         "Se restauraron todos los archivos.")
+
+
+class ApplyPatchTool(BaseTool):
+    """Aplica un diff unificado u operaciones sobre varios archivos, todo o nada."""
+
+    def __init__(self, allowed_paths: List[str]):
+        super().__init__(
+            name="apply_patch",
+            description=(
+                "Modifica VARIOS archivos en una sola llamada, de forma atomica "
+                "(si algo no aplica no se modifica ningun archivo). "
+                "Acepta 'patch' (diff unificado: encabezados ---/+++ y hunks @@; "
+                "/dev/null para crear o eliminar) y/o 'files' (lista de cambios por "
+                "archivo: 'operations' como edit_file, 'content' completo o 'delete'). "
+                "Devuelve solo un resumen por archivo; usa read_file si necesitas ver el resultado."
+            )
+        )
+        self.allowed_paths = [Path(p).expanduser().resolve() for p in allowed_paths]
+
+    def _build_schema(self) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "patch": {
+                    "type": "string",
+                    "description": "Diff unificado con uno o varios archivos (formato diff -u / git diff)"
+                },
+                "files": {
+                    "type": "array",
+                    "description": "Cambios por archivo (alternativa o complemento a 'patch')",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "path": {
+                                "type": "string",
+                                "description": "Ruta del archivo"
+                            },
+                            "operations": {
+                                "type": "array",
+                                "description": "Operaciones replace/insert/delete, igual que en edit_file",
+                                "items": {"type": "object"}
+                            },
+                            "content": {
+                                "type": "string",
+                                "description": "Contenido completo (crea o sobrescribe el archivo)"
+                            },
+                            "delete": {
+                                "type": "boolean",
+                                "description": "Eliminar el archivo",
+                                "default": False
+                            }
+                        },
+                        "required": ["path"]
+                    }
+                },
+                "dry_run": {
+                    "type": "boolean",
+                    "description": "Solo validar y mostrar el resumen, sin escribir (default false)",
+                    "default": False
+                }
+            }
+        }
+
+    def _requested_paths(self, patch: str, files: List[Dict[str, Any]]) -> List[str]:
+        paths = []
+        if patch:
+            for fp in parse_unified_diff(patch):
+                paths += [p for p in (fp.old_path, fp.new_path) if p]
+        paths += [str(item["path"]) for item in files or [] if item.get("path")]
+        return paths
+
+    def path_access(self, arguments: Dict[str, Any]):
+        try:
+            paths = self._requested_paths(arguments.get("patch", ""), arguments.get("files"))
+        except (PatchError, TypeError, AttributeError):
+            return None
+        if not paths:
+            return None
+        return [], list(dict.fromkeys(self.resolve_access_path(p) for p in paths))
+
+    async def _resolve(self, raw: str) -> Path:
+        """Ruta validada para escritura; admite directorios padres nuevos."""
+        try:
+            secure = SecurePath(raw, self.allowed_paths)
+        except SecurityError:
+            if Path(raw).is_absolute() or not self.allowed_paths:
+                raise
+            secure = SecurePath(str(self.allowed_paths[0] / raw), self.allowed_paths)
+        path = secure.resolved_path
+        # Con padres inexistentes se valida el primer directorio a crear
+        probe = path
+        while not probe.parent.exists():
+            probe = probe.parent
+        await SecurePath(str(probe), self.allowed_paths).validate_write()
+        return path
+
+    @staticmethod
+    def _read(path: Path, label: str) -> Tuple[Optional[bytes], Optional[str], Optional[int]]:
+        """(bytes, texto, st_mode) del archivo; (None, None, None) si no existe."""
+        if not path.exists():
+            return None, None, None
+        if not path.is_file():
+            raise PatchError(f"{label}: no es un archivo")
+        mode = path.stat().st_mode
+        data = path.read_bytes()
+        try:
+            return data, data.decode("utf-8"), mode
+        except UnicodeDecodeError:
+            raise PatchError(f"{label}: no se puede leer como texto UTF-8")
+
+    async def _plan(self, patch: str, files: List[Dict[str, Any]]) -> Tuple[List[_Change], List[str]]:
+        """Valida todo y calcula el contenido final de cada archivo."""
+        changes: List[_Change] = []
+        errors: List[str] = []
+        seen = set()
+        loop = asyncio.get_running_loop()
+
+        async def read(path: Path, label: str):
+            # Lectura y stat en el executor: no bloquean el event loop
+            return await loop.run_in_executor(None, self._read, path, label)
+
+        async def target(raw: str) -> Path:
+            path = await self._resolve(raw)
+            if path in seen:
+                raise PatchError(f"{raw}: aparece mas de una vez en el patch")
+            seen.add(path)
+            return path
+
+        for fp in parse_unified_diff(patch) if patch else []:
+            label = fp.path
+            try:
+                path = await target(fp.path)
+                before, text, mode = await read(path, label)
+                if fp.old_path and fp.new_path and fp.old_path != fp.new_path:
+                    # Renombrado: el original se elimina y el destino hereda sus permisos
+                    src = await target(fp.old_path)
+                    src_before, text, mode = await read(src, fp.old_path)
+                    if src_before is None:
+                        raise PatchError(f"{fp.old_path}: no existe")
+                    if before is not None:
+                        raise PatchError(f"{label}: ya existe (destino del renombrado)")
+                    changes.append(_Change(fp.old_path, src, src_before, None,
+                                           f"R {fp.old_path} -> {label}"))
+                if fp.new_path is None:
+                    if before is None:
+                        raise PatchError(f"{label}: no existe (no se puede eliminar)")
+                    changes.append(_Change(label, path, before, None, f"D {label}"))
+                    continue
+                if fp.old_path is None and before is not None:
+                    raise PatchError(f"{label}: ya existe (el patch lo crea desde /dev/null)")
+                if text is None and fp.old_path is not None:
+                    raise PatchError(f"{label}: no existe")
+                new_text, added, removed = apply_hunks(text or "", fp.hunks, label)
+                after = new_text.encode("utf-8")
+                kind = "A" if before is None else "M"
+                changes.append(_Change(
+                    label, path, before, after,
+                    f"{kind} {label}: {len(fp.hunks)} hunk(s), +{added} -{removed} "
+                    f"-> {_line_count(after)} lineas",
+                    mode=mode,
+                ))
+            except (PatchError, SecurityError) as e:
+                errors.append(str(e))
+
+        for item in files or []:
+            label = str(item.get("path", ""))
+            try:
+                if not label:
+                    raise PatchError("Cada elemento de 'files' requiere 'path'")
+                path = await target(label)
+                before, text, mode = await read(path, label)
+                if item.get("delete"):
+                    if before is None:
+                        raise PatchError(f"{label}: no existe (no se puede eliminar)")
+                    changes.append(_Change(label, path, before, None, f"D {label}"))
+                    continue
+                if item.get("content") is not None:
+                    after = str(item["content"]).encode("utf-8")
+                    detail = "contenido completo"
+                elif item.get("operations"):
+                    if text is None:
+                        raise PatchError(f"{label}: no existe")
+                    try:
+                        new_text, applied = apply_edit_operations(text, item["operations"])
+                    except EditError as e:
+                        raise PatchError(f"{label}: {e}")
+                    after = new_text.encode("utf-8")
+                    detail = "; ".join(applied)
+                else:
+                    raise PatchError(f"{label}: se requiere 'operations', 'content' o 'delete'")
+                kind = "A" if before is None else "M"
+                changes.append(_Change(
+                    label, path, before, after,
+                    f"{kind} {label}: {detail} -> {_line_count(after)} lineas",
+                    mode=mode,
+                ))
+            except (PatchError, SecurityError) as e:
+                errors.append(str(e))
+
+        if len(changes) > MAX_PATCH_FILES:
+            errors.append(f"Demasiados archivos en una llamada ({len(changes)}, maximo {MAX_PATCH_FILES})")
+        return changes, errors
+
+    async def execute(self, patch: str = "", files: Optional[List[Dict[str, Any]]] = None,
+                      dry_run: bool = False) -> str:
+        if not patch and not files:
+            return "Error: se requiere 'patch' o 'files'"
+        try:
+            changes, errors = await self._plan(patch, files or [])
+        except PatchError as e:
+            return f"Error: {e}"
+        if errors:
+            return ("Error: patch no aplicado, ningun archivo fue modificado.\n"
+                    + "\n".join(f"  - {err}" for err in errors))
+        if not changes:
+            return "Error: el patch no contiene cambios"
+
+        summary = "\n".join(f"  {ch.summary}" for ch in changes)
+        if dry_run:
+            return f"Patch valido, no se escribio nada ({len(changes)} archivo(s)):\n{summary}"
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _commit, changes)
+        except PatchError as e:
+            return f"Error: {e}"
+        return f"Patch aplicado a {len(changes)} archivo(s):\n{summary}"
@@ -0,0 +1,426 @@
+"""Procesos en background de run_command: salida drenada a logs rotativos.
+
+Antes run_command(background=true) leia stdout/stderr unos segundos y
+guardaba el proceso sin volver a leer los pipes: un dev server verboso
+llenaba el buffer del pipe del sistema y se quedaba bloqueado, y el
+modelo nunca veia la salida posterior (errores de compilacion, etc.).
+
+Aqui cada proceso tiene un hilo que drena su salida (stderr mezclado con
+stdout, en el orden en que llega) hacia:
+
+    - un log rotativo acotado: <tmp>/deepseek-code/process_logs/<pid>.log
+      (+ .1, .2 ...), LOG_MAX_BYTES por segmento
+    - las ultimas RECENT_LINES lineas en memoria (tail y wait)
+
+Un proceso detenido con 'stop' borra su log en el acto; uno que termina
+solo sigue consultable PROCESS_RETENTION_SECONDS y despues se olvida
+junto con su log.
+
+Se usan hilos y no tareas asyncio porque la CLI llama asyncio.run()
+varias veces: un lector ligado a un event loop moriria con el.
+
+BackgroundProcessTool (MCP "background_process") lista los procesos,
+muestra el final de la salida, busca con regex en el log, espera a que
+aparezca un patron y detiene procesos.
+"""
+
+import asyncio
+import collections
+import os
+import platform
+import re
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..server.tool import BaseTool, external_writer_finished, external_writer_started
+
+# Tamaño de cada segmento del log y segmentos viejos que se conservan
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 2
+# Lineas recientes en memoria por proceso
+RECENT_LINES = 2000
+# Espera maxima de la accion 'wait' (segundos)
+MAX_WAIT_SECONDS = 300
+# Tiempo que un proceso terminado sigue en la lista (tail/grep) antes de olvidarlo
+PROCESS_RETENTION_SECONDS = 600
+
+
+def log_dir() -> str:
+    return os.path.join(tempfile.gettempdir(), "deepseek-code", "process_logs")
+
+
+class RotatingLog:
+    """Archivo de log acotado: al pasar max_bytes rota a .1, .2, ..."""
+
+    def __init__(self, path: str, max_bytes: int = LOG_MAX_BYTES, backups: int = LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "wb")
+        self._size = 0
+        self._newlines = 0          # saltos de linea del segmento actual
+        self._backup_newlines = []  # idem por segmento viejo, de .1 en adelante
+        self.dropped_lines = 0      # lineas completas de segmentos ya borrados
+        self.removed = False
+
+    def write(self, data: bytes):
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        self._newlines += data.count(b"\n")
+
+    def _rotate(self):
+        self._file.close()
+        self._backup_newlines.insert(0, self._newlines)
+        if len(self._backup_newlines) > self.backups:
+            self.dropped_lines += self._backup_newlines.pop()
+        self._newlines = 0
+        for i in range(self.backups, 0, -1):
+            src = self.path if i == 1 else f"{self.path}.{i - 1}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i}")
+        self._file = open(self.path, "wb")
+        self._size = 0
+
+    def segments(self) -> List[str]:
+        """Archivos del log, del mas viejo al mas nuevo."""
+        old = [f"{self.path}.{i}" for i in range(self.backups, 0, -1)]
+        return [p for p in old if os.path.exists(p)] + [self.path]
+
+    def close(self):
+        self._file.close()
+
+    def remove(self):
+        """Cierra y borra todos los segmentos."""
+        self.close()
+        for segment in self.segments():
+            try:
+                os.remove(segment)
+            except OSError:
+                pass
+        self.removed = True
+
+
+class BackgroundProcess:
+    """Proceso en background con su salida drenada por un hilo."""
+
+    def __init__(self, cmd: List[str], command: str, cwd: Optional[str] = None):
+        self.command = command
+        self.cwd = cwd
+        self.started = time.time()
+        self.ended: Optional[float] = None
+        kwargs: Dict[str, Any] = {}
+        if platform.system() == "Windows":
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs["start_new_session"] = True  # stop() mata tambien a los hijos
+        self.popen = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL, cwd=cwd, **kwargs,
+        )
+        self.pid = self.popen.pid
+        # Puede escribir archivos: los caches de lecturas poco profundas no se usan mientras corre
+        external_writer_started()
+        self.log = RotatingLog(os.path.join(log_dir(), f"{self.pid}.log"))
+        self.recent = collections.deque(maxlen=RECENT_LINES)
+        self.total_lines = 0      # lineas completas vistas desde el inicio
+        self.last_output = time.monotonic()
+        self._partial = b""
+        self._lock = threading.Lock()
+        self._pump = threading.Thread(target=self._drain, name=f"bg-pump-{self.pid}", daemon=True)
+        self._pump.start()
+
+    def _drain(self):
+        stream = self.popen.stdout
+        try:
+            while True:
+                chunk = stream.read1(65536)
+                if not chunk:
+                    break
+                self._feed(chunk)
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                if self._partial:
+                    self._append_line(self._partial)
+                    self._partial = b""
+                self.log.close()
+            self.popen.wait()
+            self.ended = time.time()
+            external_writer_finished()
+
+    def _feed(self, chunk: bytes):
+        with self._lock:
+            self.log.write(chunk)
+            self.last_output = time.monotonic()
+            parts = (self._partial + chunk).split(b"\n")
+            self._partial = parts.pop()
+            for raw in parts:
+                self._append_line(raw)
+
+    def _append_line(self, raw: bytes):
+        self.recent.append(raw.rstrip(b"\r").decode("utf-8", errors="replace"))
+        self.total_lines += 1
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.popen.poll()
+
+    @property
+    def finished(self) -> bool:
+        """Termino y su salida ya fue drenada por completo."""
+        return self.returncode is not None and not self._pump.is_alive()
+
+    def lines_since(self, index: int) -> Tuple[List[str], int]:
+        """Lineas numero >= index que siguen en memoria, y el total actual."""
+        with self._lock:
+            first = self.total_lines - len(self.recent)
+            skip = max(0, index - first)
+            return list(self.recent)[skip:], self.total_lines
+
+    def tail(self, count: int) -> List[str]:
+        with self._lock:
+            lines = list(self.recent)[-count:] if count > 0 else []
+            if self._partial:
+                lines.append(self._partial.decode("utf-8", errors="replace"))
+            return lines
+
+    def grep(self, regex, max_results: int) -> List[str]:
+        """Lineas del log completo (todos los segmentos) que coinciden.
+
+        Los numeros son absolutos desde el inicio del proceso (como
+        describe()["lines"]): tras rotar, se cuentan las lineas de los
+        segmentos ya borrados. Con el log borrado busca en memoria.
+        """
+        with self._lock:
+            if self.log.removed:
+                first = self.total_lines - len(self.recent)
+                numbered = [(first + i + 1, line) for i, line in enumerate(self.recent)]
+                return [f"{n}: {line}" for n, line in numbered if regex.search(line)][:max_results]
+            segments = self.log.segments()
+            number = self.log.dropped_lines
+
+        matches = []
+        partial = b""
+
+        def check(raw: bytes) -> bool:
+            line = raw.rstrip(b"\r\n").decode("utf-8", errors="replace")
+            if regex.search(line):
+                matches.append(f"{number}: {line}")
+            return len(matches) >= max_results
+
+        # Una linea puede quedar partida entre dos segmentos
+        for segment in segments:
+            try:
+                with open(segment, "rb") as f:
+                    for raw in f:
+                        if not raw.endswith(b"\n"):
+                            partial += raw
+                            continue
+                        number += 1
+                        if check(partial + raw):
+                            return matches
+                        partial = b""
+            except OSError:
+                continue
+        if partial:
+            number += 1
+            check(partial)
+        return matches
+
+    def stop(self, grace: float = 5.0) -> Optional[int]:
+        """Termina el proceso y sus hijos; mata si no sale en grace segundos."""
+        if self.returncode is None:
+            if platform.system() == "Windows":
+                # cmd.exe /c no propaga la señal: matar el arbol entero
+                subprocess.run(["taskkill", "/T", "/F", "/PID", str(self.pid)],
+                               capture_output=True)
+            else:
+                try:
+                    os.killpg(self.pid, signal.SIGTERM)
+                except OSError:
+                    self.popen.terminate()
+            try:
+                self.popen.wait(timeout=grace)
+            except subprocess.TimeoutExpired:
+                try:
+                    os.killpg(self.pid, signal.SIGKILL)
+                except (OSError, AttributeError):
+                    self.popen.kill()
+                self.popen.wait()
+        self._pump.join(timeout=2.0)
+        return self.returncode
+
+    def remove_log(self):
+        """Borra el log en disco; tail, wait y grep siguen con lo que hay en memoria."""
+        with self._lock:
+            if not self.log.removed:
+                self.log.remove()
+
+    def describe(self) -> Dict[str, Any]:
+        code = self.returncode
+        return {
+            "pid": self.pid,
+            "command": self.command,
+            "status": "running" if code is None else f"exited ({code})",
+            "uptime_s": round(time.time() - self.started),
+            "lines": self.total_lines,
+            "log": None if self.log.removed else self.log.path,
+        }
+
+
+# Procesos lanzados con run_command(background=true): PID -> BackgroundProcess
+_background_processes: Dict[int, BackgroundProcess] = {}
+
+
+def prune_background(now: Optional[float] = None) -> List[int]:
+    """Olvida los procesos terminados hace mas de PROCESS_RETENTION_SECONDS y borra sus logs."""
+    now = time.time() if now is None else now
+    pruned = []
+    for pid, proc in list(_background_processes.items()):
+        if proc.finished and now - proc.ended >= PROCESS_RETENTION_SECONDS:
+            _background_processes.pop(pid, None)
+            proc.remove_log()
+            pruned.append(pid)
+    return pruned
+
+
+def start_background(cmd: List[str], command: str, cwd: Optional[str] = None) -> BackgroundProcess:
+    prune_background()
+    proc = BackgroundProcess(cmd, command, cwd)
+    _background_processes[proc.pid] = proc
+    return proc
+
+
+def get_background(pid: int) -> Optional[BackgroundProcess]:
+    return _background_processes.get(pid)
+
+
+async def initial_output(proc: BackgroundProcess, max_wait: float = 8.0, quiet: float = 1.0) -> str:
+    """Salida inicial: hasta que el proceso termina, calla `quiet` s o pasan max_wait s."""
+    start = time.monotonic()
+    while time.monotonic() - start < max_wait:
+        await asyncio.sleep(0.1)
+        if proc.finished:
+            break
+        if time.monotonic() - max(proc.last_output, start) >= quiet:
+            break
+    return "\n".join(proc.tail(RECENT_LINES))
+
+
+class BackgroundProcessTool(BaseTool):
+    """Consulta y controla los procesos lanzados con run_command(background=true)."""
+
+    def __init__(self):
+        super().__init__(
+            name="background_process",
+            description=(
+                "Gestiona procesos lanzados con run_command(background=true). "
+                "Acciones: 'list' (procesos y estado), 'tail' (ultimas lineas de salida), "
+                "'grep' (buscar regex en todo el log), 'wait' (esperar a que aparezca "
+                "un patron en la salida nueva, ej: 'compiled|error'), 'stop' (detener)."
+            )
+        )
+
+    def _build_schema(self) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["list", "tail", "grep", "wait", "stop"],
+                    "description": "Operacion a realizar"
+                },
+                "pid": {
+                    "type": "integer",
+                    "description": "PID del proceso (todas las acciones salvo 'list')"
+                },
+                "lines": {
+                    "type": "integer",
+                    "description": "Para tail: cantidad de lineas finales (default 50, maximo 500)",
+                    "default": 50
+                },
+                "pattern": {
+                    "type": "string",
+                    "description": "Para grep/wait: expresion regular"
+                },
+                "timeout": {
+                    "type": "integer",
+                    "description": f"Para wait: segundos maximos de espera (default 30, maximo {MAX_WAIT_SECONDS})",
+                    "default": 30
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Para grep: maximo de lineas (default 100)",
+                    "default": 100
+                }
+            },
+            "required": ["action"]
+        }
+
+    async def execute(self, action: str, pid: Optional[int] = None, lines: int = 50,
+                      pattern: Optional[str] = None, timeout: int = 30,
+                      max_results: int = 100) -> dict:
+        prune_background()
+        if action == "list":
+            return {"processes": [p.describe() for p in _background_processes.values()]}
+
+        if pid is None:
+            return {"error": f"La accion '{action}' requiere 'pid'"}
+        proc = get_background(int(pid))
+        if proc is None:
+            return {"error": f"No hay proceso en background con PID {pid}",
+                    "known_pids": sorted(_background_processes)}
+
+        if action == "tail":
+            count = max(1, min(int(lines), 500))
+            return {**proc.describe(), "output": "\n".join(proc.tail(count))}
+
+        if action == "stop":
+            code = await asyncio.get_running_loop().run_in_executor(None, proc.stop)
+            proc.remove_log()
+            return {**proc.describe(), "returncode": code,
+                    "output": "\n".join(proc.tail(20))}
+
+        if action in ("grep", "wait"):
+            if not pattern:
+                return {"error": f"La accion '{action}' requiere 'pattern'"}
+            try:
+                regex = re.compile(pattern)
+            except re.error as e:
+                return {"error": f"Regex invalido: {e}"}
+            if action == "grep":
+                found = await asyncio.get_running_loop().run_in_executor(
+                    None, proc.grep, regex, max(1, min(int(max_results), 1000)))
+                return {**proc.describe(), "matches": found, "total_found": len(found)}
+            return await self._wait(proc, regex, min(max(int(timeout), 1), MAX_WAIT_SECONDS))
+
+        return {"error": f"Accion desconocida: {action}"}
+
+    @staticmethod
+    async def _wait(proc: BackgroundProcess, regex, timeout: int) -> dict:
+        """Espera una linea NUEVA (posterior a la llamada) que coincida."""
+        index = proc.total_lines
+        deadline = time.monotonic() + timeout
+        while True:
+            new, index = proc.lines_since(index)
+            for offset, line in enumerate(new):
+                if regex.search(line):
+                    return {**proc.describe(), "matched": True, "line": line,
+                            "context": new[max(0, offset - 5):offset + 1]}
+            if proc.finished:
+                return {**proc.describe(), "matched": False,
+                        "reason": "el proceso termino", "output": "\n".join(proc.tail(20))}
+            if time.monotonic() >= deadline:
+                return {**proc.describe(), "matched": False,
+                        "reason": f"sin coincidencias en {timeout}s",
+                        "output": "\n".join(proc.tail(10))}
+            await asyncio.sleep(0.2)
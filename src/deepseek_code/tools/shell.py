@@ -8,9 +8,7 @@ from pathlib import Path
 from typing import List, Optional
 from ..server.tool import BaseTool
 from ..security.sandbox import CommandValidator
-
-# Almacen global de procesos en background (PID -> Process)
-_background_processes = {}
+from .process_manager import initial_output, start_background
 
 
 class RunCommandTool(BaseTool):
@@ -148,55 +146,16 @@ class RunCommandTool(BaseTool):
         """Ejecuta un comando en background, captura salida inicial y retorna.
 
         El proceso sigue vivo despues de retornar. Ideal para dev servers.
-        Espera hasta 8 segundos para capturar salida inicial (URLs, errores).
+        Un hilo drena su salida a un log rotativo (ver process_manager); se
+        espera hasta 8 segundos a la salida inicial (URLs, errores).
         """
-        process = await asyncio.create_subprocess_exec(
-            *full_cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=working_dir,
-            limit=1024*1024
-        )
-
-        # Capturar salida inicial durante ~8 segundos
-        let_initial_output = []
-        let_wait_seconds = 8
-
-        async def _read_stream(stream, label):
-            """Lee lineas del stream hasta timeout."""
-            try:
-                while True:
-                    line = await asyncio.wait_for(stream.readline(), timeout=1.0)
-                    if not line:
-                        break
-                    let_initial_output.append(line.decode('utf-8', errors='replace'))
-            except asyncio.TimeoutError:
-                pass  # normal — stream aun abierto
-            except Exception:
-                pass
-
-        # Leer stdout y stderr en paralelo durante let_wait_seconds
-        try:
-            await asyncio.wait_for(
-                asyncio.gather(
-                    _read_stream(process.stdout, "stdout"),
-                    _read_stream(process.stderr, "stderr"),
-                ),
-                timeout=let_wait_seconds
-            )
-        except asyncio.TimeoutError:
-            pass  # esperado — el proceso sigue corriendo
+        process = start_background(full_cmd, command, working_dir)
+        output = await initial_output(process, max_wait=8.0)
 
         # Verificar si el proceso murio inmediatamente (error de arranque)
-        if process.returncode is not None:
-            # Proceso ya termino — leer lo que quede
-            let_remaining_out, let_remaining_err = await process.communicate()
-            if let_remaining_out:
-                let_initial_output.append(let_remaining_out.decode('utf-8', errors='replace'))
-            if let_remaining_err:
-                let_initial_output.append(let_remaining_err.decode('utf-8', errors='replace'))
+        if process.finished:
             return {
-                "stdout": "".join(let_initial_output),
+                "stdout": output,
                 "stderr": "",
                 "returncode": process.returncode,
                 "success": False,
@@ -204,15 +163,15 @@ class RunCommandTool(BaseTool):
                 "error": "El proceso termino inmediatamente (no quedo en background)"
             }
 
-        # Proceso sigue vivo — guardarlo
-        let_pid = process.pid
-        _background_processes[let_pid] = process
-
-        let_output_text = "".join(let_initial_output)
         return {
-            "stdout": let_output_text,
-            "pid": let_pid,
+            "stdout": output,
+            "pid": process.pid,
             "background": True,
             "success": True,
-            "message": f"Proceso ejecutandose en background (PID {let_pid}). La salida inicial se muestra arriba."
+            "log": process.log.path,
+            "message": (
+                f"Proceso ejecutandose en background (PID {process.pid}). La salida inicial "
+                "se muestra arriba; la salida posterior queda en el log. Usa background_process "
+                "(tail/grep/wait/stop) para verla o detenerlo."
+            )
         }
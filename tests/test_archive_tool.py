@@ -0,0 +1,103 @@
+"""Tests para ArchiveTool — zip/tar.gz/tar.xz en paralelo y extraccion acotada."""
+import asyncio
+import gzip
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from deepseek_code.tools import archive_engine
+from deepseek_code.tools.archive_engine import ArchiveError, collect_entries, extract_zip, write_zip
+from deepseek_code.tools.archive_tool import ArchiveTool
+
+
+def _project(root):
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "app.py").write_text("print('hola')\n" * 200, encoding="utf-8")
+    (root / "src" / "pkg" / "empty.txt").write_bytes(b"")
+    # Varios bloques: cruza limites de CHUNK_SIZE (reducido en los tests)
+    (root / "src" / "pkg" / "data.bin").write_bytes(os.urandom(3000) + b"abc" * 5000)
+    return root / "src"
+
+
+def _read_tree(root):
+    return {p.relative_to(root).as_posix(): p.read_bytes()
+            for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(archive_engine, "CHUNK_SIZE", 4096)
+    monkeypatch.setattr(archive_engine, "XZ_CHUNK_SIZE", 8192)
+
+
+@pytest.mark.parametrize("fmt", ["zip", "tar.gz", "tar.xz"])
+def test_create_and_extract_roundtrip(tmp_path, fmt):
+    src = _project(tmp_path)
+    tool = ArchiveTool([str(tmp_path)])
+
+    created = asyncio.run(tool.execute("create", str(src), str(tmp_path / "bundle"), format=fmt))
+    archive = tmp_path / f"bundle.{fmt}"
+    assert f"{fmt.upper()} creado: {archive}" in created
+    assert "Archivos: 3" in created and "MB/s" in created
+
+    extracted = asyncio.run(tool.execute("extract", str(archive), str(tmp_path / "copy")))
+    assert "extraido" in extracted and "3 archivos" in extracted
+    assert _read_tree(tmp_path / "copy") == _read_tree(src)
+
+    listing = asyncio.run(tool.execute("list", str(archive)))
+    assert "pkg/data.bin" in listing
+
+
+def test_parallel_blocks_are_readable_by_stdlib(tmp_path):
+    src = _project(tmp_path)
+    entries = collect_entries(src, 100, 10 ** 9)
+    stats = write_zip(tmp_path / "a.zip", entries, workers=3)
+    assert stats.files == 3 and stats.bytes_in == sum(e[2] for e in entries)
+    with zipfile.ZipFile(tmp_path / "a.zip") as zf:
+        assert zf.testzip() is None
+        assert zf.read("pkg/data.bin") == (src / "pkg" / "data.bin").read_bytes()
+
+    archive_engine.write_tar(tmp_path / "a.tar.gz", entries, "tar.gz", workers=3)
+    # Un unico miembro gzip con CRC/ISIZE correctos
+    raw = gzip.decompress((tmp_path / "a.tar.gz").read_bytes())
+    with tarfile.open(fileobj=io.BytesIO(raw)) as tf:
+        assert sorted(tf.getnames()) == ["app.py", "pkg/data.bin", "pkg/empty.txt"]
+
+
+def test_extract_rejects_traversal_and_budget(tmp_path):
+    evil = tmp_path / "evil.zip"
+    with zipfile.ZipFile(evil, "w") as zf:
+        zf.writestr("ok.txt", "x")
+        zf.writestr("../escape.txt", "x")
+    tool = ArchiveTool([str(tmp_path)])
+    result = asyncio.run(tool.execute("extract", str(evil), str(tmp_path / "dst")))
+    assert "path traversal" in result
+    assert not (tmp_path / "dst" / "ok.txt").exists()
+    assert not (tmp_path / "escape.txt").exists()
+
+    big = tmp_path / "big.zip"
+    with zipfile.ZipFile(big, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("zeros.bin", b"\0" * 100_000)
+    with pytest.raises(ArchiveError, match="excede el limite"):
+        extract_zip(big, tmp_path / "dst2", max_files=10, max_bytes=50_000)
+
+
+def test_tar_extract_skips_links(tmp_path):
+    archive = tmp_path / "links.tar.gz"
+    with tarfile.open(archive, "w:gz") as tf:
+        data = b"contenido"
+        info = tarfile.TarInfo("dir/file.txt")
+        info.size = len(data)
+        tf.addfile(info, io.BytesIO(data))
+        link = tarfile.TarInfo("dir/link")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "/etc/passwd"
+        tf.addfile(link)
+    tool = ArchiveTool([str(tmp_path)])
+    result = asyncio.run(tool.execute("extract", str(archive)))
+    assert (tmp_path / "links" / "dir" / "file.txt").read_bytes() == b"contenido"
+    assert not os.path.lexists(tmp_path / "links" / "dir" / "link")
+    assert "Omitidos" in result and "dir/link" in result
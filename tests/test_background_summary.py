@@ -0,0 +1,168 @@
+"""Tests para el resumen progresivo en segundo plano."""
+import asyncio
+import json
+
+import pytest
+
+from deepseek_code.client.background_summary import BackgroundSummary
+from deepseek_code.client.conversation_history import ConversationHistory
+
+
+def _history(n):
+    history = ConversationHistory([{"role": "system", "content": "sistema"}])
+    for i in range(n):
+        role = "user" if i % 2 == 0 else "assistant"
+        history.append({"role": role, "content": f"mensaje {i} " + "texto " * 50})
+    return history
+
+
+def test_applies_at_next_turn_and_keeps_new_messages():
+    async def run():
+        release = asyncio.Event()
+
+        async def generate(messages):
+            await release.wait()
+            return f"resumen de {len(messages)}"
+
+        history = _history(6)
+        bg = BackgroundSummary(generate)
+        bg.start(history, list(history.window(1, 4)))
+        await asyncio.sleep(0)
+        assert await bg.take(history, 10 ** 6) is None  # en vuelo: no bloquea
+        assert bg.pending
+
+        history.append({"role": "user", "content": "llego despues"})
+        release.set()
+        await asyncio.sleep(0)
+        summary, summarized, to_keep = await bg.take(history, 10 ** 6)
+        assert summary == "resumen de 3"
+        assert summarized == history[1:4]
+        assert to_keep == history[4:] and to_keep[-1]["content"] == "llego despues"
+        assert not bg.pending
+
+    asyncio.run(run())
+
+
+def test_cancelled_when_history_changes():
+    async def run():
+        async def generate(messages):
+            await asyncio.sleep(10)
+            return "no deberia llegar"
+
+        history = _history(6)
+        bg = BackgroundSummary(generate)
+        bg.start(history, list(history.window(1, 4)))
+        task = bg._task
+        history[2] = {"role": "assistant", "content": "editado"}
+        assert await bg.take(history, 10 ** 6, wait=True) is None
+        await asyncio.sleep(0)
+        assert task.cancelled() and not bg.pending
+
+        # Demasiado crecimiento desde la foto: tambien se descarta
+        bg.start(history, list(history.window(1, 4)))
+        history.append({"role": "user", "content": "x " * 5000})
+        assert await bg.take(history, 10000) is None
+        assert not bg.pending
+
+    asyncio.run(run())
+
+
+def test_client_never_waits_below_hard_threshold():
+    pytest.importorskip("openai")
+    from deepseek_code.client.deepseek_client import DeepSeekCodeClient
+
+    async def run():
+        client = DeepSeekCodeClient(api_key="test")
+        client.max_context_tokens = 2000
+        calls = []
+        release = asyncio.Event()
+
+        async def generate(messages):
+            calls.append(len(messages))
+            await release.wait()
+            return "resumen"
+
+        client._background_summary._generate = generate
+        for i in range(8):
+            client.conversation_history.append({"role": "user", "content": "palabra " * 90})
+        ratio = client.conversation_history.total_tokens * 100 // client.max_context_tokens
+        assert client.summary_prefetch_threshold <= ratio < client.summary_threshold
+
+        # Turno 1: arranca el resumen y vuelve sin esperarlo
+        done, _, _ = await asyncio.wait_for(client._check_context_and_summarize(), 1)
+        assert not done and calls == [4]
+        # Turno 2: todavia en vuelo, no se relanza
+        done, _, _ = await asyncio.wait_for(client._check_context_and_summarize(), 1)
+        assert not done and calls == [4]
+
+        release.set()
+        await asyncio.sleep(0)
+        done, notification, _ = await client._check_context_and_summarize()
+        assert done and "Resumen progresivo #1" in notification
+        assert client.conversation_history[1]["content"].endswith("resumen")
+        assert len(client.conversation_history) == 2 + 4
+
+    asyncio.run(run())
+
+
+def test_web_summary_keeps_turn_message_id(tmp_path):
+    httpx = pytest.importorskip("httpx")
+    from deepseek_code.client.async_web_session import AsyncDeepSeekWebSession, web_chat, web_chat_detached
+    from deepseek_code.sessions.session_store import SessionStore
+
+    def sse(*chunks):
+        return [f"data: {json.dumps(c)}\n\n".encode() for c in chunks] + [b"event: finish\n\n"]
+
+    async def run():
+        turn_started, release_turn = asyncio.Event(), asyncio.Event()
+        sent = {}
+
+        async def turn_stream():
+            yield sse({"response_message_id": 10})[0]
+            turn_started.set()
+            await release_turn.wait()
+            for line in sse({"p": "response/content", "v": "respuesta"}):
+                yield line
+
+        def handler(request):
+            payload = json.loads(request.content)
+            sent[payload["chat_session_id"]] = payload["parent_message_id"]
+            if payload["chat_session_id"] == "chat-turno":
+                return httpx.Response(200, content=turn_stream())
+            return httpx.Response(200, content=b"".join(sse(
+                {"response_message_id": 99}, {"p": "response/content", "v": "resumen"})))
+
+        web = AsyncDeepSeekWebSession.__new__(AsyncDeepSeekWebSession)
+        web.extra_headers = {}
+        web._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        web._http_loop = asyncio.get_running_loop()
+        web._chat_session_id = "chat-turno"
+
+        async def pow_header():
+            return "pow"
+
+        async def new_chat():
+            return "chat-resumen"
+
+        web._pow_header_async = pow_header
+        web.acquire_chat_session_async = new_chat
+
+        store = SessionStore(str(tmp_path / "sessions.json"))
+        store.create("s", "chat-turno")
+        store.update("s", parent_message_id=5)
+
+        turn = asyncio.create_task(web_chat(web, "hola", parent_message_id=5))
+        await turn_started.wait()
+        # El resumen corre completo mientras el turno sigue abierto
+        assert await web_chat_detached(web, "resumir") == "resumen"
+        release_turn.set()
+        assert await turn == "respuesta"
+
+        # Lo que hace chat_in_session despues de cada web_chat
+        store.update("s", parent_message_id=web.last_message_id)
+        assert store.get("s").parent_message_id == 10
+        assert web._sse_diag["content_chars"] == len("respuesta")
+        assert sent == {"chat-turno": 5, "chat-resumen": None}
+        await web._http.aclose()
+
+    asyncio.run(run())
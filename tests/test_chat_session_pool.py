@@ -0,0 +1,99 @@
+"""Tests para ChatSessionPool — chat_session_id pre-creados con TTL."""
+import asyncio
+
+from deepseek_code.client.chat_session_pool import ChatSessionPool, get_chat_session_pool
+
+
+def _make_create(fail_after=None):
+    counter = {"n": 0}
+
+    async def create():
+        counter["n"] += 1
+        if fail_after is not None and counter["n"] > fail_after:
+            raise RuntimeError("sin red")
+        await asyncio.sleep(0.001)
+        return f"s{counter['n']}"
+
+    return create, counter
+
+
+class TestChatSessionPool:
+    def test_miss_then_hits_after_refill(self):
+        async def run():
+            pool = ChatSessionPool(size=2, eager=True)
+            create, counter = _make_create()
+            first = await pool.acquire(create)
+            await asyncio.sleep(0.05)  # relleno en segundo plano
+            second = await pool.acquire(create)
+            third = await pool.acquire(create)
+            await asyncio.sleep(0.05)
+            return pool.stats(), [first, second, third], counter["n"]
+
+        stats, ids, created = asyncio.run(run())
+        assert ids == ["s1", "s2", "s3"]  # FIFO, nunca se repite un id
+        assert len(set(ids)) == 3
+        assert stats["misses"] == 1 and stats["hits"] == 2
+        assert stats["ready"] == 2
+        assert created == 5
+
+    def test_refills_one_for_one_by_default(self):
+        async def run():
+            pool = ChatSessionPool(size=5)
+            create, counter = _make_create()
+            ids = []
+            for _ in range(3):
+                ids.append(await pool.acquire(create))
+                await asyncio.sleep(0.02)
+            return pool.stats(), ids, counter["n"]
+
+        stats, ids, created = asyncio.run(run())
+        assert ids == ["s1", "s2", "s3"]
+        assert stats["misses"] == 1 and stats["hits"] == 2
+        # Solo se repone lo entregado: un id sin usar, no size
+        assert stats["ready"] == 1 and created == 4
+
+    def test_expired_ids_are_skipped(self):
+        async def run():
+            pool = ChatSessionPool(size=1, ttl=0.01)
+            create, _ = _make_create()
+            await pool.acquire(create)
+            await asyncio.sleep(0.05)  # el relleno vence antes de usarse
+            sid = await pool.acquire(create)
+            pool.discard()
+            return pool.stats(), sid
+
+        stats, sid = asyncio.run(run())
+        assert stats["expired"] == 1
+        assert stats["misses"] == 2
+        assert sid == "s3"
+
+    def test_refill_error_does_not_break_acquire(self):
+        async def run():
+            pool = ChatSessionPool(size=3)
+            create, _ = _make_create(fail_after=1)
+            sid = await pool.acquire(create)
+            await asyncio.sleep(0.02)
+            return pool.stats(), sid
+
+        stats, sid = asyncio.run(run())
+        assert sid == "s1"
+        assert stats["refill_errors"] == 1
+        assert stats["ready"] == 0
+
+    def test_pool_survives_new_event_loop(self):
+        pool = ChatSessionPool(size=1)
+        create, _ = _make_create()
+
+        async def first():
+            await pool.acquire(create)
+            await asyncio.sleep(0.02)
+
+        asyncio.run(first())
+        assert asyncio.run(pool.acquire(create)) == "s2"
+
+    def test_shared_per_token(self):
+        a = get_chat_session_pool("token-test-pool", 2)
+        b = get_chat_session_pool("token-test-pool", 4)
+        assert a is b and a.size == 4 and not a.eager
+        assert get_chat_session_pool("token-test-pool", 2, eager=True).eager
+        assert get_chat_session_pool("otro-token-pool", 1) is not a
@@ -0,0 +1,79 @@
+"""Tests para ConversationHistory (totales de tokens incrementales)."""
+import pytest
+
+from deepseek_code.client.context_manager import (
+    rebuild_history_after_summary, should_summarize, total_estimated_tokens,
+)
+from deepseek_code.client.conversation_history import ConversationHistory, message_tokens
+
+
+def _messages():
+    return [
+        {"role": "system", "content": "Eres un asistente de codigo."},
+        {"role": "user", "content": "lee config.py"},
+        {"role": "assistant", "content": None, "tool_calls": [
+            {"id": "1", "type": "function",
+             "function": {"name": "read_file", "arguments": '{"path": "config.py"}'}}]},
+        {"role": "tool", "tool_call_id": "1", "content": "DEBUG = True\nPORT = 8080\n" * 20},
+        {"role": "assistant", "content": "El puerto es 8080."},
+    ]
+
+
+def _recount(history):
+    return sum(message_tokens(m) for m in history)
+
+
+def test_totals_follow_every_mutation():
+    history = ConversationHistory(_messages())
+    assert history.total_tokens == _recount(history) > 0
+    assert history.tokens_for("tool") == message_tokens(history[3])
+    assert history.tokens_for("assistant") > message_tokens(history[4])  # cuenta tool_calls
+
+    history.append({"role": "user", "content": "y el host?"})
+    history[0] = {"role": "system", "content": "Prompt nuevo mas largo que el anterior."}
+    history.insert(1, {"role": "user", "content": "hola"})
+    del history[2]
+    history.pop()
+    history[1:3] = [{"role": "user", "content": "resumen"}]
+    history.extend([{"role": "tool", "content": "ok"}])
+    assert history.total_tokens == _recount(history)
+    assert sum(history.tokens_by_role().values()) == history.total_tokens
+
+    history[-1]["content"] = "salida mucho mas larga " * 10
+    history.refresh(len(history) - 1)
+    assert history.total_tokens == _recount(history)
+
+    with pytest.raises(ValueError):
+        history[0:2:2] = []  # tramo extendido de otro tamaño: no toca los totales
+    assert history.total_tokens == _recount(history)
+
+    history.clear()
+    assert history.total_tokens == 0 and history.tokens_for("user") == 0
+
+
+def test_window_does_not_copy():
+    history = ConversationHistory(_messages())
+    view = history.window(history.non_system_start())
+    assert len(view) == 4
+    assert view[0] is history[1]
+    assert view.tokens == history.total_tokens - history.tokens_for("system")
+    assert view[1:][0] is history[2]
+    assert list(view) == history[1:]
+
+
+def test_summary_helpers_use_running_totals():
+    history = ConversationHistory(_messages())
+    assert total_estimated_tokens(history) == total_estimated_tokens(list(history))
+
+    # Umbral 1%: siempre supera; la mitad cae en un resultado de herramienta
+    # y el corte se corre para no separarlo de su tool_call
+    to_summarize, to_keep = should_summarize(history, 1000, 1, 0, 3)
+    assert to_summarize == history[1:4]
+    assert to_keep == history[4:]
+    assert should_summarize(list(history), 1000, 1, 0, 3) == (to_summarize, to_keep)
+    assert should_summarize(history, 10 ** 9, 80, 0, 3) is None
+
+    rebuilt = rebuild_history_after_summary("sistema", "resumen", to_keep)
+    assert isinstance(rebuilt, ConversationHistory)
+    assert rebuilt.total_tokens == _recount(rebuilt)
+    assert rebuilt.copy().total_tokens == rebuilt.total_tokens
@@ -0,0 +1,75 @@
+"""Tests para dir_walker — recorrido en streaming con poda (list_directory / find_files)."""
+import asyncio
+
+from deepseek_code.tools.dir_walker import GitIgnore, glob_to_regex, walk_tree
+from deepseek_code.tools.file_utils import FindFilesTool
+from deepseek_code.tools.filesystem import ListDirectoryTool
+
+
+def _tree(root):
+    files = [
+        "README.md", "src/app.py", "src/util/helpers.py", "src/util/data.json",
+        "node_modules/pkg/index.js", "build/out.js", "logs/today.log",
+        "src/gen/auto.py", "src/keep.log",
+    ]
+    for rel in files:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x", encoding="utf-8")
+    (root / ".gitignore").write_text("*.log\n!keep.log\n/logs/\ngen/\n", encoding="utf-8")
+
+
+def _run(tool, **args):
+    return asyncio.run(tool.execute(**args))
+
+
+class TestDirWalker:
+    def test_prunes_ignored_dirs_and_gitignore(self, tmp_path):
+        _tree(tmp_path)
+        entries = {e.rel: e for e in walk_tree(tmp_path)}
+        assert entries["node_modules"].ignored and entries["build"].ignored
+        assert entries["logs"].ignored and entries["src/gen"].ignored
+        assert "node_modules/pkg" not in entries
+        assert "src/keep.log" in entries  # re-incluido con '!'
+        assert "src/util/helpers.py" in entries
+
+    def test_order_matches_sorted_paths(self, tmp_path):
+        _tree(tmp_path)
+        rels = [e.rel for e in walk_tree(tmp_path, prune=False)]
+        assert rels == sorted(rels, key=lambda r: r.split("/"))
+        assert len(rels) == len({p for p in tmp_path.rglob("*")})
+
+    def test_glob_regex(self):
+        assert glob_to_regex("**/*.py").match("a.py")
+        assert glob_to_regex("**/*.py").match("x/y/a.py")
+        assert not glob_to_regex("*.py").match("x/a.py")
+        assert glob_to_regex("data_[!0-4]?.csv").match("data_57.csv")
+        assert not glob_to_regex("data_[!0-4]?.csv").match("data_17.csv")
+        gi = GitIgnore.parse("# c\n/dist\n*.tmp\n")
+        assert gi.match("dist", True) and gi.match("a/b.tmp", False)
+        assert gi.match("a/dist", True) is None
+
+
+class TestToolsUseWalker:
+    def test_list_directory_stops_at_max_results(self, tmp_path):
+        _tree(tmp_path)
+        tool = ListDirectoryTool([str(tmp_path)])
+        out = _run(tool, path=str(tmp_path), recursive=True, max_results=3)
+        lines = out.splitlines()
+        assert lines[:3] == ["      .gitignore  (28 bytes)", "      README.md  (1 bytes)",
+                             "[DIR] build/  (omitido)"]
+        assert "truncado" in out
+        full = _run(tool, path=str(tmp_path), recursive=True, max_results=100)
+        assert "index.js" not in full and "src/util/helpers.py" in full
+        # Sin recursive se ve todo, como antes
+        assert "[DIR] node_modules/\n" in _run(tool, path=str(tmp_path)) + "\n"
+
+    def test_find_files(self, tmp_path):
+        _tree(tmp_path)
+        tool = FindFilesTool([str(tmp_path)])
+        out = _run(tool, path=str(tmp_path), pattern="**/*.py")
+        assert out.splitlines()[1:] == ["      src/app.py", "      src/util/helpers.py"]
+        assert "index.js" in _run(tool, path=str(tmp_path), pattern="node_modules/**/*.js")
+        assert "Sin resultados" in _run(tool, path=str(tmp_path), pattern="*.py")
+        out = _run(tool, path=str(tmp_path), pattern="**/*.js", include_ignored=True)
+        assert "build/out.js" in out
@@ -0,0 +1,90 @@
+"""Tests para copy_file recursivo: copia concurrente y modo sync."""
+import asyncio
+import os
+
+from deepseek_code.tools import file_sync
+from deepseek_code.tools.file_sync import copy_one, copy_tree
+from deepseek_code.tools.filesystem import CopyFileTool
+
+
+def _tree(root):
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "top.txt").write_text("top\n", encoding="utf-8")
+    (root / "a" / "one.txt").write_text("one\n", encoding="utf-8")
+    (root / "a" / "b" / "big.bin").write_bytes(os.urandom(300_000))
+    return root
+
+
+def _snapshot(root):
+    return {p.relative_to(root).as_posix(): p.read_bytes()
+            for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def test_copy_tree_then_sync_skips_unchanged(tmp_path):
+    src = _tree(tmp_path / "src")
+    dst = tmp_path / "dst"
+
+    first = copy_tree(src, dst, workers=3)
+    assert (first.copied, first.skipped) == (3, 0)
+    assert first.bytes == sum(len(v) for v in _snapshot(src).values())
+    assert _snapshot(dst) == _snapshot(src)
+
+    (src / "a" / "one.txt").write_text("one changed\n", encoding="utf-8")
+    again = copy_tree(src, dst, sync="mtime")
+    assert (again.copied, again.skipped) == (1, 2)
+    assert again.bytes == len("one changed\n")
+    assert _snapshot(dst) == _snapshot(src)
+
+
+def test_content_sync_detects_same_size_edit(tmp_path):
+    src = _tree(tmp_path / "src")
+    dst = tmp_path / "dst"
+    copy_tree(src, dst)
+    # Mismo tamaño y mtime forzado igual: solo 'content' lo detecta
+    target = dst / "top.txt"
+    target.write_text("TOP\n", encoding="utf-8")
+    st = (src / "top.txt").stat()
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    assert copy_tree(src, dst, sync="mtime").copied == 0
+    stats = copy_tree(src, dst, sync="content")
+    assert (stats.copied, stats.skipped) == (1, 2)
+    assert target.read_text(encoding="utf-8") == "top\n"
+
+
+def test_copy_one_falls_back_without_copy_file_range(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_sync, "_range_copy", lambda *a: False)
+    (tmp_path / "s.bin").write_bytes(b"x" * 5000)
+    assert copy_one(tmp_path / "s.bin", tmp_path / "d.bin") == 5000
+    assert (tmp_path / "d.bin").read_bytes() == b"x" * 5000
+    assert (tmp_path / "d.bin").stat().st_mtime == (tmp_path / "s.bin").stat().st_mtime
+
+
+def test_tool_reports_counts(tmp_path):
+    src = _tree(tmp_path / "src")
+    tool = CopyFileTool([str(tmp_path)])
+    asyncio.run(tool.execute(str(src), str(tmp_path / "dst"), recursive=True))
+    result = asyncio.run(tool.execute(str(src), str(tmp_path / "dst"), recursive=True, sync="mtime"))
+    assert "0 copiados, 3 sin cambios, 0 bytes transferidos" in result
+    assert "dentro del origen" in asyncio.run(
+        tool.execute(str(src), str(src / "a" / "copy"), recursive=True))
+
+
+def test_file_into_existing_directory(tmp_path):
+    (tmp_path / "a.txt").write_text("hola\n", encoding="utf-8")
+    (tmp_path / "out").mkdir()
+    tool = CopyFileTool([str(tmp_path)])
+    result = asyncio.run(tool.execute(str(tmp_path / "a.txt"), str(tmp_path / "out")))
+    assert "Archivo copiado" in result
+    assert (tmp_path / "out" / "a.txt").read_text(encoding="utf-8") == "hola\n"
+
+
+def test_linked_twice_copied_twice_but_cycles_pruned(tmp_path):
+    src = _tree(tmp_path / "src")
+    (src / "link1").symlink_to(src / "a", target_is_directory=True)
+    (src / "a" / "b" / "loop").symlink_to(src / "a", target_is_directory=True)
+    stats = copy_tree(src, tmp_path / "dst")
+    dst = tmp_path / "dst"
+    assert (dst / "link1" / "b" / "big.bin").read_bytes() == (src / "a" / "b" / "big.bin").read_bytes()
+    assert (dst / "a" / "one.txt").exists() and not (dst / "a" / "b" / "loop").exists()
+    assert stats.copied == 5 and not stats.errors
@@ -0,0 +1,138 @@
+"""Tests para apply_patch — varios archivos en una llamada, todo o nada."""
+import asyncio
+import os
+import stat
+import sys
+
+import pytest
+
+from deepseek_code.tools.patch_tool import ApplyPatchTool, parse_unified_diff
+
+PATCH = """\
+diff --git a/src/app.py b/src/app.py
+--- a/src/app.py
++++ b/src/app.py
+@@ -1,4 +1,4 @@
+ import os
+-
+-def main():
++import sys
++def main(argv):
+     return 0
+@@ -9,2 +9,3 @@
+ def helper():
+     return 1
++# fin
+--- /dev/null
++++ b/src/new_mod.py
+@@ -0,0 +1,2 @@
++VALUE = 1
++OTHER = 2
+--- a/old.txt
++++ /dev/null
+@@ -1 +0,0 @@
+-bye
+"""
+
+
+def _project(root):
+    (root / "src").mkdir()
+    (root / "src" / "app.py").write_text(
+        "import os\n\ndef main():\n    return 0\n\n\n# extra\n\ndef helper():\n    return 1\n",
+        encoding="utf-8")
+    (root / "old.txt").write_text("bye\n", encoding="utf-8")
+    return root
+
+
+def _run(root, **kwargs):
+    return asyncio.run(ApplyPatchTool([str(root)]).execute(**kwargs))
+
+
+class TestApplyPatch:
+    def test_parse(self):
+        patches = parse_unified_diff(PATCH)
+        assert [(p.old_path, p.new_path) for p in patches] == [
+            ("src/app.py", "src/app.py"), (None, "src/new_mod.py"), ("old.txt", None)]
+        assert [(h.added, h.removed) for h in patches[0].hunks] == [(2, 2), (1, 0)]
+
+    def test_applies_all_files_with_compact_summary(self, tmp_path):
+        root = _project(tmp_path)
+        out = _run(root, patch=PATCH)
+        assert out.splitlines() == [
+            "Patch aplicado a 3 archivo(s):",
+            "  M src/app.py: 2 hunk(s), +3 -2 -> 11 lineas",
+            "  A src/new_mod.py: 1 hunk(s), +2 -0 -> 2 lineas",
+            "  D old.txt",
+        ]
+        assert (root / "src" / "app.py").read_text(encoding="utf-8") == (
+            "import os\nimport sys\ndef main(argv):\n    return 0\n\n\n# extra\n\n"
+            "def helper():\n    return 1\n# fin\n")
+        assert (root / "src" / "new_mod.py").read_text(encoding="utf-8") == "VALUE = 1\nOTHER = 2\n"
+        assert not (root / "old.txt").exists()
+
+    def test_failing_hunk_changes_nothing(self, tmp_path):
+        root = _project(tmp_path)
+        broken = PATCH.replace(" def helper():", " def missing():")
+        out = _run(root, patch=broken)
+        assert out.startswith("Error: patch no aplicado, ningun archivo fue modificado.")
+        assert "src/app.py: hunk 2" in out
+        assert (root / "old.txt").exists() and not (root / "src" / "new_mod.py").exists()
+        assert "def main():" in (root / "src" / "app.py").read_text(encoding="utf-8")
+
+    def test_file_operations_and_new_dirs(self, tmp_path):
+        root = _project(tmp_path)
+        out = _run(root, files=[
+            {"path": "src/app.py", "operations": [
+                {"op": "replace", "old_text": "return 1", "new_text": "return 2"}]},
+            {"path": "pkg/sub/mod.py", "content": "x = 1\n"},
+        ])
+        assert "M src/app.py: replace: 1 de 1 ocurrencia(s) -> 10 lineas" in out
+        assert (root / "pkg" / "sub" / "mod.py").read_text(encoding="utf-8") == "x = 1\n"
+        out = _run(root, dry_run=True, files=[{"path": "src/app.py", "delete": True}])
+        assert out.startswith("Patch valido") and (root / "src" / "app.py").exists()
+
+    def test_offset_hunk_and_crlf(self, tmp_path):
+        path = tmp_path / "win.txt"
+        path.write_bytes(b"a\r\nb\r\nc\r\nd\r\n")
+        patch = "--- win.txt\n+++ win.txt\n@@ -1,2 +1,2 @@\n c\n-d\n+D\n"
+        out = _run(tmp_path, patch=patch)
+        assert "+1 -1 -> 4 lineas" in out
+        assert path.read_bytes() == b"a\r\nb\r\nc\r\nD\r\n"
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="bit de ejecucion POSIX")
+    def test_rename_keeps_source_mode(self, tmp_path):
+        script = tmp_path / "run.sh"
+        script.write_text("echo a\n", encoding="utf-8")
+        os.chmod(script, 0o755)
+        patch = ("diff --git a/run.sh b/bin/run.sh\n--- a/run.sh\n+++ b/bin/run.sh\n"
+                 "@@ -1 +1 @@\n-echo a\n+echo b\n")
+        out = _run(tmp_path, patch=patch)
+        assert "R run.sh -> bin/run.sh" in out and not script.exists()
+        moved = tmp_path / "bin" / "run.sh"
+        assert moved.read_text(encoding="utf-8") == "echo b\n"
+        assert stat.S_IMODE(moved.stat().st_mode) == 0o755
+
+    def test_path_access_lists_every_file(self, tmp_path):
+        root = _project(tmp_path)
+        reads, writes = ApplyPatchTool([str(root)]).path_access({"patch": PATCH})
+        assert reads == [] and len(writes) == 3
+
+    def test_write_failure_rolls_back(self, tmp_path, monkeypatch):
+        import os
+        from deepseek_code.tools import patch_tool
+        root = _project(tmp_path)
+        original = (root / "src" / "app.py").read_bytes()
+        calls = []
+
+        def flaky_replace(src, dst):
+            calls.append(dst)
+            if len(calls) == 2:
+                raise OSError("disco lleno")
+            os.replace(src, dst)
+
+        monkeypatch.setattr(patch_tool.os, "replace", flaky_replace)
+        out = _run(root, patch=PATCH)
+        assert "Se restauraron todos los archivos" in out
+        assert (root / "src" / "app.py").read_bytes() == original
+        assert not (root / "src" / "new_mod.py").exists() and (root / "old.txt").exists()
+        assert [p.name for p in (root / "src").iterdir()] == ["app.py"]
@@ -0,0 +1,87 @@
+"""Tests para PowPipeline — prefetch del PoW del siguiente mensaje."""
+import asyncio
+import time
+
+import pytest
+
+from deepseek_code.client.pow_pipeline import PowPipeline, challenge_seconds_left
+
+
+def _make_pipeline(ttl_seconds=300.0, fail=False):
+    counter = {"n": 0}
+
+    async def fetch():
+        counter["n"] += 1
+        if fail:
+            raise RuntimeError("sin red")
+        await asyncio.sleep(0.01)
+        return {"challenge": f"c{counter['n']}",
+                "expire_at": int((time.time() + ttl_seconds) * 1000)}
+
+    def solve(challenge):
+        return int(challenge["challenge"][1:]) * 10
+
+    return PowPipeline(fetch, solve), counter
+
+
+class TestPowPipeline:
+    def test_expire_at_ms_and_seconds(self):
+        now = 1_700_000_000.0
+        assert challenge_seconds_left({"expire_at": (now + 60) * 1000}, now) == pytest.approx(60)
+        assert challenge_seconds_left({"expire_at": now + 30}, now) == 30
+        assert challenge_seconds_left({}, now) == float("inf")
+
+    def test_prefetch_hit(self):
+        async def run():
+            pipeline, counter = _make_pipeline()
+            first = await pipeline.acquire()
+            pipeline.prefetch()
+            await asyncio.sleep(0.05)  # "stream" en curso
+            second = await pipeline.acquire()
+            return pipeline.stats(), first, second, counter["n"]
+
+        stats, first, second, fetched = asyncio.run(run())
+        assert first == ({"challenge": "c1", "expire_at": first[0]["expire_at"]}, 10)
+        assert second[1] == 20
+        assert fetched == 2
+        assert stats["prefetch_hits"] == 1
+        assert stats["prefetch_misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["saved_s"] > 0
+
+    def test_expired_prefetch_is_wasted(self):
+        async def run():
+            pipeline, counter = _make_pipeline(ttl_seconds=5)  # < margen de expiracion
+            await pipeline.acquire()
+            pipeline.prefetch()
+            await asyncio.sleep(0.05)
+            await pipeline.acquire()
+            return pipeline.stats(), counter["n"]
+
+        stats, fetched = asyncio.run(run())
+        assert stats["wasted_solves"] == 1
+        assert stats["prefetch_hits"] == 0
+        assert fetched == 3
+
+    def test_prefetch_error_falls_back_inline(self):
+        async def run():
+            pipeline, _ = _make_pipeline(fail=True)
+            pipeline.prefetch()
+            await asyncio.sleep(0.01)
+            try:
+                await pipeline.acquire()
+            except RuntimeError:
+                return pipeline.stats()
+
+        stats = asyncio.run(run())
+        assert stats["prefetch_errors"] == 1
+
+    def test_discard_counts_unused_solve(self):
+        async def run():
+            pipeline, _ = _make_pipeline()
+            pipeline.prefetch()
+            await asyncio.sleep(0.05)
+            pipeline.discard()
+            return pipeline.stats()
+
+        assert asyncio.run(run())["wasted_solves"] == 1
@@ -0,0 +1,149 @@
+"""Tests para el solver de PoW multi-nucleo (particion de nonces)."""
+import os
+import threading
+
+import pytest
+
+wasmtime = pytest.importorskip("wasmtime")
+
+from deepseek_code.client import pow_solver, wasm_runtime  # noqa: E402
+
+# Modulo minimo con la ABI de wasm-bindgen que usa el solver. El "hash"
+# es la identidad: retorna (ptr, len) del propio input, asi el challenge
+# esperado es prefix + str(nonce). wasm_solve no recorre nonces: parsea
+# el challenge y responde lo mismo que el bucle real (n < difficulty con
+# prefix + str(n) == challenge).
+_WAT = """
+(module
+  (memory (export "memory") 2)
+  (global $sp (mut i32) (i32.const 65536))
+  (global $heap (mut i32) (i32.const 1024))
+  (func (export "__wbindgen_add_to_stack_pointer") (param i32) (result i32)
+    global.get $sp local.get 0 i32.add global.set $sp global.get $sp)
+  (func (export "__wbindgen_export_0") (param i32 i32) (result i32)
+    (local $p i32)
+    global.get $heap local.set $p
+    global.get $heap local.get 0 i32.add global.set $heap
+    local.get $p)
+  (func (export "wasm_deepseek_hash_v1") (param $ret i32) (param $ptr i32) (param $len i32)
+    local.get $ret local.get $ptr i32.store
+    local.get $ret local.get $len i32.store offset=4)
+  (func (export "wasm_solve") (param $ret i32) (param $cptr i32) (param $clen i32)
+        (param $pptr i32) (param $plen i32) (param $diff f64)
+    (local $i i32) (local $c i32) (local $v i64)
+    local.get $ret i32.const 0 i32.store
+    local.get $clen local.get $plen i32.le_u
+    if return end
+    (block $fail
+      (loop $pre
+        local.get $i local.get $plen i32.lt_u
+        if
+          local.get $cptr local.get $i i32.add i32.load8_u
+          local.get $pptr local.get $i i32.add i32.load8_u
+          i32.ne br_if $fail
+          local.get $i i32.const 1 i32.add local.set $i
+          br $pre
+        end)
+      ;; sin ceros a la izquierda: str(n) es canonico
+      local.get $clen local.get $plen i32.sub i32.const 1 i32.gt_u
+      local.get $cptr local.get $plen i32.add i32.load8_u i32.const 48 i32.eq
+      i32.and br_if $fail
+      (loop $dig
+        local.get $i local.get $clen i32.lt_u
+        if
+          local.get $cptr local.get $i i32.add i32.load8_u i32.const 48 i32.sub local.tee $c
+          i32.const 9 i32.gt_u br_if $fail
+          local.get $v i64.const 10 i64.mul local.get $c i64.extend_i32_u i64.add local.set $v
+          local.get $i i32.const 1 i32.add local.set $i
+          br $dig
+        end)
+      local.get $v f64.convert_i64_u local.get $diff f64.lt i32.eqz br_if $fail
+      local.get $ret i32.const 1 i32.store
+      local.get $ret local.get $v f64.convert_i64_u f64.store offset=8))
+)
+"""
+
+# sha3_wasm_bg.wasm real de DeepSeek (DEEPSEEK_WASM o el de APPDATA)
+_REAL_WASM = os.environ.get("DEEPSEEK_WASM") or os.path.join(
+    os.environ.get("APPDATA", os.path.expanduser("~")), "DeepSeek-Code", "sha3_wasm_bg.wasm")
+
+
+@pytest.fixture
+def wasm_file(tmp_path):
+    path = tmp_path / "sha3_wasm_bg.wasm"
+    path.write_bytes(wasmtime.wat2wasm(_WAT))
+    wasm_runtime.clear_memory_cache()
+    yield path
+    wasm_runtime.clear_memory_cache()
+
+
+def _challenge(answer: int, difficulty: int) -> dict:
+    salt, expire_at = "abc", 1700000000000
+    return {
+        "challenge": f"{salt}_{expire_at}_{answer}",
+        "salt": salt,
+        "expire_at": expire_at,
+        "difficulty": difficulty,
+    }
+
+
+class TestNonceTasks:
+    @pytest.mark.parametrize("difficulty", [1, 9, 10, 11, 100, 101, 12345, 144000])
+    def test_tasks_cover_range_exactly(self, difficulty):
+        for max_task in (10, 37, 1000, difficulty):
+            nonces = [int(head + str(m)) for head, limit in pow_solver.nonce_tasks(difficulty, max_task)
+                      for m in range(limit)]
+            assert sorted(nonces) == list(range(difficulty))
+
+    def test_solve_tasks_finds_nonce(self, wasm_file):
+        c = _challenge(4321, 10000)
+        prefix = f"{c['salt']}_{c['expire_at']}_"
+        tasks = pow_solver.nonce_tasks(10000, 500)
+        assert pow_solver.solve_tasks(c["challenge"], prefix, tasks, str(wasm_file)) == 4321
+        others = [t for t in tasks if not (t[0] and "4321".startswith(t[0]))]
+        assert pow_solver.solve_tasks(c["challenge"], prefix, others, str(wasm_file)) is None
+
+    def test_stop_event_aborts(self, wasm_file):
+        c = _challenge(9999, 10000)
+        prefix = f"{c['salt']}_{c['expire_at']}_"
+        stop = threading.Event()
+        stop.set()
+        tasks = pow_solver.nonce_tasks(10000, 500)
+        assert pow_solver.solve_tasks(c["challenge"], prefix, tasks, str(wasm_file), stop) is None
+
+
+class TestParallelSolver:
+    def test_pool_matches_answer(self, wasm_file):
+        solver = pow_solver.ParallelPowSolver(wasm_file, workers=2)
+        try:
+            assert solver.solve(_challenge(7777, 20000)) == 7777
+            assert solver.solve(_challenge(3, 20000)) == 3
+            with pytest.raises(RuntimeError):
+                solver.solve(_challenge(25000, 20000))
+        finally:
+            solver.close()
+
+    def test_mode_selection(self):
+        assert pow_solver.use_parallel("parallel", 10)
+        assert not pow_solver.use_parallel("wasm", 10**9)
+        assert not pow_solver.use_parallel("auto", 10)
+
+    def test_hash_export_helper(self, wasm_file):
+        assert pow_solver.deepseek_hash_v1("abc_1_42", wasm_file) == "abc_1_42"
+
+
+@pytest.mark.skipif(not os.path.exists(_REAL_WASM), reason="sin sha3_wasm_bg.wasm real")
+def test_matches_wasm_solve_on_real_wasm():
+    from deepseek_code.client.web_session import DeepSeekWebSession
+
+    wasm_runtime.clear_memory_cache()
+    session = DeepSeekWebSession("test-token", {"test": "1"}, _REAL_WASM)
+    solver = pow_solver.ParallelPowSolver(_REAL_WASM, workers=2)
+    try:
+        for answer, difficulty in ((7, 10), (1005, 20000), (143999, 144000)):
+            c = _challenge(answer, difficulty)
+            c["challenge"] = pow_solver.deepseek_hash_v1(f"{c['salt']}_{c['expire_at']}_{answer}", _REAL_WASM)
+            assert session._solve_challenge_wasm(c) == answer
+            assert solver.solve(c) == answer
+    finally:
+        solver.close()
@@ -0,0 +1,103 @@
+"""Tests para los procesos en background de run_command y background_process."""
+import asyncio
+import collections
+import os
+import re
+import sys
+import threading
+import time
+
+import pytest
+
+from deepseek_code.tools import process_manager
+from deepseek_code.tools.process_manager import BackgroundProcessTool, RotatingLog
+from deepseek_code.tools.shell import RunCommandTool
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="usa comandos POSIX")
+
+# Imprime mucho mas de lo que cabe en el buffer de un pipe, luego sigue vivo
+SCRIPT = (
+    "import sys, time\n"
+    "print('listening on 8000', flush=True)\n"
+    "time.sleep(1.5)\n"
+    "for i in range(20000): print('line', i, 'x' * 40)\n"
+    "print('compiled OK', flush=True)\n"
+    "time.sleep(60)\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_logs(tmp_path, monkeypatch):
+    monkeypatch.setattr(process_manager.tempfile, "gettempdir", lambda: str(tmp_path))
+
+
+def _start(tmp_path, script):
+    path = tmp_path / "server.py"
+    path.write_text(script, encoding="utf-8")
+    tool = RunCommandTool([])
+    return asyncio.run(tool.execute(f"{sys.executable} {path}", background=True))
+
+
+class TestBackgroundProcess:
+    def test_pump_tail_grep_wait_stop(self, tmp_path):
+        started = _start(tmp_path, SCRIPT)
+        assert started["background"] and "listening on 8000" in started["stdout"]
+        pid = started["pid"]
+        tool = BackgroundProcessTool()
+
+        waited = asyncio.run(tool.execute("wait", pid=pid, pattern=r"compiled (OK|FAIL)", timeout=20))
+        assert waited["matched"] and waited["line"] == "compiled OK"
+        tail = asyncio.run(tool.execute("tail", pid=pid, lines=2))
+        assert tail["output"].splitlines() == ["line 19999 " + "x" * 40, "compiled OK"]
+        found = asyncio.run(tool.execute("grep", pid=pid, pattern=r"^line 1234 "))
+        assert found["matches"] == ["1236: line 1234 " + "x" * 40]
+        assert pid in [p["pid"] for p in asyncio.run(tool.execute("list"))["processes"]]
+
+        log_path = found["log"]
+        stopped = asyncio.run(tool.execute("stop", pid=pid))
+        assert stopped["status"].startswith("exited")
+        assert stopped["log"] is None and not os.path.exists(log_path)
+        waited = asyncio.run(tool.execute("wait", pid=pid, pattern="never", timeout=5))
+        assert not waited["matched"] and waited["reason"] == "el proceso termino"
+
+    def test_immediate_exit_is_reported(self, tmp_path):
+        out = _start(tmp_path, "print('boom')\nraise SystemExit(3)\n")
+        assert out["background"] is False and out["returncode"] == 3
+        assert "boom" in out["stdout"]
+
+    def test_rotating_log_is_capped(self, tmp_path):
+        log = RotatingLog(str(tmp_path / "x.log"), max_bytes=100, backups=2)
+        for i in range(50):
+            log.write(b"%02d-456789\n" % i)
+        log.close()
+        segments = log.segments()
+        assert [s.rsplit("/", 1)[1] for s in segments] == ["x.log.2", "x.log.1", "x.log"]
+        data = b"".join(open(s, "rb").read() for s in segments)
+        assert len(data) <= 300 and data.endswith(b"49-456789\n")
+
+    def test_grep_numbers_are_absolute_after_rotation(self, tmp_path):
+        proc = process_manager.BackgroundProcess.__new__(process_manager.BackgroundProcess)
+        proc.log = RotatingLog(str(tmp_path / "p.log"), max_bytes=64, backups=1)
+        proc.recent = collections.deque(maxlen=5)
+        proc.total_lines, proc._partial, proc._lock = 0, b"", threading.Lock()
+        data = b"".join(b"line %03d\n" % i for i in range(100))
+        for start in range(0, len(data), 7):  # lineas partidas entre segmentos
+            proc._feed(data[start:start + 7])
+        assert proc.log.dropped_lines > 0
+
+        found = proc.grep(re.compile(r"^line \d+$"), 1000)
+        assert found and all(int(m.split(": line ")[0]) == int(m.split()[-1]) + 1 for m in found)
+        assert found[-1] == "100: line 099"
+        proc.remove_log()
+        assert proc.grep(re.compile("line"), 1000) == [f"{n}: line {n - 1:03d}" for n in range(96, 101)]
+
+    def test_exited_processes_are_pruned(self, tmp_path):
+        proc = process_manager.start_background([sys.executable, "-c", "print('bye')"], "bye")
+        deadline = time.monotonic() + 10
+        while not proc.finished and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert process_manager.prune_background() == []
+        later = time.time() + process_manager.PROCESS_RETENTION_SECONDS + 1
+        assert proc.pid in process_manager.prune_background(later)
+        assert process_manager.get_background(proc.pid) is None
+        assert not os.path.exists(proc.log.path)
@@ -0,0 +1,67 @@
+"""Tests para lecturas por rango de ReadFileTool (mmap + indice de lineas)."""
+import asyncio
+import os
+
+from deepseek_code.tools import line_index
+from deepseek_code.tools.filesystem import ReadFileTool
+from deepseek_code.tools.line_index import read_line_range
+
+
+def _read(tmp_path, **args):
+    tool = ReadFileTool([str(tmp_path)])
+    return asyncio.run(tool.execute(**args))
+
+
+def _write_lines(path, n, trailing_newline=True):
+    body = "\n".join(f"linea {i}" for i in range(1, n + 1))
+    path.write_text(body + ("\n" if trailing_newline else ""), encoding="utf-8")
+
+
+class TestReadRanges:
+    def test_line_window_with_total(self, tmp_path):
+        target = tmp_path / "big.log"
+        _write_lines(target, 50_000)
+        out = _read(tmp_path, path=str(target), offset=40_000, limit=3)
+        assert out.splitlines() == [
+            "[lineas 40000-40002 de 50000]",
+            "linea 40000", "linea 40001", "linea 40002",
+            "... (siguiente: offset=40003)",
+        ]
+        tail = _read(tmp_path, path=str(target), offset=49_999)
+        assert tail == "[lineas 49999-50000 de 50000]\nlinea 49999\nlinea 50000\n"
+
+    def test_index_cached_until_file_changes(self, tmp_path):
+        target = tmp_path / "a.txt"
+        _write_lines(target, 10, trailing_newline=False)
+        line_index.clear_line_index_cache()
+        assert read_line_range(str(target), 10, 1).text == "linea 10"
+        assert read_line_range(str(target), 1, 1).total_lines == 10
+        assert len(line_index._cache) == 1
+        _write_lines(target, 12)
+        os.utime(target, ns=(1, 1))
+        assert read_line_range(str(target), 12, 1).text == "linea 12\n"
+        assert len(line_index._cache) == 1  # la version vieja se descarta
+
+    def test_max_lines_reports_total(self, tmp_path):
+        target = tmp_path / "a.txt"
+        _write_lines(target, 5)
+        out = _read(tmp_path, path=str(target), max_lines=2)
+        assert out.startswith("linea 1\nlinea 2\n")
+        assert "truncado a 2 de 5 lineas" in out
+        assert _read(tmp_path, path=str(target), max_lines=5) == target.read_text()
+
+    def test_crlf_and_byte_range(self, tmp_path):
+        target = tmp_path / "win.txt"
+        target.write_bytes("uno\r\ndós\r\ntres\r\n".encode("utf-8"))
+        assert _read(tmp_path, path=str(target), offset=2, limit=1) == \
+            "[lineas 2-2 de 3]\ndós\n... (siguiente: offset=3)"
+        out = _read(tmp_path, path=str(target), byte_offset=5, byte_limit=4)
+        assert out == "[bytes 5-9 de 17]\ndós"
+
+    def test_out_of_range_and_empty(self, tmp_path):
+        target = tmp_path / "a.txt"
+        _write_lines(target, 3)
+        assert "el archivo tiene 3 lineas" in _read(tmp_path, path=str(target), offset=10)
+        empty = tmp_path / "vacio.txt"
+        empty.write_text("")
+        assert "el archivo tiene 0 lineas" in _read(tmp_path, path=str(empty), offset=1, limit=5)
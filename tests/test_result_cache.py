@@ -0,0 +1,162 @@
+"""Tests para ToolResultCache — resultados de tools read_only validados por identidad."""
+import asyncio
+import os
+
+from deepseek_code.server.protocol import MCPMethod, MCPRequest, MCPServer
+from deepseek_code.server.tool import BaseTool, external_writer_finished, external_writer_started
+
+
+class _ReadTool(BaseTool):
+    read_only = True
+    path_args = ("path",)
+
+    def __init__(self):
+        self.calls = 0
+        super().__init__("read_file", "lee")
+
+    def _build_schema(self):
+        return {"type": "object", "properties": {"path": {"type": "string"}}}
+
+    async def execute(self, path):
+        self.calls += 1
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+
+class _ListTool(_ReadTool):
+    def __init__(self):
+        self.calls = 0
+        BaseTool.__init__(self, "list_directory", "lista")
+
+    async def execute(self, path):
+        self.calls += 1
+        return sorted(os.path.relpath(os.path.join(d, f), path)
+                      for d, _, files in os.walk(path) for f in files)
+
+
+class _WriteTool(_ReadTool):
+    read_only = False
+
+    def __init__(self):
+        BaseTool.__init__(self, "write_file", "escribe")
+
+    def _build_schema(self):
+        return {"type": "object", "properties": {
+            "path": {"type": "string"}, "content": {"type": "string"}}}
+
+    async def execute(self, path, content):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return "ok"
+
+
+class _CommandTool(BaseTool):
+    def __init__(self):
+        super().__init__("run_command", "ejecuta")
+
+    def _build_schema(self):
+        return {"type": "object", "properties": {"command": {"type": "string"}}}
+
+    async def execute(self, command):
+        return "ok"
+
+
+def _server(**kwargs):
+    server = MCPServer(**kwargs)
+    reader = _ReadTool()
+    server.register_tool(reader)
+    server.register_tool(_WriteTool())
+    server.register_tool(_CommandTool())
+    return server, reader
+
+
+def _call(server, tool, **args):
+    request = MCPRequest(id=1, method=MCPMethod.TOOLS_CALL,
+                         params={"name": tool, "arguments": args})
+    return asyncio.run(server.handle_request(request)).result["content"]
+
+
+class TestToolResultCache:
+    def test_repeat_read_is_served_from_cache(self, tmp_path):
+        server, reader = _server()
+        target = tmp_path / "a.py"
+        target.write_text("uno", encoding="utf-8")
+        assert _call(server, "read_file", path=str(target)) == "uno"
+        # Argumentos alucinados se filtran antes de formar la clave
+        assert _call(server, "read_file", path=str(target), extra=1) == "uno"
+        assert reader.calls == 1
+        stats = server.cache_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+    def test_external_change_is_detected(self, tmp_path):
+        server, reader = _server()
+        target = tmp_path / "a.py"
+        target.write_text("uno", encoding="utf-8")
+        _call(server, "read_file", path=str(target))
+        target.write_text("dos!", encoding="utf-8")
+        os.utime(target, ns=(1, 1))
+        assert _call(server, "read_file", path=str(target)) == "dos!"
+        assert reader.calls == 2
+        assert server.cache_stats()["stale"] == 1
+
+    def test_write_through_server_invalidates(self, tmp_path):
+        server, reader = _server()
+        target = tmp_path / "a.py"
+        other = tmp_path / "b.py"
+        target.write_text("uno", encoding="utf-8")
+        other.write_text("otro", encoding="utf-8")
+        _call(server, "read_file", path=str(target))
+        _call(server, "read_file", path=str(other))
+        _call(server, "write_file", path=str(target), content="tres")
+        stats = server.cache_stats()
+        assert stats["invalidated"] == 1 and stats["entries"] == 1
+        assert _call(server, "read_file", path=str(target)) == "tres"
+        # Un comando arbitrario es una barrera: vacia todo
+        _call(server, "run_command", command="make")
+        assert server.cache_stats()["entries"] == 0
+
+    def test_lru_bounded_by_bytes(self, tmp_path):
+        server, reader = _server(result_cache_bytes=10)
+        for name in ("a", "b", "c"):
+            (tmp_path / name).write_text(name * 4, encoding="utf-8")
+            _call(server, "read_file", path=str(tmp_path / name))
+        stats = server.cache_stats()
+        assert stats["entries"] == 2 and stats["bytes"] == 8
+        assert stats["evictions"] == 1
+        _call(server, "read_file", path=str(tmp_path / "a"))
+        assert reader.calls == 4  # "a" fue el menos usado y salio
+
+    def test_disabled(self, tmp_path):
+        server, reader = _server(result_cache_bytes=0)
+        target = tmp_path / "a.py"
+        target.write_text("uno", encoding="utf-8")
+        _call(server, "read_file", path=str(target))
+        _call(server, "read_file", path=str(target))
+        assert reader.calls == 2
+
+    def test_background_writer_bypasses_directory_entries(self, tmp_path):
+        server, reader = _server()
+        lister = _ListTool()
+        server.register_tool(lister)
+        (tmp_path / "sub").mkdir()
+        target = tmp_path / "a.py"
+        target.write_text("uno", encoding="utf-8")
+        _call(server, "list_directory", path=str(tmp_path))
+        _call(server, "list_directory", path=str(tmp_path))
+        assert lister.calls == 1
+
+        external_writer_started()  # p.ej. un dev server de run_command(background=true)
+        try:
+            (tmp_path / "sub" / "gen.js").write_text("x", encoding="utf-8")
+            assert "sub/gen.js".replace("/", os.sep) in _call(server, "list_directory", path=str(tmp_path))
+            _call(server, "list_directory", path=str(tmp_path))
+            assert lister.calls == 3
+            # Los archivos se siguen validando de forma exacta
+            _call(server, "read_file", path=str(target))
+            _call(server, "read_file", path=str(target))
+            assert reader.calls == 1
+        finally:
+            external_writer_finished()
+        _call(server, "list_directory", path=str(tmp_path))
+        _call(server, "list_directory", path=str(tmp_path))
+        assert lister.calls == 4
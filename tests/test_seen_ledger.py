@@ -0,0 +1,84 @@
+"""Tests for the seen-file ledger (repeat reads as "unchanged" or a diff)."""
+from deepseek_code.sessions.seen_ledger import apply_seen_ledger, ledger_key
+from deepseek_code.sessions.session_store import SessionStore
+
+
+def _store(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.json"))
+    store.create("s1", "chat-1")
+    return store
+
+
+def _read(path, **extra):
+    return {"tool": "read_file", "args": {"path": str(path), **extra}}
+
+
+BODY = "".join(f"line {i}\n" for i in range(200))
+
+
+class TestSeenLedger:
+    def test_first_read_is_full_and_recorded(self, tmp_path):
+        store = _store(tmp_path)
+        call = _read(tmp_path / "a.py")
+        assert apply_seen_ledger(store, "s1", None, call, BODY) == BODY
+        store.save()
+        # The ledger survives a reload and the text is stored once by hash
+        reloaded = SessionStore(str(tmp_path / "sessions.json"))
+        entry = reloaded.get_seen("s1", ledger_key(None, call))
+        assert reloaded.load_seen(entry["hash"]) == BODY
+
+    def test_unchanged_reread(self, tmp_path):
+        store = _store(tmp_path)
+        call = _read(tmp_path / "a.py")
+        apply_seen_ledger(store, "s1", None, call, BODY)
+        store.update("s1", parent_message_id=7)
+        out = apply_seen_ledger(store, "s1", None, call, BODY)
+        assert "sin cambios desde el mensaje 0" in out
+        assert len(out) < 300
+
+    def test_changed_reread_sends_diff(self, tmp_path):
+        store = _store(tmp_path)
+        call = _read(tmp_path / "a.py")
+        apply_seen_ledger(store, "s1", None, call, BODY)
+        store.update("s1", parent_message_id=7)
+        edited = BODY.replace("line 100\n", "line cien\n")
+        out = apply_seen_ledger(store, "s1", None, call, edited)
+        assert "-line 100" in out and "+line cien" in out
+        assert len(out) < len(edited) // 4
+        # The diffed version becomes the reference for the next read
+        assert "sin cambios desde el mensaje 1" in apply_seen_ledger(store, "s1", None, call, edited)
+
+    def test_full_opt_out_and_views(self, tmp_path):
+        store = _store(tmp_path)
+        path = tmp_path / "a.py"
+        apply_seen_ledger(store, "s1", None, _read(path), BODY)
+        assert apply_seen_ledger(store, "s1", None, _read(path, full=True), BODY) == BODY
+        # A partial read is a different view: never diffed against the full one
+        head = "".join(BODY.splitlines(keepends=True)[:10])
+        assert apply_seen_ledger(store, "s1", None, _read(path, max_lines=10), head) == head
+
+    def test_large_rewrite_sends_full_text(self, tmp_path):
+        store = _store(tmp_path)
+        call = _read(tmp_path / "a.py")
+        apply_seen_ledger(store, "s1", None, call, BODY)
+        rewritten = BODY.upper()
+        assert apply_seen_ledger(store, "s1", None, call, rewritten) == rewritten
+
+    def test_errors_and_other_tools_pass_through(self, tmp_path):
+        store = _store(tmp_path)
+        call = _read(tmp_path / "missing.py")
+        assert apply_seen_ledger(store, "s1", None, call, "Error: no existe") == "Error: no existe"
+        assert apply_seen_ledger(store, "s1", None, call, "Error: no existe") == "Error: no existe"
+        other = {"tool": "list_directory", "args": {"path": str(tmp_path)}}
+        apply_seen_ledger(store, "s1", None, other, "a.py")
+        assert store.get("s1").seen_files == {}
+
+    def test_retry_in_new_chat_resends_full_text(self, tmp_path):
+        store = _store(tmp_path)
+        call = _read(tmp_path / "a.py")
+        apply_seen_ledger(store, "s1", None, call, BODY, chat_session_id="chat-1")
+        assert "sin cambios" in apply_seen_ledger(store, "s1", None, call, BODY, chat_session_id="chat-1")
+        # A stall retry moved the conversation to a fresh chat
+        assert apply_seen_ledger(store, "s1", None, call, BODY, chat_session_id="chat-2") == BODY
+        assert store.get_seen("s1", ledger_key(None, call))["chat"] == "chat-2"
+        assert "sin cambios" in apply_seen_ledger(store, "s1", None, call, BODY, chat_session_id="chat-2")
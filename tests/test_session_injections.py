@@ -0,0 +1,114 @@
+"""Tests for Phase 2 context injections (batched) and primed sessions in chat_in_session."""
+import asyncio
+
+import pytest
+
+from deepseek_code.client import session_chat
+from deepseek_code.client.session_chat import _batch_injections, chat_in_session
+
+
+class FakeWebSession:
+    """Sync stand-in for DeepSeekWebSession (web_chat runs it in the executor)."""
+
+    def __init__(self):
+        self.prompts = []
+        self.parents = []
+        self._n = 0
+        self.last_message_id = None
+
+    def create_chat_session(self):
+        return "chat-1"
+
+    def chat(self, message, thinking_enabled=False, parent_message_id=None,
+             max_stall_retries=3):
+        self.prompts.append(message)
+        self.parents.append(parent_message_id)
+        self._n += 1
+        self.last_message_id = self._n
+        return "ok"
+
+
+INJECTIONS = [
+    {"type": "skill", "name": "design", "content": "a" * 40},
+    {"type": "memory", "name": "proyecto", "content": "b" * 40},
+    {"type": "error", "name": "auth", "content": "c" * 40},
+]
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path))
+
+
+def _run(injections, name="s1", web=None, **kwargs):
+    web = web or FakeWebSession()
+    response = asyncio.run(chat_in_session(
+        web, None, name, "haz la tarea", pending_injections=injections, **kwargs,
+    ))
+    return web, response, session_chat.get_session_store().get(name)
+
+
+class TestBatchedInjections:
+    def test_single_round_trip_records_every_ctx_id(self):
+        web, response, session = _run(INJECTIONS)
+        assert response == "ok"
+        assert len(web.prompts) == 2  # one batched injection + the task
+        assert "Contexto integrado (3 bloques)" in web.prompts[0]
+        assert "== SKILL: design ==" in web.prompts[0]
+        assert session.injected_contexts == ["skill:design", "memory:proyecto", "error:auth"]
+        assert session.total_injected_tokens > 0
+
+    def test_reused_contexts_are_skipped(self):
+        _run(INJECTIONS[:2])
+        web, _, session = _run(INJECTIONS)
+        assert len(web.prompts) == 2
+        assert "Errores de auth registrados" in web.prompts[0]
+        assert "SKILL" not in web.prompts[0]
+        assert len(session.injected_contexts) == 3
+
+    def test_one_by_one_fallback(self):
+        web, _, session = _run(INJECTIONS, batch_injections=False)
+        assert len(web.prompts) == 4
+        assert web.prompts[0].endswith("Responde UNICAMENTE: 'Skill design aceptada'")
+        assert len(session.injected_contexts) == 3
+
+    def test_size_limit_splits_batches(self):
+        batches = _batch_injections(INJECTIONS, max_chars=80)
+        assert [len(b) for b in batches] == [2, 1]
+        # A block over the limit goes alone, never dropped
+        assert [len(b) for b in _batch_injections(INJECTIONS, max_chars=10)] == [1, 1, 1]
+
+
+class TestPrimedSessions:
+    def test_second_session_forks_from_primed_ack(self):
+        web = FakeWebSession()
+        _, _, first = _run(INJECTIONS, name="delegate:a", web=web, system_prompt="SYS")
+        # Phase 1 + skill batch + memory/error batch + task
+        assert len(web.prompts) == 4
+        assert "SKILL" in web.prompts[1] and "SKILL" not in web.prompts[2]
+        skill_ack_id = 2
+
+        web.prompts.clear()
+        web.parents.clear()
+        _, _, second = _run(INJECTIONS, name="delegate:b", web=web, system_prompt="SYS")
+        # No Phase 1 and no skill: only memory/error + task
+        assert len(web.prompts) == 2
+        assert "DEEPSEEK CODE ACTIVADO" not in web.prompts[0]
+        assert "SKILL" not in web.prompts[0]
+        assert web.parents[0] == skill_ack_id
+        assert second.chat_session_id == first.chat_session_id
+        assert second.system_prompt_sent
+        assert set(second.injected_contexts) == set(first.injected_contexts)
+
+    def test_prompt_change_invalidates(self):
+        _run(INJECTIONS[:1], name="delegate:a", system_prompt="SYS v1")
+        web, _, _ = _run(INJECTIONS[:1], name="delegate:b", system_prompt="SYS v2")
+        assert "SYS v2" in web.prompts[0]  # re-primed, no fork
+        primed = session_chat.get_session_store().primed
+        assert len(primed) == 1  # the v1 entry was dropped
+        assert next(iter(primed.values())).prompt_hash != session_chat.content_hash("SYS v1")
+
+    def test_disabled(self):
+        _run([], name="delegate:a", system_prompt="SYS")
+        web, _, _ = _run([], name="delegate:b", system_prompt="SYS", primed_sessions=False)
+        assert "SYS" in web.prompts[0]
@@ -0,0 +1,87 @@
+"""Tests para el loader compartido y el indice persistente de skills."""
+import os
+import zipfile
+
+import pytest
+
+from deepseek_code.skills import skill_index
+from deepseek_code.skills.loader import KnowledgeSkill, SkillLoader, get_skill_loader, reset_skill_loaders
+from deepseek_code.skills.skill_catalog import _build_entries
+
+SKILL_MD = """---
+name: {name}
+description: Skill {name} con acentos (ñandú, café)
+---
+
+# {name}
+
+Contenido de la skill {name} — con texto no ASCII ✓.
+"""
+
+
+def _write_skill(path, name, text=None):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(f"{name}/SKILL.md", text if text is not None else SKILL_MD.format(name=name))
+
+
+@pytest.fixture
+def skills_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    reset_skill_loaders()
+    d = tmp_path / "skills"
+    d.mkdir()
+    _write_skill(d / "alpha.skill", "alpha")
+    _write_skill(d / "beta.skill", "beta", "sin frontmatter\n")
+    (d / "flow.yaml").write_text("name: flow\ndescription: un workflow\nsteps:\n  - tool: read_file\n    args: {}\n",
+                                 encoding="utf-8")
+    yield d
+    reset_skill_loaders()
+
+
+def test_content_matches_zip(skills_dir):
+    skills = SkillLoader(str(skills_dir)).load_all()
+    alpha = skills["alpha"]
+    assert isinstance(alpha, KnowledgeSkill)
+    assert alpha.content == SKILL_MD.format(name="alpha").split("---", 2)[2].strip()
+    assert alpha.description.startswith("Skill alpha") and alpha.tokens > 0
+    assert skills["beta"].content == "sin frontmatter\n" and skills["beta"].description == ""
+    assert skills["flow"].skill_type == "workflow"
+
+
+def test_warm_loads_never_open_zip(skills_dir, monkeypatch):
+    get_skill_loader(str(skills_dir)).load_one("alpha")
+    expected = SkillLoader(str(skills_dir), index=False).load_one("alpha").content
+
+    def no_zip(*args, **kwargs):
+        raise AssertionError("no deberia abrir el ZIP")
+
+    monkeypatch.setattr(skill_index.zipfile, "ZipFile", no_zip)
+    # Mismo proceso: cache en memoria; proceso nuevo: indice en disco
+    assert get_skill_loader(str(skills_dir)).load_one("alpha").content == expected
+    fresh = SkillLoader(str(skills_dir))
+    assert fresh.load_one("alpha").content == expected
+    assert fresh.load_metadata()["alpha"].tokens is not None
+
+
+def test_catalog_reads_only_frontmatter(skills_dir, monkeypatch):
+    reads = []
+    original = zipfile.ZipFile.read
+    monkeypatch.setattr(zipfile.ZipFile, "read", lambda self, name, *a: reads.append(name) or original(self, name, *a))
+
+    entries = _build_entries(str(skills_dir))
+    assert entries["alpha"].startswith("Skill alpha")
+    assert entries["flow"] == "[workflow] un workflow"
+    assert reads == []  # ningun cuerpo extraido
+    index_dir = get_skill_loader(str(skills_dir)).index.index_dir
+    assert not os.path.exists(os.path.join(index_dir, "alpha.md"))
+
+
+def test_edited_package_is_reloaded(skills_dir):
+    loader = get_skill_loader(str(skills_dir))
+    assert "Contenido de la skill alpha" in loader.load_one("alpha").content
+
+    path = skills_dir / "alpha.skill"
+    _write_skill(path, "alpha", "---\nname: alpha\ndescription: nueva\n---\nnuevo cuerpo, mas largo que antes")
+    assert loader.load_one("alpha").content == "nuevo cuerpo, mas largo que antes"
+    assert SkillLoader(str(skills_dir)).load_metadata()["alpha"].description == "nueva"
+    assert get_skill_loader(str(skills_dir)) is loader
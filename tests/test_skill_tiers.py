@@ -0,0 +1,138 @@
+"""Tests para los niveles condensados de skills y el empaquetado por relevancia."""
+import json
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+
+from deepseek_code.skills import skill_tiers
+from deepseek_code.skills.skill_injector import _load_skills_with_budget, pack_skill_contents
+from deepseek_code.skills.skill_packer import PackCandidate, pack_skills
+from deepseek_code.skills.skill_tiers import SkillTier, condense, get_tier_cache
+from deepseek_code.tokenization import get_tokenizer
+
+SKILL_MD = """---
+name: {name}
+description: skill de prueba
+---
+# {name}
+
+Introduccion larga que explica el contexto de la skill con bastante prosa.
+
+## Reglas
+- SIEMPRE validar la entrada
+- NUNCA bloquear el loop
+
+## API
+```js
+// Crear el contexto
+const ctx = createContext();
+
+// Variante con opciones
+const ctx2 = createContext({{ debug: true, retries: 3, timeout: 5000 }});
+const ctx3 = createContext({{ debug: false }});
+```
+
+## Ejemplos
+```js
+for (let i = 0; i < 10; i++) {{ run(ctx, i); run(ctx2, i); run(ctx3, i); }}
+```
+Texto del ejemplo con mucho detalle que solo sirve como referencia adicional.
+"""
+
+
+@pytest.fixture
+def skills_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    monkeypatch.setattr(skill_tiers, "_caches", {})
+    d = tmp_path / "skills"
+    d.mkdir()
+    for name in ("alpha", "beta", "gamma"):
+        with zipfile.ZipFile(d / f"{name}.skill", "w") as zf:
+            zf.writestr(f"{name}/SKILL.md", SKILL_MD.format(name=name) * 8)
+    return d
+
+
+def test_condense_tiers():
+    content = SKILL_MD.format(name="demo").split("---", 2)[2]  # el titulo no es una seccion de ejemplos
+    no_examples = condense(content, "no-examples")
+    assert "## Ejemplos" not in no_examples and "for (let i" not in no_examples
+    assert "const ctx = createContext();" in no_examples
+    assert "ctx2" not in no_examples  # solo el primer grupo del bloque
+    outline = condense(content, "outline")
+    assert "## Reglas" in outline and "- NUNCA bloquear el loop" in outline
+    assert "// Crear el contexto" in outline
+    assert "Introduccion larga" not in outline and "createContext()" not in outline
+
+
+def test_tiers_cached_on_disk_and_invalidated(skills_dir):
+    cache = get_tier_cache(str(skills_dir))
+    tiers = cache.get("alpha")
+    assert set(tiers) == {"full", "no-examples", "outline"}
+    assert tiers["full"].tokens > tiers["no-examples"].tokens > tiers["outline"].tokens
+
+    # Otra instancia lee del JSON sin abrir el zip
+    fresh = skill_tiers.SkillTierCache(str(skills_dir))
+    assert fresh.get("alpha")["outline"].content == tiers["outline"].content
+
+    with zipfile.ZipFile(skills_dir / "alpha.skill", "w") as zf:
+        zf.writestr("alpha/SKILL.md", "---\nname: alpha\n---\nnuevo contenido")
+    assert cache.get("alpha")["full"].content == "nuevo contenido"
+
+
+def test_tier_cache_tokenizer_and_batched_save(skills_dir, monkeypatch):
+    cache = get_tier_cache(str(skills_dir))
+    writes = []
+    original = skill_tiers.os.replace
+
+    def replace(src, dst):
+        if dst == cache.cache_path:
+            writes.append(dst)
+        original(src, dst)
+
+    monkeypatch.setattr(skill_tiers.os, "replace", replace)
+    pack_skill_contents(str(skills_dir), ["alpha", "beta", "gamma"], 10 ** 6)
+    assert len(writes) == 1  # una escritura para las tres skills
+    pack_skill_contents(str(skills_dir), ["alpha", "beta"], 10 ** 6)
+    assert len(writes) == 1
+    with open(cache.cache_path, encoding="utf-8") as f:
+        assert json.load(f)["tokenizer"] == get_tokenizer().name
+
+    # Otro tokenizador: el JSON no sirve y los niveles se recalculan
+    other = SimpleNamespace(name="otro-tokenizador")
+    monkeypatch.setattr(skill_tiers, "get_tokenizer", lambda: other)
+    fresh = skill_tiers.SkillTierCache(str(skills_dir))
+    assert fresh._load() == {}
+    assert fresh.get("alpha") and len(writes) == 2
+
+
+def test_knapsack_prefers_total_relevance():
+    def cand(name, relevance, full, outline):
+        return PackCandidate(name, relevance, {
+            "full": SkillTier(name, "full", "f", full),
+            "outline": SkillTier(name, "outline", "o", outline),
+        })
+
+    # El recorrido voraz meteria "big" completa y dejaria fuera al resto
+    candidates = [cand("big", 1.0, 900, 100), cand("mid", 0.9, 400, 100), cand("low", 0.8, 400, 100)]
+    picked = pack_skills(candidates, 1000)
+    assert [(t.name, t.tier) for t in picked] == [
+        ("big", "outline"), ("mid", "full"), ("low", "full")]
+    assert sum(t.tokens for t in picked) <= 1000
+    assert pack_skills(candidates, 10) == []
+
+
+def test_budget_loader_uses_tiers(skills_dir):
+    full = get_tier_cache(str(skills_dir)).get("alpha")
+    budget = full["full"].tokens + full["outline"].tokens + 100
+    picked = pack_skill_contents(str(skills_dir), [("alpha", 0.9), ("beta", 0.5)], budget)
+    assert [(t.name, t.tier) for t in picked] == [("alpha", "full"), ("beta", "outline")]
+
+    context, used = _load_skills_with_budget(str(skills_dir), ["alpha", "beta"], budget, header="H\n")
+    assert context.startswith("H\n\n--- alpha ---") and "--- beta ---" in context
+    assert used <= budget
+
+    # Ni el esquema cabe: se recorta en un salto de linea
+    tiny = full["outline"].tokens - 10
+    (cut,) = pack_skill_contents(str(skills_dir), ["alpha"], tiny)
+    assert cut.tier == "truncated" and full["outline"].content.startswith(cut.content)
@@ -0,0 +1,114 @@
+"""Tests para SSEStreamParser — interpretacion de lineas SSE compartida sync/async."""
+import json
+
+from deepseek_code.client.sse_parser import SSEStreamParser, format_sse_events, new_sse_diag
+
+
+def _data(obj) -> str:
+    return "data: " + json.dumps(obj, ensure_ascii=False)
+
+
+def _run(lines):
+    parser = SSEStreamParser(new_sse_diag())
+    tokens = []
+    for line in lines:
+        token = parser.feed(line)
+        if token:
+            tokens.append(token)
+        if parser.finished:
+            break
+    parser.close()
+    return parser, tokens
+
+
+class TestSSEStreamParser:
+    def test_content_tokens_after_thinking(self):
+        parser, tokens = _run([
+            _data({"request_message_id": 1, "response_message_id": 2}),
+            _data({"p": "response/thinking_content", "v": "pienso"}),
+            _data({"v": " mas"}),
+            _data({"p": "response/content", "v": "Hola"}),
+            _data({"v": " mundo"}),
+            "event: finish",
+            _data({"v": "ignorado"}),
+        ])
+        assert tokens == ["Hola", " mundo"]
+        assert parser.last_message_id == 2
+        assert parser.diag["thinking_chunks"] == 2
+        assert parser.diag["content_chars"] == len("Hola mundo")
+        assert parser.diag["finish_reason"] == "event:finish"
+        assert parser.diag["mode_transitions"] == ["init→thinking", "thinking→content"]
+
+    def test_response_object_message_id(self):
+        parser, tokens = _run([
+            _data({"v": {"response": {"message_id": 7}}}),
+            _data({"p": "response/content", "v": "ok"}),
+        ])
+        assert tokens == ["ok"]
+        assert parser.last_message_id == 7
+        assert parser.diag["finish_reason"] == "stream_end"
+
+    def test_empty_path_ignored_before_content(self):
+        _, tokens = _run([_data({"v": "antes"}), "data: [DONE]"])
+        assert tokens == []
+
+    def test_parse_error_recorded(self):
+        parser, tokens = _run(["data: {no json", _data({"p": "response/content", "v": "x"})])
+        assert tokens == ["x"]
+        assert parser.diag["errors"]
+
+    def test_events_ring_bounded(self):
+        parser, _ = _run([_data({"p": f"otro/{i}", "v": 1}) for i in range(100)])
+        assert len(parser.diag["events"]) <= 30
+
+
+def _compact(obj) -> str:
+    """Formato real de DeepSeek: JSON sin espacios (activa el camino rapido)."""
+    return "data: " + json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+MIXED_STREAM = [
+    _compact({"request_message_id": 1, "response_message_id": 2}),
+    _compact({"v": {"response": {"message_id": 2}}}),
+    _compact({"p": "response/thinking_content", "v": "pienso"}),
+    _compact({"v": " con \"comillas\""}),
+    _compact({"v": "ñandú"}),
+    _compact({"p": "response/search_status", "v": "x"}),
+    _compact({"p": "response/content", "v": "Hola"}),
+    _compact({"v": " mundo\n"}),
+    _compact({"v": "con \\ backslash"}),
+    _compact({"v": ", \"citado\""}),
+    _compact({"v": {"content": " dict"}}),
+    "data: [DONE]",
+]
+
+
+class TestSSEFastPath:
+    def _run_mode(self, fast_path, use_bytes=False):
+        parser = SSEStreamParser(new_sse_diag(), fast_path=fast_path)
+        tokens = []
+        for line in MIXED_STREAM:
+            token = parser.feed_bytes(line.encode("utf-8")) if use_bytes else parser.feed(line)
+            if token:
+                tokens.append(token)
+        parser.close()
+        return parser, tokens
+
+    def test_fast_path_matches_full_decode(self):
+        slow, slow_tokens = self._run_mode(False)
+        for use_bytes in (False, True):
+            fast, fast_tokens = self._run_mode(True, use_bytes)
+            assert fast_tokens == slow_tokens
+            assert fast.last_message_id == slow.last_message_id
+            for key in ("total_lines", "total_data_chunks", "thinking_chunks",
+                        "content_chunks", "content_chars", "mode_transitions"):
+                assert fast.diag[key] == slow.diag[key], key
+            assert fast.diag["fast_path_chunks"] > 0
+        assert slow.diag["fast_path_chunks"] == 0
+
+    def test_events_formatted_lazily(self):
+        parser, _ = self._run_mode(True)
+        assert all(isinstance(ev, tuple) for ev in parser.diag["events"])
+        lines = format_sse_events(parser.diag, last=2)
+        assert len(lines) == 2
+        assert lines[-1].startswith("+") and "data: [DONE]" in lines[-1]
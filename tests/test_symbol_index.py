@@ -0,0 +1,137 @@
+"""Tests para la tabla de simbolos de find_symbol / get_symbols_overview."""
+import asyncio
+import os
+import sqlite3
+import time
+
+import pytest
+
+from deepseek_code.serena import native_tools, symbol_index
+from deepseek_code.serena.native_tools import FindSymbolTool, SymbolsOverviewTool
+from deepseek_code.serena.symbol_index import SymbolIndex
+from deepseek_code.server import tool
+from deepseek_code.server.tool import bump_mutation_epoch
+
+
+@pytest.fixture(autouse=True)
+def isolated_appdata(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+
+
+def _project(root):
+    files = {
+        "src/config.py": (
+            "import os\n\nDEFAULTS = {}\n\n\nclass Config:\n    def load(self):\n"
+            "        return 1\n\n\ndef load_config(path):\n    return path\n\n\ndef load_all():\n    pass\n"
+        ),
+        "src/app.js": "const loadConfig = (p) => {\n  return p;\n};\nconst LIMIT = 3;\n",
+        "node_modules/dep/config.py": "def load_config(): pass\n",
+        "README.md": "def load_config\n",
+    }
+    for rel, text in files.items():
+        path = root / "proj" / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return root / "proj"
+
+
+def _run(tool, **kwargs):
+    return asyncio.run(tool.execute(**kwargs))
+
+
+class TestFindSymbolIndexed:
+    def test_exact_prefix_and_body(self, tmp_path):
+        root = _project(tmp_path)
+        tool = FindSymbolTool([str(root)])
+        out = _run(tool, name_path_pattern="load_config", include_body=True)
+        assert out["total_found"] == 1
+        hit = out["results"][0]
+        assert (hit["file"], hit["kind"], hit["line"], hit["end_line"]) == ("src/config.py", "function", 11, 12)
+        assert hit["body"] == "def load_config(path):\n    return path"
+        out = _run(tool, name_path_pattern="load_", prefix_match=True)
+        assert [r["name"] for r in out["results"]] == ["load_config", "load_all"]
+        out = _run(tool, name_path_pattern="LIMIT", relative_path="src/app.js", include_body=True)
+        assert out["results"][0]["body"] == "const LIMIT = 3;"
+
+    def test_incremental_refresh(self, tmp_path):
+        root = _project(tmp_path)
+        tool = FindSymbolTool([str(root)])
+        assert _run(tool, name_path_pattern="Config")["total_found"] == 1
+        (root / "src" / "config.py").write_text("class Settings:\n    pass\n", encoding="utf-8")
+        bump_mutation_epoch()
+        assert _run(tool, name_path_pattern="Config")["total_found"] == 0
+        assert _run(tool, name_path_pattern="Settings")["results"][0]["end_line"] == 2
+
+    def test_overview_reparses_only_changed_file(self, tmp_path):
+        root = _project(tmp_path)
+        tool = SymbolsOverviewTool([str(root)])
+        out = _run(tool, relative_path="src/app.js")
+        assert list(out["symbols"]) == ["arrow", "variable"]
+        assert [s["name"] for s in out["symbols"]["variable"]] == ["loadConfig", "LIMIT"]
+        assert out["total_lines"] == 4
+        path = root / "src" / "app.js"
+        path.write_text("export class Widget {\n}\n", encoding="utf-8")
+        os.utime(path, ns=(1, 1))
+        out = _run(tool, relative_path="src/app.js")
+        assert out["symbols"] == {"class": [{"name": "Widget", "line": 1, "end_line": 2,
+                                             "preview": "export class Widget {"}]}
+
+
+    def test_scan_fallback_and_partial_refresh(self, tmp_path, monkeypatch):
+        root = _project(tmp_path)
+        (root / ".gitignore").write_text("generated.py\n", encoding="utf-8")
+        (root / "src" / "generated.py").write_text("def load_config():\n    pass\n", encoding="utf-8")
+        tool = FindSymbolTool([str(root)])
+        indexed = _run(tool, name_path_pattern="load_config")
+        assert [r["file"] for r in indexed["results"]] == ["src/config.py"]
+
+        def no_index(_root):
+            raise sqlite3.OperationalError("database is locked")
+
+        with monkeypatch.context() as m:
+            m.setattr(native_tools, "get_symbol_index", no_index)
+            assert _run(tool, name_path_pattern="load_config")["results"] == indexed["results"]
+
+        def full_walk(*args):
+            raise AssertionError("no deberia recorrer todo el proyecto")
+
+        monkeypatch.setattr(symbol_index, "scan_project", full_walk)
+        extra = root / "src" / "extra.py"
+        extra.write_text("def load_config():\n    pass\n", encoding="utf-8")
+        bump_mutation_epoch([str(extra), str(root / "src" / "generated.py")])
+        assert [r["file"] for r in _run(tool, name_path_pattern="load_config")["results"]] == [
+            "src/config.py", "src/extra.py"]
+
+
+class TestSymbolIndexStore:
+    def test_persists_and_parallel_rebuild(self, tmp_path, monkeypatch):
+        root = _project(tmp_path)
+        first = SymbolIndex(str(root))
+        assert first.refresh(force=True)["indexed"] == 2
+        first.close()
+        second = SymbolIndex(str(root))
+        assert second.refresh(force=True)["indexed"] == 0
+        monkeypatch.setattr(symbol_index, "PARALLEL_MIN_FILES", 1)
+        assert second.rebuild(workers=2)["indexed"] == 2
+        assert [s["file"] for s in second.lookup("load_config")] == ["src/config.py"]
+        second.close()
+
+    def test_idle_refresh_uses_mutation_log(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(tool, "_external_writers", 0)
+        monkeypatch.setattr(tool, "_external_last_end", 0.0)
+        root = _project(tmp_path)
+        index = SymbolIndex(str(root))
+        index.refresh(force=True)
+        walks = []
+        original = symbol_index.scan_project
+        monkeypatch.setattr(symbol_index, "scan_project", lambda *a: walks.append(a) or original(*a))
+
+        index._last_refresh = time.monotonic() - 30
+        assert index.refresh() is None
+        extra = root / "src" / "extra.py"
+        extra.write_text("def extra():\n    pass\n", encoding="utf-8")
+        bump_mutation_epoch([str(extra)])
+        assert index.refresh()["partial"] and walks == []
+        index._last_refresh = time.monotonic() - symbol_index.REFRESH_INTERVAL_SECONDS
+        assert not index.refresh()["partial"] and len(walks) == 1
+        index.close()
@@ -0,0 +1,59 @@
+"""Tests para el conteo de tokens unificado (BPE + cache por contenido)."""
+import json
+
+from deepseek_code import tokenization
+from deepseek_code.tokenization import count_tokens, get_tokenizer, truncate_to_tokens
+from deepseek_code.tokenization.bpe import BPETokenizer, encode_merge
+
+
+def test_bundled_vocab_follows_text_shape():
+    tok = get_tokenizer()
+    assert isinstance(tok, BPETokenizer)
+    # Palabras comunes de codigo son un solo token
+    assert tok.tokenize(" return") == [b" return"]
+    # Numeros en grupos de hasta 3 digitos, cada grupo un token
+    assert tok.tokenize("1234567") == [b"123", b"456", b"7"]
+    assert count_tokens("") == 0 and count_tokens(None) == 0
+    code = "def load_config(path):\n    with open(path) as f:\n        return json.load(f)\n"
+    assert 10 < count_tokens(code) < len(code) / 2
+
+
+def test_cache_is_keyed_by_content(monkeypatch):
+    tokenization.reset_tokenizer()
+    tok = get_tokenizer()
+    calls = []
+    original = tok.count
+    monkeypatch.setattr(tok, "count", lambda text: calls.append(len(text)) or original(text))
+    big = "import os\n" * 100
+    first = count_tokens(big)
+    assert count_tokens("".join(["import os\n"] * 100)) == first  # otro objeto, mismo contenido
+    assert len(calls) == 1
+    count_tokens(big + "x")
+    assert len(calls) == 2
+
+
+def test_truncate_to_tokens():
+    text = "palabra " * 500
+    cut = truncate_to_tokens(text, 100)
+    assert text.startswith(cut)
+    assert 95 <= count_tokens(cut) <= 100
+    assert truncate_to_tokens("corto", 100) == "corto"
+    assert truncate_to_tokens(text, 0) == ""
+
+
+def test_loads_huggingface_tokenizer_json(tmp_path, monkeypatch):
+    # Vocabulario minusculo en formato tokenizer.json
+    merges = [(b"h", b"o"), (b"ho", b"l"), (b"hol", b"a"), (b" ", b"m"), (b" m", b"u"),
+              (b" mu", b"n"), (b" mun", b"d"), (b" mund", b"o")]
+    hf = {"model": {"type": "BPE", "merges": [encode_merge(a, b).split(" ") for a, b in merges]}}
+    path = tmp_path / "tokenizer.json"
+    path.write_text(json.dumps(hf), encoding="utf-8")
+    monkeypatch.setenv(tokenization.counter.TOKENIZER_ENV, str(path))
+    tokenization.reset_tokenizer()
+    try:
+        tok = get_tokenizer()
+        assert tok.tokenize("hola mundo") == [b"hola", b" mundo"]
+        assert count_tokens("hola mundo") == 2
+    finally:
+        monkeypatch.delenv(tokenization.counter.TOKENIZER_ENV)
+        tokenization.reset_tokenizer()
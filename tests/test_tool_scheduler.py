@@ -0,0 +1,106 @@
+"""Tests para tool_scheduler — tool calls concurrentes con dependencias por ruta."""
+import asyncio
+
+from deepseek_code.client.tool_scheduler import calls_conflict, run_tool_calls
+from deepseek_code.server.protocol import MCPServer
+from deepseek_code.server.tool import BaseTool
+
+
+class _Recorder:
+    """Registra inicio/fin de cada ejecucion para verificar solapamientos."""
+
+    def __init__(self):
+        self.events = []
+        self.active = 0
+        self.max_active = 0
+
+
+class _SlowTool(BaseTool):
+    path_args = ("path",)
+
+    def __init__(self, name, recorder, read_only):
+        self.read_only = read_only
+        self.recorder = recorder
+        super().__init__(name, name)
+
+    def _build_schema(self):
+        return {"type": "object", "properties": {"path": {"type": "string"}}}
+
+    async def execute(self, path):
+        rec = self.recorder
+        rec.events.append(("start", self.name, path))
+        rec.active += 1
+        rec.max_active = max(rec.max_active, rec.active)
+        await asyncio.sleep(0.02)
+        rec.active -= 1
+        rec.events.append(("end", self.name, path))
+        return f"{self.name}:{path}"
+
+
+class _Barrier(_SlowTool):
+    path_args = ()
+
+    def _build_schema(self):
+        return {"type": "object", "properties": {"command": {"type": "string"}}}
+
+    async def execute(self, command):
+        return await super().execute(command)
+
+
+def _server(tmp_path):
+    rec = _Recorder()
+    server = MCPServer()
+    server.register_tool(_SlowTool("read_file", rec, True))
+    server.register_tool(_SlowTool("write_file", rec, False))
+    server.register_tool(_Barrier("run_command", rec, False))
+    return server, rec
+
+
+def _call(tool, path):
+    key = "command" if tool == "run_command" else "path"
+    return {"tool": tool, "args": {key: path}}
+
+
+class TestToolScheduler:
+    def test_independent_reads_run_concurrently_in_order(self, tmp_path):
+        server, rec = _server(tmp_path)
+        calls = [_call("read_file", str(tmp_path / f"f{i}")) for i in range(5)]
+        results = asyncio.run(run_tool_calls(server, calls, "t", max_concurrency=3))
+        assert [r.response.result["content"] for r in results] == [
+            f"read_file:{tmp_path / f'f{i}'}" for i in range(5)
+        ]
+        assert rec.max_active == 3
+        assert all(r.wall_s > 0 for r in results)
+
+    def test_same_path_write_is_serialised(self, tmp_path):
+        server, rec = _server(tmp_path)
+        target = str(tmp_path / "a.py")
+        calls = [
+            _call("write_file", target),
+            _call("read_file", target),
+            _call("read_file", str(tmp_path / "b.py")),
+        ]
+        asyncio.run(run_tool_calls(server, calls, "t"))
+        # La lectura de a.py arranca despues de que termina la escritura
+        assert rec.events.index(("start", "read_file", target)) > rec.events.index(("end", "write_file", target))
+        # b.py no depende de nada: arranca junto con la escritura
+        assert rec.events.index(("start", "read_file", str(tmp_path / "b.py"))) < rec.events.index(("end", "write_file", target))
+
+    def test_barrier_blocks_everything(self, tmp_path):
+        server, rec = _server(tmp_path)
+        calls = [
+            _call("read_file", str(tmp_path / "a")),
+            _call("run_command", "npm test"),
+            _call("read_file", str(tmp_path / "b")),
+        ]
+        asyncio.run(run_tool_calls(server, calls, "t"))
+        assert rec.max_active == 1
+
+    def test_directory_contains_file(self, tmp_path):
+        write_dir = ([], [str(tmp_path / "src")])
+        read_file = ([str(tmp_path / "src" / "x.py")], [])
+        read_other = ([str(tmp_path / "srcx" / "x.py")], [])
+        assert calls_conflict(write_dir, read_file)
+        assert not calls_conflict(write_dir, read_other)
+        assert not calls_conflict(read_file, read_other)
+        assert calls_conflict(None, read_file)
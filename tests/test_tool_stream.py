@@ -0,0 +1,129 @@
+"""Tests para ToolCallStream y SpeculativeToolRunner (tool calls durante el stream)."""
+import asyncio
+
+from deepseek_code.client.tool_stream import SpeculativeToolRunner, ToolCallStream
+from deepseek_code.client.web_tool_caller import extract_tool_calls
+from deepseek_code.server.protocol import MCPServer
+from deepseek_code.server.tool import BaseTool
+
+RESPONSE = (
+    "Voy a leer los archivos.\n"
+    "```tool_call\n"
+    '[{"tool": "read_file", "args": {"path": "a.py"}},'
+    ' {"tool": "read_file", "args": {"path": "b.py"}}]\n'
+    "```\n"
+    "Y ademas, repetido:\n"
+    "```tool_call\n"
+    '{"tool": "read_file", "args": {"path": "a.py"}}\n'
+    "```\n"
+    "```tool_call\n"
+    'texto basura {"tool": "write_file", "arguments": {"path": "c.py", "content": "x = `1`"}}\n'
+    "```\n"
+    "Fin con ``` suelto."
+)
+
+
+def _feed_in_chunks(stream, text, size):
+    emitted = []
+    for i in range(0, len(text), size):
+        emitted.extend(stream.feed(text[i:i + size]))
+    return emitted
+
+
+class TestToolCallStream:
+    def test_matches_extract_tool_calls_for_any_split(self):
+        expected, _ = extract_tool_calls(RESPONSE)
+        for size in (1, 2, 3, 7, 16, len(RESPONSE)):
+            stream = ToolCallStream()
+            assert _feed_in_chunks(stream, RESPONSE, size) == expected, size
+            assert stream.text == RESPONSE
+
+    def test_emits_before_response_ends(self):
+        stream = ToolCallStream()
+        head = RESPONSE[:RESPONSE.index("Y ademas")]
+        assert [c["args"]["path"] for c in stream.feed(head)] == ["a.py", "b.py"]
+
+    def test_reset_clears_dedup(self):
+        seen = []
+        stream = ToolCallStream(on_call=seen.append)
+        stream.feed(RESPONSE)
+        stream.reset()
+        stream.feed(RESPONSE)
+        assert len(seen) == 2 * len(extract_tool_calls(RESPONSE)[0])
+
+
+class _CountingRead(BaseTool):
+    read_only = True
+
+    def __init__(self):
+        self.calls = 0
+        super().__init__("read_file", "lee")
+
+    def _build_schema(self):
+        return {"type": "object", "properties": {"path": {"type": "string"}}}
+
+    async def execute(self, path):
+        self.calls += 1
+        return f"contenido de {path}"
+
+
+class _Write(_CountingRead):
+    read_only = False
+
+    def __init__(self):
+        super().__init__()
+        self.name = "write_file"
+
+    def _build_schema(self):
+        return {"type": "object", "properties": {
+            "path": {"type": "string"}, "content": {"type": "string"}}}
+
+    async def execute(self, path, content=""):
+        self.calls += 1
+        return "ok"
+
+
+class TestSpeculativeToolRunner:
+    def _server(self):
+        server = MCPServer()
+        reader, writer = _CountingRead(), _Write()
+        server.register_tool(reader)
+        server.register_tool(writer)
+        return server, reader, writer
+
+    def test_read_only_calls_start_during_stream(self):
+        async def run():
+            server, reader, writer = self._server()
+            runner = SpeculativeToolRunner(server, "t")
+            stream = runner.stream()
+            stream.feed(RESPONSE)
+            calls, _ = extract_tool_calls(RESPONSE)
+            await asyncio.sleep(0)
+            responses = [await runner.take(c) for c in calls]
+            return runner, reader, writer, responses
+
+        runner, reader, writer, responses = asyncio.run(run())
+        assert runner.started == 2 and runner.used == 2
+        assert reader.calls == 2
+        assert writer.calls == 0  # las herramientas mutantes nunca se anticipan
+        assert responses[0].result == {"content": "contenido de a.py"}
+        assert responses[2] is None
+
+    def test_nothing_speculated_after_mutating_call(self):
+        text = (
+            "```tool_call\n"
+            '[{"tool": "write_file", "args": {"path": "a.py"}},'
+            ' {"tool": "read_file", "args": {"path": "a.py"}}]\n'
+            "```"
+        )
+
+        async def run():
+            server, reader, _ = self._server()
+            runner = SpeculativeToolRunner(server, "t")
+            runner.stream().feed(text)
+            await asyncio.sleep(0)
+            return runner, reader
+
+        runner, reader = asyncio.run(run())
+        assert runner.started == 0
+        assert reader.calls == 0
@@ -0,0 +1,153 @@
+"""Tests para el indice de trigramas de serena_search_for_pattern."""
+import asyncio
+import os
+import sqlite3
+import time
+
+import pytest
+
+from deepseek_code.serena import native_tools, trigram_index
+from deepseek_code.serena.native_tools import SearchPatternTool
+from deepseek_code.serena.trigram_index import (
+    TrigramIndex, fts_query, line_of, line_starts, required_literals,
+)
+from deepseek_code.server import tool
+from deepseek_code.server.tool import (
+    bump_mutation_epoch, external_writer_finished, external_writer_started,
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_appdata(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+
+
+def _project(root):
+    files = {
+        "src/config.py": "import os\n\ndef load_config(path):\n    return path\n",
+        "src/app.py": "from config import load_config\n\nload_config('x')\n",
+        "src/util.js": "function loadConfig() {}\n",
+        "node_modules/dep/config.py": "def load_config(): pass\n",
+    }
+    for rel, text in files.items():
+        path = root / "proj" / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return root / "proj"
+
+
+def _search(root, **kwargs):
+    tool = SearchPatternTool([str(root)])
+    return asyncio.run(tool.execute(**kwargs))
+
+
+class TestRequiredLiterals:
+    def test_extraction(self):
+        assert required_literals(r"def\s+load_config") == ("and", [("lit", "def"), ("lit", "load_config")])
+        assert required_literals(r"(?:foo|barbaz)_x") == ("or", [("lit", "foo"), ("lit", "barbaz")])
+        assert required_literals(r"(abc)?\w+") is None
+        assert required_literals(r"a.b") is None
+        assert required_literals(r"(?:abc|d)") is None
+        assert fts_query(("lit", "Load")) == '("loa" AND "oad")'
+
+    def test_line_offsets(self):
+        text = "uno\ndos\n\ntres"
+        starts = line_starts(text)
+        assert list(starts) == [0, 4, 8, 9]
+        assert [line_of(starts, text.index(w)) for w in ("uno", "dos", "tres")] == [0, 1, 3]
+
+
+class TestSearchPatternIndexed:
+    def test_matches_with_line_numbers(self, tmp_path):
+        root = _project(tmp_path)
+        out = _search(root, substring_pattern=r"def\s+load_config", context_lines=1)
+        assert list(out["matches"]) == ["src/config.py"]
+        match = out["matches"]["src/config.py"][0]
+        assert match["line"] == 3
+        assert match["snippet"].splitlines() == [
+            "   2: ", ">> 3: def load_config(path):", "   4:     return path"]
+        # Solo se leyo el candidato (node_modules no se indexa)
+        assert out["files_searched"] == 1 and out["files_indexed"] == 3
+
+    def test_glob_prefix_and_incremental_update(self, tmp_path):
+        root = _project(tmp_path)
+        out = _search(root, substring_pattern="load_config", file_glob="*.py", relative_path="src")
+        assert sorted(out["matches"]) == ["src/app.py", "src/config.py"]
+        (root / "src" / "new.py").write_text("x = load_config\n", encoding="utf-8")
+        os.remove(root / "src" / "app.py")
+        bump_mutation_epoch()  # como tras un write_file del servidor MCP
+        out = _search(root, substring_pattern="load_config")
+        assert sorted(out["matches"]) == ["src/config.py", "src/new.py"]
+
+    def test_index_persists_and_reindexes_only_changes(self, tmp_path):
+        root = _project(tmp_path)
+        first = TrigramIndex(str(root))
+        assert first.refresh(force=True)["indexed"] == 3
+        first.close()
+        second = TrigramIndex(str(root))
+        assert second.refresh(force=True)["indexed"] == 0
+        (root / "src" / "app.py").write_text("changed = 1\n", encoding="utf-8")
+        os.utime(root / "src" / "app.py", ns=(1, 1))
+        assert second.refresh(force=True)["indexed"] == 1
+        assert list(second.candidates("load_config")) == ["src/config.py"]
+
+    def test_scan_fallback_selects_the_same_files(self, tmp_path, monkeypatch):
+        root = _project(tmp_path)
+        (root / ".gitignore").write_text("gen/\n", encoding="utf-8")
+        (root / "src" / "gen").mkdir()
+        (root / "src" / "gen" / "out.py").write_text("load_config = 1\n", encoding="utf-8")
+        indexed = _search(root, substring_pattern="load_config")
+
+        def no_fts5(_root):
+            raise sqlite3.OperationalError("no such tokenizer: trigram")
+
+        monkeypatch.setattr(native_tools, "get_trigram_index", no_fts5)
+        for kwargs in ({}, {"relative_path": "src"}):
+            scanned = _search(root, substring_pattern="load_config", **kwargs)
+            assert scanned["matches"] == indexed["matches"]
+        assert sorted(indexed["matches"]) == ["src/app.py", "src/config.py"]
+
+    def test_tool_mutation_rescans_only_written_paths(self, tmp_path, monkeypatch):
+        root = _project(tmp_path)
+        index = TrigramIndex(str(root))
+        index.refresh(force=True)
+
+        def full_walk(*args):
+            raise AssertionError("no deberia recorrer todo el proyecto")
+
+        monkeypatch.setattr(trigram_index, "scan_project", full_walk)
+        new = root / "src" / "new.py"
+        new.write_text("x = load_config\n", encoding="utf-8")
+        os.remove(root / "src" / "app.py")
+        bump_mutation_epoch([str(new)])
+        bump_mutation_epoch([str(root / "src" / "app.py")])
+        stats = index.refresh()
+        assert stats["partial"] and (stats["indexed"], stats["removed"]) == (1, 1)
+        assert list(index.candidates("load_config")) == ["src/config.py", "src/new.py"]
+
+        # Una mutacion sin rutas declaradas (run_command) obliga al recorrido completo
+        bump_mutation_epoch()
+        with pytest.raises(AssertionError):
+            index.refresh()
+
+    def test_idle_queries_skip_the_full_walk(self, tmp_path, monkeypatch):
+        # Sin procesos en background de otros tests
+        monkeypatch.setattr(tool, "_external_writers", 0)
+        monkeypatch.setattr(tool, "_external_last_end", 0.0)
+        root = _project(tmp_path)
+        index = TrigramIndex(str(root))
+        index.refresh(force=True)
+        walks = []
+        original = trigram_index.scan_project
+        monkeypatch.setattr(trigram_index, "scan_project", lambda *a: walks.append(a) or original(*a))
+
+        # Tool calls separadas por mas de unos segundos: sin recorrido
+        index._last_refresh = time.monotonic() - 30
+        assert index.refresh() is None and walks == []
+        # Un proceso en background pudo escribir: recorrido completo
+        external_writer_started()
+        external_writer_finished()
+        assert not index.refresh()["partial"] and len(walks) == 1
+        # Y cada FULL_REFRESH_SECONDS, por cambios hechos fuera de las tools
+        index._last_refresh = time.monotonic() - trigram_index.REFRESH_INTERVAL_SECONDS
+        assert not index.refresh()["partial"] and len(walks) == 2
@@ -0,0 +1,68 @@
+"""Tests para el cache de modulo WASM del PoW (proceso + disco)."""
+import threading
+
+import pytest
+
+wasmtime = pytest.importorskip("wasmtime")
+
+from deepseek_code.client import wasm_runtime  # noqa: E402
+
+_WAT = """
+(module
+  (memory (export "memory") 1)
+  (func (export "wasm_solve"))
+  (func (export "wasm_deepseek_hash_v1")))
+"""
+
+
+@pytest.fixture
+def wasm_file(tmp_path):
+    path = tmp_path / "sha3_wasm_bg.wasm"
+    path.write_bytes(wasmtime.wat2wasm(_WAT))
+    wasm_runtime.clear_memory_cache()
+    yield path
+    wasm_runtime.clear_memory_cache()
+
+
+class TestWasmRuntime:
+    def test_compiles_once_per_process(self, wasm_file):
+        _, m1 = wasm_runtime.get_compiled_module(wasm_file)
+        _, m2 = wasm_runtime.get_compiled_module(wasm_file)
+        assert m1 is m2
+        stats = wasm_runtime.get_cache_stats()
+        assert stats["compiled"] == 1
+        assert stats["memory_hits"] == 1
+
+    def test_artifact_reused_by_new_process(self, wasm_file):
+        wasm_runtime.get_compiled_module(wasm_file)
+        artifacts = list((wasm_file.parent / wasm_runtime.CACHE_DIRNAME).glob("*.cwasm"))
+        assert len(artifacts) == 1
+
+        wasm_runtime.clear_memory_cache()
+        wasm_runtime.get_compiled_module(wasm_file)
+        stats = wasm_runtime.get_cache_stats()
+        assert stats["compiled"] == 0
+        assert stats["deserialized"] == 1
+
+    def test_corrupt_artifact_recompiled(self, wasm_file):
+        wasm_runtime.get_compiled_module(wasm_file)
+        artifact = next((wasm_file.parent / wasm_runtime.CACHE_DIRNAME).glob("*.cwasm"))
+        artifact.write_bytes(b"basura")
+
+        wasm_runtime.clear_memory_cache()
+        wasm_runtime.get_compiled_module(wasm_file)
+        assert wasm_runtime.get_cache_stats()["compiled"] == 1
+
+    def test_instance_per_thread(self, wasm_file):
+        engine, module = wasm_runtime.get_compiled_module(wasm_file)
+        stores = []
+
+        def _worker():
+            stores.append(wasm_runtime.PowInstance(engine, module).store)
+
+        threads = [threading.Thread(target=_worker) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len({id(s) for s in stores}) == 3